@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Audit Sink - Buffered Audit Log Writer
+======================================
+
+Takes audit rows off the request path. Callers append a row to a bounded
+in-memory ring buffer (microseconds); a background thread drains the buffer
+into SQLite over one long-lived WAL connection, writing many rows per
+transaction and committing whenever the batch is large enough or its oldest
+row old enough.
+
+Durability modes:
+- buffered: never wait; rows reach disk within the flush interval
+- flush_on_critical: critical rows wait until they are committed with
+  synchronous=FULL; everything else is buffered
+- sync: every row waits for its commit
+
+When the buffer is full the oldest pending row is dropped and counted, so a
+stalled disk degrades auditing instead of request latency or memory. A caller
+waiting on a dropped row is told its write failed.
+"""
+
+import atexit
+import logging
+import sqlite3
+import threading
+import time
+from collections import deque
+from enum import Enum
+from pathlib import Path
+from typing import Any, Deque, Dict, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class AuditDurability(Enum):
+    """How long audit callers wait for their row to reach disk"""
+    BUFFERED = "buffered"
+    FLUSH_ON_CRITICAL = "flush_on_critical"
+    SYNC = "sync"
+
+
+class AuditSink:
+    """Bounded ring buffer of audit rows drained by a background batch writer"""
+
+    def __init__(
+        self,
+        db_path: Path,
+        statements: Dict[str, str],
+        capacity: int = 10000,
+        max_batch: int = 256,
+        max_age: float = 0.5,
+        durability: AuditDurability = AuditDurability.FLUSH_ON_CRITICAL,
+        flush_timeout: float = 5.0,
+    ):
+        """
+        Args:
+            db_path: SQLite database (tables must already exist)
+            statements: INSERT statement per record kind, e.g. {"audit_event": "INSERT ..."}
+            capacity: Pending rows held before the oldest is dropped
+            max_batch: Rows written per transaction at most; a full batch is flushed immediately
+            max_age: Seconds a row may wait before its batch is flushed
+            durability: When callers wait for their row's commit
+            flush_timeout: Longest a waiting caller blocks before giving up
+        """
+        self.db_path = Path(db_path)
+        self.statements = statements
+        self.capacity = capacity
+        self.max_batch = max_batch
+        self.max_age = max_age
+        self.durability = durability
+        self.flush_timeout = flush_timeout
+
+        # (seq, kind, row, critical, enqueued_at)
+        self._buffer: Deque[Tuple[int, str, Sequence[Any], bool, float]] = deque()
+        self._cond = threading.Condition()
+        self._seq = 0
+        self._committed_seq = 0
+        # Rows a caller is waiting on, and those of them dropped on overflow
+        self._waiting: set = set()
+        self._dropped_waiting: set = set()
+        self._flush_requested = False
+        self._closing = False
+        self.stats = {
+            "enqueued": 0,
+            "written": 0,
+            "batches": 0,
+            "dropped": 0,
+            "failed": 0,
+            "critical_flushes": 0,
+            "flush_timeouts": 0,
+            "max_batch_seen": 0,
+            "max_pending": 0,
+        }
+
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+
+        self._thread = threading.Thread(target=self._run, name="audit-sink", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # ------------------------------------------------------------------
+    # Request path
+    # ------------------------------------------------------------------
+
+    def write(self, kind: str, row: Sequence[Any], critical: bool = False) -> bool:
+        """
+        Queue one row
+
+        Args:
+            kind: Key into `statements`
+            row: Statement parameters
+            critical: Row must be durable before returning (flush_on_critical mode)
+
+        Returns:
+            False only if the caller had to wait and its row was dropped or not
+            committed in time
+        """
+        with self._cond:
+            if self._closing:
+                self.stats["dropped"] += 1
+                return False
+            if len(self._buffer) >= self.capacity:
+                dropped_seq = self._buffer.popleft()[0]
+                self.stats["dropped"] += 1
+                if dropped_seq in self._waiting:
+                    self._dropped_waiting.add(dropped_seq)
+                    self._cond.notify_all()
+            self._seq += 1
+            seq = self._seq
+            self._buffer.append((seq, kind, row, critical, time.monotonic()))
+            self.stats["enqueued"] += 1
+            self.stats["max_pending"] = max(self.stats["max_pending"], len(self._buffer))
+
+            wait = self.durability == AuditDurability.SYNC or (
+                critical and self.durability == AuditDurability.FLUSH_ON_CRITICAL
+            )
+            if wait:
+                self._flush_requested = True
+                self._waiting.add(seq)
+            if wait or len(self._buffer) >= self.max_batch or len(self._buffer) == 1:
+                # The writer sleeps until the first row's deadline; wake it to re-plan
+                self._cond.notify_all()
+            if not wait:
+                return True
+            try:
+                return self._wait_for(seq)
+            finally:
+                self._waiting.discard(seq)
+                self._dropped_waiting.discard(seq)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until every row queued so far is committed
+
+        Returns:
+            True if committed within the timeout
+        """
+        with self._cond:
+            # An empty buffer is not enough: the writer may still hold a batch
+            if self._committed_seq >= self._seq:
+                return True
+            if self._buffer:
+                self._flush_requested = True
+                self._cond.notify_all()
+            return self._wait_for(self._seq, timeout)
+
+    def _wait_for(self, seq: int, timeout: Optional[float] = None) -> bool:
+        """Wait (holding the condition) until `seq` is committed or dropped"""
+        done = self._cond.wait_for(
+            lambda: (self._committed_seq >= seq or seq in self._dropped_waiting
+                     or self._thread is None or not self._thread.is_alive()),
+            timeout=self.flush_timeout if timeout is None else timeout,
+        )
+        if seq in self._dropped_waiting:
+            return False
+        if not done or self._committed_seq < seq:
+            self.stats["flush_timeouts"] += 1
+            return False
+        return True
+
+    # ------------------------------------------------------------------
+    # Background writer
+    # ------------------------------------------------------------------
+
+    def _next_batch(self):
+        """Wait until a batch is due, then take it off the buffer (holds the condition)"""
+        while True:
+            if self._buffer:
+                if self._closing or self._flush_requested or len(self._buffer) >= self.max_batch:
+                    break
+                remaining = self._buffer[0][4] + self.max_age - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            elif self._closing:
+                return None
+            else:
+                self._cond.wait()
+
+        count = min(self.max_batch, len(self._buffer))
+        batch = [self._buffer.popleft() for _ in range(count)]
+        if not self._buffer:
+            self._flush_requested = False
+        return batch
+
+    def _run(self):
+        while True:
+            with self._cond:
+                batch = self._next_batch()
+            if batch is None:
+                return
+            self._write_batch(batch)
+            with self._cond:
+                self._committed_seq = max(self._committed_seq, batch[-1][0])
+                self._cond.notify_all()
+
+    def _write_batch(self, batch):
+        critical = any(item[3] for item in batch)
+        rows_by_kind: Dict[str, list] = {}
+        for _, kind, row, _, _ in batch:
+            rows_by_kind.setdefault(kind, []).append(row)
+
+        try:
+            if critical:
+                # Make this commit survive power loss, not just a process crash
+                self._conn.execute("PRAGMA synchronous=FULL")
+            self._conn.execute("BEGIN")
+            try:
+                for kind, rows in rows_by_kind.items():
+                    self._conn.executemany(self.statements[kind], rows)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            finally:
+                if critical:
+                    self._conn.execute("PRAGMA synchronous=NORMAL")
+        except Exception as e:
+            # One bad row must not cost the whole batch; retry row by row
+            logger.error(f"❌ Audit batch of {len(batch)} rows failed ({e}); retrying individually")
+            written = 0
+            for _, kind, row, _, _ in batch:
+                try:
+                    self._conn.execute(self.statements[kind], row)
+                    written += 1
+                except Exception as row_error:
+                    self.stats["failed"] += 1
+                    logger.error(f"❌ Dropping audit row ({kind}): {row_error}")
+            self.stats["written"] += written
+            return
+
+        self.stats["written"] += len(batch)
+        self.stats["batches"] += 1
+        self.stats["max_batch_seen"] = max(self.stats["max_batch_seen"], len(batch))
+        if critical:
+            self.stats["critical_flushes"] += 1
+
+    # ------------------------------------------------------------------
+    # Lifecycle and stats
+    # ------------------------------------------------------------------
+
+    def close(self):
+        """Write out everything pending and close the connection"""
+        with self._cond:
+            if self._closing:
+                return
+            self._closing = True
+            self._cond.notify_all()
+        self._thread.join(timeout=self.flush_timeout)
+        try:
+            self._conn.close()
+        except Exception:
+            pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._cond:
+            batches = self.stats["batches"]
+            return {
+                **self.stats,
+                "pending": len(self._buffer),
+                "capacity": self.capacity,
+                "durability": self.durability.value,
+                "avg_batch_size": self.stats["written"] / batches if batches else 0.0,
+            }
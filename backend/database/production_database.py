@@ -34,8 +34,13 @@ class ProductionDatabaseManager:
     """Production database manager with pooling and monitoring"""
     
     def __init__(self, max_connections: int = 10):
+        """
+        Args:
+            max_connections: Reader connections in the pool (plus one writer)
+        """
         self.max_connections = max_connections
-        self._connection_pool: Dict[str, QSRDatabase] = {}
+        self._database: Optional[QSRDatabase] = None
+        self._db_path: Optional[Path] = None
         self._pool_stats = {
             "active_connections": 0,
             "total_connections": 0,
@@ -60,14 +65,12 @@ class ProductionDatabaseManager:
             # Ensure database directory exists
             db_path.parent.mkdir(parents=True, exist_ok=True)
             
-            # Test database connection
-            await self._test_database_connection(db_path)
-            
-            # Initialize primary connection
-            primary_db = await create_qsr_database(db_path)
-            self._connection_pool["primary"] = primary_db
-            self._pool_stats["active_connections"] = 1
-            self._pool_stats["total_connections"] = 1
+            # Open the pool (one writer, max_connections readers) and test it
+            self._database = await create_qsr_database(db_path, max_workers=self.max_connections)
+            self._db_path = db_path
+            await self._test_database_connection(self._database)
+            self._pool_stats["active_connections"] = 1 + self.max_connections
+            self._pool_stats["total_connections"] = 1 + self.max_connections
             
             self._initialized = True
             logger.info(f"✅ Production Database Manager initialized with database: {db_path}")
@@ -76,40 +79,24 @@ class ProductionDatabaseManager:
             logger.error(f"❌ Failed to initialize Production Database Manager: {e}")
             raise
     
-    async def _test_database_connection(self, db_path: Path) -> None:
+    async def _test_database_connection(self, db: QSRDatabase) -> None:
         """Test database connectivity"""
         try:
-            logger.info(f"Testing database connection to {db_path}...")
-            test_db = await create_qsr_database(db_path)
-            
-            # Test basic operations
-            test_conversation_id = f"health_check_{datetime.now().timestamp()}"
-            
-            # This will create tables if they don't exist
-            await test_db.save_message(
-                conversation_id=test_conversation_id,
-                role="system",
-                content="Database health check",
-                metadata={"type": "health_check"}
-            )
-            
-            # Clean up test data
-            # TODO: Add cleanup method to QSRDatabase
-            
+            logger.info(f"Testing database connection to {self._db_path or db.pool.file}...")
+            await db.ping()
             logger.info("✅ Database connection test successful")
             
         except Exception as e:
             logger.error(f"❌ Database connection test failed: {e}")
+            await db.close()
             raise
     
     async def get_database(self) -> QSRDatabase:
-        """Get a database connection from the pool"""
+        """Get the pooled database (reads fan out over reader connections, writes share one writer)"""
         if not self._initialized:
             raise RuntimeError("Database manager not initialized")
         
-        # For now, return primary connection
-        # TODO: Implement proper connection pooling
-        return self._connection_pool["primary"]
+        return self._database
     
     async def health_check(self) -> Dict[str, Any]:
         """Perform database health check"""
@@ -117,18 +104,7 @@ class ProductionDatabaseManager:
             db = await self.get_database()
             
             # Test basic query
-            start_time = datetime.now()
-            
-            # Simple health check - try to save and retrieve a message
-            test_id = f"health_{datetime.now().timestamp()}"
-            await db.save_message(
-                conversation_id=test_id,
-                role="system", 
-                content="Health check",
-                metadata={"type": "health_check"}
-            )
-            
-            response_time = (datetime.now() - start_time).total_seconds() * 1000
+            response_time = await db.ping()
             
             self._pool_stats["last_health_check"] = datetime.now().isoformat()
             
@@ -136,6 +112,7 @@ class ProductionDatabaseManager:
                 "status": "healthy",
                 "response_time_ms": response_time,
                 "pool_stats": self._pool_stats.copy(),
+                "connection_pool": db.get_pool_stats(),
                 "timestamp": datetime.now().isoformat()
             }
             
@@ -154,6 +131,7 @@ class ProductionDatabaseManager:
         """Get database performance metrics"""
         return {
             "connection_pool": self._pool_stats.copy(),
+            "pool_usage": self._database.get_pool_stats() if self._database else {},
             "database_file_size": "calculating...",  # TODO: Implement
             "total_conversations": "calculating...",  # TODO: Implement  
             "total_messages": "calculating...",  # TODO: Implement
@@ -191,11 +169,10 @@ class ProductionDatabaseManager:
         try:
             logger.info("Cleaning up database connections...")
             
-            for conn_name, db in self._connection_pool.items():
-                logger.info(f"Closing connection: {conn_name}")
-                # TODO: Add proper connection cleanup to QSRDatabase
+            if self._database is not None:
+                await self._database.close()
+                self._database = None
             
-            self._connection_pool.clear()
             self._pool_stats["active_connections"] = 0
             self._initialized = False
             
@@ -7,7 +7,8 @@ SQLite database implementation following PydanticAI patterns.
 Replaces JSON file storage with proper async database operations.
 
 Features:
-- Async SQLite operations with thread pool
+- Async SQLite operations on a WAL connection pool (one writer, N readers)
+- Single-transaction message inserts with optional group commit
 - Conversation and message persistence
 - QSR-specific analytics tables
 - Performance monitoring
@@ -19,31 +20,46 @@ Co-Authored-By: Memex <noreply@memex.tech>
 
 import asyncio
 import json
+import os
 import sqlite3
 import logging
 from collections.abc import AsyncIterator
-from concurrent.futures.thread import ThreadPoolExecutor
 from contextlib import asynccontextmanager
 from dataclasses import dataclass
 from datetime import datetime, timedelta
-from functools import partial
 from pathlib import Path
 from typing import Any, Callable, Dict, List, Optional, TypeVar
 
 from pydantic_ai.messages import ModelMessage, ModelMessagesTypeAdapter
-from typing_extensions import LiteralString, ParamSpec
+
+try:
+    from .sqlite_pool import SQLitePool, GroupCommitWriter
+    from ..metrics_registry import instrumented
+except ImportError:
+    from database.sqlite_pool import SQLitePool, GroupCommitWriter
+    from metrics_registry import instrumented
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Type definitions
-P = ParamSpec('P')
 R = TypeVar('R')
 
 # Database file location
 DEFAULT_DB_FILE = Path(__file__).parent / '.qsr_conversations.sqlite'
 
+# Pool configuration
+QSR_DB_READERS = int(os.getenv("QSR_DB_READERS", "4"))
+QSR_DB_GROUP_COMMIT = os.getenv("QSR_DB_GROUP_COMMIT", "false").lower() == "true"
+QSR_DB_GROUP_COMMIT_DELAY = float(os.getenv("QSR_DB_GROUP_COMMIT_DELAY", "0.005"))
+
+# Hot-path statements; identical SQL text hits each connection's statement cache
+SQL_ENSURE_CONVERSATION = 'INSERT OR IGNORE INTO conversations (id) VALUES (?)'
+SQL_INSERT_MESSAGE = 'INSERT INTO messages (conversation_id, message_data, agent_id, response_time) VALUES (?, ?, ?, ?)'
+SQL_TOUCH_CONVERSATION = 'UPDATE conversations SET updated_at = CURRENT_TIMESTAMP, total_messages = total_messages + 1 WHERE id = ?'
+SQL_INSERT_ANALYTICS = 'INSERT INTO analytics (conversation_id, metric_type, metric_value, metric_data) VALUES (?, ?, ?, ?)'
+
 @dataclass
 class ConversationMetadata:
     """Metadata for conversations"""
@@ -90,75 +106,92 @@ class QSRDatabase:
     QSR-specific analytics and monitoring.
     """
     
-    con: sqlite3.Connection
-    _loop: asyncio.AbstractEventLoop
-    _executor: ThreadPoolExecutor
+    pool: SQLitePool
+    group_commit: Optional[GroupCommitWriter] = None
     
     @classmethod
-    @asynccontextmanager
-    async def connect(
-        cls, 
+    async def open(
+        cls,
         file: Path = DEFAULT_DB_FILE,
-        max_workers: int = 1
-    ) -> AsyncIterator['QSRDatabase']:
+        max_workers: int = QSR_DB_READERS,
+        group_commit: bool = QSR_DB_GROUP_COMMIT,
+        group_commit_delay: float = QSR_DB_GROUP_COMMIT_DELAY
+    ) -> 'QSRDatabase':
         """
-        Create database connection with async context manager.
+        Open a database pool; the caller must await close().
         
         Args:
             file: Database file path
-            max_workers: Thread pool size for async operations
+            max_workers: Reader connections in the pool
+            group_commit: Batch message and analytics inserts into shared transactions
+            group_commit_delay: Seconds a group commit waits for more writes
             
-        Yields:
+        Returns:
             QSRDatabase instance
         """
         
         logger.info(f"Connecting to QSR database: {file}")
         
-        loop = asyncio.get_event_loop()
-        executor = ThreadPoolExecutor(max_workers=max_workers)
-        
+        pool = SQLitePool(file, readers=max_workers)
         try:
-            con = await loop.run_in_executor(executor, cls._connect, file)
-            db = cls(con, loop, executor)
+            await pool.open(schema=cls._create_schema)
+            writer = GroupCommitWriter(pool, max_delay=group_commit_delay) if group_commit else None
+            db = cls(pool, writer)
             
             # Perform initial health check
             await db._health_check()
-            
-            logger.info("QSR database connection established successfully")
-            yield db
-            
         except Exception as e:
             logger.error(f"Failed to connect to QSR database: {e}")
+            await pool.close()
             raise
-        finally:
-            if 'con' in locals():
-                await db._asyncify(con.close)
-            executor.shutdown(wait=True)
-            logger.info("QSR database connection closed")
+        
+        logger.info("QSR database connection established successfully")
+        return db
     
-    @staticmethod
-    def _connect(file: Path) -> sqlite3.Connection:
+    async def close(self) -> None:
+        """Flush pending group commits and close every pooled connection"""
+        if self.group_commit is not None:
+            await self.group_commit.close()
+        await self.pool.close()
+        logger.info("QSR database connection closed")
+    
+    @classmethod
+    @asynccontextmanager
+    async def connect(
+        cls, 
+        file: Path = DEFAULT_DB_FILE,
+        max_workers: int = QSR_DB_READERS,
+        group_commit: bool = QSR_DB_GROUP_COMMIT
+    ) -> AsyncIterator['QSRDatabase']:
         """
-        Create SQLite connection and initialize schema.
+        Create database connection with async context manager.
         
         Args:
             file: Database file path
+            max_workers: Reader connections in the pool
+            group_commit: Batch message and analytics inserts into shared transactions
             
-        Returns:
-            SQLite connection
+        Yields:
+            QSRDatabase instance
         """
         
-        # Create database directory if it doesn't exist
-        file.parent.mkdir(parents=True, exist_ok=True)
-        
-        # Connect to database
-        con = sqlite3.connect(str(file))
-        con.row_factory = sqlite3.Row  # Enable column access by name
+        db = await cls.open(file, max_workers=max_workers, group_commit=group_commit)
+        try:
+            yield db
+        finally:
+            await db.close()
+    
+    @staticmethod
+    def _create_schema(con: sqlite3.Connection) -> None:
+        """
+        Initialize schema on the pool's writer connection.
         
-        # Enable foreign key constraints
-        con.execute("PRAGMA foreign_keys = ON")
+        Args:
+            con: Writer connection (autocommit; DDL runs in one transaction)
+        """
         
         # Create tables
+        con.execute("BEGIN")
         cursor = con.cursor()
         
         # Conversations table
@@ -239,13 +272,16 @@ class QSRDatabase:
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_analytics_conversation ON analytics(conversation_id)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_analytics_type ON analytics(metric_type)')
         
-        con.commit()
-        return con
+        con.execute("COMMIT")
     
+    @instrumented("sqlite")
     async def add_messages(self, conversation_id: str, messages: bytes, agent_id: str = None, response_time: float = None) -> bool:
         """
         Add messages to conversation history.
         
+        Creating the conversation, inserting the messages and updating the
+        conversation metadata happen in one transaction.
+        
         Args:
             conversation_id: Conversation identifier
             messages: Serialized messages from PydanticAI
@@ -256,23 +292,13 @@ class QSRDatabase:
             True if successful
         """
         
+        def _insert(con: sqlite3.Connection) -> None:
+            con.execute(SQL_ENSURE_CONVERSATION, (conversation_id,))
+            con.execute(SQL_INSERT_MESSAGE, (conversation_id, messages, agent_id, response_time))
+            con.execute(SQL_TOUCH_CONVERSATION, (conversation_id,))
+        
         try:
-            # Ensure conversation exists
-            await self._ensure_conversation_exists(conversation_id)
-            
-            # Add messages
-            await self._asyncify(
-                self._execute,
-                'INSERT INTO messages (conversation_id, message_data, agent_id, response_time) VALUES (?, ?, ?, ?)',
-                conversation_id,
-                messages,
-                agent_id,
-                response_time,
-                commit=True
-            )
-            
-            # Update conversation metadata
-            await self._update_conversation_metadata(conversation_id)
+            await self._write(_insert, batchable=True)
             
             logger.debug(f"Added messages to conversation {conversation_id}")
             return True
@@ -281,6 +307,7 @@ class QSRDatabase:
             logger.error(f"Failed to add messages to conversation {conversation_id}: {e}")
             return False
     
+    @instrumented("sqlite")
     async def get_messages(self, conversation_id: str, limit: int = None) -> List[ModelMessage]:
         """
         Get conversation history.
@@ -303,8 +330,7 @@ class QSRDatabase:
                 args.append(limit)
             
             # Execute query
-            cursor = await self._asyncify(self._execute, query, *args)
-            rows = await self._asyncify(cursor.fetchall)
+            rows = await self.pool.fetchall(query, *args)
             
             # Deserialize messages
             messages: List[ModelMessage] = []
@@ -322,6 +348,7 @@ class QSRDatabase:
             logger.error(f"Failed to get messages from conversation {conversation_id}: {e}")
             return []
     
+    @instrumented("sqlite")
     async def get_conversation_metadata(self, conversation_id: str) -> Optional[ConversationMetadata]:
         """
         Get conversation metadata.
@@ -334,21 +361,19 @@ class QSRDatabase:
         """
         
         try:
-            cursor = await self._asyncify(
-                self._execute,
-                'SELECT * FROM conversations WHERE id = ?',
-                conversation_id
-            )
-            row = await self._asyncify(cursor.fetchone)
+            row = await self.pool.fetchone('SELECT * FROM conversations WHERE id = ?', conversation_id)
             
             if row:
-                return ConversationMetadata.from_dict(dict(row))
+                data = dict(row)
+                data['conversation_id'] = data.pop('id')
+                return ConversationMetadata.from_dict(data)
             return None
             
         except Exception as e:
             logger.error(f"Failed to get metadata for conversation {conversation_id}: {e}")
             return None
     
+    @instrumented("sqlite")
     async def add_equipment_reference(self, conversation_id: str, equipment_name: str, manual_reference: str = None, context: str = None) -> bool:
         """
         Add equipment reference to conversation.
@@ -364,14 +389,12 @@ class QSRDatabase:
         """
         
         try:
-            await self._asyncify(
-                self._execute,
+            await self.pool.execute(
                 'INSERT INTO equipment_references (conversation_id, equipment_name, manual_reference, context) VALUES (?, ?, ?, ?)',
                 conversation_id,
                 equipment_name,
                 manual_reference,
-                context,
-                commit=True
+                context
             )
             
             logger.debug(f"Added equipment reference {equipment_name} to conversation {conversation_id}")
@@ -381,6 +404,7 @@ class QSRDatabase:
             logger.error(f"Failed to add equipment reference to conversation {conversation_id}: {e}")
             return False
     
+    @instrumented("sqlite")
     async def add_safety_incident(self, conversation_id: str, incident_type: str, severity_level: str = 'low', 
                                  response_provided: str = None, escalation_required: bool = False) -> bool:
         """
@@ -398,15 +422,13 @@ class QSRDatabase:
         """
         
         try:
-            await self._asyncify(
-                self._execute,
+            await self.pool.execute(
                 'INSERT INTO safety_incidents (conversation_id, incident_type, severity_level, response_provided, escalation_required) VALUES (?, ?, ?, ?, ?)',
                 conversation_id,
                 incident_type,
                 severity_level,
                 response_provided,
-                escalation_required,
-                commit=True
+                escalation_required
             )
             
             logger.info(f"Added safety incident {incident_type} to conversation {conversation_id}")
@@ -416,6 +438,7 @@ class QSRDatabase:
             logger.error(f"Failed to add safety incident to conversation {conversation_id}: {e}")
             return False
     
+    @instrumented("sqlite")
     async def add_analytics_metric(self, conversation_id: str, metric_type: str, metric_value: float, metric_data: Dict[str, Any] = None) -> bool:
         """
         Add analytics metric.
@@ -430,16 +453,10 @@ class QSRDatabase:
             True if successful
         """
         
+        args = (conversation_id, metric_type, metric_value, json.dumps(metric_data or {}))
+        
         try:
-            await self._asyncify(
-                self._execute,
-                'INSERT INTO analytics (conversation_id, metric_type, metric_value, metric_data) VALUES (?, ?, ?, ?)',
-                conversation_id,
-                metric_type,
-                metric_value,
-                json.dumps(metric_data or {}),
-                commit=True
-            )
+            await self._write(lambda con: con.execute(SQL_INSERT_ANALYTICS, args), batchable=True)
             
             return True
             
@@ -447,6 +464,34 @@ class QSRDatabase:
             logger.error(f"Failed to add analytics metric to conversation {conversation_id}: {e}")
             return False
     
+    @instrumented("sqlite")
+    async def add_analytics_metrics(self, metrics: List[Dict[str, Any]]) -> int:
+        """
+        Add many analytics metrics in one transaction.
+        
+        Args:
+            metrics: Dicts with conversation_id, metric_type, metric_value and optional metric_data
+            
+        Returns:
+            Number of metrics written
+        """
+        
+        rows = [
+            (m['conversation_id'], m['metric_type'], m['metric_value'], json.dumps(m.get('metric_data') or {}))
+            for m in metrics
+        ]
+        if not rows:
+            return 0
+        
+        try:
+            await self.pool.executemany(SQL_INSERT_ANALYTICS, rows)
+            return len(rows)
+            
+        except Exception as e:
+            logger.error(f"Failed to add {len(rows)} analytics metrics: {e}")
+            return 0
+    
+    @instrumented("sqlite")
     async def get_conversation_analytics(self, conversation_id: str) -> Dict[str, Any]:
         """
         Get analytics for a conversation.
@@ -458,38 +503,39 @@ class QSRDatabase:
             Dictionary with analytics data
         """
         
+        def _query(con: sqlite3.Connection):
+            # One reader round trip and one consistent snapshot for all four queries
+            con.execute("BEGIN")
+            try:
+                # Get equipment references
+                equipment_rows = con.execute(
+                    'SELECT equipment_name, COUNT(*) as count FROM equipment_references WHERE conversation_id = ? GROUP BY equipment_name',
+                    (conversation_id,)
+                ).fetchall()
+                
+                # Get safety incidents
+                safety_rows = con.execute(
+                    'SELECT incident_type, severity_level, COUNT(*) as count FROM safety_incidents WHERE conversation_id = ? GROUP BY incident_type, severity_level',
+                    (conversation_id,)
+                ).fetchall()
+                
+                # Get performance metrics
+                metrics_rows = con.execute(
+                    'SELECT metric_type, AVG(metric_value) as avg_value, COUNT(*) as count FROM analytics WHERE conversation_id = ? GROUP BY metric_type',
+                    (conversation_id,)
+                ).fetchall()
+                
+                # Get message count
+                message_row = con.execute(
+                    'SELECT COUNT(*) as count FROM messages WHERE conversation_id = ?',
+                    (conversation_id,)
+                ).fetchone()
+            finally:
+                con.execute("COMMIT")
+            return equipment_rows, safety_rows, metrics_rows, message_row
+        
         try:
-            # Get equipment references
-            equipment_cursor = await self._asyncify(
-                self._execute,
-                'SELECT equipment_name, COUNT(*) as count FROM equipment_references WHERE conversation_id = ? GROUP BY equipment_name',
-                conversation_id
-            )
-            equipment_rows = await self._asyncify(equipment_cursor.fetchall)
-            
-            # Get safety incidents
-            safety_cursor = await self._asyncify(
-                self._execute,
-                'SELECT incident_type, severity_level, COUNT(*) as count FROM safety_incidents WHERE conversation_id = ? GROUP BY incident_type, severity_level',
-                conversation_id
-            )
-            safety_rows = await self._asyncify(safety_cursor.fetchall)
-            
-            # Get performance metrics
-            metrics_cursor = await self._asyncify(
-                self._execute,
-                'SELECT metric_type, AVG(metric_value) as avg_value, COUNT(*) as count FROM analytics WHERE conversation_id = ? GROUP BY metric_type',
-                conversation_id
-            )
-            metrics_rows = await self._asyncify(metrics_cursor.fetchall)
-            
-            # Get message count
-            message_cursor = await self._asyncify(
-                self._execute,
-                'SELECT COUNT(*) as count FROM messages WHERE conversation_id = ?',
-                conversation_id
-            )
-            message_row = await self._asyncify(message_cursor.fetchone)
+            equipment_rows, safety_rows, metrics_rows, message_row = await self.pool.read(_query)
             
             return {
                 'conversation_id': conversation_id,
@@ -520,6 +566,7 @@ class QSRDatabase:
             logger.error(f"Failed to get analytics for conversation {conversation_id}: {e}")
             return {}
     
+    @instrumented("sqlite")
     async def get_system_analytics(self, days: int = 7) -> Dict[str, Any]:
         """
         Get system-wide analytics.
@@ -531,48 +578,44 @@ class QSRDatabase:
             Dictionary with system analytics
         """
         
+        since_date = datetime.now() - timedelta(days=days)
+        
+        def _query(con: sqlite3.Connection):
+            con.execute("BEGIN")
+            try:
+                # Get conversation count
+                conv_row = con.execute(
+                    'SELECT COUNT(*) as count FROM conversations WHERE created_at >= ?', (since_date,)
+                ).fetchone()
+                
+                # Get message count
+                msg_row = con.execute(
+                    'SELECT COUNT(*) as count FROM messages WHERE created_at >= ?', (since_date,)
+                ).fetchone()
+                
+                # Get top equipment
+                equipment_rows = con.execute(
+                    'SELECT equipment_name, COUNT(*) as count FROM equipment_references WHERE mentioned_at >= ? GROUP BY equipment_name ORDER BY count DESC LIMIT 10',
+                    (since_date,)
+                ).fetchall()
+                
+                # Get safety incidents
+                safety_rows = con.execute(
+                    'SELECT incident_type, severity_level, COUNT(*) as count FROM safety_incidents WHERE created_at >= ? GROUP BY incident_type, severity_level ORDER BY count DESC',
+                    (since_date,)
+                ).fetchall()
+                
+                # Get performance metrics
+                perf_rows = con.execute(
+                    'SELECT metric_type, AVG(metric_value) as avg_value, MIN(metric_value) as min_value, MAX(metric_value) as max_value, COUNT(*) as count FROM analytics WHERE recorded_at >= ? GROUP BY metric_type',
+                    (since_date,)
+                ).fetchall()
+            finally:
+                con.execute("COMMIT")
+            return conv_row, msg_row, equipment_rows, safety_rows, perf_rows
+        
         try:
-            since_date = datetime.now() - timedelta(days=days)
-            
-            # Get conversation count
-            conv_cursor = await self._asyncify(
-                self._execute,
-                'SELECT COUNT(*) as count FROM conversations WHERE created_at >= ?',
-                since_date
-            )
-            conv_row = await self._asyncify(conv_cursor.fetchone)
-            
-            # Get message count
-            msg_cursor = await self._asyncify(
-                self._execute,
-                'SELECT COUNT(*) as count FROM messages WHERE created_at >= ?',
-                since_date
-            )
-            msg_row = await self._asyncify(msg_cursor.fetchone)
-            
-            # Get top equipment
-            equipment_cursor = await self._asyncify(
-                self._execute,
-                'SELECT equipment_name, COUNT(*) as count FROM equipment_references WHERE mentioned_at >= ? GROUP BY equipment_name ORDER BY count DESC LIMIT 10',
-                since_date
-            )
-            equipment_rows = await self._asyncify(equipment_cursor.fetchall)
-            
-            # Get safety incidents
-            safety_cursor = await self._asyncify(
-                self._execute,
-                'SELECT incident_type, severity_level, COUNT(*) as count FROM safety_incidents WHERE created_at >= ? GROUP BY incident_type, severity_level ORDER BY count DESC',
-                since_date
-            )
-            safety_rows = await self._asyncify(safety_cursor.fetchall)
-            
-            # Get performance metrics
-            perf_cursor = await self._asyncify(
-                self._execute,
-                'SELECT metric_type, AVG(metric_value) as avg_value, MIN(metric_value) as min_value, MAX(metric_value) as max_value, COUNT(*) as count FROM analytics WHERE recorded_at >= ? GROUP BY metric_type',
-                since_date
-            )
-            perf_rows = await self._asyncify(perf_cursor.fetchall)
+            conv_row, msg_row, equipment_rows, safety_rows, perf_rows = await self.pool.read(_query)
             
             return {
                 'period_days': days,
@@ -607,6 +650,7 @@ class QSRDatabase:
             logger.error(f"Failed to get system analytics: {e}")
             return {}
     
+    @instrumented("sqlite")
     async def cleanup_old_conversations(self, days: int = 30) -> int:
         """
         Clean up old conversations.
@@ -621,78 +665,48 @@ class QSRDatabase:
         try:
             cutoff_date = datetime.now() - timedelta(days=days)
             
-            # Get conversations to delete
-            cursor = await self._asyncify(
-                self._execute,
-                'SELECT id FROM conversations WHERE created_at < ?',
-                cutoff_date
-            )
-            rows = await self._asyncify(cursor.fetchall)
-            
-            if not rows:
-                return 0
-            
             # Delete conversations (cascading will handle related records)
-            await self._asyncify(
-                self._execute,
+            deleted_count = await self.pool.execute(
                 'DELETE FROM conversations WHERE created_at < ?',
-                cutoff_date,
-                commit=True
+                cutoff_date
             )
             
-            deleted_count = len(rows)
-            logger.info(f"Cleaned up {deleted_count} old conversations")
+            if deleted_count:
+                logger.info(f"Cleaned up {deleted_count} old conversations")
             return deleted_count
             
         except Exception as e:
             logger.error(f"Failed to cleanup old conversations: {e}")
             return 0
     
-    async def _ensure_conversation_exists(self, conversation_id: str) -> None:
-        """Ensure conversation exists in database"""
-        
-        await self._asyncify(
-            self._execute,
-            'INSERT OR IGNORE INTO conversations (id) VALUES (?)',
-            conversation_id,
-            commit=True
-        )
+    async def ping(self) -> float:
+        """
+        Round-trip a trivial query through a reader connection.
+        
+        Returns:
+            Latency in milliseconds
+        """
+        
+        start = datetime.now()
+        await self.pool.fetchone('SELECT 1')
+        return (datetime.now() - start).total_seconds() * 1000
     
-    async def _update_conversation_metadata(self, conversation_id: str) -> None:
-        """Update conversation metadata after adding messages"""
-        
-        # Get current message count
-        cursor = await self._asyncify(
-            self._execute,
-            'SELECT COUNT(*) as count FROM messages WHERE conversation_id = ?',
-            conversation_id
-        )
-        row = await self._asyncify(cursor.fetchone)
-        message_count = row['count'] if row else 0
-        
-        # Update conversation
-        await self._asyncify(
-            self._execute,
-            'UPDATE conversations SET updated_at = CURRENT_TIMESTAMP, total_messages = ? WHERE id = ?',
-            message_count,
-            conversation_id,
-            commit=True
-        )
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Connection pool and group commit counters"""
+        stats = self.pool.get_stats()
+        if self.group_commit is not None:
+            stats['group_commit'] = self.group_commit.get_stats()
+        return stats
     
     async def _health_check(self) -> None:
         """Perform database health check"""
         
         try:
             # Test basic query
-            cursor = await self._asyncify(self._execute, 'SELECT 1')
-            await self._asyncify(cursor.fetchone)
+            await self.pool.fetchone('SELECT 1')
             
             # Check table existence
-            cursor = await self._asyncify(
-                self._execute,
-                "SELECT name FROM sqlite_master WHERE type='table'"
-            )
-            tables = await self._asyncify(cursor.fetchall)
+            tables = await self.pool.fetchall("SELECT name FROM sqlite_master WHERE type='table'")
             
             expected_tables = {'conversations', 'messages', 'equipment_references', 'safety_incidents', 'analytics'}
             actual_tables = {row['name'] for row in tables}
@@ -707,29 +721,22 @@ class QSRDatabase:
             logger.error(f"Database health check failed: {e}")
             raise
     
-    def _execute(self, sql: LiteralString, *args: Any, commit: bool = False) -> sqlite3.Cursor:
-        """Execute SQL query"""
-        cursor = self.con.cursor()
-        cursor.execute(sql, args)
-        if commit:
-            self.con.commit()
-        return cursor
-    
-    async def _asyncify(self, func: Callable[P, R], *args: P.args, **kwargs: P.kwargs) -> R:
-        """Run function in thread pool executor"""
-        return await self._loop.run_in_executor(
-            self._executor,
-            partial(func, **kwargs),
-            *args,
-        )
+    async def _write(self, op: Callable[[sqlite3.Connection], R], batchable: bool = False) -> R:
+        """Run a write transaction, through group commit when enabled and allowed"""
+        if batchable and self.group_commit is not None:
+            return await self.group_commit.submit(op)
+        return await self.pool.write(op)
 
 # Factory function for creating database connections
-async def create_qsr_database(file: Path = None) -> QSRDatabase:
+async def create_qsr_database(file: Path = None, **kwargs: Any) -> QSRDatabase:
     """
     Factory function to create QSR database connection.
     
+    The returned database stays open until its close() is awaited.
+    
     Args:
         file: Database file path
+        **kwargs: Passed to QSRDatabase.open (max_workers, group_commit, ...)
         
     Returns:
         QSRDatabase instance
@@ -737,8 +744,7 @@ async def create_qsr_database(file: Path = None) -> QSRDatabase:
     
     file = file or DEFAULT_DB_FILE
     
-    async with QSRDatabase.connect(file) as db:
-        return db
+    return await QSRDatabase.open(file, **kwargs)
 
 # Test function
 async def test_database():
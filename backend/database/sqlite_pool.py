@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+SQLite Connection Pool
+======================
+
+Async access layer for one SQLite file in WAL mode:
+
+- One writer connection on a dedicated thread; every write runs inside an
+  explicit BEGIN IMMEDIATE ... COMMIT transaction
+- N reader connections (one per reader thread, query_only) that never block
+  on the writer thanks to WAL
+- Per-connection prepared statement cache, so repeated SQL text skips parsing
+- Optional group commit: small writes queued within a few milliseconds of
+  each other share one transaction (each isolated by a SAVEPOINT), turning
+  one fsync per insert into one per batch
+"""
+
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+R = TypeVar('R')
+
+# sqlite3 keeps this many compiled statements per connection
+STATEMENT_CACHE_SIZE = 256
+
+
+def _open_connection(file: Path, readonly: bool) -> sqlite3.Connection:
+    con = sqlite3.connect(
+        str(file),
+        check_same_thread=False,
+        isolation_level=None,  # Transactions are explicit
+        cached_statements=STATEMENT_CACHE_SIZE,
+    )
+    con.row_factory = sqlite3.Row
+    con.execute("PRAGMA busy_timeout = 5000")
+    con.execute("PRAGMA foreign_keys = ON")
+    if readonly:
+        con.execute("PRAGMA query_only = ON")
+    else:
+        con.execute("PRAGMA journal_mode = WAL")
+        con.execute("PRAGMA synchronous = NORMAL")
+    return con
+
+
+class SQLitePool:
+    """One writer and N reader connections to a WAL-mode SQLite file"""
+
+    def __init__(self, file: Path, readers: int = 4):
+        """
+        Args:
+            file: Database file path
+            readers: Reader connections (and threads)
+        """
+        self.file = Path(file)
+        self.readers = max(1, readers)
+        self._writer_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-writer")
+        self._reader_executor = ThreadPoolExecutor(max_workers=self.readers, thread_name_prefix="sqlite-reader")
+        self._writer: Optional[sqlite3.Connection] = None
+        self._reader_local = threading.local()
+        self._reader_connections: List[sqlite3.Connection] = []
+        self._reader_lock = threading.Lock()
+        self.stats = {"reads": 0, "writes": 0, "transactions": 0, "rollbacks": 0}
+
+    async def open(self, schema: Optional[Callable[[sqlite3.Connection], None]] = None):
+        """
+        Open the writer connection (switching the file to WAL) and create the schema
+
+        Args:
+            schema: Called with the writer connection to create tables
+        """
+        def _open():
+            self.file.parent.mkdir(parents=True, exist_ok=True)
+            self._writer = _open_connection(self.file, readonly=False)
+            if schema is not None:
+                schema(self._writer)
+
+        await asyncio.get_running_loop().run_in_executor(self._writer_executor, _open)
+
+    def _reader(self) -> sqlite3.Connection:
+        """This reader thread's connection, opened on first use"""
+        con = getattr(self._reader_local, "con", None)
+        if con is None:
+            con = _open_connection(self.file, readonly=True)
+            self._reader_local.con = con
+            with self._reader_lock:
+                self._reader_connections.append(con)
+        return con
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    async def read(self, fn: Callable[[sqlite3.Connection], R]) -> R:
+        """Run fn(connection) on a reader thread"""
+        self.stats["reads"] += 1
+        return await asyncio.get_running_loop().run_in_executor(
+            self._reader_executor, lambda: fn(self._reader())
+        )
+
+    async def fetchall(self, sql: str, *args: Any) -> List[sqlite3.Row]:
+        """All rows of a query"""
+        return await self.read(lambda con: con.execute(sql, args).fetchall())
+
+    async def fetchone(self, sql: str, *args: Any) -> Optional[sqlite3.Row]:
+        """First row of a query, or None"""
+        return await self.read(lambda con: con.execute(sql, args).fetchone())
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def _transaction(self, fn: Callable[[sqlite3.Connection], R]) -> R:
+        con = self._writer
+        con.execute("BEGIN IMMEDIATE")
+        try:
+            result = fn(con)
+            con.execute("COMMIT")
+            self.stats["transactions"] += 1
+            return result
+        except BaseException:
+            con.execute("ROLLBACK")
+            self.stats["rollbacks"] += 1
+            raise
+
+    async def write(self, fn: Callable[[sqlite3.Connection], R]) -> R:
+        """Run fn(connection) in its own transaction on the writer thread"""
+        self.stats["writes"] += 1
+        return await asyncio.get_running_loop().run_in_executor(
+            self._writer_executor, self._transaction, fn
+        )
+
+    async def execute(self, sql: str, *args: Any) -> int:
+        """
+        One write statement in its own transaction
+
+        Returns:
+            Rows changed
+        """
+        return await self.write(lambda con: con.execute(sql, args).rowcount)
+
+    async def executemany(self, sql: str, rows: Sequence[Sequence[Any]]) -> int:
+        """Batched write of many parameter rows in a single transaction"""
+        return await self.write(lambda con: con.executemany(sql, rows).rowcount)
+
+    async def write_batch(self, ops: Sequence[Callable[[sqlite3.Connection], Any]]) -> List[Tuple[bool, Any]]:
+        """
+        Run several independent write operations in one transaction
+
+        Each operation runs under its own SAVEPOINT, so a failing one is
+        rolled back alone while the others still commit.
+
+        Returns:
+            (ok, result or exception) per operation, in order
+        """
+        def _run(con):
+            outcomes = []
+            for op in ops:
+                con.execute("SAVEPOINT op")
+                try:
+                    outcomes.append((True, op(con)))
+                    con.execute("RELEASE op")
+                except Exception as e:
+                    con.execute("ROLLBACK TO op")
+                    con.execute("RELEASE op")
+                    outcomes.append((False, e))
+            return outcomes
+
+        self.stats["writes"] += len(ops)
+        return await asyncio.get_running_loop().run_in_executor(
+            self._writer_executor, self._transaction, _run
+        )
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    async def close(self):
+        """Close all connections and stop the pool threads"""
+        loop = asyncio.get_running_loop()
+        if self._writer is not None:
+            writer, self._writer = self._writer, None
+            await loop.run_in_executor(self._writer_executor, writer.close)
+        with self._reader_lock:
+            readers, self._reader_connections = self._reader_connections, []
+        for con in readers:
+            con.close()
+        self._writer_executor.shutdown(wait=True)
+        self._reader_executor.shutdown(wait=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._reader_lock:
+            open_readers = len(self._reader_connections)
+        return {
+            "file": str(self.file),
+            "writer_open": self._writer is not None,
+            "reader_connections": open_readers,
+            "max_readers": self.readers,
+            **self.stats,
+        }
+
+
+class GroupCommitWriter:
+    """Coalesces small writes from concurrent callers into shared transactions"""
+
+    def __init__(self, pool: SQLitePool, max_delay: float = 0.005, max_batch: int = 256):
+        """
+        Args:
+            pool: Pool whose writer runs the batches
+            max_delay: Seconds to wait for more writes before committing a batch
+            max_batch: Writes per transaction at most
+        """
+        self.pool = pool
+        self.max_delay = max_delay
+        self.max_batch = max_batch
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"batches": 0, "writes": 0, "max_batch_seen": 0}
+
+    def _ensure_started(self):
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def submit(self, op: Callable[[sqlite3.Connection], R]) -> R:
+        """
+        Queue a write and wait until the batch containing it has committed
+
+        Returns:
+            op's result
+
+        Raises:
+            Whatever op raised (only op's own changes are rolled back)
+        """
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((op, future))
+        return await future
+
+    async def _run(self):
+        while True:
+            first = await self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            stopping = False
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._commit(batch)
+            if stopping:
+                return
+
+    async def _commit(self, batch):
+        try:
+            outcomes = await self.pool.write_batch([op for op, _ in batch])
+        except Exception as e:
+            logger.error(f"Group commit of {len(batch)} writes failed: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        self.stats["batches"] += 1
+        self.stats["writes"] += len(batch)
+        self.stats["max_batch_seen"] = max(self.stats["max_batch_seen"], len(batch))
+        for (_, future), (ok, value) in zip(batch, outcomes):
+            if future.done():
+                continue
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+    async def close(self):
+        """Commit anything still queued, then stop"""
+        if self._task is None:
+            return
+        task, self._task = self._task, None
+        if not task.done():
+            await self._queue.put(None)  # Queued after every pending write
+            await task
+
+    def get_stats(self) -> Dict[str, Any]:
+        batches = self.stats["batches"]
+        return {
+            **self.stats,
+            "avg_batch_size": self.stats["writes"] / batches if batches else 0.0,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+        }
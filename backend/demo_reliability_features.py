@@ -264,9 +264,7 @@ class ReliabilityDemo:
                 validation_op = next((op for op in dlq.failed_operations 
                                     if "validation" in op.error_message.lower()), None)
                 if validation_op:
-                    validation_op.manual_review = True
-                    dlq.manual_review_queue.append(validation_op)
-                    dlq.failed_operations.remove(validation_op)
+                    dlq.escalate_to_manual_review(validation_op.operation_id)
                     
                     manual_ops = dlq.get_manual_review_operations()
                     print(f"   📋 Manual review operations: {len(manual_ops)}")
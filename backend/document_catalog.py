@@ -0,0 +1,374 @@
+"""
+SQLite document catalog replacing the whole-file documents.json database
+
+Document metadata lives in an indexed `documents` table and the extracted
+text in a separate `document_texts` table, so listings never touch full text
+and an upload or delete writes one row instead of re-serializing the corpus.
+Metadata is mirrored in an in-process read cache that is updated in place
+on local writes and reloaded when another connection (e.g. a second worker)
+commits, detected through PRAGMA data_version. The database runs in WAL
+mode so readers never block the writer.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Columns stored directly; any other document keys go to extra_json
+CATALOG_COLUMNS = (
+    "id",
+    "filename",
+    "original_filename",
+    "upload_timestamp",
+    "file_size",
+    "pages_count",
+    "text_preview",
+)
+
+
+class DocumentCatalog:
+    """Indexed document metadata with separately stored text and a read cache"""
+
+    def __init__(self, db_path: str = "../documents.sqlite", legacy_json_path: Optional[str] = None):
+        """
+        Args:
+            db_path: SQLite database file
+            legacy_json_path: documents.json to import the first time the catalog is opened
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._create_schema()
+
+        self._cache: Dict[str, Dict[str, Any]] = {}
+        self._cache_version: Optional[int] = None
+
+        if legacy_json_path:
+            self._import_legacy_json(legacy_json_path)
+
+    def _create_schema(self):
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS documents (
+                id TEXT PRIMARY KEY,
+                filename TEXT NOT NULL DEFAULT '',
+                original_filename TEXT NOT NULL DEFAULT '',
+                upload_timestamp TEXT NOT NULL DEFAULT '',
+                file_size INTEGER NOT NULL DEFAULT 0,
+                pages_count INTEGER NOT NULL DEFAULT 0,
+                text_preview TEXT NOT NULL DEFAULT '',
+                extra_json TEXT NOT NULL DEFAULT '{}'
+            );
+            CREATE INDEX IF NOT EXISTS idx_documents_filename ON documents(filename);
+            CREATE INDEX IF NOT EXISTS idx_documents_upload_timestamp ON documents(upload_timestamp);
+            CREATE TABLE IF NOT EXISTS document_texts (
+                id TEXT PRIMARY KEY REFERENCES documents(id) ON DELETE CASCADE,
+                text_content TEXT NOT NULL
+            );
+            """
+        )
+
+    def _import_legacy_json(self, legacy_json_path: str):
+        """
+        Copy documents.json into the catalog (once)
+
+        Nothing writes documents.json once the catalog is in use, so the
+        import is recorded in PRAGMA user_version rather than inferred from
+        an empty catalog; otherwise deleting every document would bring the
+        stale file back on the next start.
+        """
+        with self._lock:
+            if self._conn.execute("PRAGMA user_version").fetchone()[0] >= 1:
+                return
+            try:
+                legacy = {}
+                # A catalog populated before the import was recorded already holds these documents
+                if self.count() == 0 and os.path.exists(legacy_json_path):
+                    with open(legacy_json_path, "r") as f:
+                        legacy = json.load(f)
+                    if isinstance(legacy, list):
+                        legacy = {doc.get("id", f"doc_{i}"): doc for i, doc in enumerate(legacy) if isinstance(doc, dict)}
+                documents = list(legacy.values()) if isinstance(legacy, dict) else []
+
+                self._conn.execute("BEGIN IMMEDIATE")
+                written = [self._write(document) for document in documents]
+                self._conn.execute("PRAGMA user_version = 1")
+                self._conn.execute("COMMIT")
+                for metadata in written:
+                    self._cache[metadata["id"]] = metadata
+                if documents:
+                    logger.info(f"📥 Imported {len(documents)} documents from {legacy_json_path} into catalog")
+            except Exception as e:
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                logger.error(f"Error importing legacy documents database: {e}")
+
+    # ------------------------------------------------------------------
+    # Read cache
+    # ------------------------------------------------------------------
+
+    def _refresh_cache(self):
+        """Reload metadata if any connection has committed since the last load"""
+        version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if version == self._cache_version:
+            return
+        rows = self._conn.execute(
+            f"SELECT {', '.join(CATALOG_COLUMNS)}, extra_json FROM documents ORDER BY upload_timestamp DESC"
+        ).fetchall()
+        self._cache = {row[0]: self._row_to_document(row) for row in rows}
+        self._cache_version = version
+
+    @staticmethod
+    def _row_to_document(row) -> Dict[str, Any]:
+        document = json.loads(row[-1]) if row[-1] else {}
+        document.update(zip(CATALOG_COLUMNS, row[:-1]))
+        return document
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return self.count()
+
+    def __contains__(self, doc_id: str) -> bool:
+        return self.get(doc_id) is not None
+
+    def count(self) -> int:
+        with self._lock:
+            self._refresh_cache()
+            return len(self._cache)
+
+    def get(self, doc_id: str, include_text: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Look up one document
+
+        Args:
+            doc_id: Document id
+            include_text: Also load text_content from the text table
+
+        Returns:
+            Document dict (a copy) or None
+        """
+        with self._lock:
+            self._refresh_cache()
+            document = self._cache.get(doc_id)
+            if document is None:
+                return None
+            document = dict(document)
+            if include_text:
+                document["text_content"] = self.get_text(doc_id) or ""
+            return document
+
+    def get_text(self, doc_id: str) -> Optional[str]:
+        """Full extracted text for a document"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT text_content FROM document_texts WHERE id = ?", (doc_id,)
+            ).fetchone()
+            return row[0] if row else None
+
+    def ids_with_text(self) -> set:
+        """Ids of documents whose extracted text is non-empty"""
+        with self._lock:
+            return {
+                row[0] for row in self._conn.execute("SELECT id FROM document_texts WHERE text_content != ''")
+            }
+
+    def list(self, offset: int = 0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Document metadata, newest first, read as one page through the timestamp index
+
+        Args:
+            offset: Number of documents to skip
+            limit: Maximum documents to return (None for all)
+        """
+        with self._lock:
+            self._refresh_cache()
+            rows = self._conn.execute(
+                "SELECT id FROM documents ORDER BY upload_timestamp DESC LIMIT ? OFFSET ?",
+                (-1 if limit is None else limit, offset),
+            ).fetchall()
+            return [dict(self._cache[row[0]]) for row in rows if row[0] in self._cache]
+
+    def as_dict(self, include_text: bool = True) -> Dict[str, Dict[str, Any]]:
+        """Whole catalog in the legacy documents.json shape ({doc_id: document})"""
+        with self._lock:
+            self._refresh_cache()
+            documents = {doc_id: dict(doc) for doc_id, doc in self._cache.items()}
+            if include_text:
+                for doc_id, text in self._conn.execute("SELECT id, text_content FROM document_texts"):
+                    if doc_id in documents:
+                        documents[doc_id]["text_content"] = text
+            return documents
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def put(self, document: Dict[str, Any]):
+        """Insert or replace one document (text_content is stored separately)"""
+        self.put_many([document])
+
+    def put_many(self, documents: List[Dict[str, Any]]):
+        """Insert or replace documents in a single transaction"""
+        with self._lock:
+            self._refresh_cache()
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                written = [self._write(document) for document in documents]
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            for metadata in written:
+                self._cache[metadata["id"]] = metadata
+
+    def _write(self, document: Dict[str, Any]) -> Dict[str, Any]:
+        """Write one document inside the caller's transaction; returns its cached metadata"""
+        doc_id = document["id"]
+        extra = json.dumps(
+            {k: v for k, v in document.items() if k not in CATALOG_COLUMNS and k != "text_content"},
+            default=str,
+        )
+        row = (
+            doc_id,
+            document.get("filename") or "",
+            document.get("original_filename") or "",
+            document.get("upload_timestamp") or "",
+            int(document.get("file_size") or 0),
+            int(document.get("pages_count") or 0),
+            document.get("text_preview") or "",
+            extra,
+        )
+        self._conn.execute(
+            f"INSERT OR REPLACE INTO documents ({', '.join(CATALOG_COLUMNS)}, extra_json) "
+            f"VALUES ({', '.join('?' * len(row))})",
+            row,
+        )
+        if "text_content" in document:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO document_texts (id, text_content) VALUES (?, ?)",
+                (doc_id, document.get("text_content") or ""),
+            )
+        return self._row_to_document(row)
+
+    def update(self, doc_id: str, **fields) -> bool:
+        """
+        Merge fields into an existing document
+
+        Returns:
+            False if the document does not exist
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._refresh_cache()
+                current = self._cache.get(doc_id)
+                if current is None:
+                    self._conn.execute("ROLLBACK")
+                    return False
+                metadata = self._write({**current, **fields, "id": doc_id})
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._cache[doc_id] = metadata
+            return True
+
+    def delete(self, doc_id: str) -> bool:
+        """
+        Remove a document and its text
+
+        Returns:
+            True if a document was removed
+        """
+        with self._lock:
+            self._refresh_cache()
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = self._conn.execute("DELETE FROM documents WHERE id = ?", (doc_id,))
+                self._conn.execute("DELETE FROM document_texts WHERE id = ?", (doc_id,))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._cache.pop(doc_id, None)
+            return cursor.rowcount > 0
+
+    def replace_all(self, documents: Dict[str, Dict[str, Any]]):
+        """
+        Make the catalog match a full {doc_id: document} mapping
+
+        Compatibility path for callers that still load, mutate and save the
+        whole database; new code should use put/update/delete.
+        """
+        with self._lock:
+            self._refresh_cache()
+            stale = [doc_id for doc_id in self._cache if doc_id not in documents]
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for doc_id in stale:
+                    self._conn.execute("DELETE FROM documents WHERE id = ?", (doc_id,))
+                    self._conn.execute("DELETE FROM document_texts WHERE id = ?", (doc_id,))
+                written = [
+                    self._write({**document, "id": document.get("id", doc_id)})
+                    for doc_id, document in documents.items()
+                ]
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._cache = {metadata["id"]: metadata for metadata in written}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# Repo-root defaults, matching where main.py has always kept documents.json
+DEFAULT_CATALOG_PATH = os.getenv(
+    "DOCUMENT_CATALOG_PATH", str(Path(__file__).resolve().parent.parent / "documents.sqlite")
+)
+DEFAULT_LEGACY_JSON_PATH = str(Path(__file__).resolve().parent.parent / "documents.json")
+
+# Global catalog instance (lazy-loaded)
+_document_catalog: Optional[DocumentCatalog] = None
+_document_catalog_lock = threading.Lock()
+
+
+def get_document_catalog(
+    db_path: Optional[str] = None, legacy_json_path: Optional[str] = None
+) -> DocumentCatalog:
+    """
+    Get or create the process-wide document catalog
+
+    The first caller decides the paths (main.py passes its configured ones);
+    diagnostics and upload helpers call it without arguments to share that
+    instance instead of reading documents.json.
+
+    Args:
+        db_path: SQLite database file (defaults to DOCUMENT_CATALOG_PATH)
+        legacy_json_path: documents.json to import the first time the catalog is opened
+
+    Returns:
+        The shared DocumentCatalog
+    """
+    global _document_catalog
+    with _document_catalog_lock:
+        if _document_catalog is None:
+            _document_catalog = DocumentCatalog(
+                db_path or DEFAULT_CATALOG_PATH,
+                legacy_json_path=legacy_json_path or DEFAULT_LEGACY_JSON_PATH,
+            )
+        return _document_catalog
@@ -2,29 +2,57 @@
 Document search functionality using sentence embeddings
 """
 
+import asyncio
 import json
 import logging
+import os
 import re
-from typing import List, Dict, Tuple
+import threading
+from typing import List, Dict, Optional, Tuple
 import numpy as np
 from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
+
+from embedding_pipeline import DEFAULT_BATCH_SIZE, DEFAULT_WORKERS, ProgressCallback, encode_in_batches, encode_texts
+from embedding_store import EmbeddingStore, content_hash
+from lexical_index import BM25Index, reciprocal_rank_fusion
+from vector_index import GrowableArray, create_vector_index
 
 logger = logging.getLogger(__name__)
 
 class DocumentSearchEngine:
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2", index_type: Optional[str] = None, **index_params):
         """
         Initialize the document search engine
         
         Args:
             model_name: Name of the sentence transformer model to use
+            index_type: Vector index backend ("exact" or "ivf"); defaults to SEARCH_INDEX_TYPE env var
+            **index_params: Backend options such as nlist/nprobe for "ivf"
         """
         self.model_name = model_name
         self.model = None
-        self.document_chunks = []  # List of text chunks
-        self.embeddings = None     # Numpy array of embeddings
-        self.chunk_metadata = []   # Metadata for each chunk (doc_id, chunk_id, etc.)
+        self.document_chunks = []  # List of text chunks, one per index row
+        
+        # Parallel per-chunk arrays aligned with index rows
+        self._chunk_doc_slots = GrowableArray(np.int32)  # Row -> document slot
+        self._chunk_ids = GrowableArray(np.int32)        # Row -> chunk number within its document
+        
+        # Per-document table: doc_id -> {slot, filename, content_hash, chunk_count}
+        self.documents: Dict[str, Dict] = {}
+        self._doc_slots: List[Optional[str]] = []  # Slot -> doc_id (None once removed)
+        
+        # Guards index mutation so bulk ingestion can run off the event loop
+        self._lock = threading.RLock()
+        
+        # Vector index holds the normalized float32 embeddings
+        self.index_type = index_type or os.getenv("SEARCH_INDEX_TYPE", "ivf")
+        if self.index_type == "ivf" and "nprobe" not in index_params and os.getenv("SEARCH_INDEX_NPROBE"):
+            index_params["nprobe"] = int(os.getenv("SEARCH_INDEX_NPROBE"))
+        self.index = create_vector_index(self.index_type, **index_params)
+        
+        # BM25 inverted index over the same rows, for exact model numbers and part codes
+        self.lexical_index = BM25Index()
+        self.hybrid_candidate_pool = int(os.getenv("SEARCH_HYBRID_CANDIDATES", "1000"))
         
         # Initialize model (this will download on first use)
         self._initialize_model()
@@ -39,6 +67,19 @@ class DocumentSearchEngine:
             logger.error(f"Failed to load model: {e}")
             raise
     
+    @property
+    def embeddings(self) -> Optional[np.ndarray]:
+        """Normalized embedding matrix backing the vector index"""
+        return self.index.vectors
+    
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """Encode texts into L2-normalized float32 embeddings"""
+        return encode_texts(self.model, texts)
+    
+    def encode_query(self, query: str) -> np.ndarray:
+        """Normalized float32 embedding for a single query"""
+        return self._encode([query])[0]
+    
     def _chunk_text(self, text: str, chunk_size: int = 300, overlap: int = 50) -> List[str]:
         """
         Split text into overlapping chunks
@@ -108,111 +149,347 @@ class DocumentSearchEngine:
             logger.info(f"Created {len(chunks)} chunks for document {doc_id}")
             
             # Generate embeddings for chunks
-            if chunks:
-                chunk_embeddings = self.model.encode(chunks)
-                
-                # Store chunks and metadata
-                for i, (chunk, embedding) in enumerate(zip(chunks, chunk_embeddings)):
-                    self.document_chunks.append(chunk)
-                    self.chunk_metadata.append({
-                        'doc_id': doc_id,
-                        'chunk_id': i,
-                        'filename': filename,
-                        'text': chunk
-                    })
-                
-                # Update embeddings array
-                if self.embeddings is None:
-                    self.embeddings = chunk_embeddings
-                else:
-                    self.embeddings = np.vstack([self.embeddings, chunk_embeddings])
+            chunk_embeddings = self._encode(chunks) if chunks else None
+            
+            with self._lock:
+                # Re-adding a document replaces its previous chunks
+                if doc_id in self.documents:
+                    self.remove_document(doc_id)
                 
-                logger.info(f"Added {len(chunks)} chunks from {filename} to search index")
+                self._append_document(doc_id, chunks, filename, content_hash(text))
+                if chunks:
+                    # Update vector index
+                    self.index.add(chunk_embeddings)
+                    logger.info(f"Added {len(chunks)} chunks from {filename} to search index")
                 
         except Exception as e:
             logger.error(f"Error adding document {doc_id}: {e}")
             raise
     
-    def search(self, query: str, top_k: int = 3) -> List[Dict]:
+    def add_documents(
+        self,
+        documents: List[Tuple[str, str, str]],
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        workers: int = DEFAULT_WORKERS,
+        progress_callback: Optional[ProgressCallback] = None
+    ):
+        """
+        Bulk-add documents, encoding chunks across documents in large batches
+        
+        Args:
+            documents: List of (doc_id, text, filename) tuples
+            batch_size: Chunks per encode call
+            workers: Encoder processes; >1 uses a process pool (one model per worker)
+            progress_callback: Called with (encoded_chunks, total_chunks) after each batch
+        """
+        chunked = []
+        all_chunks = []
+        for doc_id, text, filename in documents:
+            chunks = self._chunk_text(text)
+            chunked.append((doc_id, chunks, filename, content_hash(text)))
+            all_chunks.extend(chunks)
+        
+        logger.info(f"Bulk indexing {len(documents)} documents ({len(all_chunks)} chunks)")
+        embeddings = encode_in_batches(
+            all_chunks,
+            self.model_name,
+            local_model=self.model,
+            batch_size=batch_size,
+            workers=workers,
+            progress_callback=progress_callback
+        )
+        
+        with self._lock:
+            # Drop replaced documents first so row metadata stays aligned with the index
+            for doc_id, _, _, _ in chunked:
+                self.remove_document(doc_id)
+            for doc_id, chunks, filename, doc_hash in chunked:
+                self._append_document(doc_id, chunks, filename, doc_hash)
+            if all_chunks:
+                self.index.add(embeddings)
+        
+        logger.info(f"Bulk indexed {len(documents)} documents ({len(all_chunks)} chunks)")
+    
+    async def add_documents_async(self, documents: List[Tuple[str, str, str]], **kwargs):
+        """Run add_documents in a worker thread so the event loop keeps serving requests"""
+        await asyncio.to_thread(self.add_documents, documents, **kwargs)
+    
+    def _append_document(self, doc_id: str, chunks: List[str], filename: str, doc_hash: str):
+        """Record a document and its chunk texts in the parallel arrays"""
+        slot = len(self._doc_slots)
+        self._doc_slots.append(doc_id)
+        self.documents[doc_id] = {
+            'slot': slot,
+            'filename': filename,
+            'content_hash': doc_hash,
+            'chunk_count': len(chunks)
+        }
+        self.document_chunks.extend(chunks)
+        self.lexical_index.add(chunks)
+        self._chunk_doc_slots.append(np.full(len(chunks), slot, dtype=np.int32))
+        self._chunk_ids.append(np.arange(len(chunks), dtype=np.int32))
+    
+    def remove_document(self, doc_id: str) -> bool:
+        """
+        Remove a document's chunks from the search index
+        
+        Args:
+            doc_id: Document identifier
+            
+        Returns:
+            True if the document was indexed
+        """
+        with self._lock:
+            doc = self.documents.pop(doc_id, None)
+            if doc is None:
+                return False
+            
+            self._doc_slots[doc['slot']] = None
+            if doc['chunk_count']:
+                keep = self._chunk_doc_slots.view != doc['slot']
+                self.index.remove(keep)
+                self.lexical_index.remove(keep)
+                self._chunk_doc_slots.compact(keep)
+                self._chunk_ids.compact(keep)
+                self.document_chunks = [chunk for chunk, kept in zip(self.document_chunks, keep) if kept]
+        
+        logger.info(f"Removed {doc['chunk_count']} chunks for document {doc_id} from search index")
+        return True
+    
+    def _chunk_metadata(self, row: int) -> Dict:
+        """Build the metadata dict for an index row"""
+        doc_id = self._doc_slots[self._chunk_doc_slots.view[row]]
+        return {
+            'doc_id': doc_id,
+            'chunk_id': int(self._chunk_ids.view[row]),
+            'filename': self.documents[doc_id]['filename'],
+            'text': self.document_chunks[row]
+        }
+    
+    def restore_documents(self, embeddings: np.ndarray, documents: Dict[str, Dict]):
+        """
+        Replace the index with previously stored chunks and embeddings
+        
+        Args:
+            embeddings: Normalized embedding matrix (may be a read-only memory map)
+            documents: doc_id -> {content_hash, filename, offset, chunks}, rows in offset order
+        """
+        with self._lock:
+            self.clear_index()
+            for doc_id, entry in sorted(documents.items(), key=lambda item: item[1]['offset']):
+                self._append_document(doc_id, entry['chunks'], entry.get('filename', ''), entry['content_hash'])
+            self.index.build(embeddings)
+        logger.info(f"Restored {len(self.document_chunks)} chunks from {len(documents)} documents")
+    
+    def export_documents(self) -> Dict[str, Dict]:
+        """Describe indexed documents in the EmbeddingStore sidecar format"""
+        documents = {}
+        offset = 0
+        # Rows are grouped by document in slot order
+        for doc_id in self._doc_slots:
+            if doc_id is None:
+                continue
+            doc = self.documents[doc_id]
+            documents[doc_id] = {
+                'content_hash': doc['content_hash'],
+                'filename': doc['filename'],
+                'offset': offset,
+                'chunks': self.document_chunks[offset:offset + doc['chunk_count']]
+            }
+            offset += doc['chunk_count']
+        return documents
+    
+    def search(self, query: str, top_k: int = 3, mode: str = "dense", **search_params) -> List[Dict]:
         """
         Search for relevant document chunks
         
         Args:
             query: Search query
             top_k: Number of top results to return
+            mode: "dense" (embeddings), "lexical" (BM25) or "hybrid" (both, fused with RRF)
+            **search_params: Index recall/latency knobs (e.g. nprobe for "ivf")
             
         Returns:
             List of relevant chunks with similarity scores
         """
-        if self.embeddings is None or len(self.document_chunks) == 0:
+        if self.index.ntotal == 0 or len(self.document_chunks) == 0:
             logger.info("No documents in search index")
             return []
         
         try:
             # Generate query embedding
-            query_embedding = self.model.encode([query])
-            
-            # Calculate similarities
-            similarities = cosine_similarity(query_embedding, self.embeddings)[0]
-            
-            # Get top results
-            top_indices = np.argsort(similarities)[::-1][:top_k]
+            query_embedding = self._encode([query])[0] if mode != "lexical" else None
             
             results = []
-            for idx in top_indices:
-                similarity_score = similarities[idx]
-                # Only include results with reasonable similarity (> 0.1)
-                if similarity_score > 0.1:
-                    results.append({
-                        'text': self.document_chunks[idx],
-                        'similarity': float(similarity_score),
-                        'metadata': self.chunk_metadata[idx]
-                    })
+            with self._lock:
+                if mode == "dense":
+                    # Top results from the vector index (cosine similarity on normalized vectors)
+                    top_indices, similarities = self.index.search(query_embedding, top_k, **search_params)
+                    
+                    for idx, similarity_score in zip(top_indices, similarities):
+                        # Only include results with reasonable similarity (> 0.1)
+                        if similarity_score > 0.1:
+                            results.append({
+                                'text': self.document_chunks[idx],
+                                'similarity': float(similarity_score),
+                                'metadata': self._chunk_metadata(idx)
+                            })
+                elif mode in ("lexical", "hybrid"):
+                    results = self._lexical_search(query, query_embedding, top_k, **search_params)
+                else:
+                    raise ValueError(f"Unknown search mode: {mode}")
             
-            logger.info(f"Found {len(results)} relevant chunks for query: {query[:50]}...")
+            logger.info(f"Found {len(results)} relevant chunks ({mode}) for query: {query[:50]}...")
             return results
             
         except Exception as e:
             logger.error(f"Error searching documents: {e}")
             return []
     
+    def _lexical_search(self, query: str, query_embedding: Optional[np.ndarray], top_k: int, **search_params) -> List[Dict]:
+        """
+        BM25 search, optionally fused with dense similarity
+        
+        In hybrid mode the BM25 stage prefilters candidates, so dense scores are
+        computed for at most hybrid_candidate_pool rows rather than the whole
+        corpus. If too few rows match lexically, dense index results fill in.
+        """
+        pool = max(top_k, self.hybrid_candidate_pool) if query_embedding is not None else top_k
+        lexical_rows, lexical_scores = self.lexical_index.search(query, pool)
+        lexical_by_row = dict(zip(lexical_rows.tolist(), lexical_scores.tolist()))
+        
+        if query_embedding is None:
+            ranked_rows, ranked_scores = lexical_rows, lexical_scores
+            dense_by_row = {}
+        else:
+            candidates = lexical_rows
+            if len(candidates) < top_k:
+                dense_rows, _ = self.index.search(query_embedding, top_k, **search_params)
+                candidates = np.union1d(candidates, dense_rows)
+            
+            dense_scores = self.index.vectors[candidates] @ query_embedding
+            dense_order = np.argsort(-dense_scores, kind="stable")
+            dense_by_row = dict(zip(candidates.tolist(), dense_scores.tolist()))
+            ranked_rows, ranked_scores = reciprocal_rank_fusion([candidates[dense_order], lexical_rows])
+        
+        results = []
+        for idx, score in zip(ranked_rows[:top_k].tolist(), ranked_scores[:top_k].tolist()):
+            similarity = dense_by_row.get(idx, 0.0)
+            lexical_score = lexical_by_row.get(idx, 0.0)
+            # Keep lexical matches and reasonably similar dense matches
+            if lexical_score > 0 or similarity > 0.1:
+                results.append({
+                    'text': self.document_chunks[idx],
+                    'similarity': float(similarity),
+                    'score': float(score),
+                    'lexical_score': float(lexical_score),
+                    'metadata': self._chunk_metadata(idx)
+                })
+        return results
+    
     def get_stats(self) -> Dict:
         """Get statistics about the search index"""
         return {
             'total_chunks': len(self.document_chunks),
-            'total_documents': len(set(meta['doc_id'] for meta in self.chunk_metadata)),
-            'model_name': self.model_name
+            'total_documents': sum(1 for doc in self.documents.values() if doc['chunk_count']),
+            'model_name': self.model_name,
+            'index': self.index.get_stats(),
+            'lexical_index': self.lexical_index.get_stats()
         }
     
     def clear_index(self):
         """Clear the search index"""
-        self.document_chunks = []
-        self.embeddings = None
-        self.chunk_metadata = []
+        with self._lock:
+            self.document_chunks = []
+            self._chunk_doc_slots.clear()
+            self._chunk_ids.clear()
+            self.documents = {}
+            self._doc_slots = []
+            self.index.reset()
+            self.lexical_index.reset()
         logger.info("Search index cleared")
 
 # Global search engine instance
 search_engine = DocumentSearchEngine()
 
-def load_documents_into_search_engine(documents_db: Dict):
+# On-disk embedding cache so restarts only embed new or changed documents
+embedding_store = EmbeddingStore(
+    os.getenv("SEARCH_INDEX_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "search_index"))
+)
+
+def load_documents_into_search_engine(
+    documents_db: Dict,
+    store: Optional[EmbeddingStore] = None,
+    progress_callback: Optional[ProgressCallback] = None
+):
     """
     Load all documents from the database into the search engine
     
+    Documents whose content hash matches the embedding store are mapped from
+    disk; only new or changed documents are chunked and embedded.
+    
     Args:
         documents_db: Dictionary of document data
+        store: Embedding store to reuse (defaults to the module-level store)
+        progress_callback: Called with (encoded_chunks, total_chunks) while embedding
     """
+    store = store or embedding_store
     try:
-        search_engine.clear_index()
+        cached = store.load(search_engine.model_name)
+        cached_embeddings, cached_documents = cached if cached else (None, {})
         
+        reusable = {}
+        pending = []
         for doc_id, doc_info in documents_db.items():
-            search_engine.add_document(
-                doc_id=doc_id,
-                text=doc_info.get('text_content', ''),
-                filename=doc_info.get('original_filename', '')
+            text = doc_info.get('text_content', '')
+            entry = cached_documents.get(doc_id)
+            if entry is not None and entry['content_hash'] == content_hash(text):
+                reusable[doc_id] = entry
+            else:
+                pending.append((doc_id, doc_info))
+        
+        if reusable:
+            if len(reusable) == len(cached_documents):
+                # Everything still valid: serve straight from the memory map
+                embeddings = cached_embeddings
+                documents = cached_documents
+            else:
+                embeddings, documents = _select_documents(cached_embeddings, reusable)
+            search_engine.restore_documents(embeddings, documents)
+        else:
+            search_engine.clear_index()
+        
+        if pending:
+            search_engine.add_documents(
+                [
+                    (doc_id, doc_info.get('text_content', ''), doc_info.get('original_filename', ''))
+                    for doc_id, doc_info in pending
+                ],
+                progress_callback=progress_callback
             )
         
-        logger.info(f"Loaded {len(documents_db)} documents into search engine")
+        if pending or len(reusable) != len(cached_documents):
+            store.save(search_engine.model_name, search_engine.embeddings, search_engine.export_documents())
+        
+        logger.info(
+            f"Loaded {len(documents_db)} documents into search engine "
+            f"({len(reusable)} from embedding store, {len(pending)} embedded)"
+        )
         
     except Exception as e:
         logger.error(f"Error loading documents into search engine: {e}")
-        raise
\ No newline at end of file
+        raise
+
+def _select_documents(embeddings: np.ndarray, documents: Dict[str, Dict]) -> Tuple[np.ndarray, Dict[str, Dict]]:
+    """Copy the rows of the given stored documents into a contiguous matrix"""
+    ordered = sorted(documents.items(), key=lambda item: item[1]['offset'])
+    rows = [np.arange(entry['offset'], entry['offset'] + len(entry['chunks'])) for _, entry in ordered]
+    rows = np.concatenate(rows) if rows else np.empty(0, dtype=np.int64)
+    
+    selected = {}
+    offset = 0
+    for doc_id, entry in ordered:
+        selected[doc_id] = dict(entry, offset=offset)
+        offset += len(entry['chunks'])
+    
+    return np.asarray(embeddings[rows], dtype=np.float32), selected
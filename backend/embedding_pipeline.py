@@ -0,0 +1,160 @@
+"""
+Batched, multi-process embedding pipeline for bulk document ingestion
+
+Chunks from many documents are grouped into fixed-size batches and encoded
+with SentenceTransformer, either in-process or in a pool of worker processes
+that each load the model once. This module deliberately avoids importing
+document_search so spawned workers do not build the global search engine.
+"""
+
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = int(os.getenv("SEARCH_EMBED_BATCH_SIZE", "256"))
+# Each worker holds its own copy of the model, so pooling is opt-in on small instances
+DEFAULT_WORKERS = int(os.getenv("SEARCH_EMBED_WORKERS", "1"))
+
+ProgressCallback = Callable[[int, int], None]
+
+_worker_model = None
+
+
+def _init_worker(model_name: str):
+    """Load the sentence transformer once per worker process"""
+    global _worker_model
+    from sentence_transformers import SentenceTransformer
+
+    # One torch thread per process; parallelism comes from the pool
+    try:
+        import torch
+        torch.set_num_threads(1)
+    except ImportError:
+        pass
+
+    _worker_model = SentenceTransformer(model_name)
+
+
+def _encode_batch(texts: List[str]) -> np.ndarray:
+    """Encode one batch inside a worker process"""
+    return encode_texts(_worker_model, texts)
+
+
+def encode_texts(model, texts: List[str]) -> np.ndarray:
+    """Encode texts into L2-normalized float32 embeddings"""
+    embeddings = model.encode(texts, convert_to_numpy=True, normalize_embeddings=True)
+    return embeddings.astype(np.float32, copy=False)
+
+
+def encode_in_batches(
+    texts: List[str],
+    model_name: str,
+    local_model=None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    workers: int = DEFAULT_WORKERS,
+    progress_callback: Optional[ProgressCallback] = None,
+) -> np.ndarray:
+    """
+    Encode a large list of texts in fixed-size batches
+
+    Args:
+        texts: Chunk texts to encode
+        model_name: Sentence transformer model name (loaded by worker processes)
+        local_model: Already-loaded model used when encoding in-process
+        batch_size: Chunks per encode call
+        workers: Worker processes; 1 encodes in the calling process
+        progress_callback: Called with (encoded_chunks, total_chunks) after each batch
+
+    Returns:
+        2-D float32 array with one row per text, in input order
+    """
+    total = len(texts)
+    if total == 0:
+        return np.empty((0, 0), dtype=np.float32)
+
+    batches = [texts[i:i + batch_size] for i in range(0, total, batch_size)]
+    results: List[np.ndarray] = []
+    done = 0
+    start_time = time.time()
+
+    def _report(batch_embeddings: np.ndarray):
+        nonlocal done
+        results.append(batch_embeddings)
+        done += batch_embeddings.shape[0]
+        if progress_callback:
+            progress_callback(done, total)
+
+    if workers > 1 and len(batches) > 1:
+        # spawn avoids forking a process that already holds torch thread pools
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(batches)),
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(model_name,),
+        ) as executor:
+            # map() yields in submission order, so rows stay aligned with texts
+            for batch_embeddings in executor.map(_encode_batch, batches):
+                _report(batch_embeddings)
+    else:
+        if local_model is None:
+            from sentence_transformers import SentenceTransformer
+            local_model = SentenceTransformer(model_name)
+        for batch in batches:
+            _report(encode_texts(local_model, batch))
+
+    elapsed = time.time() - start_time
+    logger.info(
+        f"Encoded {total} chunks in {len(batches)} batches with {max(1, workers)} worker(s) "
+        f"in {elapsed:.2f}s ({total / max(elapsed, 1e-9):.0f} chunks/s)"
+    )
+    return np.vstack(results)
+
+
+def _read_manual(path: str) -> str:
+    """Extract text from a manual in uploaded_docs for benchmarking"""
+    if path.lower().endswith(".pdf"):
+        import PyPDF2
+        with open(path, "rb") as f:
+            reader = PyPDF2.PdfReader(f)
+            return "\n".join(page.extract_text() or "" for page in reader.pages)
+    with open(path, "r", errors="ignore") as f:
+        return f.read()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark bulk embedding on uploaded manuals")
+    parser.add_argument("--docs-dir", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "uploaded_docs"))
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    parser.add_argument("--repeat", type=int, default=1, help="Replicate the corpus to simulate a larger library")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    # Reuse the search engine's chunker and already-loaded model for the in-process run
+    from document_search import search_engine
+
+    texts = []
+    for name in sorted(os.listdir(args.docs_dir)):
+        if name.lower().endswith((".pdf", ".txt", ".md")):
+            texts.extend(search_engine._chunk_text(_read_manual(os.path.join(args.docs_dir, name))))
+    texts = texts * args.repeat
+    print(f"{len(texts)} chunks from {args.docs_dir}")
+
+    for workers in args.workers:
+        start = time.time()
+        encode_in_batches(
+            texts, search_engine.model_name, local_model=search_engine.model,
+            batch_size=args.batch_size, workers=workers,
+        )
+        print(f"workers={workers}: {time.time() - start:.2f}s")
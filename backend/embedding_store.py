@@ -0,0 +1,126 @@
+"""
+Persistent on-disk store for DocumentSearchEngine embeddings
+
+Embeddings are written as a single float32 .npy file that is reopened with
+np.load(mmap_mode='r'), so restarts map the index instead of re-encoding
+every manual. A compact JSON sidecar records, per document, the content
+hash, filename, row offset and chunk texts.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+STORE_FORMAT_VERSION = 1
+
+
+def content_hash(text: str) -> str:
+    """Stable hash of a document's text content"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingStore:
+    """Memory-mapped embedding matrix plus metadata sidecar"""
+
+    EMBEDDINGS_FILE = "embeddings.npy"
+    METADATA_FILE = "metadata.json"
+
+    def __init__(self, storage_path: str = "data/search_index"):
+        self.storage_path = Path(storage_path)
+        self.embeddings_file = self.storage_path / self.EMBEDDINGS_FILE
+        self.metadata_file = self.storage_path / self.METADATA_FILE
+
+    def load(self, model_name: str) -> Optional[Tuple[np.ndarray, Dict[str, Dict]]]:
+        """
+        Map the stored embeddings
+
+        Args:
+            model_name: Model the caller encodes with; a mismatch invalidates the store
+
+        Returns:
+            Tuple of (read-only memory-mapped embeddings, documents) or None.
+            documents maps doc_id to {content_hash, filename, offset, chunks}.
+        """
+        if not self.embeddings_file.exists() or not self.metadata_file.exists():
+            return None
+
+        try:
+            with open(self.metadata_file, "r") as f:
+                metadata = json.load(f)
+
+            if metadata.get("version") != STORE_FORMAT_VERSION:
+                logger.info("Embedding store format changed, ignoring cached embeddings")
+                return None
+            if metadata.get("model_name") != model_name:
+                logger.info(
+                    f"Embedding store built with {metadata.get('model_name')}, "
+                    f"not {model_name}; ignoring cached embeddings"
+                )
+                return None
+
+            embeddings = np.load(self.embeddings_file, mmap_mode="r")
+            if embeddings.shape[0] != metadata.get("total_chunks"):
+                logger.warning("Embedding store row count mismatch, ignoring cached embeddings")
+                return None
+
+            return embeddings, metadata.get("documents", {})
+
+        except Exception as e:
+            logger.warning(f"Failed to load embedding store: {e}")
+            return None
+
+    def save(self, model_name: str, embeddings: Optional[np.ndarray], documents: Dict[str, Dict]) -> bool:
+        """
+        Atomically write embeddings and metadata
+
+        Args:
+            model_name: Model used to produce the embeddings
+            embeddings: 2-D float32 matrix (rows ordered by document offset)
+            documents: doc_id -> {content_hash, filename, offset, chunks}
+
+        Returns:
+            True if the store was written
+        """
+        try:
+            self.storage_path.mkdir(parents=True, exist_ok=True)
+            if embeddings is None:
+                embeddings = np.empty((0, 0), dtype=np.float32)
+
+            metadata = {
+                "version": STORE_FORMAT_VERSION,
+                "model_name": model_name,
+                "total_chunks": int(embeddings.shape[0]),
+                "documents": documents,
+            }
+
+            embeddings_tmp = self.storage_path / (self.EMBEDDINGS_FILE + ".tmp")
+            metadata_tmp = self.storage_path / (self.METADATA_FILE + ".tmp")
+
+            with open(embeddings_tmp, "wb") as f:
+                np.save(f, np.asarray(embeddings, dtype=np.float32))
+            with open(metadata_tmp, "w") as f:
+                json.dump(metadata, f, separators=(",", ":"))
+
+            # Replace embeddings first; the row count in metadata guards against a torn pair
+            os.replace(embeddings_tmp, self.embeddings_file)
+            os.replace(metadata_tmp, self.metadata_file)
+
+            logger.info(f"Saved {metadata['total_chunks']} embeddings to {self.storage_path}")
+            return True
+
+        except Exception as e:
+            logger.error(f"Failed to save embedding store: {e}")
+            return False
+
+    def clear(self):
+        """Delete the stored embeddings"""
+        for path in (self.embeddings_file, self.metadata_file):
+            if path.exists():
+                path.unlink()
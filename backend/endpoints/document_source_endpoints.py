@@ -23,10 +23,11 @@ from fastapi import APIRouter, HTTPException, Request, Response
 from fastapi.responses import StreamingResponse
 from pathlib import Path
 import os
-import io
 
 # Import the document source service
 from services.ragie_document_source_service import ragie_document_source_service
+from services.file_server import build_file_response, parse_range_header, RangeNotSatisfiable
+from services.source_download import SharedSourceDownload
 
 logger = logging.getLogger(__name__)
 
@@ -59,8 +60,8 @@ async def get_document_source(
     try:
         logger.info(f"📥 Document source request for {document_id}")
         
-        # Get document from Ragie
-        document_result = await ragie_document_source_service.get_document_source(document_id)
+        # Locate the document on disk (cache) or join its upstream download
+        document_result = await ragie_document_source_service.open_document_source(document_id)
         
         if not document_result.success:
             logger.error(f"❌ Document source failed: {document_result.error}")
@@ -73,50 +74,30 @@ async def get_document_source(
             else:
                 raise HTTPException(status_code=500, detail=document_result.error)
         
-        if not document_result.content:
-            raise HTTPException(status_code=404, detail="Document content not available")
-        
-        # Get content details
-        content = document_result.content
         content_type = document_result.content_type or "application/octet-stream"
-        content_length = len(content)
         filename = document_result.filename or f"document_{document_id}"
+        headers = {
+            "Content-Disposition": f'inline; filename="{filename}"',
+            "Cache-Control": "public, max-age=3600"  # Cache for 1 hour
+        }
         
-        # Check for Range header (for video streaming)
-        range_header = request.headers.get("Range")
+        if document_result.path:
+            # Cached: range-aware streaming straight from the cache file
+            try:
+                served = build_file_response(request, document_result.path, content_type, headers=headers)
+            except FileNotFoundError:
+                # Evicted between lookup and serve; fetch it again
+                logger.warning(f"⚠️ Cached document {document_id} evicted while serving, refetching")
+                document_result = await ragie_document_source_service.open_document_source(document_id)
+                if not document_result.success:
+                    raise HTTPException(status_code=404, detail="Document not found")
+                if document_result.path:
+                    return build_file_response(request, document_result.path, content_type, headers=headers)
+                return _stream_download(document_result.download, request, content_type, headers)
+            logger.info(f"✅ Document source served: {document_id} ({served.status_code}, cached)")
+            return served
         
-        if range_header:
-            # Handle range requests for video streaming
-            return _handle_range_request(
-                content=content,
-                content_type=content_type,
-                content_length=content_length,
-                range_header=range_header,
-                filename=filename
-            )
-        else:
-            # Return full content
-            response.headers["Content-Type"] = content_type
-            response.headers["Content-Length"] = str(content_length)
-            response.headers["Content-Disposition"] = f'inline; filename="{filename}"'
-            response.headers["Accept-Ranges"] = "bytes"
-            
-            # Add caching headers
-            response.headers["Cache-Control"] = "public, max-age=3600"  # Cache for 1 hour
-            response.headers["ETag"] = f'"{document_id}"'
-            
-            # Log success
-            cache_status = "cached" if document_result.cached else "fetched"
-            logger.info(f"✅ Document source served: {document_id} ({content_length} bytes, {cache_status})")
-            
-            return StreamingResponse(
-                io.BytesIO(content),
-                media_type=content_type,
-                headers={
-                    "Content-Disposition": f'inline; filename="{filename}"',
-                    "Accept-Ranges": "bytes"
-                }
-            )
+        return _stream_download(document_result.download, request, content_type, headers)
             
     except HTTPException:
         raise
@@ -124,70 +105,53 @@ async def get_document_source(
         logger.error(f"❌ Unexpected error serving document {document_id}: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
-def _handle_range_request(
-    content: bytes,
+def _stream_download(
+    download: SharedSourceDownload,
+    request: Request,
     content_type: str,
-    content_length: int,
-    range_header: str,
-    filename: str
-) -> StreamingResponse:
+    headers: Dict[str, str]
+) -> Response:
     """
-    Handle HTTP Range requests for video streaming
+    Serve a document while its upstream download is still in progress
+    
+    A single range is honoured when the upstream declared its length;
+    otherwise the body is streamed in full as it arrives.
     
     Args:
-        content: Document content bytes
+        download: In-flight shared download
+        request: FastAPI request object
         content_type: MIME type
-        content_length: Total content length
-        range_header: Range header value
-        filename: Document filename
+        headers: Extra response headers
         
     Returns:
-        StreamingResponse with partial content
+        StreamingResponse teed from the download
     """
-    try:
-        # Parse range header (e.g., "bytes=0-1023" or "bytes=1024-")
-        range_match = range_header.replace("bytes=", "").strip()
-        
-        if "-" not in range_match:
-            raise ValueError("Invalid range format")
-        
-        range_start, range_end = range_match.split("-", 1)
-        
-        # Parse start and end positions
-        start = int(range_start) if range_start else 0
-        end = int(range_end) if range_end else content_length - 1
-        
-        # Validate range
-        if start < 0 or end >= content_length or start > end:
-            raise ValueError("Invalid range bounds")
-        
-        # Extract content chunk
-        chunk_size = end - start + 1
-        content_chunk = content[start:end + 1]
-        
-        # Create response headers
-        headers = {
-            "Content-Type": content_type,
-            "Content-Length": str(chunk_size),
-            "Content-Range": f"bytes {start}-{end}/{content_length}",
-            "Accept-Ranges": "bytes",
-            "Content-Disposition": f'inline; filename="{filename}"'
-        }
-        
-        logger.info(f"📹 Range request served: {start}-{end}/{content_length} ({chunk_size} bytes)")
-        
-        return StreamingResponse(
-            io.BytesIO(content_chunk),
-            status_code=206,  # Partial Content
-            headers=headers
-        )
+    headers = {**headers, "Accept-Ranges": "bytes"}
+    range_header = request.headers.get("Range")
+    
+    if range_header and download.size is not None:
+        try:
+            ranges = parse_range_header(range_header, download.size)
+        except RangeNotSatisfiable:
+            logger.warning(f"⚠️ Invalid range request: {range_header}")
+            return Response(status_code=416, headers={"Content-Range": f"bytes */{download.size}"})
         
-    except ValueError as e:
-        logger.warning(f"⚠️ Invalid range request: {e}")
-        raise HTTPException(status_code=416, detail="Range Not Satisfiable")
-    except Exception as e:
-        logger.error(f"❌ Range request error: {e}")
-        raise HTTPException(status_code=500, detail="Range request processing error")
+        if ranges is not None and len(ranges) == 1:
+            start, end = ranges[0]
+            headers["Content-Range"] = f"bytes {start}-{end}/{download.size}"
+            headers["Content-Length"] = str(end - start + 1)
+            logger.info(f"📹 Range request served from download: {start}-{end}/{download.size}")
+            return StreamingResponse(
+                download.iter_range(start, end),
+                status_code=206,  # Partial Content
+                media_type=content_type,
+                headers=headers
+            )
+    
+    if download.size is not None:
+        headers["Content-Length"] = str(download.size)
+    logger.info(f"✅ Document source streaming from upstream download ({download.size or 'unknown'} bytes)")
+    return StreamingResponse(download.iter_range(0), media_type=content_type, headers=headers)
 
 @document_source_router.get("/documents/{document_id}/metadata")
 async def get_document_metadata(document_id: str):
@@ -261,6 +225,14 @@ async def clear_cache():
         logger.error(f"❌ Error clearing cache: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@document_source_router.on_event("shutdown")
+async def close_document_source_cache():
+    """Stop the cache cleanup task and persist the cache index"""
+    try:
+        await ragie_document_source_service.close()
+    except Exception as e:
+        logger.error(f"❌ Error closing document source cache: {e}")
+
 @document_source_router.get("/documents/source/health")
 async def document_source_health():
     """
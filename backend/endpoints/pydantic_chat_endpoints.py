@@ -92,7 +92,11 @@ class QSRChatEndpoints:
         self.app = app
         # Lazy-load the agent to ensure environment is loaded first
         self._agent = None
+        # One pool for every request so group commits batch across requests
+        self._database: Optional[QSRDatabase] = None
+        self._database_lock = asyncio.Lock()
         self.setup_endpoints()
+        self.app.add_event_handler("shutdown", self.close_database)
     
     @property
     def agent(self) -> QSRBaseAgent:
@@ -136,11 +140,18 @@ class QSRChatEndpoints:
         )
     
     async def get_database(self) -> QSRDatabase:
-        """Get database connection"""
-        # This would typically be managed by FastAPI dependency injection
-        # For now, we'll create a new connection each time
-        async with QSRDatabase.connect() as db:
-            return db
+        """Get the shared database pool, opening it on first use"""
+        if self._database is None:
+            async with self._database_lock:
+                if self._database is None:
+                    self._database = await QSRDatabase.open()
+        return self._database
+    
+    async def close_database(self):
+        """Flush pending writes and close the shared database pool"""
+        if self._database is not None:
+            database, self._database = self._database, None
+            await database.close()
     
     async def chat_endpoint(self, request: PydanticChatRequest) -> PydanticChatResponse:
         """
@@ -163,56 +174,56 @@ class QSRChatEndpoints:
             logger.info(f"Processing PydanticAI chat request: {request.message[:50]}...")
             
             # Get database connection
-            async with QSRDatabase.connect() as db:
-                # Get conversation history
-                message_history = await db.get_messages(request.conversation_id, limit=20)
-                
-                # Search documents with Ragie if requested
-                ragie_documents = []
-                if request.search_documents:
-                    ragie_documents = await self._search_ragie_documents(request.message)
-                
-                # Create QSR context
-                context = QSRContext(
-                    conversation_id=request.conversation_id,
-                    user_location=request.user_location,
-                    equipment_context=request.equipment_context,
-                    previous_queries=[request.message]
-                )
-                
-                # Process query with agent
-                response = await self.agent.process_query(
-                    query=request.message,
-                    context=context,
-                    message_history=message_history
-                )
-                
-                # Calculate response time
-                response_time = asyncio.get_event_loop().time() - start_time
-                
-                # Save conversation data
-                await self._save_conversation_data(db, request, response, response_time)
-                
-                # Create API response
-                api_response = PydanticChatResponse(
-                    response=response.response,
-                    timestamp=datetime.now().isoformat(),
-                    conversation_id=request.conversation_id,
-                    response_type=response.response_type,
-                    confidence=response.confidence,
-                    safety_alerts=response.safety_alerts,
-                    equipment_references=response.equipment_references,
-                    citations=response.citations,
-                    follow_up_suggestions=response.follow_up_suggestions,
-                    escalation_required=response.escalation_required,
-                    response_time=response_time,
-                    agent_id=self.agent.agent_id,
-                    ragie_documents=ragie_documents
-                )
-                
-                logger.info(f"PydanticAI chat response generated in {response_time:.2f}s")
-                return api_response
-                
+            db = await self.get_database()
+            # Get conversation history
+            message_history = await db.get_messages(request.conversation_id, limit=20)
+            
+            # Search documents with Ragie if requested
+            ragie_documents = []
+            if request.search_documents:
+                ragie_documents = await self._search_ragie_documents(request.message)
+            
+            # Create QSR context
+            context = QSRContext(
+                conversation_id=request.conversation_id,
+                user_location=request.user_location,
+                equipment_context=request.equipment_context,
+                previous_queries=[request.message]
+            )
+            
+            # Process query with agent
+            response = await self.agent.process_query(
+                query=request.message,
+                context=context,
+                message_history=message_history
+            )
+            
+            # Calculate response time
+            response_time = asyncio.get_event_loop().time() - start_time
+            
+            # Save conversation data
+            await self._save_conversation_data(db, request, response, response_time)
+            
+            # Create API response
+            api_response = PydanticChatResponse(
+                response=response.response,
+                timestamp=datetime.now().isoformat(),
+                conversation_id=request.conversation_id,
+                response_type=response.response_type,
+                confidence=response.confidence,
+                safety_alerts=response.safety_alerts,
+                equipment_references=response.equipment_references,
+                citations=response.citations,
+                follow_up_suggestions=response.follow_up_suggestions,
+                escalation_required=response.escalation_required,
+                response_time=response_time,
+                agent_id=self.agent.agent_id,
+                ragie_documents=ragie_documents
+            )
+            
+            logger.info(f"PydanticAI chat response generated in {response_time:.2f}s")
+            return api_response
+            
         except HTTPException:
             raise
         except Exception as e:
@@ -240,69 +251,69 @@ class QSRChatEndpoints:
             async def generate_stream():
                 try:
                     # Get database connection
-                    async with QSRDatabase.connect() as db:
-                        # Get conversation history
-                        message_history = await db.get_messages(request.conversation_id, limit=20)
-                        
-                        # Search documents with Ragie if requested
-                        ragie_documents = []
-                        if request.search_documents:
-                            ragie_documents = await self._search_ragie_documents(request.message)
-                        
-                        # Create QSR context
-                        context = QSRContext(
-                            conversation_id=request.conversation_id,
-                            user_location=request.user_location,
-                            equipment_context=request.equipment_context,
-                            previous_queries=[request.message]
-                        )
-                        
-                        # Stream user message first
-                        user_chunk = StreamingChatChunk(
-                            chunk=f"User: {request.message}\n\nAssistant: ",
-                            timestamp=datetime.now().isoformat(),
-                            conversation_id=request.conversation_id,
-                            done=False
-                        )
-                        yield f"data: {user_chunk.json()}\n\n"
-                        
-                        # Stream agent response
-                        complete_response = ""
-                        async for chunk_data in self.agent.process_query_stream(
-                            query=request.message,
-                            context=context,
-                            message_history=message_history
-                        ):
-                            if chunk_data["done"]:
-                                # Final chunk with metadata
-                                final_chunk = StreamingChatChunk(
-                                    chunk="",
-                                    timestamp=chunk_data["timestamp"],
-                                    conversation_id=request.conversation_id,
-                                    done=True,
-                                    metadata={
-                                        **chunk_data.get("metadata", {}),
-                                        "ragie_documents": ragie_documents,
-                                        "agent_id": self.agent.agent_id
-                                    }
-                                )
-                                yield f"data: {final_chunk.json()}\n\n"
-                                
-                                # Save conversation data
-                                await self._save_streaming_conversation_data(
-                                    db, request, complete_response, chunk_data.get("metadata", {})
-                                )
-                                
-                            else:
-                                # Regular chunk
-                                complete_response += chunk_data["chunk"]
-                                chunk = StreamingChatChunk(
-                                    chunk=chunk_data["chunk"],
-                                    timestamp=chunk_data["timestamp"],
-                                    conversation_id=request.conversation_id,
-                                    done=False
-                                )
-                                yield f"data: {chunk.json()}\n\n"
+                    db = await self.get_database()
+                    # Get conversation history
+                    message_history = await db.get_messages(request.conversation_id, limit=20)
+                    
+                    # Search documents with Ragie if requested
+                    ragie_documents = []
+                    if request.search_documents:
+                        ragie_documents = await self._search_ragie_documents(request.message)
+                    
+                    # Create QSR context
+                    context = QSRContext(
+                        conversation_id=request.conversation_id,
+                        user_location=request.user_location,
+                        equipment_context=request.equipment_context,
+                        previous_queries=[request.message]
+                    )
+                    
+                    # Stream user message first
+                    user_chunk = StreamingChatChunk(
+                        chunk=f"User: {request.message}\n\nAssistant: ",
+                        timestamp=datetime.now().isoformat(),
+                        conversation_id=request.conversation_id,
+                        done=False
+                    )
+                    yield f"data: {user_chunk.json()}\n\n"
+                    
+                    # Stream agent response
+                    complete_response = ""
+                    async for chunk_data in self.agent.process_query_stream(
+                        query=request.message,
+                        context=context,
+                        message_history=message_history
+                    ):
+                        if chunk_data["done"]:
+                            # Final chunk with metadata
+                            final_chunk = StreamingChatChunk(
+                                chunk="",
+                                timestamp=chunk_data["timestamp"],
+                                conversation_id=request.conversation_id,
+                                done=True,
+                                metadata={
+                                    **chunk_data.get("metadata", {}),
+                                    "ragie_documents": ragie_documents,
+                                    "agent_id": self.agent.agent_id
+                                }
+                            )
+                            yield f"data: {final_chunk.json()}\n\n"
+                            
+                            # Save conversation data
+                            await self._save_streaming_conversation_data(
+                                db, request, complete_response, chunk_data.get("metadata", {})
+                            )
+                            
+                        else:
+                            # Regular chunk
+                            complete_response += chunk_data["chunk"]
+                            chunk = StreamingChatChunk(
+                                chunk=chunk_data["chunk"],
+                                timestamp=chunk_data["timestamp"],
+                                conversation_id=request.conversation_id,
+                                done=False
+                            )
+                            yield f"data: {chunk.json()}\n\n"
                 
                 except Exception as e:
                     logger.error(f"Error in streaming chat: {str(e)}")
@@ -343,30 +354,30 @@ class QSRChatEndpoints:
         """
         
         try:
-            async with QSRDatabase.connect() as db:
-                # Get messages
-                messages = await db.get_messages(conversation_id)
-                
-                # Get metadata
-                metadata = await db.get_conversation_metadata(conversation_id)
-                
-                # Format response
-                response = {
-                    "conversation_id": conversation_id,
-                    "message_count": len(messages),
-                    "messages": [
-                        {
-                            "role": getattr(msg, 'role', 'unknown'),
-                            "content": getattr(msg, 'content', str(msg)),
-                            "timestamp": getattr(msg, 'timestamp', datetime.now().isoformat())
-                        }
-                        for msg in messages
-                    ],
-                    "metadata": metadata.to_dict() if metadata else None
-                }
-                
-                return JSONResponse(content=response)
-                
+            db = await self.get_database()
+            # Get messages
+            messages = await db.get_messages(conversation_id)
+            
+            # Get metadata
+            metadata = await db.get_conversation_metadata(conversation_id)
+            
+            # Format response
+            response = {
+                "conversation_id": conversation_id,
+                "message_count": len(messages),
+                "messages": [
+                    {
+                        "role": getattr(msg, 'role', 'unknown'),
+                        "content": getattr(msg, 'content', str(msg)),
+                        "timestamp": getattr(msg, 'timestamp', datetime.now().isoformat())
+                    }
+                    for msg in messages
+                ],
+                "metadata": metadata.to_dict() if metadata else None
+            }
+            
+            return JSONResponse(content=response)
+            
         except Exception as e:
             logger.error(f"Error getting conversation history: {str(e)}")
             raise HTTPException(status_code=500, detail="Failed to get conversation history")
@@ -383,10 +394,10 @@ class QSRChatEndpoints:
         """
         
         try:
-            async with QSRDatabase.connect() as db:
-                analytics = await db.get_conversation_analytics(conversation_id)
-                return JSONResponse(content=analytics)
-                
+            db = await self.get_database()
+            analytics = await db.get_conversation_analytics(conversation_id)
+            return JSONResponse(content=analytics)
+            
         except Exception as e:
             logger.error(f"Error getting conversation analytics: {str(e)}")
             raise HTTPException(status_code=500, detail="Failed to get conversation analytics")
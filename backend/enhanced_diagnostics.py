@@ -24,6 +24,11 @@ import logging
 from datetime import datetime
 from pathlib import Path
 
+try:
+    from document_catalog import get_document_catalog
+except ImportError:
+    from .document_catalog import get_document_catalog
+
 logger = logging.getLogger(__name__)
 
 # Create router for enhanced diagnostics
@@ -88,13 +93,10 @@ async def get_processing_status():
     Shows detailed pipeline visibility including Neo4j sync status.
     """
     try:
-        # Load documents database
-        docs_db_path = Path(__file__).parent.parent / "documents.json"
-        if docs_db_path.exists():
-            with open(docs_db_path) as f:
-                docs_db = json.load(f)
-        else:
-            docs_db = {}
+        # Load document metadata from the catalog (text stays in its own table)
+        catalog = get_document_catalog()
+        docs_db = catalog.as_dict(include_text=False)
+        ids_with_text = catalog.ids_with_text()
         
         # Analyze processing files
         backend_dir = Path(__file__).parent
@@ -129,12 +131,12 @@ async def get_processing_status():
                 except:
                     pass
             
-            # Determine status - prioritize documents.json status if available
+            # Determine status - prioritize catalog status if available
             doc_status = doc_info.get('status', 'unknown')
             doc_stage = doc_info.get('processing_stage', 'unknown')
             
             if doc_status == 'complete' and doc_stage == 'complete':
-                # Document marked as complete in documents.json
+                # Document marked as complete in the catalog
                 status = "completed"
                 stage = "neo4j_synced"
                 graph_ready = True
@@ -165,7 +167,7 @@ async def get_processing_status():
                 original_filename=doc_info.get('original_filename', 'unknown'),
                 upload_timestamp=doc_info.get('upload_timestamp', ''),
                 
-                text_extracted=bool(doc_info.get('text_content')),
+                text_extracted=doc_id in ids_with_text,
                 entities_extracted=entities_count,
                 relationships_extracted=relationships_count,
                 neo4j_synced=has_checkpoint,
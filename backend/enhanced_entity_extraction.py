@@ -21,6 +21,8 @@ from pathlib import Path
 from typing import Dict, List, Any, Optional, Tuple
 import hashlib
 
+from document_catalog import get_document_catalog
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -365,12 +367,9 @@ async def process_stuck_files():
     logger.info("🚀 Starting enhanced entity extraction for stuck files...")
     
     try:
-        # Load documents database
+        # Load documents (with text) from the catalog
         backend_dir = Path("/Users/johninniger/Workspace/line_lead_qsr_mvp/backend")
-        docs_db_path = backend_dir.parent / "documents.json"
-        
-        with open(docs_db_path, 'r') as f:
-            docs_db = json.load(f)
+        docs_db = get_document_catalog().as_dict(include_text=True)
             
         # Initialize extractor
         extractor = EnhancedEntityExtractor()
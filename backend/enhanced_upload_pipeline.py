@@ -20,6 +20,7 @@ import fitz  # PyMuPDF
 # Local imports
 from services.document_context_integration_service import DocumentContextIntegrationService
 from services.neo4j_service import Neo4jService
+from document_catalog import get_document_catalog
 
 logger = logging.getLogger(__name__)
 
@@ -38,7 +39,7 @@ class EnhancedUploadPipeline:
         self.upload_dir.mkdir(exist_ok=True)
         
         # Document tracking
-        self.documents_file = Path(__file__).parent.parent / "documents.json"
+        self.document_catalog = get_document_catalog()
         self.neo4j_verified_file = Path(__file__).parent / "neo4j_verified_documents.json"
         
     async def process_document_upload(self, file: UploadFile) -> Dict[str, Any]:
@@ -157,20 +158,15 @@ class EnhancedUploadPipeline:
                                         integration_results: Dict[str, Any]) -> None:
         """Update document tracking files"""
         
-        # Update documents.json
+        # Update the document catalog
         try:
-            if self.documents_file.exists():
-                with open(self.documents_file, 'r') as f:
-                    documents = json.load(f)
-            else:
-                documents = []
-            
-            # Add new document
             document_entry = {
+                "id": document_data["document_id"],
                 "document_id": document_data["document_id"],
                 "filename": document_data["filename"],
                 "file_path": document_data["file_path"],
                 "page_count": document_data["page_count"],
+                "pages_count": document_data["page_count"],
                 "char_count": document_data["char_count"],
                 "document_type": integration_results["document_summary"]["document_type"],
                 "qsr_category": integration_results["document_summary"]["qsr_category"],
@@ -182,15 +178,12 @@ class EnhancedUploadPipeline:
                 "relationships_count": integration_results["hierarchy_relationships"]
             }
             
-            documents.append(document_entry)
-            
-            with open(self.documents_file, 'w') as f:
-                json.dump(documents, f, indent=2)
+            self.document_catalog.put(document_entry)
             
-            logger.info(f"Updated documents.json with {document_data['filename']}")
+            logger.info(f"Updated document catalog with {document_data['filename']}")
             
         except Exception as e:
-            logger.error(f"Failed to update documents.json: {e}")
+            logger.error(f"Failed to update document catalog: {e}")
         
         # Update Neo4j verified documents
         try:
@@ -275,12 +268,8 @@ class EnhancedUploadPipeline:
         """Get current upload status and statistics"""
         
         try:
-            # Load documents
-            if self.documents_file.exists():
-                with open(self.documents_file, 'r') as f:
-                    documents = json.load(f)
-            else:
-                documents = []
+            # Load documents, oldest first
+            documents = list(reversed(self.document_catalog.list()))
             
             # Load verified documents
             if self.neo4j_verified_file.exists():
@@ -334,12 +323,7 @@ class EnhancedUploadPipeline:
         """List all uploaded documents with their metadata"""
         
         try:
-            if self.documents_file.exists():
-                with open(self.documents_file, 'r') as f:
-                    documents = json.load(f)
-                return documents
-            else:
-                return []
+            return list(reversed(self.document_catalog.list()))
                 
         except Exception as e:
             logger.error(f"Failed to list documents: {e}")
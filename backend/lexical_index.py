@@ -0,0 +1,187 @@
+"""
+BM25 inverted index for the local document search engine
+
+Postings are stored per term in compact NumPy arrays (row ids and term
+frequencies) so a query only touches the rows that contain its terms. This
+catches exact model numbers and part codes ("OV520E1", "8-1234") that dense
+embeddings tend to miss.
+"""
+
+import logging
+import re
+from collections import Counter
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from vector_index import GrowableArray, top_k_indices
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[-_./][a-z0-9]+)*")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercase word tokens; compound codes are kept whole and also split
+
+    "OV520E1" -> ["ov520e1"], "8-1234" -> ["8-1234", "8", "1234"]
+    """
+    tokens = []
+    for token in _TOKEN_PATTERN.findall(text.lower()):
+        tokens.append(token)
+        if not token.isalnum():
+            tokens.extend(part for part in re.split(r"[-_./]", token) if part)
+    return tokens
+
+
+class BM25Index:
+    """Okapi BM25 over rows aligned with the vector index"""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        """
+        Args:
+            k1: Term frequency saturation
+            b: Length normalization strength
+        """
+        self.k1 = k1
+        self.b = b
+        self._vocabulary: Dict[str, int] = {}
+        self._posting_rows: List[GrowableArray] = []
+        self._posting_tfs: List[GrowableArray] = []
+        self._row_lengths = GrowableArray(np.float32)
+        self._total_length = 0.0
+
+    @property
+    def ntotal(self) -> int:
+        return len(self._row_lengths)
+
+    def add(self, texts: List[str]):
+        """
+        Append rows to the index
+
+        Args:
+            texts: Chunk texts, one per row, in vector index order
+        """
+        lengths = np.empty(len(texts), dtype=np.float32)
+        start = self.ntotal
+        # Collect postings for the whole batch, then append once per term
+        batch_rows: Dict[str, List[int]] = {}
+        batch_tfs: Dict[str, List[int]] = {}
+        for offset, text in enumerate(texts):
+            counts = Counter(tokenize(text))
+            lengths[offset] = sum(counts.values())
+            for term, tf in counts.items():
+                batch_rows.setdefault(term, []).append(start + offset)
+                batch_tfs.setdefault(term, []).append(tf)
+
+        for term, rows in batch_rows.items():
+            term_id = self._vocabulary.get(term)
+            if term_id is None:
+                term_id = len(self._posting_rows)
+                self._vocabulary[term] = term_id
+                self._posting_rows.append(GrowableArray(np.int32, initial_capacity=4))
+                self._posting_tfs.append(GrowableArray(np.float32, initial_capacity=4))
+            self._posting_rows[term_id].append(np.array(rows))
+            self._posting_tfs[term_id].append(np.array(batch_tfs[term]))
+
+        self._row_lengths.append(lengths)
+        self._total_length += float(lengths.sum())
+
+    def remove(self, keep: np.ndarray):
+        """
+        Remove rows; surviving rows are renumbered in order
+
+        Args:
+            keep: Boolean mask over current rows, False for rows to drop
+        """
+        keep = np.asarray(keep, dtype=bool)
+        new_ids = (np.cumsum(keep) - 1).astype(np.int32)
+        for rows, tfs in zip(self._posting_rows, self._posting_tfs):
+            if not len(rows):
+                continue
+            kept = keep[rows.view]
+            if not kept.all():
+                tfs.compact(kept)
+                rows.compact(kept)
+            if len(rows):
+                rows.view[:] = new_ids[rows.view]
+        self._row_lengths.compact(keep)
+        self._total_length = float(self._row_lengths.view.sum()) if self.ntotal else 0.0
+
+    def search(self, query: str, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score only the rows that contain at least one query term
+
+        Args:
+            query: Raw query text
+            top_k: Number of rows to return
+
+        Returns:
+            Tuple of (row indices, BM25 scores), best first
+        """
+        empty = np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        if self.ntotal == 0:
+            return empty
+
+        term_ids = {self._vocabulary[t] for t in tokenize(query) if t in self._vocabulary}
+        term_ids = [t for t in term_ids if len(self._posting_rows[t])]
+        if not term_ids:
+            return empty
+
+        n = self.ntotal
+        avg_length = self._total_length / n if n else 1.0
+        lengths = self._row_lengths.view
+
+        rows_parts, score_parts = [], []
+        for term_id in term_ids:
+            rows = self._posting_rows[term_id].view
+            tfs = self._posting_tfs[term_id].view
+            df = rows.shape[0]
+            idf = np.log1p((n - df + 0.5) / (df + 0.5))
+            norm = self.k1 * (1.0 - self.b + self.b * lengths[rows] / avg_length)
+            rows_parts.append(rows)
+            score_parts.append(idf * tfs * (self.k1 + 1.0) / (tfs + norm))
+
+        candidate_rows, inverse = np.unique(np.concatenate(rows_parts), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(score_parts)).astype(np.float32)
+        best = top_k_indices(scores, top_k)
+        return candidate_rows[best].astype(np.int64), scores[best]
+
+    def reset(self):
+        """Remove all rows"""
+        self._vocabulary = {}
+        self._posting_rows = []
+        self._posting_tfs = []
+        self._row_lengths.clear()
+        self._total_length = 0.0
+
+    def get_stats(self) -> Dict:
+        return {
+            "rows": self.ntotal,
+            "terms": len(self._vocabulary),
+            "postings": int(sum(len(rows) for rows in self._posting_rows)),
+        }
+
+
+def reciprocal_rank_fusion(rankings: List[np.ndarray], k: int = 60) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Fuse several best-first row rankings with reciprocal rank fusion
+
+    Args:
+        rankings: Arrays of row ids, each ordered best first
+        k: RRF damping constant
+
+    Returns:
+        Tuple of (row ids, fused scores), best first
+    """
+    fused: Dict[int, float] = {}
+    for ranking in rankings:
+        for rank, row in enumerate(ranking):
+            fused[int(row)] = fused.get(int(row), 0.0) + 1.0 / (k + rank + 1)
+    if not fused:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    rows = np.fromiter(fused.keys(), dtype=np.int64, count=len(fused))
+    scores = np.fromiter(fused.values(), dtype=np.float32, count=len(fused))
+    order = np.argsort(-scores, kind="stable")
+    return rows[order], scores[order]
@@ -1,6 +1,6 @@
 from fastapi import FastAPI, HTTPException, UploadFile, File, Request, BackgroundTasks, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse, FileResponse, Response, JSONResponse
+from fastapi.responses import StreamingResponse, FileResponse, Response, JSONResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel, Field
 from typing import Dict, List, Optional, Any
@@ -12,12 +12,10 @@ import os
 import time
 from pathlib import Path
 from dotenv import load_dotenv
-import io
 
 # Load environment variables from .env file
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '.env'))
 import json
-import aiofiles
 import PyPDF2
 from io import BytesIO
 import sys
@@ -25,6 +23,7 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from document_search import search_engine, load_documents_into_search_engine
+from document_catalog import get_document_catalog
 from openai_integration import qsr_assistant
 from voice_service import voice_service
 from voice_agent import voice_orchestrator, VoiceState, ConversationIntent
@@ -53,6 +52,13 @@ from error_handling.production_errors_v3 import setup_production_error_handling
 
 # Multi-format validation
 from services.multi_format_validator import multi_format_validator
+from services.upload_streamer import stream_upload_to_disk, map_file, as_binary_stream, UploadRejectedError
+from services.pdf_artifact import pdf_artifact_store, PDFParseError, file_sha256
+from services.file_server import FileStatCache, build_file_response
+from services.voice_audio_pipeline import (
+    SentenceAccumulator, pipeline_sentence_audio, encode_frame, encode_meta_frame, FRAME_AUDIO
+)
+from metrics_registry import MetricsMiddleware, metrics, CONTENT_TYPE_LATEST
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -60,13 +66,23 @@ logger = logging.getLogger(__name__)
 
 # File upload settings
 UPLOAD_DIR = "../uploads"
-DOCUMENTS_DB = "../documents.json"
+DOCUMENTS_DB = "../documents.json"  # Legacy whole-file database, imported into the catalog once
+DOCUMENT_CATALOG_PATH = os.getenv("DOCUMENT_CATALOG_PATH", "../documents.sqlite")
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
 ALLOWED_EXTENSIONS = {".pdf"}
 
+# Sentences synthesized ahead of playback on /chat-voice-with-audio/stream
+VOICE_AUDIO_WINDOW = int(os.getenv("VOICE_AUDIO_WINDOW", "3"))
+
+# Short-lived stat() cache shared by /files range requests (pdf.js issues many per document)
+file_stat_cache = FileStatCache(ttl=float(os.getenv("FILE_STAT_CACHE_TTL", "2.0")))
+
 # Ensure upload directory exists
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+# Indexed document catalog (metadata + separately stored text, WAL, read cache)
+document_catalog = get_document_catalog(DOCUMENT_CATALOG_PATH, legacy_json_path=DOCUMENTS_DB)
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Line Lead QSR Assistant API",
@@ -77,43 +93,52 @@ app = FastAPI(
 # Setup production error handling (BaseChat pattern)
 error_handler = setup_production_error_handling(app)
 
+# Per-route latency and status metrics, served at /metrics/prometheus
+app.add_middleware(MetricsMiddleware)
+
 # Track application startup time for monitoring
 app_start_time = datetime.now()
 
 # Utility functions
 def load_documents_db():
-    """Load documents database from JSON file"""
-    if os.path.exists(DOCUMENTS_DB):
-        try:
-            with open(DOCUMENTS_DB, 'r') as f:
-                return json.load(f)
-        except Exception as e:
-            logger.error(f"Error loading documents database: {e}")
-            return {}
-    return {}
+    """
+    Load the whole documents database, including full text
+    
+    O(corpus): kept for callers that need every document. Endpoints should
+    use document_catalog.get/list/put/delete instead.
+    """
+    try:
+        return document_catalog.as_dict(include_text=True)
+    except Exception as e:
+        logger.error(f"Error loading documents database: {e}")
+        return {}
 
 def load_documents():
-    """Load documents from documents.json"""
-    try:
-        documents_file = os.path.join(os.path.dirname(__file__), '..', 'documents.json')
-        if os.path.exists(documents_file):
-            with open(documents_file, 'r') as f:
-                return json.load(f)
-        return load_documents_db()
-    except json.JSONDecodeError:
-        logger.error("Error decoding documents.json")
+    """Load document metadata (without full text) from the catalog"""
+    try:
+        return document_catalog.as_dict(include_text=False)
+    except Exception as e:
+        logger.error(f"Error loading document metadata: {e}")
         return {}
 
 def save_documents_db(db):
-    """Save documents database to JSON file"""
+    """Make the catalog match a whole documents database (legacy load-modify-save callers)"""
     try:
-        with open(DOCUMENTS_DB, 'w') as f:
-            json.dump(db, f, indent=2)
+        document_catalog.replace_all(db)
         return True
     except Exception as e:
         logger.error(f"Error saving documents database: {e}")
         return False
 
+def save_document_record(document):
+    """Insert or replace a single document in the catalog"""
+    try:
+        document_catalog.put(document)
+        return True
+    except Exception as e:
+        logger.error(f"Error saving document {document.get('id')}: {e}")
+        return False
+
 def get_file_type(filename):
     """Determine file type based on extension"""
     if not filename:
@@ -266,12 +291,9 @@ def smart_sentence_split(text: str) -> List[str]:
 def extract_pdf_text(pdf_content: bytes) -> tuple[str, int]:
     """Extract text from PDF content"""
     try:
-        pdf_reader = PyPDF2.PdfReader(BytesIO(pdf_content))
-        text_content = ""
+        pdf_reader = PyPDF2.PdfReader(as_binary_stream(pdf_content))
         pages_count = len(pdf_reader.pages)
-        
-        for page in pdf_reader.pages:
-            text_content += page.extract_text() + "\n"
+        text_content = "\n".join(page.extract_text() for page in pdf_reader.pages)
         
         return text_content.strip(), pages_count
     except Exception as e:
@@ -284,9 +306,9 @@ def generate_document_id() -> str:
     return str(uuid.uuid4())
 
 def is_valid_pdf(content: bytes) -> bool:
-    """Check if content is a valid PDF"""
+    """Check if content (bytes or a memory-mapped file) is a valid PDF"""
     try:
-        PyPDF2.PdfReader(BytesIO(content))
+        PyPDF2.PdfReader(as_binary_stream(content))
         return True
     except:
         return False
@@ -379,21 +401,30 @@ async def simple_upload(file: UploadFile = File(...)):
         # Ensure upload directory exists
         os.makedirs("uploaded_docs", exist_ok=True)
         
-        # Read and validate file content
-        content = await file.read()
-        
-        # Validate file type and content
-        validation_result = multi_format_validator.validate_file(file.filename, content)
-        
+        # Stream to disk with incremental size and magic-byte checks, then validate the mapped file
+        saved = await stream_upload_to_disk(
+            file,
+            file_path,
+            max_size=multi_format_validator.max_size_for(file.filename),
+            header_check=lambda head: multi_format_validator.check_header(file.filename, head)
+        )
+        try:
+            validation_result = await asyncio.to_thread(
+                multi_format_validator.validate_path, file.filename, file_path, saved.sha256
+            )
+        except Exception:
+            # Don't leave a file the validator couldn't vouch for on disk
+            if os.path.exists(file_path):
+                os.remove(file_path)
+            raise
+
         if validation_result.result.value != "valid":
+            os.remove(file_path)
             raise HTTPException(
                 status_code=400, 
                 detail=f"File validation failed: {validation_result.error_message}"
             )
         
-        with open(file_path, "wb") as f:
-            f.write(content)
-        
         # Initialize progress
         simple_progress_store[process_id] = {
             "success": True,
@@ -401,6 +432,7 @@ async def simple_upload(file: UploadFile = File(...)):
             "filename": file.filename,
             "file_id": file_id,
             "file_path": file_path,
+            "sha256": saved.sha256,
             "status": "uploaded",
             "progress": {
                 "stage": "upload_complete",
@@ -530,22 +562,21 @@ async def simple_background_process(process_id: str, file_path: str, filename: s
             # Try to add to search engine (the real integration)
             logger.info(f"🔄 Attempting to add {filename} to search engine...")
             
-            # Read the file content for processing
-            with open(file_path, 'rb') as f:
-                file_content = f.read()
+            file_size = os.path.getsize(file_path)
             
             # Process with Ragie integration
             try:
-                # Extract text from PDF if it's a PDF
                 if filename.lower().endswith('.pdf'):
-                    import PyPDF2
-                    pdf_reader = PyPDF2.PdfReader(io.BytesIO(file_content))
-                    text_content = ""
-                    for page in pdf_reader.pages:
-                        text_content += page.extract_text()
-                    pages_count = len(pdf_reader.pages)
+                    # Reuse the artifact parsed during validation
+                    parsed = await pdf_artifact_store.aload_or_parse(
+                        file_path, simple_progress_store.get(process_id, {}).get("sha256")
+                    )
+                    text_content = parsed.text
+                    pages_count = parsed.pages_count
                 else:
-                    text_content = file_content.decode('utf-8', errors='ignore')
+                    # Read from a read-only map of the saved file rather than a bytes copy
+                    with map_file(file_path) as mapped:
+                        text_content = bytes(mapped).decode('utf-8', errors='ignore')
                     pages_count = 1
                 
                 # Generate document ID from file_path
@@ -559,7 +590,7 @@ async def simple_background_process(process_id: str, file_path: str, filename: s
                     # Prepare metadata
                     metadata = {
                         "original_filename": filename,
-                        "file_size": len(file_content),
+                        "file_size": file_size,
                         "pages_count": pages_count,
                         "upload_timestamp": datetime.now().isoformat(),
                         "equipment_type": "general",  # Could be enhanced with AI detection
@@ -576,30 +607,26 @@ async def simple_background_process(process_id: str, file_path: str, filename: s
                         logger.warning(f"⚠️ Ragie upload failed: {ragie_result.error}")
                 
                 # Add to documents database
-                docs_db = load_documents_db()
-                docs_db[doc_id] = {
+                document_record = {
                     "id": doc_id,
                     "filename": os.path.basename(file_path),
                     "original_filename": filename,
                     "upload_timestamp": datetime.now().isoformat(),
-                    "file_size": len(file_content),
+                    "file_size": file_size,
                     "pages_count": pages_count,
                     "text_content": text_content,
                     "text_preview": text_content[:200] + "..." if len(text_content) > 200 else text_content,
                     "ragie_document_id": ragie_document_id,
-                    "processing_source": "ragie" if ragie_document_id else "local"
+                    "processing_source": "ragie" if ragie_document_id else "local",
+                    "sha256": simple_progress_store.get(process_id, {}).get("sha256")
                 }
                 
-                # Save updated database
-                if save_documents_db(docs_db):
+                # Single-row insert; no whole-database rewrite
+                if save_document_record(document_record):
                     logger.info(f"✅ Added {filename} to documents database")
                     
                     # Add to search engine as fallback
-                    search_engine.add_document(
-                        doc_id=doc_id,
-                        text=text_content,
-                        filename=filename
-                    )
+                    await search_engine.add_documents_async([(doc_id, text_content, filename)])
                     
                     logger.info(f"✅ Added {filename} to search engine")
                     entities_found = min(15, max(8, len(text_content) // 100))
@@ -708,10 +735,38 @@ async def startup_event():
     try:
         docs_db = load_documents_db()
         if docs_db:
-            load_documents_into_search_engine(docs_db)
+            def log_progress(done: int, total: int):
+                logger.info(f"Embedding documents for search index: {done}/{total} chunks")
+            
+            # Embedding is CPU-bound; keep it off the event loop
+            await asyncio.to_thread(load_documents_into_search_engine, docs_db, progress_callback=log_progress)
             logger.info(f"Loaded {len(docs_db)} documents into search engine at startup")
     except Exception as e:
         logger.error(f"Error loading documents at startup: {e}")
+    
+    # Optional semantic tier for the Ragie result cache, reusing the local embedding model
+    if os.getenv("RAGIE_SEMANTIC_CACHE", "false").lower() == "true":
+        clean_ragie_service.result_cache.set_semantic_encoder(search_engine.encode_query)
+        logger.info("Semantic Ragie result cache enabled")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release pooled HTTP connections, persist voice sessions and stop parse workers"""
+    try:
+        await clean_ragie_service.close()
+        await qsr_assistant.close()
+        await voice_service.close()
+    except Exception as e:
+        logger.error(f"Error closing HTTP connection pools: {e}")
+    try:
+        # Spills in-memory sessions to disk when VOICE_SESSION_SPILL_PATH is set
+        voice_orchestrator.sessions.close()
+    except Exception as e:
+        logger.error(f"Error closing voice session store: {e}")
+    try:
+        pdf_artifact_store.close()
+    except Exception as e:
+        logger.error(f"Error stopping PDF parse workers: {e}")
 
 # Pydantic models
 class ChatMessage(BaseModel):
@@ -799,6 +854,7 @@ class SearchStatsResponse(BaseModel):
     total_chunks: int
     total_documents: int
     model_name: str
+    ragie_retrieval: Optional[Dict[str, Any]] = None  # Coalescing and result-cache hit/miss counters
 
 class AIStatusResponse(BaseModel):
     ai_available: bool
@@ -814,6 +870,7 @@ class DeleteDocumentResponse(BaseModel):
 # Voice service models
 class VoiceRequest(BaseModel):
     text: str
+    session_id: Optional[str] = None
 
 class VoiceStatusResponse(BaseModel):
     available: bool
@@ -942,8 +999,7 @@ async def health_check(request: Request):
         # 3. Document Storage Health
         try:
             doc_start = time.time()
-            documents_db = load_documents()
-            doc_count = len(documents_db)
+            doc_count = document_catalog.count()
             doc_response_time = (time.time() - doc_start) * 1000
             
             service_health["document_storage"] = {
@@ -1104,9 +1160,9 @@ async def health_check(request: Request):
         try:
             db_check_start = datetime.now()
             # Test database read
-            test_documents = load_documents_db()
+            catalog_count = document_catalog.count()
             db_response_time = (datetime.now() - db_check_start).total_seconds() * 1000
-            if len(test_documents) != doc_count:
+            if catalog_count != doc_count:
                 db_status = "inconsistent"
         except Exception as e:
             logger.error(f"Database health check failed: {e}")
@@ -1249,6 +1305,12 @@ async def keep_alive():
         "uptime_seconds": (datetime.now() - app_start_time).total_seconds() if 'app_start_time' in globals() else 0
     }
 
+# Prometheus scrape endpoint for the in-process metrics registry
+@app.get("/metrics/prometheus")
+async def prometheus_metrics():
+    """Request and dependency latency (plus reliability state when loaded) in Prometheus format"""
+    return PlainTextResponse(metrics.render(), media_type=CONTENT_TYPE_LATEST)
+
 # Warm-up endpoint for faster cold start recovery
 @app.post("/warm-up")
 async def warm_up():
@@ -1257,8 +1319,7 @@ async def warm_up():
         logger.info("Warm-up request received")
         
         # Pre-load critical services - only count Neo4j-verified documents
-        documents_db = load_documents()
-        doc_count = len(documents_db)
+        doc_count = document_catalog.count()
         
         # Initialize search engine if needed
         global search_engine
@@ -1638,15 +1699,17 @@ async def chat_stream_endpoint(chat_message: ChatMessage):
         if not relevant_content:
             try:
                 logger.info("🔍 Using local search engine...")
-                search_results = search_engine.search(user_message, top_k=5)
+                # Hybrid BM25 + dense so exact model numbers and part codes still match
+                search_results = await asyncio.to_thread(search_engine.search, user_message, top_k=5, mode="hybrid")
                 search_method = "local"
                 
                 for result in search_results:
+                    metadata = result.get("metadata", {})
                     relevant_content.append({
                         "content": result.get("text", ""),
-                        "score": result.get("score", 0.0),
-                        "source": result.get("filename", "Unknown"),
-                        "document_id": result.get("doc_id", "unknown")
+                        "score": result.get("similarity", 0.0),
+                        "source": metadata.get("filename", "Unknown"),
+                        "document_id": metadata.get("doc_id", "unknown")
                     })
                 logger.info(f"✅ Found {len(relevant_content)} results from local search")
             except Exception as e:
@@ -1663,58 +1726,27 @@ async def chat_stream_endpoint(chat_message: ChatMessage):
         
         async def generate_stream():
             try:
-                # CRITICAL FIX: Use PydanticAI voice orchestrator for intelligent conversation management
-                orchestrated_response = await voice_orchestrator.process_voice_message(
+                # Stream PydanticAI voice orchestrator output as the model generates it
+                final_data = {'chunk': '', 'done': True}
+                async for event in voice_orchestrator.stream_voice_message(
                     message=user_message,
                     relevant_docs=relevant_chunks,
                     session_id=chat_message.conversation_id
-                )
-                
-                complete_response = orchestrated_response.text_response
-                
-                # SEND VISUAL CITATIONS FIRST if they exist
-                visual_citations = orchestrated_response.visual_citations or []
-                if visual_citations:
-                    # Send visual citations immediately in first chunk
-                    first_chunk_data = {
-                        'chunk': '',  # Empty text chunk
-                        'done': False,
-                        'visual_citations': visual_citations
-                    }
-                    yield f"data: {json.dumps(first_chunk_data)}\n\n"
-                    await asyncio.sleep(0.1)  # Small delay to ensure frontend processes images first
-                
-                # Natural speech conversion is already applied in the orchestrator
-                        
-                # Re-stream the orchestrated response preserving spacing and formatting
-                # Split into paragraphs first to preserve structure
-                paragraphs = complete_response.split('\n\n')
-                
-                for paragraph in paragraphs:
-                    if paragraph.strip():
-                        # For each paragraph, split into sentences while preserving spacing
-                        sentences = paragraph.split('. ')
-                        
-                        for i, sentence in enumerate(sentences):
-                            if sentence.strip():
-                                # Add period back if it's not the last sentence in paragraph
-                                if i < len(sentences) - 1 and not sentence.endswith('.'):
-                                    sentence += '.'
-                                
-                                # Add space after sentence (will be trimmed by frontend)
-                                chunk_text = sentence + ' ' if not sentence.endswith('\n') else sentence
-                                yield f"data: {json.dumps({'chunk': chunk_text, 'done': False})}\n\n"
-                                await asyncio.sleep(0.01)
-                        
-                        # Add paragraph break after each paragraph
-                        if paragraph != paragraphs[-1]:  # Not the last paragraph
-                            yield f"data: {json.dumps({'chunk': ' ', 'done': False})}\n\n"
+                ):
+                    if event["type"] == "visual_citations":
+                        # Push images as soon as the tool returns, ahead of the answer text
+                        yield f"data: {json.dumps({'chunk': '', 'done': False, 'visual_citations': event['visual_citations']})}\n\n"
+                    elif event["type"] == "delta":
+                        yield f"data: {json.dumps({'chunk': event['text'], 'done': False})}\n\n"
+                    elif event["type"] == "final":
+                        orchestrated_response = event["response"]
+                        parsed_steps = orchestrated_response.parsed_steps
+                        final_data.update({
+                            'detected_intent': orchestrated_response.detected_intent.value,
+                            'parsed_steps': parsed_steps.model_dump(mode="json") if parsed_steps else None
+                        })
                 
-                # Send final completion signal (visual citations already sent at start)
-                final_data = {
-                    'chunk': '', 
-                    'done': True
-                }
+                # Final frame carries the structured fields (visual citations already sent)
                 yield f"data: {json.dumps(final_data)}\n\n"
                     
             except Exception as e:
@@ -1742,140 +1774,50 @@ async def chat_stream_endpoint(chat_message: ChatMessage):
         raise HTTPException(status_code=500, detail="Internal server error")
 
 # File serving endpoint
+FILE_SERVE_HEADERS = {
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Methods": "GET, HEAD, OPTIONS, POST",
+    "Access-Control-Allow-Headers": "Range, Content-Type, Authorization, Cache-Control, Pragma, If-None-Match, If-Modified-Since, If-Range",
+    "Access-Control-Expose-Headers": "Content-Range, Accept-Ranges, Content-Length, Content-Type, ETag, Last-Modified",
+    "Access-Control-Max-Age": "86400",
+    "Cache-Control": "public, max-age=3600"  # Cache for 1 hour; revalidated with ETag afterwards
+}
+
+def _serve_upload(filename: str, request: Request):
+    """Validate an upload filename and build its 200/206/304/416 response"""
+    # URL decode the filename
+    from urllib.parse import unquote
+    decoded_filename = unquote(filename)
+    
+    # Validate decoded filename for security
+    if not validate_filename(decoded_filename):
+        logger.warning(f"Invalid filename requested: {decoded_filename} (original: {filename})")
+        raise HTTPException(status_code=400, detail="Invalid filename")
+    
+    # Construct file path using decoded filename
+    file_path = os.path.join(UPLOAD_DIR, decoded_filename)
+    content_type = get_file_type(filename)
+    
+    headers = dict(FILE_SERVE_HEADERS)
+    # For PDF files, set Content-Disposition to inline for browser preview
+    if content_type == "application/pdf":
+        headers["Content-Disposition"] = "inline"
+    
+    try:
+        response = build_file_response(request, file_path, content_type, headers=headers, stat_cache=file_stat_cache)
+    except (FileNotFoundError, NotADirectoryError):
+        logger.warning(f"File not found: {file_path}")
+        raise HTTPException(status_code=404, detail="File not found")
+    
+    logger.info(f"{request.method} {filename}: {response.status_code} "
+                f"({response.headers.get('content-range') or response.headers.get('content-length', 0)})")
+    return response
+
 @app.get("/files/{filename}")
 async def serve_file(filename: str, request: Request):
-    """High-performance streaming file server with range request support"""
+    """Serve an uploaded file with ETag revalidation and single/multi-range support"""
     try:
-        # URL decode the filename
-        from urllib.parse import unquote
-        decoded_filename = unquote(filename)
-        
-        # Validate decoded filename for security
-        if not validate_filename(decoded_filename):
-            logger.warning(f"Invalid filename requested: {decoded_filename} (original: {filename})")
-            raise HTTPException(status_code=400, detail="Invalid filename")
-        
-        # Construct file path using decoded filename
-        file_path = os.path.join(UPLOAD_DIR, decoded_filename)
-        
-        # Check if file exists
-        if not os.path.exists(file_path):
-            logger.warning(f"File not found: {file_path}")
-            raise HTTPException(status_code=404, detail="File not found")
-        
-        # Check if it's actually a file (not a directory)
-        if not os.path.isfile(file_path):
-            logger.warning(f"Path is not a file: {file_path}")
-            raise HTTPException(status_code=404, detail="File not found")
-        
-        # Get file size for range requests
-        file_size = os.path.getsize(file_path)
-        
-        # Determine content type
-        content_type = get_file_type(filename)
-        
-        # Parse range header for partial content support
-        range_header = request.headers.get('range')
-        
-        if range_header:
-            # Handle range requests for streaming (critical for PDF performance)
-            try:
-                byte_start = 0
-                byte_end = file_size - 1
-                
-                # Parse range header: "bytes=start-end"
-                range_match = range_header.replace('bytes=', '').split('-')
-                if len(range_match) == 2:
-                    if range_match[0]:
-                        byte_start = int(range_match[0])
-                    if range_match[1]:
-                        byte_end = int(range_match[1])
-                
-                # Ensure byte_end doesn't exceed file size
-                byte_end = min(byte_end, file_size - 1)
-                content_length = byte_end - byte_start + 1
-                
-                # Set headers for partial content response
-                headers = {
-                    "Content-Type": content_type,
-                    "Content-Range": f"bytes {byte_start}-{byte_end}/{file_size}",
-                    "Accept-Ranges": "bytes",
-                    "Content-Length": str(content_length),
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Methods": "GET, HEAD, OPTIONS, POST",
-                    "Access-Control-Allow-Headers": "Range, Content-Type, Authorization, Cache-Control, Pragma",
-                    "Access-Control-Expose-Headers": "Content-Range, Accept-Ranges, Content-Length, Content-Type",
-                    "Access-Control-Max-Age": "86400",
-                    "Cache-Control": "public, max-age=3600"  # Cache for 1 hour
-                }
-                
-                # For PDF files, set Content-Disposition to inline for browser preview
-                if content_type == "application/pdf":
-                    headers["Content-Disposition"] = "inline"
-                
-                logger.info(f"Serving partial content: {filename} ({byte_start}-{byte_end}/{file_size})")
-                
-                # Stream the requested byte range
-                def generate_range():
-                    with open(file_path, 'rb') as file:
-                        file.seek(byte_start)
-                        remaining = content_length
-                        chunk_size = 64 * 1024  # 64KB chunks for optimal streaming
-                        
-                        while remaining > 0:
-                            chunk_to_read = min(chunk_size, remaining)
-                            chunk = file.read(chunk_to_read)
-                            if not chunk:
-                                break
-                            remaining -= len(chunk)
-                            yield chunk
-                
-                return StreamingResponse(
-                    generate_range(),
-                    status_code=206,  # Partial Content
-                    headers=headers,
-                    media_type=content_type
-                )
-                
-            except (ValueError, IndexError) as e:
-                logger.warning(f"Invalid range header: {range_header}, error: {e}")
-                # Fall through to serve entire file
-        
-        # Serve entire file with optimized streaming
-        headers = {
-            "Content-Type": content_type,
-            "Content-Length": str(file_size),
-            "Accept-Ranges": "bytes",  # Advertise range support
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Methods": "GET, HEAD, OPTIONS, POST",
-            "Access-Control-Allow-Headers": "Range, Content-Type, Authorization, Cache-Control, Pragma",
-            "Access-Control-Expose-Headers": "Content-Range, Accept-Ranges, Content-Length, Content-Type",
-            "Access-Control-Max-Age": "86400",
-            "Cache-Control": "public, max-age=3600"  # Cache for 1 hour
-        }
-        
-        # For PDF files, set Content-Disposition to inline for browser preview
-        if content_type == "application/pdf":
-            headers["Content-Disposition"] = "inline"
-        
-        logger.info(f"Serving full file: {filename} ({file_size} bytes)")
-        
-        # Stream entire file in chunks for better performance
-        def generate_file():
-            with open(file_path, 'rb') as file:
-                chunk_size = 64 * 1024  # 64KB chunks
-                while True:
-                    chunk = file.read(chunk_size)
-                    if not chunk:
-                        break
-                    yield chunk
-        
-        return StreamingResponse(
-            generate_file(),
-            headers=headers,
-            media_type=content_type
-        )
-        
+        return _serve_upload(filename, request)
     except HTTPException:
         raise
     except Exception as e:
@@ -1886,56 +1828,7 @@ async def serve_file(filename: str, request: Request):
 async def files_head(filename: str, request: Request):
     """Handle HEAD requests for file serving (for debugging and accessibility checks)"""
     try:
-        # URL decode the filename
-        from urllib.parse import unquote
-        decoded_filename = unquote(filename)
-        
-        # Validate decoded filename for security
-        if not validate_filename(decoded_filename):
-            logger.warning(f"Invalid filename requested: {decoded_filename} (original: {filename})")
-            raise HTTPException(status_code=400, detail="Invalid filename")
-        
-        # Construct file path using decoded filename
-        file_path = os.path.join(UPLOAD_DIR, decoded_filename)
-        
-        # Check if file exists
-        if not os.path.exists(file_path):
-            logger.warning(f"File not found: {file_path}")
-            raise HTTPException(status_code=404, detail="File not found")
-        
-        # Check if it's actually a file (not a directory)
-        if not os.path.isfile(file_path):
-            logger.warning(f"Path is not a file: {file_path}")
-            raise HTTPException(status_code=404, detail="File not found")
-        
-        # Get file size
-        file_size = os.path.getsize(file_path)
-        
-        # Determine content type
-        content_type = get_file_type(filename)
-        
-        # Set headers for HEAD response
-        headers = {
-            "Content-Type": content_type,
-            "Content-Length": str(file_size),
-            "Accept-Ranges": "bytes",
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Methods": "GET, HEAD, OPTIONS, POST",
-            "Access-Control-Allow-Headers": "Range, Content-Type, Authorization, Cache-Control, Pragma",
-            "Access-Control-Expose-Headers": "Content-Range, Accept-Ranges, Content-Length, Content-Type",
-            "Access-Control-Max-Age": "86400",
-            "Cache-Control": "public, max-age=3600"
-        }
-        
-        # For PDF files, set Content-Disposition to inline for browser preview
-        if content_type == "application/pdf":
-            headers["Content-Disposition"] = "inline"
-        
-        logger.info(f"HEAD request for file: {filename} ({content_type}, {file_size} bytes)")
-        
-        from fastapi import Response
-        return Response(headers=headers)
-        
+        return _serve_upload(filename, request)
     except HTTPException:
         raise
     except Exception as e:
@@ -2071,64 +1964,66 @@ async def upload_file(background_tasks: BackgroundTasks, file: UploadFile = File
 @app.post("/upload-original", response_model=UploadResponse)
 async def upload_file_original(file: UploadFile = File(...)):
     """Upload and process PDF manual files"""
+    file_path = None
     try:
-        # Read file content
-        content = await file.read()
-        
-        # Validate file type and content using multi-format validator
-        validation_result = multi_format_validator.validate_file(file.filename, content)
-        
-        if validation_result.result.value != "valid":
-            raise HTTPException(
-                status_code=400, 
-                detail=f"File validation failed: {validation_result.error_message}"
-            )
-        
-        # Validate PDF content
-        if not is_valid_pdf(content):
-            raise HTTPException(status_code=400, detail="Invalid PDF file")
-        
-        # Extract text from PDF
-        extracted_text, pages_count = extract_pdf_text(content)
-        
-        if not extracted_text.strip():
-            raise HTTPException(status_code=400, detail="No text could be extracted from PDF")
-        
         # Generate document ID and filename
         doc_id = generate_document_id()
         safe_filename = f"{doc_id}_{file.filename}"
         file_path = os.path.join(UPLOAD_DIR, safe_filename)
         
-        # Save file
-        async with aiofiles.open(file_path, 'wb') as f:
-            await f.write(content)
+        # Stream to disk with incremental size and magic-byte checks
+        try:
+            saved = await stream_upload_to_disk(
+                file,
+                file_path,
+                max_size=multi_format_validator.max_size_for(file.filename),
+                header_check=lambda head: multi_format_validator.check_header(file.filename, head)
+            )
+        except UploadRejectedError as e:
+            file_path = None
+            raise HTTPException(status_code=400, detail=f"File validation failed: {e}")
+        
+        # Validate, then extract from the artifact parsed during validation
+        def validate_and_extract():
+            validation_result = multi_format_validator.validate_path(file.filename, file_path, saved.sha256)
+            if validation_result.result.value != "valid":
+                raise HTTPException(
+                    status_code=400, 
+                    detail=f"File validation failed: {validation_result.error_message}"
+                )
+            
+            # Validate PDF content
+            try:
+                parsed = pdf_artifact_store.load_or_parse(file_path, saved.sha256)
+            except PDFParseError:
+                raise HTTPException(status_code=400, detail="Invalid PDF file")
+            
+            return parsed.text, parsed.pages_count
         
-        # Load and update documents database
-        docs_db = load_documents_db()
+        extracted_text, pages_count = await asyncio.to_thread(validate_and_extract)
+        
+        if not extracted_text.strip():
+            raise HTTPException(status_code=400, detail="No text could be extracted from PDF")
         
+        # Add to documents database
         document_info = {
             "id": doc_id,
             "filename": safe_filename,
             "original_filename": file.filename,
             "upload_timestamp": datetime.now().isoformat(),
-            "file_size": len(content),
+            "file_size": saved.size,
             "pages_count": pages_count,
             "text_content": extracted_text,
-            "text_preview": extracted_text[:200] + "..." if len(extracted_text) > 200 else extracted_text
+            "text_preview": extracted_text[:200] + "..." if len(extracted_text) > 200 else extracted_text,
+            "sha256": saved.sha256
         }
         
-        docs_db[doc_id] = document_info
-        
-        if not save_documents_db(docs_db):
+        if not save_document_record(document_info):
             raise HTTPException(status_code=500, detail="Failed to save document information")
         
         # Add document to search engine
         try:
-            search_engine.add_document(
-                doc_id=doc_id,
-                text=extracted_text,
-                filename=file.filename
-            )
+            await search_engine.add_documents_async([(doc_id, extracted_text, file.filename)])
             logger.info(f"Added document to search engine: {file.filename}")
         except Exception as search_error:
             logger.error(f"Failed to add document to search engine: {search_error}")
@@ -2145,41 +2040,29 @@ async def upload_file_original(file: UploadFile = File(...)):
         )
         
     except HTTPException:
+        if file_path and os.path.exists(file_path):
+            os.remove(file_path)
         raise
     except Exception as e:
         logger.error(f"Error uploading file: {str(e)}")
+        if file_path and os.path.exists(file_path):
+            os.remove(file_path)
         raise HTTPException(status_code=500, detail="Failed to process uploaded file")
 
 # List documents endpoint
 @app.get("/documents", response_model=DocumentListResponse)
-async def list_documents():
+async def list_documents(offset: int = 0, limit: Optional[int] = None):
     """Get list of documents from the main document database"""
     try:
-        # Use the main document database (single source of truth)
-        docs_db = load_documents_db()
-        
-        # Handle both dict and list formats
-        if isinstance(docs_db, list):
-            # Convert list to dict format for compatibility
-            docs_dict = {}
-            for i, doc in enumerate(docs_db):
-                if isinstance(doc, dict):
-                    doc_id = doc.get('id', f'doc_{i}')
-                    docs_dict[doc_id] = doc
-            docs_db = docs_dict
-        elif not isinstance(docs_db, dict):
-            logger.error(f"Unexpected docs_db type: {type(docs_db)}")
-            docs_db = {}
+        # Metadata only, newest first, one page from the catalog's read cache
+        page = document_catalog.list(offset=max(offset, 0), limit=limit)
         
         documents = []
-        for doc_id, doc_info in docs_db.items():
+        for doc_info in page:
             try:
                 filename = doc_info.get("filename", "")
-                # Ensure document has required fields
-                document_id = doc_info.get("id", doc_id)  # Fallback to doc_id if no id field
-                
                 documents.append(DocumentSummary(
-                    id=document_id,
+                    id=doc_info["id"],
                     filename=filename,
                     original_filename=doc_info.get("original_filename", ""),
                     upload_timestamp=doc_info.get("upload_timestamp", ""),
@@ -2189,16 +2072,13 @@ async def list_documents():
                     file_type=get_file_type(doc_info.get("original_filename", ""))
                 ))
             except Exception as e:
-                logger.error(f"Error processing document {doc_id}: {e}")
+                logger.error(f"Error processing document {doc_info.get('id')}: {e}")
                 logger.error(f"Document info keys: {list(doc_info.keys())}")
                 continue
         
-        # Sort by upload timestamp (newest first)
-        documents.sort(key=lambda x: x.upload_timestamp, reverse=True)
-        
         response = DocumentListResponse(
             documents=documents,
-            total_count=len(documents)
+            total_count=document_catalog.count()
         )
         
         return response
@@ -2216,7 +2096,8 @@ async def get_search_stats():
         return SearchStatsResponse(
             total_chunks=stats['total_chunks'],
             total_documents=stats['total_documents'],
-            model_name=stats['model_name']
+            model_name=stats['model_name'],
+            ragie_retrieval=clean_ragie_service.get_retrieval_stats()
         )
     except Exception as e:
         logger.error(f"Error getting search stats: {str(e)}")
@@ -2227,13 +2108,11 @@ async def get_search_stats():
 async def get_document_details(document_id: str):
     """Get detailed information about a specific document including text preview"""
     try:
-        docs_db = load_documents_db()
+        doc_info = document_catalog.get(document_id)
         
-        if document_id not in docs_db:
+        if doc_info is None:
             raise HTTPException(status_code=404, detail="Document not found")
         
-        doc_info = docs_db[document_id]
-        
         filename = doc_info.get("filename", "")
         return DocumentInfo(
             id=doc_info["id"],
@@ -2258,19 +2137,30 @@ async def get_document_details(document_id: str):
 async def delete_document(document_id: str):
     """Delete a document from the system"""
     try:
-        # Load documents database
-        docs_db = load_documents_db()
+        # Look up the document
+        doc_info = document_catalog.get(document_id)
         
         # Check if document exists
-        if document_id not in docs_db:
+        if doc_info is None:
             raise HTTPException(status_code=404, detail="Document not found")
         
-        doc_info = docs_db[document_id]
         filename = doc_info.get('filename', '')
         original_filename = doc_info.get('original_filename', 'Unknown')
         
         # Remove file from filesystem
         file_path = os.path.join(UPLOAD_DIR, filename)
+        file_stat_cache.invalidate(file_path)
+        
+        # Drop the cached parse; older records don't carry the content hash
+        try:
+            sha256 = doc_info.get('sha256')
+            if not sha256 and filename.lower().endswith('.pdf') and os.path.exists(file_path):
+                sha256 = await asyncio.to_thread(file_sha256, file_path)
+            if sha256:
+                await asyncio.to_thread(pdf_artifact_store.remove, sha256)
+        except Exception as e:
+            logger.warning(f"Failed to drop PDF artifact for {document_id}: {e}")
+        
         if os.path.exists(file_path):
             try:
                 os.remove(file_path)
@@ -2279,10 +2169,10 @@ async def delete_document(document_id: str):
                 logger.warning(f"Failed to delete file {file_path}: {e}")
         
         # Remove from documents database
-        del docs_db[document_id]
-        
-        # Save updated database
-        if not save_documents_db(docs_db):
+        try:
+            document_catalog.delete(document_id)
+        except Exception as e:
+            logger.error(f"Error deleting {document_id} from documents database: {e}")
             raise HTTPException(status_code=500, detail="Failed to update document database")
         
         # Also remove from Neo4j verification file
@@ -2298,12 +2188,15 @@ async def delete_document(document_id: str):
             logger.warning(f"Failed to update Neo4j verification file: {e}")
             # Continue anyway - main deletion was successful
         
-        # Rebuild search engine index without this document
+        # Cached retrievals may reference this document
+        clean_ragie_service.invalidate_search_cache()
+        
+        # Remove this document's chunks from the search engine index
         try:
-            load_documents_into_search_engine(docs_db)
-            logger.info(f"Rebuilt search index after deleting document {document_id}")
+            search_engine.remove_document(document_id)
+            logger.info(f"Removed document {document_id} from search index")
         except Exception as search_error:
-            logger.error(f"Failed to rebuild search index: {search_error}")
+            logger.error(f"Failed to update search index: {search_error}")
             # Continue anyway - document is deleted, search will just be stale
         
         logger.info(f"Successfully deleted document: {original_filename} (ID: {document_id})")
@@ -2366,7 +2259,7 @@ async def generate_audio(request: VoiceRequest):
             raise HTTPException(status_code=503, detail="Voice service not available")
         
         # Use the new safe audio generation method
-        audio_data = await voice_service.generate_audio_safely(request.text)
+        audio_data = await voice_service.generate_audio_safely(request.text, session_id=request.session_id)
         
         if audio_data:
             return Response(
@@ -2390,7 +2283,7 @@ async def chat_with_voice(request: ChatVoiceRequest):
     """OPTIMIZED chat endpoint with single audio generation (no chunking)"""
     try:
         # Get relevant document chunks (similar to the regular chat endpoint)
-        relevant_chunks = search_engine.search(request.message, top_k=3)
+        relevant_chunks = await asyncio.to_thread(search_engine.search, request.message, top_k=3, mode="hybrid")
         
         # Get AI response with VOICE-OPTIMIZED constraints
         response_data = await qsr_assistant.generate_voice_response(request.message, relevant_chunks)
@@ -2425,7 +2318,7 @@ async def chat_with_voice_and_audio(request: ChatVoiceRequest):
     """OPTIMIZED endpoint that returns text + audio data in single request (eliminates chunking)"""
     try:
         # Get relevant document chunks
-        relevant_chunks = search_engine.search(request.message, top_k=3)
+        relevant_chunks = await asyncio.to_thread(search_engine.search, request.message, top_k=3)
         
         # Use PydanticAI voice orchestrator for intelligent conversation management
         orchestrated_response = await voice_orchestrator.process_voice_message(
@@ -2459,7 +2352,7 @@ async def chat_with_voice_and_audio(request: ChatVoiceRequest):
         audio_available = False
         
         if voice_service.is_available():
-            audio_bytes = await voice_service.generate_audio_safely(ai_response)
+            audio_bytes = await voice_service.generate_audio_safely(ai_response, session_id=request.session_id)
             if audio_bytes:
                 import base64
                 audio_data = base64.b64encode(audio_bytes).decode()
@@ -2501,6 +2394,100 @@ async def chat_with_voice_and_audio(request: ChatVoiceRequest):
             suggested_follow_ups=["Could you try asking again?"]
         )
 
+@app.post("/chat-voice-with-audio/stream")
+async def chat_with_voice_and_audio_stream(request: ChatVoiceRequest):
+    """
+    Stream the voice answer as ordered per-sentence audio frames
+    
+    Sentences are cut from the orchestrator's output as it streams and
+    synthesized concurrently (bounded by VOICE_AUDIO_WINDOW), so the first
+    clip plays after one sentence's synthesis instead of the whole answer and
+    long procedures no longer need truncating. The body is a sequence of
+    binary frames (see services.voice_audio_pipeline): JSON metadata frames
+    ("start", "visual_citations", "sentence", "final") and raw MP3 audio frames.
+    """
+    relevant_chunks = await asyncio.to_thread(search_engine.search, request.message, top_k=3, mode="hybrid")
+    sources = []
+    for chunk in relevant_chunks:
+        filename = chunk.get("metadata", {}).get("filename")
+        if filename and filename not in sources:
+            sources.append(filename)
+    
+    state = {"final": None}
+    pending_meta: List[Dict] = []
+    
+    async def sentence_source():
+        accumulator = SentenceAccumulator(smart_sentence_split)
+        streamed = False
+        async for event in voice_orchestrator.stream_voice_message(
+            message=request.message,
+            relevant_docs=relevant_chunks,
+            session_id=request.session_id
+        ):
+            if event["type"] == "visual_citations":
+                pending_meta.append({"type": "visual_citations", "visual_citations": event["visual_citations"]})
+            elif event["type"] == "delta":
+                streamed = True
+                for sentence in accumulator.feed(event["text"]):
+                    yield sentence
+            elif event["type"] == "final":
+                state["final"] = event["response"]
+        
+        # Error recovery responses arrive whole, without deltas
+        if not streamed and state["final"] is not None:
+            accumulator.feed(state["final"].text_response)
+        for sentence in accumulator.flush():
+            yield sentence
+    
+    async def synthesize(index: int, sentence: str) -> Optional[bytes]:
+        return await voice_service.synthesize_sentence(index, sentence, session_id=request.session_id)
+    
+    async def generate_frames():
+        yield encode_meta_frame({"type": "start", "sources": sources, "audio_format": "audio/mpeg"})
+        try:
+            async for index, sentence, audio in pipeline_sentence_audio(
+                sentence_source(), synthesize, window=VOICE_AUDIO_WINDOW
+            ):
+                while pending_meta:
+                    yield encode_meta_frame(pending_meta.pop(0))
+                yield encode_meta_frame({
+                    "type": "sentence",
+                    "index": index,
+                    "text": sentence,
+                    "audio_available": audio is not None
+                })
+                if audio:
+                    yield encode_frame(FRAME_AUDIO, audio)
+            
+            while pending_meta:
+                yield encode_meta_frame(pending_meta.pop(0))
+            
+            final = state["final"]
+            yield encode_meta_frame({
+                "type": "final",
+                "text_response": final.text_response if final else "",
+                "sources": sources,
+                "timestamp": datetime.now().isoformat(),
+                "detected_intent": final.detected_intent.value if final else None,
+                "should_continue_listening": final.should_continue_listening if final else True,
+                "next_voice_state": final.next_voice_state.value if final else None,
+                "confidence_score": final.confidence_score if final else None,
+                "conversation_complete": final.conversation_complete if final else False,
+                "suggested_follow_ups": final.suggested_follow_ups if final else []
+            })
+        except Exception as e:
+            logger.error(f"Error in streaming voice audio: {e}")
+            yield encode_meta_frame({"type": "error", "error": str(e)})
+    
+    return StreamingResponse(
+        generate_frames(),
+        media_type="application/octet-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Voice-Frame-Format": "line-lead-frames-v1",
+        }
+    )
+
 @app.post("/chat-voice-direct")
 async def chat_voice_direct(request: ChatVoiceRequest):
     """DIAGNOSTIC: Direct voice endpoint bypassing all streaming for testing"""
@@ -2508,7 +2495,7 @@ async def chat_voice_direct(request: ChatVoiceRequest):
         logger.info(f"🧪 DIAGNOSTIC: Direct voice request for: {request.message}")
         
         # Get simple response without streaming (bypass complex RAG)
-        response = qsr_assistant.client.chat.completions.create(
+        response = await qsr_assistant.create_chat_completion(
             model="gpt-4o-mini",
             messages=[
                 {"role": "system", "content": "Give a short, simple answer about restaurant work. Use exactly 20-30 words. Mention specific temperatures if relevant."},
@@ -2523,7 +2510,7 @@ async def chat_voice_direct(request: ChatVoiceRequest):
         
         # Direct ElevenLabs generation (no chunking, no streaming, no queue)
         logger.info("🧪 DIAGNOSTIC: Calling ElevenLabs directly...")
-        audio_bytes = await voice_service.generate_audio_safely(text_response)
+        audio_bytes = await voice_service.generate_audio_safely(text_response, session_id=request.session_id)
         
         if audio_bytes:
             import base64
@@ -2590,10 +2577,11 @@ async def end_conversation(request: ConversationSummaryRequest):
 async def get_voice_orchestration_status():
     """Get PydanticAI voice orchestration status"""
     try:
-        active_sessions = len(voice_orchestrator.active_contexts)
+        session_stats = voice_orchestrator.get_session_stats()
         return {
             "pydantic_ai_active": True,
-            "active_conversations": active_sessions,
+            "active_conversations": session_stats["active_sessions"],
+            "session_store": session_stats,
             "orchestration_version": "1.0.0",
             "features": [
                 "intent_detection",
@@ -2808,7 +2796,7 @@ async def process_documents_with_true_rag():
     
     try:
         # Load documents
-        documents_db = load_documents_db()
+        documents_db = load_documents()
         if not documents_db:
             raise HTTPException(status_code=404, detail="No documents found")
         
@@ -3475,10 +3463,7 @@ def extract_pdf_text_simple(content: bytes) -> str:
     """Extract text from PDF content (simple version)."""
     try:
         pdf_reader = PyPDF2.PdfReader(BytesIO(content))
-        text_content = ""
-        for page in pdf_reader.pages:
-            text_content += page.extract_text()
-        return text_content
+        return "".join(page.extract_text() for page in pdf_reader.pages)
     except Exception as e:
         logger.error(f"PDF text extraction failed: {e}")
         return ""
@@ -4905,7 +4890,7 @@ async def voice_with_graph_context(chat_message: ChatMessage):
         logger.info(f"Processing voice message with graph context: {user_message}")
         
         # Search for relevant document chunks (existing functionality)
-        relevant_chunks = search_engine.search(user_message, top_k=3)
+        relevant_chunks = await asyncio.to_thread(search_engine.search, user_message, top_k=3)
         
         # Process through enhanced voice orchestrator with graph context
         orchestrated_response = await voice_orchestrator.process_voice_message(
@@ -5062,7 +5047,7 @@ async def voice_with_multimodal_citations(request: MultiModalVoiceRequest):
                 citation_count = citation_result.get("citation_count", 0)
         else:
             # Fallback to basic voice processing
-            relevant_chunks = search_engine.search(user_message, top_k=3)
+            relevant_chunks = await asyncio.to_thread(search_engine.search, user_message, top_k=3)
             orchestrated_response = await voice_orchestrator.process_voice_message(
                 message=user_message,
                 relevant_docs=relevant_chunks,
@@ -6406,11 +6391,7 @@ async def upload_optimized_qsr(file: UploadFile = File(...)):
             buffer.write(content)
         
         # Extract text content
-        text_content = ""
-        with open(file_path, "rb") as pdf_file:
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
-            for page in pdf_reader.pages:
-                text_content += page.extract_text() + "\n"
+        text_content = (await pdf_artifact_store.aload_or_parse(file_path)).text
         
         # Process through optimized RAG service
         extraction_result = await optimized_qsr_rag_service.process_document_optimized(
@@ -6669,7 +6650,7 @@ async def enterprise_verify_documents():
     """Enterprise Bridge: Complete document verification process for Neo4j integration"""
     try:
         # Load uploaded documents
-        raw_docs = load_documents_db()
+        raw_docs = load_documents()
         if not raw_docs:
             return {"error": "No documents found to verify", "success": False}
         
@@ -7320,6 +7301,7 @@ async def upload_qsr_document(
         
         if result["success"]:
             logger.info(f"✅ Successfully uploaded {file.filename} with ID: {result['document_id']}")
+            clean_ragie_service.invalidate_search_cache()
             return {
                 "success": True,
                 "document_id": result["document_id"],
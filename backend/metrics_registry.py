@@ -0,0 +1,468 @@
+#!/usr/bin/env python3
+"""
+Metrics Registry - In-Process Prometheus Metrics
+================================================
+
+Counters, gauges and fixed-bucket histograms rendered in the Prometheus text
+exposition format (version 0.0.4).
+
+Hot-path updates take no lock: every counter and histogram child keeps one
+small value array per thread that touches it, written only by that thread.
+A scrape sums the per-thread arrays. Only the first update from a new thread
+registers its array under a lock.
+
+Also provides:
+- MetricsMiddleware: ASGI middleware recording per-route latency and status
+- instrumented(): decorator timing calls to external dependencies (Ragie,
+  OpenAI, ElevenLabs, SQLite) by outcome; for async generators it also
+  records time to the first item
+"""
+
+import asyncio
+import bisect
+import functools
+import inspect
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Prometheus client defaults, extended for multi-second LLM and TTS calls
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+# (metric name, type, help, [(labels, value), ...]) produced by a collector at scrape time
+CollectedFamily = Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]
+
+
+def _format_value(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _format_labels(labels: Sequence[Tuple[str, str]]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label_value(str(value))}"' for name, value in labels) + "}"
+
+
+class _ThreadShards:
+    """Fixed-size value arrays, one per writing thread, summed on read"""
+
+    __slots__ = ("size", "_local", "_shards", "_lock")
+
+    def __init__(self, size: int):
+        self.size = size
+        self._local = threading.local()
+        self._shards: List[List[float]] = []
+        self._lock = threading.Lock()
+
+    def local(self) -> List[float]:
+        """This thread's array (only this thread writes to it)"""
+        shard = getattr(self._local, "values", None)
+        if shard is None:
+            shard = [0.0] * self.size
+            self._local.values = shard
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def totals(self) -> List[float]:
+        with self._lock:
+            shards = list(self._shards)
+        totals = [0.0] * self.size
+        for shard in shards:
+            for i, value in enumerate(shard):
+                totals[i] += value
+        return totals
+
+
+class _CounterChild:
+    __slots__ = ("_shards",)
+
+    def __init__(self):
+        self._shards = _ThreadShards(1)
+
+    def inc(self, amount: float = 1.0):
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        self._shards.local()[0] += amount
+
+    def get(self) -> float:
+        return self._shards.totals()[0]
+
+
+class _GaugeChild:
+    __slots__ = ("_value", "_function", "_lock")
+
+    def __init__(self):
+        self._value = 0.0
+        self._function: Optional[Callable[[], float]] = None
+        self._lock = threading.Lock()
+
+    def set(self, value: float):
+        with self._lock:
+            self._value = float(value)
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0):
+        with self._lock:
+            self._value -= amount
+
+    def set_function(self, function: Callable[[], float]):
+        """Read the value from `function` at scrape time instead"""
+        self._function = function
+
+    def get(self) -> float:
+        if self._function is not None:
+            return float(self._function())
+        return self._value
+
+
+class _HistogramChild:
+    __slots__ = ("_bounds", "_shards")
+
+    def __init__(self, bounds: Sequence[float]):
+        self._bounds = bounds
+        # One slot per bucket, then +Inf, then the running sum
+        self._shards = _ThreadShards(len(bounds) + 2)
+
+    def observe(self, value: float):
+        shard = self._shards.local()
+        shard[bisect.bisect_left(self._bounds, value)] += 1
+        shard[-1] += value
+
+    @contextmanager
+    def time(self):
+        """Observe the duration of the with-block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def snapshot(self) -> Tuple[List[float], float, float]:
+        """
+        Returns:
+            (cumulative bucket counts including +Inf, sum, count)
+        """
+        totals = self._shards.totals()
+        cumulative = []
+        running = 0.0
+        for count in totals[:-1]:
+            running += count
+            cumulative.append(running)
+        return cumulative, totals[-1], running
+
+
+class _Metric(ABC):
+    """A metric family: name, help, label names and one child per label value tuple"""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._unlabelled = self._new_child()
+            self._children[()] = self._unlabelled
+
+    @abstractmethod
+    def _new_child(self):
+        """Create the value holder for one label combination"""
+
+    def labels(self, *values: Any, **labels: Any):
+        """Child for one combination of label values"""
+        if labels:
+            values = tuple(str(labels[name]) for name in self.labelnames)
+        else:
+            values = tuple(str(value) for value in values)
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._lock:
+                child = self._children.get(values)
+                if child is None:
+                    child = self._new_child()
+                    self._children[values] = child
+        return child
+
+    def _items(self):
+        with self._lock:
+            return list(self._children.items())
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {_escape_help(self.documentation)}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in self._items():
+            lines.extend(self._render_child(list(zip(self.labelnames, values)), child))
+        return lines
+
+    def _render_child(self, labels, child) -> List[str]:
+        return [f"{self.name}{_format_labels(labels)} {_format_value(child.get())}"]
+
+
+class Counter(_Metric):
+    """Monotonically increasing count; name should end in _total"""
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0):
+        self._unlabelled.inc(amount)
+
+
+class Gauge(_Metric):
+    """Value that can go up and down"""
+
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float):
+        self._unlabelled.set(value)
+
+    def inc(self, amount: float = 1.0):
+        self._unlabelled.inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        self._unlabelled.dec(amount)
+
+    def set_function(self, function: Callable[[], float]):
+        self._unlabelled.set_function(function)
+
+
+class Histogram(_Metric):
+    """Observations counted into fixed, cumulative buckets"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        self.bounds = tuple(sorted(float(b) for b in buckets if not math.isinf(b)))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.bounds)
+
+    def observe(self, value: float):
+        self._unlabelled.observe(value)
+
+    def time(self):
+        return self._unlabelled.time()
+
+    def _render_child(self, labels, child) -> List[str]:
+        cumulative, total, count = child.snapshot()
+        lines = []
+        for bound, bucket_count in zip(self.bounds + (math.inf,), cumulative):
+            bucket_labels = labels + [("le", repr(bound) if not math.isinf(bound) else "+Inf")]
+            lines.append(f"{self.name}_bucket{_format_labels(bucket_labels)} {_format_value(bucket_count)}")
+        lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}")
+        lines.append(f"{self.name}_count{_format_labels(labels)} {_format_value(count)}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named metric families plus scrape-time collectors"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[CollectedFamily]]] = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"Metric {metric.name} already registered with a different shape")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def register_collector(self, collector: Callable[[], Iterable[CollectedFamily]]):
+        """Add a function called at every scrape to report values owned elsewhere"""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        """All metrics in Prometheus text exposition format"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        for collector in collectors:
+            try:
+                families = list(collector())
+            except Exception as e:
+                lines.append(f"# collector {getattr(collector, '__name__', 'collector')} failed: {_escape_help(str(e))}")
+                continue
+            for name, kind, documentation, samples in families:
+                lines.append(f"# HELP {name} {_escape_help(documentation)}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(list(labels.items()))} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+# Global registry and the standard request and dependency metrics
+metrics = MetricsRegistry()
+
+HTTP_REQUESTS = metrics.counter(
+    "qsr_http_requests_total", "HTTP requests by method, route and status code",
+    ("method", "route", "status")
+)
+HTTP_REQUEST_DURATION = metrics.histogram(
+    "qsr_http_request_duration_seconds", "HTTP request latency by method and route, until the response is fully sent",
+    ("method", "route")
+)
+HTTP_REQUESTS_IN_PROGRESS = metrics.gauge(
+    "qsr_http_requests_in_progress", "HTTP requests currently being served", ("method",)
+)
+DEPENDENCY_DURATION = metrics.histogram(
+    "qsr_dependency_duration_seconds", "Latency of calls to external dependencies by outcome (ok, error, cancelled)",
+    ("dependency", "operation", "outcome")
+)
+DEPENDENCY_FIRST_ITEM = metrics.histogram(
+    "qsr_dependency_first_item_seconds", "Time until a streaming dependency call produced its first item",
+    ("dependency", "operation")
+)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency, status and concurrency per route
+
+    Routes are labelled by their path template (e.g. /files/{filename}) so
+    label cardinality stays bounded; requests that match no route are
+    labelled "unmatched".
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope.get("method", "GET")
+        status_code = 500
+        start = time.perf_counter()
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_progress.dec()
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            HTTP_REQUEST_DURATION.labels(method, route).observe(time.perf_counter() - start)
+            HTTP_REQUESTS.labels(method, route, status_code).inc()
+
+
+@contextmanager
+def dependency_timer(dependency: str, operation: str):
+    """Time a dependency call, labelled ok, error or cancelled by how the block exits"""
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    except (asyncio.CancelledError, GeneratorExit):
+        outcome = "cancelled"
+        raise
+    finally:
+        DEPENDENCY_DURATION.labels(dependency, operation, outcome).observe(time.perf_counter() - start)
+
+
+def instrumented(dependency: str, operation: Optional[str] = None):
+    """
+    Decorator recording a function's latency in qsr_dependency_duration_seconds
+
+    Works on coroutine functions, async generator functions (whole stream,
+    plus time to first item) and plain functions.
+
+    Args:
+        dependency: Dependency label, e.g. "ragie" or "openai"
+        operation: Operation label; defaults to the function name
+    """
+    def decorator(func):
+        op = operation or func.__name__
+
+        if inspect.isasyncgenfunction(func):
+            @functools.wraps(func)
+            async def stream_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                first = True
+                stream = func(*args, **kwargs)
+                try:
+                    with dependency_timer(dependency, op):
+                        async for item in stream:
+                            if first:
+                                DEPENDENCY_FIRST_ITEM.labels(dependency, op).observe(time.perf_counter() - start)
+                                first = False
+                            yield item
+                finally:
+                    # Release whatever the stream holds even if the consumer stopped early
+                    await stream.aclose()
+            return stream_wrapper
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with dependency_timer(dependency, op):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def sync_wrapper(*args, **kwargs):
+            with dependency_timer(dependency, op):
+                return func(*args, **kwargs)
+        return sync_wrapper
+
+    return decorator
@@ -285,9 +285,7 @@ class Phase1CoreValidator:
                 # Test 5: Manual review functionality
                 if dlq.failed_operations:
                     test_op = dlq.failed_operations[0]
-                    test_op.manual_review = True
-                    dlq.manual_review_queue.append(test_op)
-                    dlq.failed_operations.remove(test_op)
+                    dlq.escalate_to_manual_review(test_op.operation_id)
                     
                     manual_ops = dlq.get_manual_review_operations()
                     assert len(manual_ops) >= 1, "Should have manual review operations"
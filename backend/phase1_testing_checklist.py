@@ -315,10 +315,7 @@ class Phase1TestSuite:
                 # Force an operation to manual review by exceeding retries
                 test_op = dlq.failed_operations[0] if dlq.failed_operations else None
                 if test_op:
-                    test_op.retry_count = test_op.max_retries + 1
-                    test_op.manual_review = True
-                    dlq.manual_review_queue.append(test_op)
-                    dlq.failed_operations.remove(test_op)
+                    dlq.escalate_to_manual_review(test_op.operation_id)
                 
                 manual_ops_after = dlq.get_manual_review_operations()
                 assert len(manual_ops_after) > len(manual_ops_before), "Operation should be moved to manual review"
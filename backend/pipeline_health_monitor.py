@@ -20,6 +20,8 @@ from pathlib import Path
 from typing import Dict, List, Any, Optional, Tuple
 import traceback
 
+from document_catalog import get_document_catalog
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -38,7 +40,7 @@ class PipelineHealthMonitor:
     
     def __init__(self, backend_dir: str = "/Users/johninniger/Workspace/line_lead_qsr_mvp/backend"):
         self.backend_dir = Path(backend_dir)
-        self.docs_db_path = self.backend_dir.parent / "documents.json"
+        self.document_catalog = get_document_catalog()
         self.health_score = 0
         self.monitoring = False
         
@@ -108,9 +110,9 @@ class PipelineHealthMonitor:
         docs_status = []
         
         try:
-            # Load documents database
-            with open(self.docs_db_path, 'r') as f:
-                docs_db = json.load(f)
+            # Load document metadata from the catalog
+            docs_db = self.document_catalog.as_dict(include_text=False)
+            ids_with_text = self.document_catalog.ids_with_text()
                 
             # Check each document
             for doc_id, doc_info in docs_db.items():
@@ -135,14 +137,15 @@ class PipelineHealthMonitor:
                 
                 # Determine actual status
                 actual_status = self._determine_actual_status(
-                    doc_info, temp_files, enhanced_files, doc_checkpoints
+                    doc_info, temp_files, enhanced_files, doc_checkpoints,
+                    has_text=doc_id in ids_with_text
                 )
                 
                 docs_status.append({
                     'document_id': doc_id,
                     'filename': filename,
                     'recorded_status': {
-                        'text_extracted': doc_info.get('text_content', '') != '',
+                        'text_extracted': doc_id in ids_with_text,
                         'entities_extracted': 0,  # This needs to be updated
                         'relationships_extracted': 0
                     },
@@ -157,7 +160,8 @@ class PipelineHealthMonitor:
             
         return docs_status
         
-    def _determine_actual_status(self, doc_info: Dict, temp_files: List, enhanced_files: List, checkpoints: List) -> Dict:
+    def _determine_actual_status(self, doc_info: Dict, temp_files: List, enhanced_files: List, checkpoints: List,
+                                 has_text: bool = False) -> Dict:
         """
         Determine the actual processing status of a document.
         """
@@ -193,7 +197,7 @@ class PipelineHealthMonitor:
                     else:
                         status['needs_sync'] = True
                         
-            elif doc_info.get('text_content'):
+            elif has_text:
                 status['stage'] = 'text_extraction_complete'
                 status['needs_sync'] = True
             else:
@@ -262,16 +266,14 @@ class PipelineHealthMonitor:
         
         try:
             # Check documents database
-            if self.docs_db_path.exists():
-                with open(self.docs_db_path, 'r') as f:
-                    docs_db = json.load(f)
-                    
+            catalog_path = self.document_catalog.db_path
+            if catalog_path.exists():
                 components['documents_database'] = {
                     'status': 'healthy',
                     'details': {
                         'file_exists': True,
-                        'document_count': len(docs_db),
-                        'file_size_mb': round(self.docs_db_path.stat().st_size / 1024 / 1024, 2)
+                        'document_count': self.document_catalog.count(),
+                        'file_size_mb': round(catalog_path.stat().st_size / 1024 / 1024, 2)
                     }
                 }
             else:
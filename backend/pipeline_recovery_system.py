@@ -30,6 +30,8 @@ from enum import Enum
 import glob
 import hashlib
 
+from document_catalog import get_document_catalog
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -352,21 +354,13 @@ class PipelineRecoverySystem:
         try:
             logger.info(f"🔄 Retrying entity extraction for {stuck_file.filename}")
             
-            # Load documents database to get text content
-            docs_db_path = self.backend_dir.parent / "documents.json"
-            
-            if not docs_db_path.exists():
-                logger.error("Documents database not found")
-                return False
-                
-            with open(docs_db_path, 'r') as f:
-                docs_db = json.load(f)
+            # Load the document's text content from the catalog
+            doc_info = get_document_catalog().get(stuck_file.document_id, include_text=True)
                 
-            if stuck_file.document_id not in docs_db:
+            if doc_info is None:
                 logger.error(f"Document {stuck_file.document_id} not found in database")
                 return False
                 
-            doc_info = docs_db[stuck_file.document_id]
             text_content = doc_info.get('text_content', '')
             
             if not text_content:
@@ -440,20 +434,16 @@ class PipelineRecoverySystem:
             extracted_text, pages_count = extract_pdf_text(content)
             
             if extracted_text:
-                # Update documents database
-                docs_db_path = self.backend_dir.parent / "documents.json"
-                
-                with open(docs_db_path, 'r') as f:
-                    docs_db = json.load(f)
-                    
-                if stuck_file.document_id in docs_db:
-                    docs_db[stuck_file.document_id]['text_content'] = extracted_text
-                    docs_db[stuck_file.document_id]['retry_extraction'] = True
-                    docs_db[stuck_file.document_id]['retry_timestamp'] = datetime.now().isoformat()
+                # Update the document's catalog row
+                updated = get_document_catalog().update(
+                    stuck_file.document_id,
+                    text_content=extracted_text,
+                    text_preview=extracted_text[:200] + "..." if len(extracted_text) > 200 else extracted_text,
+                    retry_extraction=True,
+                    retry_timestamp=datetime.now().isoformat()
+                )
                     
-                    with open(docs_db_path, 'w') as f:
-                        json.dump(docs_db, f, indent=2)
-                        
+                if updated:
                     logger.info(f"✅ Re-extracted text for {stuck_file.filename}")
                     self.recovery_stats.text_extractions_retried += 1
                     return True
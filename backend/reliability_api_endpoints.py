@@ -22,7 +22,7 @@ import logging
 from datetime import datetime
 from typing import Dict, List, Optional, Any
 from fastapi import APIRouter, HTTPException, UploadFile, File, BackgroundTasks, Depends
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from pydantic import BaseModel
 
 from reliability_infrastructure import (
@@ -33,6 +33,7 @@ from reliability_infrastructure import (
 )
 from enhanced_neo4j_service import enhanced_neo4j_service
 from reliable_upload_pipeline import reliable_upload_pipeline
+from metrics_registry import metrics, CONTENT_TYPE_LATEST
 
 logger = logging.getLogger(__name__)
 
@@ -277,8 +278,8 @@ async def resolve_manual_review_operation(operation_id: str, resolution: str):
 async def retry_all_failed_operations():
     """Manually trigger retry of all ready operations"""
     try:
-        # This will trigger the background processor to check all operations
-        dead_letter_queue._process_ready_operations()
+        # Wakes the background processor, or retries due operations here
+        await dead_letter_queue.process_ready_operations()
         
         status = dead_letter_queue.get_queue_status()
         
@@ -562,40 +563,42 @@ async def get_reliability_metrics():
         logger.error(f"❌ Failed to get reliability metrics: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def _collect_reliability_metrics():
+    """Circuit breaker, dead letter queue and pipeline values, read at scrape time"""
+    cb_metrics = circuit_breaker.get_metrics()
+    dlq_status = dead_letter_queue.get_queue_status()
+    pipeline_stats = reliable_upload_pipeline.get_pipeline_statistics()
+    state_value = {"closed": 0, "half_open": 1}.get(cb_metrics['state'], 2)
+    
+    return [
+        ("circuit_breaker_requests_total", "counter", "Total number of requests through circuit breaker", [
+            ({"state": "total"}, cb_metrics['total_requests']),
+            ({"state": "successful"}, cb_metrics['successful_requests']),
+            ({"state": "failed"}, cb_metrics['failed_requests'])
+        ]),
+        ("circuit_breaker_state", "gauge", "Current state of circuit breaker (0=closed, 1=half_open, 2=open)", [
+            ({}, state_value)
+        ]),
+        ("dead_letter_queue_operations", "gauge", "Operations in dead letter queue", [
+            ({"state": "failed"}, dlq_status['failed_operations']),
+            ({"state": "manual_review"}, dlq_status['manual_review_queue']),
+            ({"state": "retrying"}, dlq_status.get('retrying', 0))
+        ]),
+        ("pipeline_success_rate", "gauge", "Success rate of upload pipeline", [
+            ({}, pipeline_stats.get('success_rate', 0) / 100)
+        ]),
+        ("pipeline_active_processes", "gauge", "Active upload processes", [
+            ({}, pipeline_stats.get('active_processes', 0))
+        ])
+    ]
+
+metrics.register_collector(_collect_reliability_metrics)
+
 @reliability_router.get("/metrics/prometheus")
 async def get_prometheus_metrics():
-    """Get metrics in Prometheus format"""
+    """Get metrics in Prometheus format (request latency, dependency latency and reliability state)"""
     try:
-        cb_metrics = circuit_breaker.get_metrics()
-        dlq_status = dead_letter_queue.get_queue_status()
-        pipeline_stats = reliable_upload_pipeline.get_pipeline_statistics()
-        
-        prometheus_metrics = f"""
-# HELP circuit_breaker_requests_total Total number of requests through circuit breaker
-# TYPE circuit_breaker_requests_total counter
-circuit_breaker_requests_total{{state="total"}} {cb_metrics['total_requests']}
-circuit_breaker_requests_total{{state="successful"}} {cb_metrics['successful_requests']}
-circuit_breaker_requests_total{{state="failed"}} {cb_metrics['failed_requests']}
-
-# HELP circuit_breaker_state Current state of circuit breaker (0=closed, 1=half_open, 2=open)
-# TYPE circuit_breaker_state gauge
-circuit_breaker_state {0 if cb_metrics['state'] == 'closed' else 1 if cb_metrics['state'] == 'half_open' else 2}
-
-# HELP dead_letter_queue_operations Operations in dead letter queue
-# TYPE dead_letter_queue_operations gauge
-dead_letter_queue_operations{{state="failed"}} {dlq_status['failed_operations']}
-dead_letter_queue_operations{{state="manual_review"}} {dlq_status['manual_review_queue']}
-
-# HELP pipeline_success_rate Success rate of upload pipeline
-# TYPE pipeline_success_rate gauge
-pipeline_success_rate {pipeline_stats.get('success_rate', 0) / 100}
-
-# HELP pipeline_active_processes Active upload processes
-# TYPE pipeline_active_processes gauge
-pipeline_active_processes {pipeline_stats.get('active_processes', 0)}
-        """.strip()
-        
-        return prometheus_metrics
+        return PlainTextResponse(metrics.render(), media_type=CONTENT_TYPE_LATEST)
         
     except Exception as e:
         logger.error(f"❌ Failed to generate Prometheus metrics: {e}")
@@ -16,8 +16,12 @@ Co-Authored-By: Memex <noreply@memex.tech>
 """
 
 import asyncio
+import heapq
+import itertools
 import json
 import logging
+import os
+import sqlite3
 import time
 import threading
 from datetime import datetime, timedelta
@@ -31,6 +35,47 @@ from concurrent.futures import ThreadPoolExecutor
 
 logger = logging.getLogger(__name__)
 
+CREATE_DLQ_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS failed_operations (
+        operation_id TEXT PRIMARY KEY,
+        operation_type TEXT NOT NULL,
+        operation_data TEXT NOT NULL,
+        error_message TEXT NOT NULL,
+        error_type TEXT NOT NULL,
+        failure_time TEXT NOT NULL,
+        retry_count INTEGER NOT NULL DEFAULT 0,
+        max_retries INTEGER NOT NULL DEFAULT 3,
+        retry_strategy TEXT NOT NULL,
+        next_retry_at REAL,
+        manual_review INTEGER NOT NULL DEFAULT 0
+    )
+"""
+
+CREATE_DLQ_RETRY_INDEX_SQL = """
+    CREATE INDEX IF NOT EXISTS idx_dlq_retry ON failed_operations (manual_review, next_retry_at)
+"""
+
+INSERT_DLQ_OPERATION_SQL = """
+    INSERT OR REPLACE INTO failed_operations (
+        operation_id, operation_type, operation_data, error_message, error_type,
+        failure_time, retry_count, max_retries, retry_strategy, next_retry_at,
+        manual_review
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+SELECT_DLQ_OPERATIONS_SQL = """
+    SELECT operation_id, operation_type, operation_data, error_message, error_type,
+           failure_time, retry_count, max_retries, retry_strategy, next_retry_at,
+           manual_review
+    FROM failed_operations
+    ORDER BY failure_time, operation_id
+"""
+
+COUNT_DLQ_READY_SQL = """
+    SELECT COUNT(*) FROM failed_operations
+    WHERE manual_review = 0 AND next_retry_at <= ?
+"""
+
 # ============================================================================
 # Circuit Breaker Pattern Implementation
 # ============================================================================
@@ -513,120 +558,199 @@ class DeadLetterQueue:
     Persistent dead letter queue for failed operations.
     
     Features:
-    - Persistent storage to disk
+    - Persistent storage in SQLite (one row write per state change)
+    - Min-heap on next retry time, so due operations are found in O(log n)
     - Intelligent retry strategies
-    - Background processing
+    - Background processing with bounded concurrent retries
     - Escalation to manual review
     """
     
-    def __init__(self, storage_path: str = "data/dead_letter_queue"):
+    def __init__(self, storage_path: str = "data/dead_letter_queue",
+                 retry_concurrency: int = None):
         self.storage_path = Path(storage_path)
         self.storage_path.mkdir(parents=True, exist_ok=True)
         
+        self.db_file = self.storage_path / "dead_letter_queue.db"
+        # Legacy JSON snapshots: imported once when the database is first
+        # created and never written again, so they go stale afterwards
         self.queue_file = self.storage_path / "failed_operations.json"
         self.manual_queue_file = self.storage_path / "manual_review_queue.json"
         
-        self.failed_operations: List[FailedOperation] = []
-        self.manual_review_queue: List[FailedOperation] = []
+        # operation_id -> operation, in insertion order
+        self._pending: Dict[str, FailedOperation] = {}
+        self._manual: Dict[str, FailedOperation] = {}
+        # (next retry timestamp, tiebreak, operation_id); stale entries are skipped on pop
+        self._retry_heap: List[Tuple[float, int, str]] = []
+        self._heap_counter = itertools.count()
+        self._in_flight: set = set()
+        
+        self.retry_concurrency = retry_concurrency or int(os.getenv("DLQ_RETRY_CONCURRENCY", "8"))
+        self._retry_executor = ThreadPoolExecutor(max_workers=self.retry_concurrency, thread_name_prefix="dlq-retry")
         
         self.lock = threading.RLock()
         self.background_processor = None
         self.processing_enabled = True
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        
+        self._conn = sqlite3.connect(str(self.db_file), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(CREATE_DLQ_TABLE_SQL)
+        self._conn.execute(CREATE_DLQ_RETRY_INDEX_SQL)
         
         # Load existing operations
         self._load_operations()
         
         logger.info(f"📮 Dead letter queue initialized at {self.storage_path}")
     
+    @property
+    def failed_operations(self) -> Tuple[FailedOperation, ...]:
+        """Operations awaiting retry, oldest first (a read-only snapshot)"""
+        with self.lock:
+            return tuple(self._pending.values())
+    
+    @property
+    def manual_review_queue(self) -> Tuple[FailedOperation, ...]:
+        """
+        Operations awaiting manual review, oldest first (a read-only snapshot)
+        
+        Use escalate_to_manual_review / resolve_manual_operation to change it.
+        """
+        with self.lock:
+            return tuple(self._manual.values())
+    
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    
+    @staticmethod
+    def _operation_row(op: FailedOperation) -> Tuple:
+        return (
+            op.operation_id,
+            op.operation_type,
+            json.dumps(op.operation_data),
+            op.error_message,
+            op.error_type,
+            op.failure_time.isoformat(),
+            op.retry_count,
+            op.max_retries,
+            op.retry_strategy.value,
+            op.next_retry_time.timestamp() if op.next_retry_time else None,
+            int(op.manual_review)
+        )
+    
+    @staticmethod
+    def _row_to_operation(row: Tuple) -> FailedOperation:
+        return FailedOperation(
+            operation_id=row[0],
+            operation_type=row[1],
+            operation_data=json.loads(row[2]),
+            error_message=row[3],
+            error_type=row[4],
+            failure_time=datetime.fromisoformat(row[5]),
+            retry_count=row[6],
+            max_retries=row[7],
+            retry_strategy=RetryStrategy(row[8]),
+            next_retry_time=datetime.fromtimestamp(row[9]) if row[9] is not None else None,
+            manual_review=bool(row[10])
+        )
+    
+    @staticmethod
+    def _operation_from_dict(op: Dict[str, Any], manual: bool) -> FailedOperation:
+        """Parse an operation from the legacy JSON snapshot format"""
+        return FailedOperation(
+            operation_id=op["operation_id"],
+            operation_type=op["operation_type"],
+            operation_data=op["operation_data"],
+            error_message=op["error_message"],
+            error_type=op["error_type"],
+            failure_time=datetime.fromisoformat(op["failure_time"]),
+            retry_count=op.get("retry_count", 0),
+            max_retries=op.get("max_retries", 3),
+            retry_strategy=RetryStrategy(op.get("retry_strategy", "manual" if manual else "exponential")),
+            next_retry_time=datetime.fromisoformat(op["next_retry_time"]) if not manual and op.get("next_retry_time") else None,
+            manual_review=manual or op.get("manual_review", False)
+        )
+    
+    def _import_legacy_snapshots(self):
+        """Copy operations from the old JSON snapshot files into a new database (once)"""
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] >= 1:
+            return
+        try:
+            operations = []
+            for path, manual in ((self.queue_file, False), (self.manual_queue_file, True)):
+                if path.exists():
+                    with open(path, 'r') as f:
+                        operations.extend(self._operation_from_dict(op, manual) for op in json.load(f))
+            self._conn.execute("BEGIN")
+            self._conn.executemany(INSERT_DLQ_OPERATION_SQL, [self._operation_row(op) for op in operations])
+            self._conn.execute("PRAGMA user_version = 1")
+            self._conn.execute("COMMIT")
+            if operations:
+                logger.info(f"📥 Imported {len(operations)} operations from JSON snapshots")
+        except Exception as e:
+            if self._conn.in_transaction:
+                self._conn.execute("ROLLBACK")
+            logger.error(f"❌ Failed to import dead letter queue snapshots: {e}")
+    
     def _load_operations(self):
         """Load failed operations from disk"""
         try:
-            if self.queue_file.exists():
-                with open(self.queue_file, 'r') as f:
-                    data = json.load(f)
-                    self.failed_operations = [
-                        FailedOperation(
-                            operation_id=op["operation_id"],
-                            operation_type=op["operation_type"],
-                            operation_data=op["operation_data"],
-                            error_message=op["error_message"],
-                            error_type=op["error_type"],
-                            failure_time=datetime.fromisoformat(op["failure_time"]),
-                            retry_count=op.get("retry_count", 0),
-                            max_retries=op.get("max_retries", 3),
-                            retry_strategy=RetryStrategy(op.get("retry_strategy", "exponential")),
-                            next_retry_time=datetime.fromisoformat(op["next_retry_time"]) if op.get("next_retry_time") else None,
-                            manual_review=op.get("manual_review", False)
-                        )
-                        for op in data
-                    ]
-            
-            if self.manual_queue_file.exists():
-                with open(self.manual_queue_file, 'r') as f:
-                    data = json.load(f)
-                    self.manual_review_queue = [
-                        FailedOperation(
-                            operation_id=op["operation_id"],
-                            operation_type=op["operation_type"],
-                            operation_data=op["operation_data"],
-                            error_message=op["error_message"],
-                            error_type=op["error_type"],
-                            failure_time=datetime.fromisoformat(op["failure_time"]),
-                            retry_count=op.get("retry_count", 0),
-                            max_retries=op.get("max_retries", 3),
-                            retry_strategy=RetryStrategy(op.get("retry_strategy", "manual")),
-                            manual_review=True
-                        )
-                        for op in data
-                    ]
-            
-            logger.info(f"📥 Loaded {len(self.failed_operations)} failed operations, {len(self.manual_review_queue)} manual review")
+            self._import_legacy_snapshots()
+            
+            for row in self._conn.execute(SELECT_DLQ_OPERATIONS_SQL):
+                op = self._row_to_operation(row)
+                if op.manual_review:
+                    self._manual[op.operation_id] = op
+                else:
+                    self._pending[op.operation_id] = op
+                    self._schedule(op)
+            
+            logger.info(f"📥 Loaded {len(self._pending)} failed operations, {len(self._manual)} manual review")
             
         except Exception as e:
             logger.error(f"❌ Failed to load dead letter queue: {e}")
     
-    def _save_operations(self):
-        """Save failed operations to disk"""
+    def _save_operation(self, op: FailedOperation):
+        """Insert or update one operation's row"""
         try:
-            # Save main queue
-            with open(self.queue_file, 'w') as f:
-                json.dump([
-                    {
-                        "operation_id": op.operation_id,
-                        "operation_type": op.operation_type,
-                        "operation_data": op.operation_data,
-                        "error_message": op.error_message,
-                        "error_type": op.error_type,
-                        "failure_time": op.failure_time.isoformat(),
-                        "retry_count": op.retry_count,
-                        "max_retries": op.max_retries,
-                        "retry_strategy": op.retry_strategy.value,
-                        "next_retry_time": op.next_retry_time.isoformat() if op.next_retry_time else None,
-                        "manual_review": op.manual_review
-                    }
-                    for op in self.failed_operations
-                ], f, indent=2)
-            
-            # Save manual review queue
-            with open(self.manual_queue_file, 'w') as f:
-                json.dump([
-                    {
-                        "operation_id": op.operation_id,
-                        "operation_type": op.operation_type,
-                        "operation_data": op.operation_data,
-                        "error_message": op.error_message,
-                        "error_type": op.error_type,
-                        "failure_time": op.failure_time.isoformat(),
-                        "retry_count": op.retry_count,
-                        "max_retries": op.max_retries,
-                        "retry_strategy": op.retry_strategy.value,
-                        "manual_review": op.manual_review
-                    }
-                    for op in self.manual_review_queue
-                ], f, indent=2)
-            
+            self._conn.execute(INSERT_DLQ_OPERATION_SQL, self._operation_row(op))
+        except Exception as e:
+            logger.error(f"❌ Failed to save dead letter queue operation {op.operation_id}: {e}")
+    
+    def _delete_operation(self, operation_id: str):
+        try:
+            self._conn.execute("DELETE FROM failed_operations WHERE operation_id = ?", (operation_id,))
         except Exception as e:
-            logger.error(f"❌ Failed to save dead letter queue: {e}")
+            logger.error(f"❌ Failed to delete dead letter queue operation {operation_id}: {e}")
+    
+    # ------------------------------------------------------------------
+    # Queueing
+    # ------------------------------------------------------------------
+    
+    def _schedule(self, op: FailedOperation):
+        """Push an operation onto the retry heap (caller holds the lock)"""
+        if op.next_retry_time is not None:
+            heapq.heappush(self._retry_heap, (op.next_retry_time.timestamp(), next(self._heap_counter), op.operation_id))
+    
+    def _pop_ready(self, now: float) -> List[FailedOperation]:
+        """Take every operation due by `now` off the heap (caller holds the lock)"""
+        ready = []
+        while self._retry_heap and self._retry_heap[0][0] <= now:
+            due, _, operation_id = heapq.heappop(self._retry_heap)
+            op = self._pending.get(operation_id)
+            # Skip entries for operations that were removed or rescheduled since
+            if op is None or op.next_retry_time is None or op.next_retry_time.timestamp() != due:
+                continue
+            if operation_id in self._in_flight:
+                continue
+            ready.append(op)
+        return ready
+    
+    def _next_due(self) -> Optional[float]:
+        with self.lock:
+            return self._retry_heap[0][0] if self._retry_heap else None
     
     def add_failed_operation(self, operation_type: str, operation_data: Dict[str, Any], 
                            error: Exception, max_retries: int = 3) -> str:
@@ -650,11 +774,16 @@ class DeadLetterQueue:
         
         with self.lock:
             if retry_strategy == RetryStrategy.MANUAL_REVIEW:
-                self.manual_review_queue.append(failed_op)
+                failed_op.manual_review = True
+                failed_op.next_retry_time = None
+                self._manual[operation_id] = failed_op
             else:
-                self.failed_operations.append(failed_op)
+                self._pending[operation_id] = failed_op
+                self._schedule(failed_op)
             
-            self._save_operations()
+            self._save_operation(failed_op)
+        
+        self._wake_processor()
         
         logger.info(f"📮 Added failed operation {operation_id} to queue (strategy: {retry_strategy.value})")
         return operation_id
@@ -690,11 +819,17 @@ class DeadLetterQueue:
         
         return datetime.now() + timedelta(seconds=delay)
     
+    # ------------------------------------------------------------------
+    # Background processing
+    # ------------------------------------------------------------------
+    
     def start_background_processing(self):
         """Start background processing of failed operations"""
         if self.background_processor is None:
+            self.processing_enabled = True
             self.background_processor = threading.Thread(
                 target=self._background_process_loop,
+                name="dead-letter-queue",
                 daemon=True
             )
             self.background_processor.start()
@@ -703,61 +838,166 @@ class DeadLetterQueue:
     def stop_background_processing(self):
         """Stop background processing"""
         self.processing_enabled = False
+        self._wake_processor()
         if self.background_processor:
             self.background_processor.join(timeout=5)
             self.background_processor = None
         logger.info("⏹️ Dead letter queue background processing stopped")
     
+    def _wake_processor(self):
+        """Make the background loop re-check the heap now"""
+        loop, wakeup = self._loop, self._wakeup
+        if loop is not None and wakeup is not None:
+            try:
+                loop.call_soon_threadsafe(wakeup.set)
+            except RuntimeError:
+                pass  # Loop already closed
+    
     def _background_process_loop(self):
-        """Background processing loop"""
-        while self.processing_enabled:
+        """Background processing loop (hosts the retry event loop)"""
+        asyncio.run(self._process_forever())
+    
+    async def _process_forever(self):
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        semaphore = asyncio.Semaphore(self.retry_concurrency)
+        tasks: set = set()
+        try:
+            while self.processing_enabled:
+                try:
+                    for op in self._claim_ready():
+                        task = asyncio.create_task(self._retry_with_limit(op, semaphore))
+                        tasks.add(task)
+                        task.add_done_callback(tasks.discard)
+                except Exception as e:
+                    logger.error(f"❌ Background processing error: {e}")
+                
+                # Sleep until the earliest retry is due, a new operation arrives, or 10s pass
+                next_due = self._next_due()
+                timeout = 10.0 if next_due is None else min(10.0, max(0.0, next_due - time.time()))
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+            
+            if tasks:
+                await asyncio.wait(tasks, timeout=5)
+        finally:
+            self._loop = None
+            self._wakeup = None
+    
+    def _claim_ready(self) -> List[FailedOperation]:
+        """Pop due operations off the heap and mark them in flight"""
+        with self.lock:
+            ready = self._pop_ready(time.time())
+            self._in_flight.update(op.operation_id for op in ready)
+            return ready
+    
+    async def _retry_with_limit(self, op: FailedOperation, semaphore: asyncio.Semaphore) -> bool:
+        async with semaphore:
             try:
-                self._process_ready_operations()
-                time.sleep(10)  # Check every 10 seconds
+                success = await asyncio.get_running_loop().run_in_executor(
+                    self._retry_executor, self._retry_operation, op
+                )
             except Exception as e:
-                logger.error(f"❌ Background processing error: {e}")
-                time.sleep(30)  # Wait longer on errors
+                logger.error(f"❌ Error processing operation {op.operation_id}: {e}")
+                success = False
+            self._record_retry_outcome(op, success)
+            return success
+    
+    def _record_retry_outcome(self, op: FailedOperation, success: bool):
+        """Apply a retry result to the queue and persist just that operation"""
+        with self.lock:
+            self._in_flight.discard(op.operation_id)
+            if op.operation_id not in self._pending:
+                return  # Removed while the retry ran
+            
+            if success:
+                # Remove from queue on success
+                del self._pending[op.operation_id]
+                self._delete_operation(op.operation_id)
+                logger.info(f"✅ Successfully retried operation {op.operation_id}")
+                return
+            
+            # Update retry count and schedule next retry
+            op.retry_count += 1
+            
+            if op.retry_count >= op.max_retries:
+                # Move to manual review
+                op.manual_review = True
+                op.retry_strategy = RetryStrategy.MANUAL_REVIEW
+                op.next_retry_time = None
+                del self._pending[op.operation_id]
+                self._manual[op.operation_id] = op
+                logger.info(f"📋 Moved operation {op.operation_id} to manual review after {op.retry_count} failures")
+            else:
+                # Schedule next retry
+                op.next_retry_time = self._calculate_next_retry_time(op.retry_strategy, op.retry_count)
+                self._schedule(op)
+                logger.info(f"🔄 Scheduled retry {op.retry_count}/{op.max_retries} for operation {op.operation_id} at {op.next_retry_time}")
+            
+            self._save_operation(op)
+    
+    async def _process_ready(self) -> int:
+        """Retry every operation due now, concurrently, and wait for the results"""
+        ready = self._claim_ready()
+        if ready:
+            semaphore = asyncio.Semaphore(self.retry_concurrency)
+            await asyncio.gather(*(self._retry_with_limit(op, semaphore) for op in ready))
+        return len(ready)
     
-    def _process_ready_operations(self):
-        """Process operations ready for retry"""
-        now = datetime.now()
-        ready_operations = []
+    def _process_ready_operations(self) -> int:
+        """
+        Process operations ready for retry
+        
+        With the background processor running this only wakes it and returns
+        immediately. Called from a running event loop without it, the
+        processor is started rather than blocking the loop (await
+        process_ready_operations to wait for the results instead);
+        otherwise the due retries run here before returning.
+        
+        Returns:
+            Operations due for retry
+        """
+        if self._loop is not None:
+            return self._wake_for_ready()
         
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self._process_ready())
         with self.lock:
-            for i, op in enumerate(self.failed_operations):
-                if op.next_retry_time and now >= op.next_retry_time:
-                    ready_operations.append((i, op))
+            ready = self._count_ready(time.time())
+        self.start_background_processing()
+        return ready
+    
+    async def process_ready_operations(self) -> int:
+        """
+        Process operations ready for retry from async code
         
-        # Process ready operations
-        for i, op in reversed(ready_operations):  # Reverse to maintain indices
-            try:
-                success = self._retry_operation(op)
-                
-                with self.lock:
-                    if success:
-                        # Remove from queue on success
-                        self.failed_operations.pop(i)
-                        logger.info(f"✅ Successfully retried operation {op.operation_id}")
-                    else:
-                        # Update retry count and schedule next retry
-                        op.retry_count += 1
-                        
-                        if op.retry_count >= op.max_retries:
-                            # Move to manual review
-                            op.manual_review = True
-                            op.retry_strategy = RetryStrategy.MANUAL_REVIEW
-                            self.manual_review_queue.append(op)
-                            self.failed_operations.pop(i)
-                            logger.info(f"📋 Moved operation {op.operation_id} to manual review after {op.retry_count} failures")
-                        else:
-                            # Schedule next retry
-                            op.next_retry_time = self._calculate_next_retry_time(op.retry_strategy, op.retry_count)
-                            logger.info(f"🔄 Scheduled retry {op.retry_count}/{op.max_retries} for operation {op.operation_id} at {op.next_retry_time}")
-                    
-                    self._save_operations()
-                    
-            except Exception as e:
-                logger.error(f"❌ Error processing operation {op.operation_id}: {e}")
+        Wakes the background processor if it is running; otherwise awaits
+        the due retries on the caller's loop (they run on the retry pool).
+        
+        Returns:
+            Operations due for retry
+        """
+        if self._loop is not None:
+            return self._wake_for_ready()
+        return await self._process_ready()
+    
+    def _wake_for_ready(self) -> int:
+        with self.lock:
+            ready = self._count_ready(time.time())
+        self._wake_processor()
+        return ready
+    
+    def _count_ready(self, now: float) -> int:
+        try:
+            return self._conn.execute(COUNT_DLQ_READY_SQL, (now,)).fetchone()[0]
+        except Exception as e:
+            logger.error(f"❌ Failed to count ready operations: {e}")
+            return 0
     
     def _retry_operation(self, operation: FailedOperation) -> bool:
         """Retry failed operation"""
@@ -802,9 +1042,11 @@ class DeadLetterQueue:
         """Get queue status"""
         with self.lock:
             return {
-                "failed_operations": len(self.failed_operations),
-                "manual_review_queue": len(self.manual_review_queue),
-                "ready_for_retry": len([op for op in self.failed_operations if op.next_retry_time and datetime.now() >= op.next_retry_time]),
+                "failed_operations": len(self._pending),
+                "manual_review_queue": len(self._manual),
+                "ready_for_retry": self._count_ready(time.time()),
+                "retrying": len(self._in_flight),
+                "retry_concurrency": self.retry_concurrency,
                 "processing_enabled": self.processing_enabled,
                 "background_processor_running": self.background_processor is not None and self.background_processor.is_alive()
             }
@@ -822,20 +1064,49 @@ class DeadLetterQueue:
                     "retry_count": op.retry_count,
                     "operation_data": op.operation_data
                 }
-                for op in self.manual_review_queue
+                for op in self._manual.values()
             ]
     
+    def escalate_to_manual_review(self, operation_id: str) -> bool:
+        """
+        Stop retrying a pending operation and move it to manual review
+        
+        Args:
+            operation_id: Pending operation to escalate
+            
+        Returns:
+            False if no pending operation has that id
+        """
+        with self.lock:
+            op = self._pending.pop(operation_id, None)
+            if op is None:
+                return False
+            # Its heap entry is skipped lazily; an in-flight retry's outcome is ignored
+            op.manual_review = True
+            op.retry_strategy = RetryStrategy.MANUAL_REVIEW
+            op.next_retry_time = None
+            self._manual[operation_id] = op
+            self._save_operation(op)
+        
+        logger.info(f"📋 Escalated operation {operation_id} to manual review")
+        return True
+    
     def resolve_manual_operation(self, operation_id: str, resolution: str) -> bool:
         """Resolve manual review operation"""
         with self.lock:
-            for i, op in enumerate(self.manual_review_queue):
-                if op.operation_id == operation_id:
-                    self.manual_review_queue.pop(i)
-                    self._save_operations()
-                    logger.info(f"✅ Resolved manual operation {operation_id}: {resolution}")
-                    return True
-        
-        return False
+            if self._manual.pop(operation_id, None) is None:
+                return False
+            self._delete_operation(operation_id)
+        
+        logger.info(f"✅ Resolved manual operation {operation_id}: {resolution}")
+        return True
+    
+    def close(self):
+        """Stop processing and close the database"""
+        self.stop_background_processing()
+        self._retry_executor.shutdown(wait=False)
+        with self.lock:
+            self._conn.close()
 
 # ============================================================================
 # Global instances
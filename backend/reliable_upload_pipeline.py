@@ -24,13 +24,14 @@ import time
 import uuid
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, field
 
-import PyPDF2
-from io import BytesIO
 from fastapi import UploadFile, BackgroundTasks, HTTPException
 
+from services.upload_streamer import stream_upload_to_disk
+from services.pdf_artifact import pdf_artifact_store, PDFParseError
+
 from reliability_infrastructure import (
     circuit_breaker,
     transaction_manager,
@@ -180,7 +181,7 @@ class ReliableUploadPipeline:
         
         try:
             # Stage 1: File validation and storage
-            await self._stage_file_validation(file, result, transaction)
+            await self._stage_file_validation(file, result, transaction, document_id)
             
             # Stage 2: Text extraction and preprocessing
             file_path = await self._stage_text_extraction(file, result, transaction, document_id)
@@ -252,39 +253,45 @@ class ReliableUploadPipeline:
                 self.process_history = self.process_history[-100:]
     
     async def _stage_file_validation(self, file: UploadFile, result: ProcessingResult, 
-                                   transaction: AtomicTransaction):
+                                   transaction: AtomicTransaction, document_id: str):
         """Stage 1: File validation and storage"""
         stage = result.stages[0]
         stage.start_time = datetime.now()
         
         try:
-            # Read file content
-            content = await file.read()
-            
             # Validate file type
             if not file.filename.lower().endswith('.pdf'):
                 raise ValueError("Only PDF files are allowed")
             
-            # Validate file size
-            if len(content) > self.max_file_size:
-                raise ValueError(f"File size exceeds {self.max_file_size // (1024*1024)}MB limit")
-            
-            # Validate PDF content
-            if not self._is_valid_pdf(content):
-                raise ValueError("Invalid PDF file")
-            
-            # Store file content for later stages
-            stage.metadata["file_content"] = content
-            stage.metadata["file_size"] = len(content)
+            # Stream to disk; size and PDF magic bytes are checked while receiving
+            file_path = self.upload_dir / f"{document_id}_{file.filename}"
+            saved = await stream_upload_to_disk(
+                file,
+                file_path,
+                max_size=self.max_file_size,
+                header_check=lambda head: None if head.startswith(b'%PDF') else "Invalid PDF file"
+            )
             
             # Add file cleanup to transaction
             transaction_manager.add_operation(
                 transaction.transaction_id,
                 "file_validation",
-                {"filename": file.filename, "size": len(content)},
-                {"type": "file_delete", "file_path": None}  # Will be set in next stage
+                {"filename": file.filename, "size": saved.size},
+                {"type": "file_delete", "file_path": str(file_path)}
             )
             
+            # Validate PDF content by parsing it once; later stages reuse the artifact
+            try:
+                parsed = await pdf_artifact_store.aload_or_parse(file_path, saved.sha256)
+            except PDFParseError:
+                raise ValueError("Invalid PDF file")
+            
+            # Later stages read the file from disk
+            stage.metadata["file_path"] = str(file_path)
+            stage.metadata["file_size"] = saved.size
+            stage.metadata["sha256"] = saved.sha256
+            stage.metadata["pages_count"] = parsed.pages_count
+            
             stage.completed = True
             stage.end_time = datetime.now()
             
@@ -302,21 +309,12 @@ class ReliableUploadPipeline:
         stage.start_time = datetime.now()
         
         try:
-            # Get file content from previous stage
-            content = result.stages[0].metadata["file_content"]
-            
-            # Save file to disk
-            safe_filename = f"{document_id}_{file.filename}"
-            file_path = self.upload_dir / safe_filename
+            # File was streamed to disk in the validation stage
+            file_path = Path(result.stages[0].metadata["file_path"])
             
-            with open(file_path, 'wb') as f:
-                f.write(content)
-            
-            # Update transaction with file path
-            transaction.operations[0].rollback_data["file_path"] = str(file_path)
-            
-            # Extract text from PDF
-            extracted_text, pages_count = self._extract_pdf_text(content)
+            # Text comes from the artifact parsed during validation
+            parsed = await pdf_artifact_store.aload_or_parse(file_path, result.stages[0].metadata.get("sha256"))
+            extracted_text, pages_count = parsed.text, parsed.pages_count
             
             if not extracted_text.strip():
                 raise ValueError("No text could be extracted from PDF")
@@ -551,11 +549,6 @@ class ReliableUploadPipeline:
         stage.start_time = datetime.now()
         
         try:
-            # Clean up temporary data
-            for prev_stage in result.stages[:-1]:
-                if "file_content" in prev_stage.metadata:
-                    del prev_stage.metadata["file_content"]  # Free memory
-            
             # Update final progress
             stage.completed = True
             stage.end_time = datetime.now()
@@ -567,29 +560,6 @@ class ReliableUploadPipeline:
             stage.end_time = datetime.now()
             raise
     
-    def _is_valid_pdf(self, content: bytes) -> bool:
-        """Check if content is a valid PDF"""
-        try:
-            PyPDF2.PdfReader(BytesIO(content))
-            return True
-        except:
-            return False
-    
-    def _extract_pdf_text(self, content: bytes) -> Tuple[str, int]:
-        """Extract text from PDF content"""
-        try:
-            pdf_reader = PyPDF2.PdfReader(BytesIO(content))
-            text_content = ""
-            pages_count = len(pdf_reader.pages)
-            
-            for page in pdf_reader.pages:
-                text_content += page.extract_text() + "\n"
-            
-            return text_content.strip(), pages_count
-        except Exception as e:
-            logger.error(f"Error extracting PDF text: {e}")
-            raise
-    
     def _get_current_stage(self, result: ProcessingResult) -> str:
         """Get current processing stage"""
         for stage in result.stages:
@@ -38,14 +38,87 @@ import sqlite3
 import uuid
 from functools import wraps
 
+from audit_sink import AuditSink, AuditDurability
+from security_windows import SecurityWindowIndex, is_normal_hour
+
 logger = logging.getLogger(__name__)
 
+INSERT_AUDIT_EVENT_SQL = """
+    INSERT INTO audit_events (
+        event_id, event_type, user_id, username, email, access_level,
+        timestamp, operation, resource, result, data_summary,
+        security_level, compliance_tags, risk_score, metadata,
+        ip_address, session_id
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+INSERT_SECURITY_VIOLATION_SQL = """
+    INSERT INTO security_violations (
+        violation_id, violation_type, user_id, username, timestamp,
+        severity, description, detection_method, context
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Report aggregation runs entirely inside this index (no table lookups), and
+# its (timestamp, event_id) prefix serves keyset pagination in order
+CREATE_AUDIT_REPORT_INDEX_SQL = """
+    CREATE INDEX IF NOT EXISTS idx_audit_report ON audit_events (
+        timestamp, event_id, event_type, result, security_level,
+        risk_score, user_id, operation, compliance_tags
+    )
+"""
+
+CREATE_VIOLATION_REPORT_INDEX_SQL = """
+    CREATE INDEX IF NOT EXISTS idx_violations_report ON security_violations (
+        timestamp, severity, violation_type, user_id
+    )
+"""
+
+AUDIT_DAILY_AGGREGATE_SQL = """
+    SELECT substr(timestamp, 1, 10) AS day, event_type, result, security_level,
+           COUNT(*) AS events,
+           SUM(COALESCE(risk_score, 0) < 3) AS risk_low,
+           SUM(COALESCE(risk_score, 0) >= 3 AND COALESCE(risk_score, 0) < 7) AS risk_medium,
+           SUM(COALESCE(risk_score, 0) >= 7) AS risk_high,
+           SUM(COALESCE(risk_score, 0) > 7.0) AS risk_over_7,
+           SUM(COALESCE(risk_score, 0) > 8.0) AS risk_over_8,
+           SUM(instr(lower(operation), 'data') > 0) AS data_processing,
+           COALESCE(SUM(instr(compliance_tags, 'consent') > 0), 0) AS consent
+    FROM audit_events
+    WHERE timestamp BETWEEN ? AND ?
+    GROUP BY day, event_type, result, security_level
+"""
+
+AUDIT_USER_AGGREGATE_SQL = """
+    SELECT user_id, COUNT(*) FROM audit_events
+    WHERE timestamp BETWEEN ? AND ?
+    GROUP BY user_id
+"""
+
+VIOLATION_AGGREGATE_SQL = """
+    SELECT severity, violation_type, user_id, COUNT(*) FROM security_violations
+    WHERE timestamp BETWEEN ? AND ?
+    GROUP BY severity, violation_type, user_id
+"""
+
+SELECT_AUDIT_EVENTS_PAGE_SQL = """
+    SELECT event_id, event_type, user_id, username, email, access_level,
+           timestamp, operation, resource, result, data_summary,
+           security_level, compliance_tags, risk_score, metadata,
+           ip_address, session_id
+    FROM audit_events
+    WHERE timestamp BETWEEN ? AND ? AND (timestamp, event_id) > (?, ?)
+    ORDER BY timestamp, event_id
+    LIMIT ?
+"""
+
 class SecurityLevel(Enum):
     """Security levels for operations"""
     PUBLIC = "public"
     INTERNAL = "internal"
     CONFIDENTIAL = "confidential"
     RESTRICTED = "restricted"
+    CRITICAL = "critical"  # Audit rows are committed before the operation returns
 
 class AuditEventType(Enum):
     """Types of audit events"""
@@ -85,6 +158,7 @@ class UserContext:
     department: Optional[str] = None
     session_id: Optional[str] = None
     ip_address: Optional[str] = None
+    metadata: Dict[str, Any] = field(default_factory=dict)
 
 @dataclass
 class AuditEvent:
@@ -128,6 +202,28 @@ class ComplianceReport:
     recommendations: List[str]
     details: Dict[str, Any] = field(default_factory=dict)
 
+@dataclass
+class CompliancePeriodStats:
+    """Audit and violation aggregates for a report period, computed in SQL"""
+    total_events: int = 0
+    event_types: Dict[str, int] = field(default_factory=dict)
+    results: Dict[str, int] = field(default_factory=dict)
+    security_levels: Dict[str, int] = field(default_factory=dict)
+    daily: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    user_activity: Dict[str, int] = field(default_factory=dict)
+    risk_distribution: Dict[str, int] = field(default_factory=dict)
+    risk_over_7: int = 0
+    risk_over_8: int = 0
+    data_processing: int = 0
+    consent_events: int = 0
+    total_violations: int = 0
+    violations_by_severity: Dict[str, int] = field(default_factory=dict)
+    violations_by_type: Dict[str, int] = field(default_factory=dict)
+    violations_by_user: Dict[str, int] = field(default_factory=dict)
+    
+    def events_of(self, *event_types: AuditEventType) -> int:
+        return sum(self.event_types.get(t.value, 0) for t in event_types)
+
 class SecurityComplianceLayer:
     """
     Comprehensive security and compliance framework that provides audit logging,
@@ -240,16 +336,35 @@ class SecurityComplianceLayer:
             "data_export": (3, 3600)         # 3 exports per hour
         }
         
+        # Per-user sliding-window counters for the behavioural checks
+        self.activity_windows = SecurityWindowIndex(
+            max_users=int(os.getenv("SECURITY_WINDOW_MAX_USERS", "10000"))
+        )
+        
         # Initialize system
         self._initialize_audit_database()
         self._load_security_configuration()
         
+        # Background batch writer for audit rows (keeps fsyncs off the request path)
+        self.audit_sink = AuditSink(
+            self.audit_db_path,
+            statements={
+                "audit_event": INSERT_AUDIT_EVENT_SQL,
+                "security_violation": INSERT_SECURITY_VIOLATION_SQL
+            },
+            capacity=int(os.getenv("AUDIT_BUFFER_CAPACITY", "10000")),
+            max_batch=int(os.getenv("AUDIT_FLUSH_BATCH", "256")),
+            max_age=float(os.getenv("AUDIT_FLUSH_INTERVAL", "0.5")),
+            durability=AuditDurability(os.getenv("AUDIT_DURABILITY", AuditDurability.FLUSH_ON_CRITICAL.value))
+        )
+        
         logger.info("🔒 Security and Compliance Layer initialized")
     
     def _initialize_audit_database(self):
         """Initialize audit database"""
         try:
             conn = sqlite3.connect(self.audit_db_path)
+            conn.execute("PRAGMA journal_mode=WAL")
             cursor = conn.cursor()
             
             # Audit events table
@@ -299,6 +414,8 @@ class SecurityComplianceLayer:
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_audit_operation ON audit_events(operation)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_violations_user_id ON security_violations(user_id)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_violations_timestamp ON security_violations(timestamp)")
+            cursor.execute(CREATE_AUDIT_REPORT_INDEX_SQL)
+            cursor.execute(CREATE_VIOLATION_REPORT_INDEX_SQL)
             
             conn.commit()
             conn.close()
@@ -384,6 +501,11 @@ class SecurityComplianceLayer:
             
             # Add to in-memory buffer
             self.audit_events.append(event)
+            rate_limit = self._find_rate_limit(operation)
+            self.activity_windows.record(
+                user_context.user_id, event.timestamp,
+                (rate_limit[0], rate_limit[1][1]) if rate_limit else None
+            )
             
             # Check for security violations
             if self.violation_detection_enabled:
@@ -397,20 +519,31 @@ class SecurityComplianceLayer:
             logger.error(f"❌ Error logging audit event: {e}")
             return ""
     
+    async def audit_operation_async(self, event_type: AuditEventType, user_context: UserContext,
+                                    operation: str, resource: str, result: str,
+                                    data_summary: Dict[str, Any] = None,
+                                    security_level: SecurityLevel = SecurityLevel.INTERNAL,
+                                    compliance_tags: List[str] = None) -> str:
+        """
+        audit_operation for async callers
+        
+        Only calls that wait for a commit (every row in sync mode, critical
+        rows in flush-on-critical mode) run on a worker thread; everything
+        else is queued inline without leaving the event loop.
+        """
+        args = (event_type, user_context, operation, resource, result,
+                data_summary, security_level, compliance_tags)
+        durability = self.audit_sink.durability
+        if durability == AuditDurability.SYNC or (
+            durability == AuditDurability.FLUSH_ON_CRITICAL and security_level == SecurityLevel.CRITICAL
+        ):
+            return await asyncio.to_thread(self.audit_operation, *args)
+        return self.audit_operation(*args)
+    
     def _store_audit_event(self, event: AuditEvent):
-        """Store audit event in database"""
+        """Queue audit event for the background writer (waits for the commit when critical)"""
         try:
-            conn = sqlite3.connect(self.audit_db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                INSERT INTO audit_events (
-                    event_id, event_type, user_id, username, email, access_level,
-                    timestamp, operation, resource, result, data_summary,
-                    security_level, compliance_tags, risk_score, metadata,
-                    ip_address, session_id
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
+            self.audit_sink.write("audit_event", (
                 event.event_id,
                 event.event_type.value,
                 event.user_context.user_id,
@@ -428,10 +561,7 @@ class SecurityComplianceLayer:
                 json.dumps(event.metadata),
                 event.user_context.ip_address,
                 event.user_context.session_id
-            ))
-            
-            conn.commit()
-            conn.close()
+            ), critical=event.security_level == SecurityLevel.CRITICAL)
             
         except Exception as e:
             logger.error(f"❌ Error storing audit event: {e}")
@@ -583,39 +713,20 @@ class SecurityComplianceLayer:
     def _check_unusual_access_pattern(self, event: AuditEvent) -> bool:
         """Check for unusual access patterns"""
         try:
-            current_time = datetime.now()
+            current_time = event.timestamp
             user_id = event.user_context.user_id
             
-            # Check recent events for this user
-            recent_events = [
-                e for e in self.audit_events
-                if e.user_context.user_id == user_id and
-                e.timestamp > current_time - timedelta(hours=1)
-            ]
-            
             # Check for rapid-fire operations
-            if len(recent_events) > 50:  # More than 50 operations in an hour
+            if self.activity_windows.events_last_hour(user_id, current_time) > 50:  # More than 50 operations in an hour
                 return True
             
             # Check for operations outside normal hours
-            if current_time.hour < 6 or current_time.hour > 22:
+            if not is_normal_hour(current_time.hour):
                 # Check if user normally works these hours
-                normal_hour_events = [
-                    e for e in self.audit_events
-                    if e.user_context.user_id == user_id and
-                    6 <= e.timestamp.hour <= 22 and
-                    e.timestamp > current_time - timedelta(days=30)
-                ]
-                
-                off_hour_events = [
-                    e for e in self.audit_events
-                    if e.user_context.user_id == user_id and
-                    (e.timestamp.hour < 6 or e.timestamp.hour > 22) and
-                    e.timestamp > current_time - timedelta(days=30)
-                ]
+                normal_hour_events, off_hour_events = self.activity_windows.hour_profile_30d(user_id, current_time)
                 
                 # If user rarely works off hours but is doing so now
-                if len(normal_hour_events) > 10 and len(off_hour_events) < 3:
+                if normal_hour_events > 10 and off_hour_events < 3:
                     return True
             
             return False
@@ -650,35 +761,29 @@ class SecurityComplianceLayer:
             logger.error(f"❌ Error checking privilege escalation: {e}")
             return False
     
+    def _find_rate_limit(self, operation: str) -> Optional[Tuple[str, Tuple[int, int]]]:
+        """First configured rate limit whose pattern appears in the operation"""
+        operation_type = operation.lower()
+        for op_pattern, config in self.rate_limit_windows.items():
+            if op_pattern in operation_type:
+                return op_pattern, config
+        return None
+    
     def _check_rate_limit_violation(self, event: AuditEvent) -> bool:
         """Check for rate limit violations"""
         try:
-            current_time = datetime.now()
-            user_id = event.user_context.user_id
-            operation_type = event.operation.lower()
-            
-            # Find applicable rate limit
-            rate_limit_config = None
-            for op_pattern, config in self.rate_limit_windows.items():
-                if op_pattern in operation_type:
-                    rate_limit_config = config
-                    break
-            
-            if not rate_limit_config:
+            rate_limit = self._find_rate_limit(event.operation)
+            if not rate_limit:
                 return False
             
-            max_operations, window_seconds = rate_limit_config
-            window_start = current_time - timedelta(seconds=window_seconds)
+            op_pattern, (max_operations, _) = rate_limit
             
-            # Count recent operations of this type by this user
-            recent_operations = [
-                e for e in self.audit_events
-                if e.user_context.user_id == user_id and
-                e.timestamp > window_start and
-                operation_type in e.operation.lower()
-            ]
+            # Operations under this limit by this user within its window
+            recent_operations = self.activity_windows.rate_count(
+                event.user_context.user_id, op_pattern, event.timestamp
+            )
             
-            return len(recent_operations) >= max_operations
+            return recent_operations >= max_operations
             
         except Exception as e:
             logger.error(f"❌ Error checking rate limit violation: {e}")
@@ -717,17 +822,9 @@ class SecurityComplianceLayer:
             logger.error(f"❌ Error creating security violation: {e}")
     
     def _store_security_violation(self, violation: SecurityViolation):
-        """Store security violation in database"""
+        """Queue security violation for the background writer (waits for the commit when critical)"""
         try:
-            conn = sqlite3.connect(self.audit_db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                INSERT INTO security_violations (
-                    violation_id, violation_type, user_id, username, timestamp,
-                    severity, description, detection_method, context
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
+            self.audit_sink.write("security_violation", (
                 violation.violation_id,
                 violation.violation_type,
                 violation.user_context.user_id,
@@ -737,10 +834,7 @@ class SecurityComplianceLayer:
                 violation.description,
                 violation.detection_method,
                 json.dumps(violation.context)
-            ))
-            
-            conn.commit()
-            conn.close()
+            ), critical=violation.severity == "critical")
             
         except Exception as e:
             logger.error(f"❌ Error storing security violation: {e}")
@@ -811,20 +905,17 @@ class SecurityComplianceLayer:
         try:
             report_id = str(uuid.uuid4())
             
-            # Get audit events for period
-            period_events = self._get_audit_events_for_period(period_start, period_end)
-            
-            # Get violations for period
-            period_violations = self._get_violations_for_period(period_start, period_end)
+            # Aggregate audit events and violations for the period in SQL
+            stats = self._aggregate_period(period_start, period_end)
             
             # Calculate compliance score
-            compliance_score = self._calculate_compliance_score(framework, period_events, period_violations)
+            compliance_score = self._calculate_compliance_score(framework, stats)
             
             # Generate recommendations
-            recommendations = self._generate_compliance_recommendations(framework, period_events, period_violations)
+            recommendations = self._generate_compliance_recommendations(framework, stats)
             
             # Create detailed analysis
-            details = self._analyze_compliance_details(framework, period_events, period_violations)
+            details = self._analyze_compliance_details(framework, stats)
             
             report = ComplianceReport(
                 report_id=report_id,
@@ -833,8 +924,8 @@ class SecurityComplianceLayer:
                 period_end=period_end,
                 generated_at=datetime.now(),
                 compliance_score=compliance_score,
-                audit_events=len(period_events),
-                violations=len(period_violations),
+                audit_events=stats.total_events,
+                violations=stats.total_violations,
                 recommendations=recommendations,
                 details=details
             )
@@ -850,145 +941,163 @@ class SecurityComplianceLayer:
             logger.error(f"❌ Error generating compliance report: {e}")
             return None
     
-    def _get_audit_events_for_period(self, start: datetime, end: datetime) -> List[AuditEvent]:
-        """Get audit events for specified period"""
+    def _aggregate_period(self, start: datetime, end: datetime) -> CompliancePeriodStats:
+        """
+        Aggregate a period's audit events and violations with GROUP BY queries
+        
+        Memory is proportional to the number of distinct days, event types,
+        results, security levels and users, not to the number of events.
+        """
+        self.audit_sink.flush()
+        bounds = (start.isoformat(), end.isoformat())
+        stats = CompliancePeriodStats()
+        
+        conn = sqlite3.connect(self.audit_db_path)
         try:
-            conn = sqlite3.connect(self.audit_db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                SELECT * FROM audit_events 
-                WHERE timestamp BETWEEN ? AND ?
-                ORDER BY timestamp
-            """, (start.isoformat(), end.isoformat()))
-            
-            rows = cursor.fetchall()
-            conn.close()
-            
-            # Convert to AuditEvent objects
-            events = []
-            for row in rows:
-                user_context = UserContext(
-                    user_id=row[2],
-                    username=row[3],
-                    email=row[4],
-                    access_level=AccessLevel(row[5]),
-                    ip_address=row[15],
-                    session_id=row[16]
-                )
+            for (day, event_type, result, security_level, events, risk_low, risk_medium, risk_high,
+                 risk_over_7, risk_over_8, data_processing, consent) in conn.execute(AUDIT_DAILY_AGGREGATE_SQL, bounds):
+                stats.total_events += events
+                stats.event_types[event_type] = stats.event_types.get(event_type, 0) + events
+                stats.results[result] = stats.results.get(result, 0) + events
+                stats.security_levels[security_level] = stats.security_levels.get(security_level, 0) + events
                 
-                event = AuditEvent(
-                    event_id=row[0],
-                    event_type=AuditEventType(row[1]),
-                    user_context=user_context,
-                    timestamp=datetime.fromisoformat(row[6]),
-                    operation=row[7],
-                    resource=row[8],
-                    result=row[9],
-                    data_summary=json.loads(row[10]) if row[10] else {},
-                    security_level=SecurityLevel(row[11]),
-                    compliance_tags=json.loads(row[12]) if row[12] else [],
-                    risk_score=row[13] or 0.0,
-                    metadata=json.loads(row[14]) if row[14] else {}
-                )
-                events.append(event)
-            
-            return events
-            
-        except Exception as e:
-            logger.error(f"❌ Error getting audit events for period: {e}")
-            return []
+                daily = stats.daily.setdefault(day, {"events": 0, "failures": 0, "high_risk": 0})
+                daily["events"] += events
+                daily["high_risk"] += risk_high
+                if result == "failure":
+                    daily["failures"] += events
+                
+                for risk_level, count in (("low", risk_low), ("medium", risk_medium), ("high", risk_high)):
+                    if count:
+                        stats.risk_distribution[risk_level] = stats.risk_distribution.get(risk_level, 0) + count
+                stats.risk_over_7 += risk_over_7
+                stats.risk_over_8 += risk_over_8
+                stats.data_processing += data_processing
+                stats.consent_events += consent
+            
+            stats.user_activity = dict(conn.execute(AUDIT_USER_AGGREGATE_SQL, bounds).fetchall())
+            
+            for severity, violation_type, user_id, count in conn.execute(VIOLATION_AGGREGATE_SQL, bounds):
+                stats.total_violations += count
+                stats.violations_by_severity[severity] = stats.violations_by_severity.get(severity, 0) + count
+                stats.violations_by_type[violation_type] = stats.violations_by_type.get(violation_type, 0) + count
+                stats.violations_by_user[user_id] = stats.violations_by_user.get(user_id, 0) + count
+        finally:
+            conn.close()
+        
+        stats.daily = dict(sorted(stats.daily.items()))
+        return stats
+    
+    def _row_to_audit_event(self, row: Tuple) -> AuditEvent:
+        """Build an AuditEvent from an audit_events row (SELECT_AUDIT_EVENTS_PAGE_SQL column order)"""
+        user_context = UserContext(
+            user_id=row[2],
+            username=row[3],
+            email=row[4],
+            access_level=AccessLevel(row[5]),
+            ip_address=row[15],
+            session_id=row[16]
+        )
+        
+        return AuditEvent(
+            event_id=row[0],
+            event_type=AuditEventType(row[1]),
+            user_context=user_context,
+            timestamp=datetime.fromisoformat(row[6]),
+            operation=row[7],
+            resource=row[8],
+            result=row[9],
+            data_summary=json.loads(row[10]) if row[10] else {},
+            security_level=SecurityLevel(row[11]),
+            compliance_tags=json.loads(row[12]) if row[12] else [],
+            risk_score=row[13] or 0.0,
+            metadata=json.loads(row[14]) if row[14] else {}
+        )
     
-    def _get_violations_for_period(self, start: datetime, end: datetime) -> List[SecurityViolation]:
-        """Get security violations for specified period"""
+    def get_audit_events_page(self, start: datetime, end: datetime, limit: int = 500,
+                              cursor: Optional[str] = None) -> Tuple[List[AuditEvent], Optional[str]]:
+        """
+        One page of a period's audit events, oldest first
+        
+        Pages are keyed on (timestamp, event_id) rather than OFFSET, so every
+        page costs the same no matter how deep into the period it is.
+        
+        Args:
+            start: Period start
+            end: Period end
+            limit: Events per page
+            cursor: Cursor returned with the previous page (None for the first page)
+            
+        Returns:
+            (events, cursor for the next page or None when exhausted)
+        """
+        after_timestamp, after_event_id = cursor.split("|", 1) if cursor else ("", "")
+        
+        conn = sqlite3.connect(self.audit_db_path)
         try:
-            conn = sqlite3.connect(self.audit_db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                SELECT * FROM security_violations 
-                WHERE timestamp BETWEEN ? AND ?
-                ORDER BY timestamp
-            """, (start.isoformat(), end.isoformat()))
-            
-            rows = cursor.fetchall()
+            rows = conn.execute(SELECT_AUDIT_EVENTS_PAGE_SQL, (
+                start.isoformat(), end.isoformat(), after_timestamp, after_event_id, limit
+            )).fetchall()
+        finally:
             conn.close()
-            
-            # Convert to SecurityViolation objects
-            violations = []
-            for row in rows:
-                user_context = UserContext(
-                    user_id=row[2],
-                    username=row[3],
-                    email="",  # Not stored in violations table
-                    access_level=AccessLevel.STANDARD_USER  # Default
-                )
-                
-                violation = SecurityViolation(
-                    violation_id=row[0],
-                    violation_type=row[1],
-                    user_context=user_context,
-                    timestamp=datetime.fromisoformat(row[4]),
-                    severity=row[5],
-                    description=row[6],
-                    detection_method=row[7],
-                    context=json.loads(row[8]) if row[8] else {}
-                )
-                violations.append(violation)
-            
-            return violations
-            
-        except Exception as e:
-            logger.error(f"❌ Error getting violations for period: {e}")
-            return []
+        
+        events = [self._row_to_audit_event(row) for row in rows]
+        next_cursor = f"{rows[-1][6]}|{rows[-1][0]}" if len(rows) == limit else None
+        return events, next_cursor
+    
+    def iter_audit_events(self, start: datetime, end: datetime, page_size: int = 500):
+        """Stream a period's audit events page by page in constant memory"""
+        self.audit_sink.flush()
+        cursor = None
+        while True:
+            events, cursor = self.get_audit_events_page(start, end, limit=page_size, cursor=cursor)
+            yield from events
+            if cursor is None:
+                return
     
     def _calculate_compliance_score(self, framework: ComplianceFramework,
-                                  events: List[AuditEvent], violations: List[SecurityViolation]) -> float:
+                                  stats: CompliancePeriodStats) -> float:
         """Calculate compliance score based on framework requirements"""
         try:
             score = 100.0
+            by_severity = stats.violations_by_severity
             
             if framework == ComplianceFramework.SOC2:
                 # SOC2 focuses on security controls
-                if violations:
+                if stats.total_violations:
                     # Deduct points for violations
-                    high_severity = len([v for v in violations if v.severity == "high"])
-                    medium_severity = len([v for v in violations if v.severity == "medium"])
-                    low_severity = len([v for v in violations if v.severity == "low"])
+                    high_severity = by_severity.get("high", 0)
+                    medium_severity = by_severity.get("medium", 0)
+                    low_severity = by_severity.get("low", 0)
                     
                     score -= (high_severity * 15 + medium_severity * 8 + low_severity * 3)
                 
                 # Check for required audit coverage
                 required_events = ["document_upload", "document_delete", "system_config"]
                 for required_event in required_events:
-                    if not any(e.event_type.value == required_event for e in events):
+                    if not stats.event_types.get(required_event):
                         score -= 10
             
             elif framework == ComplianceFramework.GDPR:
                 # GDPR focuses on data protection
-                data_processing_events = [e for e in events if "data" in e.operation.lower()]
-                
-                if data_processing_events:
+                if stats.data_processing:
                     # Check for consent tracking
-                    consent_events = [e for e in events if "consent" in str(e.compliance_tags)]
-                    if len(consent_events) < len(data_processing_events) * 0.8:
+                    if stats.consent_events < stats.data_processing * 0.8:
                         score -= 20
                 
                 # Check for data minimization
-                high_risk_events = [e for e in events if e.risk_score > 7.0]
-                if len(high_risk_events) > len(events) * 0.1:
+                if stats.risk_over_7 > stats.total_events * 0.1:
                     score -= 15
             
             elif framework == ComplianceFramework.HIPAA:
                 # HIPAA focuses on healthcare data protection
-                if violations:
+                if stats.total_violations:
                     # HIPAA has stricter violation penalties
-                    critical_violations = len([v for v in violations if v.severity in ["high", "critical"]])
+                    critical_violations = by_severity.get("high", 0) + by_severity.get("critical", 0)
                     score -= critical_violations * 25
                 
                 # Check for access logging
-                access_events = [e for e in events if e.event_type == AuditEventType.USER_ACCESS]
-                if len(access_events) < len(events) * 0.1:
+                if stats.events_of(AuditEventType.USER_ACCESS) < stats.total_events * 0.1:
                     score -= 20
             
             return max(score, 0.0)
@@ -998,17 +1107,17 @@ class SecurityComplianceLayer:
             return 0.0
     
     def _generate_compliance_recommendations(self, framework: ComplianceFramework,
-                                           events: List[AuditEvent], violations: List[SecurityViolation]) -> List[str]:
+                                           stats: CompliancePeriodStats) -> List[str]:
         """Generate compliance recommendations"""
         recommendations = []
         
         try:
-            if violations:
-                recommendations.append(f"Address {len(violations)} security violations identified in the audit period")
+            if stats.total_violations:
+                recommendations.append(f"Address {stats.total_violations} security violations identified in the audit period")
                 
-                high_severity_violations = [v for v in violations if v.severity == "high"]
+                high_severity_violations = stats.violations_by_severity.get("high", 0)
                 if high_severity_violations:
-                    recommendations.append(f"Prioritize resolution of {len(high_severity_violations)} high-severity violations")
+                    recommendations.append(f"Prioritize resolution of {high_severity_violations} high-severity violations")
             
             if framework == ComplianceFramework.SOC2:
                 recommendations.extend([
@@ -1032,13 +1141,11 @@ class SecurityComplianceLayer:
                 ])
             
             # Add general recommendations based on audit analysis
-            if events:
-                failed_events = [e for e in events if e.result == "failure"]
-                if len(failed_events) > len(events) * 0.1:
+            if stats.total_events:
+                if stats.results.get("failure", 0) > stats.total_events * 0.1:
                     recommendations.append("Investigate high failure rate in operations")
                 
-                high_risk_events = [e for e in events if e.risk_score > 8.0]
-                if high_risk_events:
+                if stats.risk_over_8:
                     recommendations.append("Review high-risk operations and implement additional controls")
             
         except Exception as e:
@@ -1047,66 +1154,41 @@ class SecurityComplianceLayer:
         return recommendations
     
     def _analyze_compliance_details(self, framework: ComplianceFramework,
-                                  events: List[AuditEvent], violations: List[SecurityViolation]) -> Dict[str, Any]:
+                                  stats: CompliancePeriodStats) -> Dict[str, Any]:
         """Analyze compliance details"""
         try:
             details = {
                 "audit_summary": {
-                    "total_events": len(events),
-                    "event_types": {},
-                    "user_activity": {},
-                    "risk_distribution": {}
+                    "total_events": stats.total_events,
+                    "event_types": stats.event_types,
+                    "user_activity": stats.user_activity,
+                    "risk_distribution": stats.risk_distribution,
+                    "results": stats.results,
+                    "security_levels": stats.security_levels,
+                    "daily": stats.daily
                 },
                 "violation_summary": {
-                    "total_violations": len(violations),
-                    "by_severity": {},
-                    "by_type": {},
-                    "by_user": {}
+                    "total_violations": stats.total_violations,
+                    "by_severity": stats.violations_by_severity,
+                    "by_type": stats.violations_by_type,
+                    "by_user": stats.violations_by_user
                 },
                 "compliance_metrics": {}
             }
             
-            # Analyze audit events
-            for event in events:
-                # Event types
-                event_type = event.event_type.value
-                details["audit_summary"]["event_types"][event_type] = details["audit_summary"]["event_types"].get(event_type, 0) + 1
-                
-                # User activity
-                user_id = event.user_context.user_id
-                details["audit_summary"]["user_activity"][user_id] = details["audit_summary"]["user_activity"].get(user_id, 0) + 1
-                
-                # Risk distribution
-                risk_level = "low" if event.risk_score < 3 else "medium" if event.risk_score < 7 else "high"
-                details["audit_summary"]["risk_distribution"][risk_level] = details["audit_summary"]["risk_distribution"].get(risk_level, 0) + 1
-            
-            # Analyze violations
-            for violation in violations:
-                # By severity
-                severity = violation.severity
-                details["violation_summary"]["by_severity"][severity] = details["violation_summary"]["by_severity"].get(severity, 0) + 1
-                
-                # By type
-                v_type = violation.violation_type
-                details["violation_summary"]["by_type"][v_type] = details["violation_summary"]["by_type"].get(v_type, 0) + 1
-                
-                # By user
-                user_id = violation.user_context.user_id
-                details["violation_summary"]["by_user"][user_id] = details["violation_summary"]["by_user"].get(user_id, 0) + 1
-            
             # Framework-specific metrics
             if framework == ComplianceFramework.SOC2:
                 details["compliance_metrics"]["security_controls"] = {
-                    "access_logging": len([e for e in events if e.event_type == AuditEventType.USER_ACCESS]),
-                    "configuration_changes": len([e for e in events if e.event_type == AuditEventType.SYSTEM_CONFIG]),
-                    "data_access": len([e for e in events if e.event_type in [AuditEventType.DOCUMENT_QUERY, AuditEventType.DATA_EXPORT]])
+                    "access_logging": stats.events_of(AuditEventType.USER_ACCESS),
+                    "configuration_changes": stats.events_of(AuditEventType.SYSTEM_CONFIG),
+                    "data_access": stats.events_of(AuditEventType.DOCUMENT_QUERY, AuditEventType.DATA_EXPORT)
                 }
             
             elif framework == ComplianceFramework.GDPR:
                 details["compliance_metrics"]["data_protection"] = {
-                    "consent_events": len([e for e in events if "consent" in str(e.compliance_tags)]),
-                    "data_processing": len([e for e in events if "data" in e.operation.lower()]),
-                    "deletion_requests": len([e for e in events if e.event_type == AuditEventType.DOCUMENT_DELETE])
+                    "consent_events": stats.consent_events,
+                    "data_processing": stats.data_processing,
+                    "deletion_requests": stats.events_of(AuditEventType.DOCUMENT_DELETE)
                 }
             
             return details
@@ -1167,6 +1249,8 @@ class SecurityComplianceLayer:
             "recent_violations_24h": len(recent_violations),
             "recent_high_risk_events_24h": len(recent_high_risk_events),
             "active_sessions": len(self.active_sessions),
+            "audit_writer": self.audit_sink.get_stats(),
+            "activity_windows": self.activity_windows.get_stats(),
             "last_updated": current_time.isoformat()
         }
     
@@ -1206,7 +1290,7 @@ def audit_operation(event_type: AuditEventType, operation: str, resource: str =
             try:
                 # Check access permission
                 if not security_compliance_layer.check_access_permission(user_context, operation):
-                    security_compliance_layer.audit_operation(
+                    await security_compliance_layer.audit_operation_async(
                         AuditEventType.SECURITY_VIOLATION,
                         user_context,
                         operation,
@@ -1222,7 +1306,7 @@ def audit_operation(event_type: AuditEventType, operation: str, resource: str =
                 result = await func(*args, **kwargs)
                 
                 # Log successful operation
-                security_compliance_layer.audit_operation(
+                await security_compliance_layer.audit_operation_async(
                     event_type,
                     user_context,
                     operation,
@@ -1238,7 +1322,7 @@ def audit_operation(event_type: AuditEventType, operation: str, resource: str =
             except Exception as e:
                 # Log failed operation
                 error_message = security_compliance_layer.sanitize_error_message(str(e))
-                security_compliance_layer.audit_operation(
+                await security_compliance_layer.audit_operation_async(
                     event_type,
                     user_context,
                     operation,
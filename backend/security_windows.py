@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Security Windows - Sliding-Window Activity Counters
+===================================================
+
+Per-user, time-bucketed counters backing the behavioural violation checks in
+SecurityComplianceLayer. Each audit event is recorded once; afterwards
+"how many events did this user make in the last hour / 30 days / rate-limit
+window" is a constant-time lookup instead of a scan over the in-memory
+event history.
+
+Every counter is a fixed ring of buckets with a running total, so memory per
+user is bounded and independent of traffic. Counts are exact to bucket
+granularity: a window may include up to one bucket of events just older than
+its nominal edge.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+# Working hours used by the off-hours check (inclusive)
+NORMAL_HOURS = (6, 22)
+
+
+def is_normal_hour(hour: int) -> bool:
+    return NORMAL_HOURS[0] <= hour <= NORMAL_HOURS[1]
+
+
+class SlidingWindowCounter:
+    """Event count over the trailing `window_seconds`, kept in a ring of time buckets"""
+
+    __slots__ = ("window_seconds", "buckets", "bucket_seconds", "_counts", "_head", "total")
+
+    def __init__(self, window_seconds: float, buckets: int = 60):
+        """
+        Args:
+            window_seconds: Window length
+            buckets: Ring size; the window edge is accurate to window_seconds / buckets
+        """
+        self.window_seconds = window_seconds
+        self.buckets = buckets
+        self.bucket_seconds = window_seconds / buckets
+        self._counts = [0] * buckets
+        self._head: Optional[int] = None  # Newest bucket index seen
+        self.total = 0
+
+    def _advance(self, bucket: int):
+        """Move the head forward to `bucket`, expiring buckets that left the window"""
+        if self._head is None:
+            self._head = bucket
+            return
+        gap = bucket - self._head
+        if gap <= 0:
+            return
+        if gap >= self.buckets:
+            self._counts = [0] * self.buckets
+            self.total = 0
+        else:
+            for b in range(self._head + 1, bucket + 1):
+                slot = b % self.buckets
+                self.total -= self._counts[slot]
+                self._counts[slot] = 0
+        self._head = bucket
+
+    def add(self, timestamp: float, count: int = 1):
+        """Record `count` events at `timestamp` (seconds since the epoch)"""
+        bucket = int(timestamp // self.bucket_seconds)
+        self._advance(bucket)
+        if bucket <= self._head - self.buckets:
+            return  # Older than the whole window
+        self._counts[bucket % self.buckets] += count
+        self.total += count
+
+    def count(self, timestamp: float) -> int:
+        """Events within the window ending at `timestamp`"""
+        self._advance(int(timestamp // self.bucket_seconds))
+        return self.total
+
+
+class UserActivityWindows:
+    """All sliding-window counters for one user"""
+
+    __slots__ = ("last_hour", "normal_hours_30d", "off_hours_30d", "rate_windows")
+
+    def __init__(self):
+        self.last_hour = SlidingWindowCounter(3600, buckets=60)
+        self.normal_hours_30d = SlidingWindowCounter(30 * 86400, buckets=30)
+        self.off_hours_30d = SlidingWindowCounter(30 * 86400, buckets=30)
+        # Rate-limit key -> counter sized to that limit's window
+        self.rate_windows: Dict[str, SlidingWindowCounter] = {}
+
+
+class SecurityWindowIndex:
+    """Bounded map of user_id -> activity windows, least recently active users evicted first"""
+
+    def __init__(self, max_users: int = 10000):
+        """
+        Args:
+            max_users: Users tracked at once
+        """
+        self.max_users = max_users
+        self._users: "OrderedDict[str, UserActivityWindows]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"recorded": 0, "evicted_users": 0}
+
+    def _windows(self, user_id: str) -> UserActivityWindows:
+        windows = self._users.get(user_id)
+        if windows is None:
+            windows = UserActivityWindows()
+            self._users[user_id] = windows
+            if len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+                self.stats["evicted_users"] += 1
+        else:
+            self._users.move_to_end(user_id)
+        return windows
+
+    def record(self, user_id: str, timestamp: datetime,
+               rate_limit: Optional[Tuple[str, float]] = None):
+        """
+        Count one event for a user
+
+        Args:
+            user_id: Acting user
+            timestamp: Event time
+            rate_limit: (key, window_seconds) of the rate limit this event falls under
+        """
+        ts = timestamp.timestamp()
+        with self._lock:
+            windows = self._windows(user_id)
+            windows.last_hour.add(ts)
+            if is_normal_hour(timestamp.hour):
+                windows.normal_hours_30d.add(ts)
+            else:
+                windows.off_hours_30d.add(ts)
+            if rate_limit is not None:
+                key, window_seconds = rate_limit
+                counter = windows.rate_windows.get(key)
+                if counter is None or counter.window_seconds != window_seconds:
+                    # First use, or the limit was reconfigured
+                    counter = SlidingWindowCounter(window_seconds, buckets=60)
+                    windows.rate_windows[key] = counter
+                counter.add(ts)
+            self.stats["recorded"] += 1
+
+    def events_last_hour(self, user_id: str, now: datetime) -> int:
+        with self._lock:
+            windows = self._users.get(user_id)
+            return windows.last_hour.count(now.timestamp()) if windows else 0
+
+    def hour_profile_30d(self, user_id: str, now: datetime) -> Tuple[int, int]:
+        """
+        Returns:
+            (events in normal hours, events in off hours) over the last 30 days
+        """
+        ts = now.timestamp()
+        with self._lock:
+            windows = self._users.get(user_id)
+            if windows is None:
+                return 0, 0
+            return windows.normal_hours_30d.count(ts), windows.off_hours_30d.count(ts)
+
+    def rate_count(self, user_id: str, key: str, now: datetime) -> int:
+        """Events under rate limit `key` within that limit's window"""
+        with self._lock:
+            windows = self._users.get(user_id)
+            counter = windows.rate_windows.get(key) if windows else None
+            return counter.count(now.timestamp()) if counter else 0
+
+    def get_stats(self):
+        with self._lock:
+            return {**self.stats, "tracked_users": len(self._users), "max_users": self.max_users}
+
+
+def benchmark_checks(history: int, checks: int = 2000) -> float:
+    """
+    Time the three violation-check lookups after `history` recorded events
+
+    Args:
+        history: Events recorded for one user, one per second
+        checks: Lookup rounds to time
+
+    Returns:
+        Mean seconds per round of lookups
+    """
+    index = SecurityWindowIndex()
+    start = datetime(2026, 3, 2, 12, 0)
+    for i in range(history):
+        index.record("user", start + timedelta(seconds=i), rate_limit=("document_query", 60))
+    now = start + timedelta(seconds=history)
+    began = time.perf_counter()
+    for _ in range(checks):
+        index.events_last_hour("user", now)
+        index.hour_profile_30d("user", now)
+        index.rate_count("user", "document_query", now)
+    return (time.perf_counter() - began) / checks
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark violation-check latency against history size")
+    parser.add_argument("--history", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--checks", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for history in args.history:
+        seconds = min(benchmark_checks(history, args.checks) for _ in range(args.repeat))
+        print(f"history={history:>8}  per-check={seconds * 1e6:.2f}us")
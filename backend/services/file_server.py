@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+Range-Aware File Serving
+========================
+
+Serves files from disk for PDF preview and media playback:
+
+- Strong ETags built from inode, mtime and size, plus Last-Modified, with
+  If-None-Match / If-Modified-Since answered by a 304 before the file is opened
+- Single, suffix (bytes=-500), open-ended (bytes=100-) and multi-range
+  requests, the latter as multipart/byteranges; If-Range is honoured
+- Zero-copy transfer through the ASGI "http.response.zerocopy" extension
+  (sendfile) when the server offers it, otherwise large os.pread chunks in a
+  worker thread instead of a Python generator on the event loop
+- Short-lived stat cache so bursts of pdf.js range requests share one stat()
+"""
+
+import logging
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, List, Optional, Tuple
+
+import anyio
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+SEND_CHUNK_SIZE = 256 * 1024
+# More ranges than this in one request are served as the full file
+MAX_RANGES = 32
+
+
+class RangeNotSatisfiable(Exception):
+    """No requested range overlaps the file"""
+
+
+@dataclass(frozen=True)
+class FileInfo:
+    """Cached stat() result for a served file"""
+    path: str
+    size: int
+    mtime: float
+    etag: str
+    last_modified: str
+
+
+class FileStatCache:
+    """LRU cache of stat() results with a short TTL"""
+
+    def __init__(self, ttl: float = 2.0, max_entries: int = 1024):
+        """
+        Args:
+            ttl: Seconds a stat result is reused
+            max_entries: Paths kept before LRU eviction
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, FileInfo]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: str) -> FileInfo:
+        """
+        Stat a regular file, reusing a recent result
+
+        Raises:
+            FileNotFoundError: If the path is missing or not a regular file
+        """
+        now = time.monotonic()
+        with self._lock:
+            cached = self._entries.get(path)
+            if cached is not None and now - cached[0] < self.ttl:
+                self._entries.move_to_end(path)
+                return cached[1]
+
+        info = stat_file(path)
+        with self._lock:
+            self._entries[path] = (now, info)
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return info
+
+    def invalidate(self, path: Optional[str] = None):
+        """Forget one path (e.g. after a delete or overwrite) or everything"""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(path, None)
+
+
+def stat_file(path: str) -> FileInfo:
+    """stat() a regular file into a FileInfo with a strong validator"""
+    import stat as stat_module
+
+    st = os.stat(path)
+    if not stat_module.S_ISREG(st.st_mode):
+        raise FileNotFoundError(path)
+    return FileInfo(
+        path=path,
+        size=st.st_size,
+        mtime=st.st_mtime,
+        etag=f'"{st.st_ino:x}-{st.st_mtime_ns:x}-{st.st_size:x}"',
+        last_modified=formatdate(st.st_mtime, usegmt=True),
+    )
+
+
+def parse_range_header(range_header: str, size: int) -> Optional[List[Tuple[int, int]]]:
+    """
+    Parse a Range header into sorted, merged inclusive byte ranges
+
+    Args:
+        range_header: e.g. "bytes=0-499", "bytes=-500", "bytes=100-", "bytes=0-1,500-"
+        size: File size
+
+    Returns:
+        List of (start, end) inclusive ranges, or None if the header is
+        malformed or asks for too many ranges (serve the whole file)
+
+    Raises:
+        RangeNotSatisfiable: If the header is valid but no range overlaps the file
+    """
+    unit, _, spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or not spec.strip():
+        return None
+    if spec.count(",") >= MAX_RANGES:
+        return None
+
+    ranges = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        first, dash, last = part.partition("-")
+        if not dash:
+            return None
+        try:
+            if first == "":
+                # Suffix range: last N bytes
+                suffix = int(last)
+                if suffix <= 0:
+                    continue
+                start, end = max(size - suffix, 0), size - 1
+            else:
+                start = int(first)
+                end = int(last) if last else size - 1
+                if last and start > end:
+                    return None
+                end = min(end, size - 1)
+        except ValueError:
+            return None
+        if start < 0:
+            return None
+        if start < size and start <= end:
+            ranges.append((start, end))
+
+    if not ranges:
+        raise RangeNotSatisfiable()
+
+    ranges.sort()
+    merged = [ranges[0]]
+    for start, end in ranges[1:]:
+        last_start, last_end = merged[-1]
+        if start <= last_end + 1:
+            merged[-1] = (last_start, max(last_end, end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _etag_matches(header: str, etag: str, weak: bool) -> bool:
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if weak:
+            candidate = candidate[2:] if candidate.startswith("W/") else candidate
+        if candidate == etag:
+            return True
+    return False
+
+
+def is_not_modified(request_headers, info: FileInfo) -> bool:
+    """If-None-Match (weak comparison), else If-Modified-Since"""
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, info.etag, weak=True)
+    if_modified_since = request_headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(info.mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def if_range_allows(request_headers, info: FileInfo) -> bool:
+    """Whether a Range header may be honoured given If-Range (strong comparison)"""
+    if_range = request_headers.get("if-range")
+    if not if_range:
+        return True
+    if_range = if_range.strip()
+    if if_range.startswith('"') or if_range.startswith("W/"):
+        return if_range == info.etag
+    return if_range == info.last_modified
+
+
+class FileRangeResponse(Response):
+    """Full, single-range or multipart/byteranges response streamed from disk"""
+
+    def __init__(
+        self,
+        info: FileInfo,
+        media_type: str,
+        ranges: Optional[List[Tuple[int, int]]] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ):
+        """
+        Args:
+            info: Stat result of the file to send
+            media_type: Content-Type of the file
+            ranges: Inclusive byte ranges; None sends the whole file
+            headers: Extra response headers
+        """
+        self.info = info
+        self.file_media_type = media_type
+        self.ranges = ranges
+        self.background = None
+        self.boundary = None
+        self.parts: List[Tuple[bytes, int, int]] = []  # (part header, start, end)
+
+        if ranges is None:
+            self.status_code = 200
+            content_length = info.size
+            content_type = media_type
+        elif len(ranges) == 1:
+            self.status_code = 206
+            start, end = ranges[0]
+            content_length = end - start + 1
+            content_type = media_type
+        else:
+            self.status_code = 206
+            self.boundary = secrets.token_hex(12)
+            content_type = f"multipart/byteranges; boundary={self.boundary}"
+            content_length = 0
+            for start, end in ranges:
+                part_header = (
+                    f"--{self.boundary}\r\n"
+                    f"Content-Type: {media_type}\r\n"
+                    f"Content-Range: bytes {start}-{end}/{info.size}\r\n\r\n"
+                ).encode("latin-1")
+                self.parts.append((part_header, start, end))
+                content_length += len(part_header) + (end - start + 1) + 2
+            content_length += len(self._closing_boundary())
+
+        merged_headers = {
+            **(headers or {}),
+            "content-type": content_type,
+            "content-length": str(content_length),
+            "accept-ranges": "bytes",
+            "etag": info.etag,
+            "last-modified": info.last_modified,
+        }
+        if ranges is not None and len(ranges) == 1:
+            merged_headers["content-range"] = f"bytes {ranges[0][0]}-{ranges[0][1]}/{info.size}"
+        self.init_headers(merged_headers)
+
+    def _closing_boundary(self) -> bytes:
+        return f"--{self.boundary}--\r\n".encode("latin-1")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope.get("method", "GET").upper() == "HEAD":
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        zerocopy = "http.response.zerocopy" in scope.get("extensions", {})
+        with open(self.info.path, "rb") as f:
+            if self.ranges is None:
+                await self._send_span(send, f, 0, self.info.size, zerocopy, more_body=False)
+            elif self.boundary is None:
+                start, end = self.ranges[0]
+                await self._send_span(send, f, start, end - start + 1, zerocopy, more_body=False)
+            else:
+                for part_header, start, end in self.parts:
+                    await send({"type": "http.response.body", "body": part_header, "more_body": True})
+                    await self._send_span(send, f, start, end - start + 1, zerocopy, more_body=True)
+                    await send({"type": "http.response.body", "body": b"\r\n", "more_body": True})
+                await send({"type": "http.response.body", "body": self._closing_boundary(), "more_body": False})
+
+    @staticmethod
+    async def _send_span(send: Send, f, offset: int, count: int, zerocopy: bool, more_body: bool):
+        """Send `count` bytes from `offset`, zero-copy when the server supports it"""
+        if zerocopy:
+            await send({
+                "type": "http.response.zerocopy",
+                "file": f,
+                "offset": offset,
+                "count": count,
+                "more_body": more_body,
+            })
+            return
+
+        fd = f.fileno()
+        remaining = count
+        while remaining > 0:
+            chunk = await anyio.to_thread.run_sync(os.pread, fd, min(SEND_CHUNK_SIZE, remaining), offset)
+            if not chunk:
+                break  # File shrank underneath us
+            offset += len(chunk)
+            remaining -= len(chunk)
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        if not more_body:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+def build_file_response(
+    request: Request,
+    path: str,
+    media_type: str,
+    headers: Optional[Dict[str, str]] = None,
+    stat_cache: Optional[FileStatCache] = None,
+) -> Response:
+    """
+    200/206/304/416 response for a file on disk
+
+    Args:
+        request: Incoming request (Range and conditional headers are read from it)
+        path: File path (already validated by the caller)
+        media_type: Content-Type of the file
+        headers: Extra headers (CORS, Cache-Control, Content-Disposition)
+        stat_cache: Optional stat cache shared across requests
+
+    Raises:
+        FileNotFoundError: If the path is missing or not a regular file
+    """
+    info = stat_cache.get(path) if stat_cache is not None else stat_file(path)
+    headers = dict(headers or {})
+
+    if is_not_modified(request.headers, info):
+        return Response(status_code=304, headers={**headers, "etag": info.etag, "last-modified": info.last_modified})
+
+    ranges = None
+    range_header = request.headers.get("range")
+    if range_header and if_range_allows(request.headers, info):
+        try:
+            ranges = parse_range_header(range_header, info.size)
+        except RangeNotSatisfiable:
+            return Response(
+                status_code=416,
+                headers={**headers, "content-range": f"bytes */{info.size}", "accept-ranges": "bytes"},
+            )
+        if ranges is None:
+            logger.warning(f"Ignoring unsupported range header: {range_header}")
+        elif ranges == [(0, info.size - 1)]:
+            ranges = None  # Whole file requested; a plain 200 is cheaper for clients
+
+    return FileRangeResponse(info, media_type, ranges=ranges, headers=headers)
@@ -26,12 +26,8 @@ from enum import Enum
 import PyPDF2
 from io import BytesIO
 
-# Import existing PDF validation functions to preserve patterns
-try:
-    from main import is_valid_pdf, extract_pdf_text
-    PDF_VALIDATION_AVAILABLE = True
-except ImportError:
-    PDF_VALIDATION_AVAILABLE = False
+# PDFs are validated by parsing them into the shared artifact (see pdf_artifact)
+PDF_VALIDATION_AVAILABLE = True
 
 # Handle magic import gracefully
 try:
@@ -40,8 +36,20 @@ try:
 except ImportError:
     MAGIC_AVAILABLE = False
 
+try:
+    from services.upload_streamer import map_file
+    from services.pdf_artifact import ParsedDocument, PDFParseError, pdf_artifact_store
+except ImportError:
+    from .upload_streamer import map_file
+    from .pdf_artifact import ParsedDocument, PDFParseError, pdf_artifact_store
+
 logger = logging.getLogger(__name__)
 
+# Leading bytes used for magic-number checks and MIME sniffing
+HEADER_BYTES = 8192
+MAGIC_SNIFF_BYTES = 1024 * 1024
+SECURITY_SCAN_WINDOW = 1024 * 1024
+
 class FileType(Enum):
     """Supported file types with validation categories"""
     # Documents
@@ -250,13 +258,15 @@ class MultiFormatValidator:
             self.magic_available = False
             self.logger.info("python-magic not installed, using basic MIME detection")
     
-    def validate_file(self, filename: str, content: bytes) -> FileValidationResult:
+    def validate_file(self, filename: str, content: bytes,
+                      parsed: Optional[ParsedDocument] = None) -> FileValidationResult:
         """
         Validate file following existing Line Lead patterns
         
         Args:
             filename: Original filename
             content: File content bytes
+            parsed: Parsed PDF artifact, if the caller already has one
             
         Returns:
             FileValidationResult with validation outcome
@@ -282,7 +292,9 @@ class MultiFormatValidator:
                 return mime_result
             
             # Step 4: Content validation (following existing PDF pattern)
-            content_result = self._validate_content(file_type, content)
+            if file_type == FileType.PDF and parsed is None and PDF_VALIDATION_AVAILABLE:
+                parsed = self._parse_pdf_content(content)
+            content_result = self._validate_content(file_type, content, parsed)
             if content_result.result != ValidationResult.VALID:
                 return content_result
             
@@ -297,7 +309,7 @@ class MultiFormatValidator:
                 file_type=file_type,
                 detected_mime=self._detect_mime_type(content),
                 file_size=len(content),
-                metadata=self._extract_metadata(file_type, content)
+                metadata=self._extract_metadata(file_type, content, parsed)
             )
             
         except Exception as e:
@@ -308,6 +320,67 @@ class MultiFormatValidator:
                 file_size=len(content)
             )
     
+    def validate_path(self, filename: str, file_path: str, sha256: Optional[str] = None) -> FileValidationResult:
+        """
+        Validate a file already saved to disk through a read-only memory map
+        
+        PDFs are parsed once into the shared artifact cache, which the
+        extraction and citation stages read afterwards.
+        
+        Args:
+            filename: Original filename
+            file_path: Path of the saved file
+            sha256: Content hash if already known (e.g. from the upload stream)
+            
+        Returns:
+            FileValidationResult with validation outcome
+        """
+        parsed = None
+        if self._detect_file_type(filename) == FileType.PDF and PDF_VALIDATION_AVAILABLE:
+            try:
+                parsed = pdf_artifact_store.load_or_parse(file_path, sha256)
+            except PDFParseError as e:
+                self.logger.warning(f"PDF parse failed for {filename}: {e}")
+        with map_file(file_path) as mapped:
+            return self.validate_file(filename, mapped, parsed)
+    
+    def _parse_pdf_content(self, content: bytes) -> Optional[ParsedDocument]:
+        """Parse in-memory PDF content once, or None if it is not a readable PDF"""
+        try:
+            return pdf_artifact_store.load_or_parse_bytes(content)
+        except PDFParseError as e:
+            self.logger.warning(f"PDF parse failed: {e}")
+            return None
+    
+    def max_size_for(self, filename: str) -> Optional[int]:
+        """Maximum upload size for a filename's type, or None if unsupported"""
+        file_type = self._detect_file_type(filename)
+        return self.SUPPORTED_FORMATS[file_type]['max_size'] if file_type else None
+    
+    def check_header(self, filename: str, head: bytes) -> Optional[str]:
+        """
+        Early check on the first bytes of an upload, before the rest is received
+        
+        Args:
+            filename: Original filename
+            head: Leading bytes of the file
+            
+        Returns:
+            Error message if the upload should be rejected, else None
+        """
+        file_type = self._detect_file_type(filename)
+        if not file_type:
+            return f"Unsupported file type: {Path(filename).suffix}"
+        if not head:
+            return "File is empty"
+        # Text files can only be judged on the full content (a UTF-8 sequence may straddle the header)
+        if file_type in [FileType.TXT, FileType.MD, FileType.CSV]:
+            return None
+        mime_result = self._validate_mime_type(file_type, head)
+        if mime_result.result != ValidationResult.VALID:
+            return mime_result.error_message
+        return None
+    
     def _detect_file_type(self, filename: str) -> Optional[FileType]:
         """Detect file type from filename extension"""
         extension = Path(filename).suffix.lower()
@@ -348,17 +421,19 @@ class MultiFormatValidator:
     def _detect_mime_type(self, content: bytes) -> Optional[str]:
         """Detect MIME type from content"""
         try:
+            # Sniff only the leading bytes; content may be a memory-mapped file
+            head = bytes(content[:MAGIC_SNIFF_BYTES])
             if self.magic_available:
-                return self.magic_mime.from_buffer(content)
+                return self.magic_mime.from_buffer(head)
             else:
                 # Fallback to basic detection
-                if content.startswith(b'%PDF'):
+                if head.startswith(b'%PDF'):
                     return 'application/pdf'
-                elif content.startswith(b'PK'):
+                elif head.startswith(b'PK'):
                     return 'application/zip'  # Office documents are ZIP-based
-                elif content.startswith(b'\xff\xd8\xff'):
+                elif head.startswith(b'\xff\xd8\xff'):
                     return 'image/jpeg'
-                elif content.startswith(b'\x89PNG'):
+                elif head.startswith(b'\x89PNG'):
                     return 'image/png'
                 else:
                     return 'application/octet-stream'
@@ -388,7 +463,7 @@ class MultiFormatValidator:
                 if detected_mime in ['application/octet-stream', 'text/plain']:
                     # Try to validate as text by attempting to decode
                     try:
-                        content.decode('utf-8')
+                        bytes(content).decode('utf-8')
                         # If it decodes successfully, it's likely text
                         pass
                     except UnicodeDecodeError:
@@ -419,13 +494,15 @@ class MultiFormatValidator:
             detected_mime=detected_mime
         )
     
-    def _validate_content(self, file_type: FileType, content: bytes) -> FileValidationResult:
+    def _validate_content(self, file_type: FileType, content: bytes,
+                          parsed: Optional[ParsedDocument] = None) -> FileValidationResult:
         """Validate file content following existing patterns"""
+        head = bytes(content[:HEADER_BYTES])
         try:
             # PDF validation (preserve existing logic)
             if file_type == FileType.PDF:
                 if PDF_VALIDATION_AVAILABLE:
-                    if not is_valid_pdf(content):
+                    if parsed is None:
                         return FileValidationResult(
                             result=ValidationResult.INVALID_CONTENT,
                             file_type=file_type,
@@ -433,29 +510,22 @@ class MultiFormatValidator:
                         )
                     
                     # Check if text can be extracted
-                    try:
-                        text, pages = extract_pdf_text(content)
-                        if not text.strip():
-                            return FileValidationResult(
-                                result=ValidationResult.INVALID_CONTENT,
-                                file_type=file_type,
-                                error_message="No text could be extracted from PDF"
-                            )
-                        
-                        return FileValidationResult(
-                            result=ValidationResult.VALID,
-                            file_type=file_type,
-                            metadata={'pages': pages, 'text_length': len(text)}
-                        )
-                    except Exception as e:
+                    text = parsed.text
+                    if not text:
                         return FileValidationResult(
                             result=ValidationResult.INVALID_CONTENT,
                             file_type=file_type,
-                            error_message=f"PDF text extraction failed: {str(e)}"
+                            error_message="No text could be extracted from PDF"
                         )
+                    
+                    return FileValidationResult(
+                        result=ValidationResult.VALID,
+                        file_type=file_type,
+                        metadata={'pages': parsed.pages_count, 'text_length': len(text)}
+                    )
                 else:
                     # Basic PDF validation
-                    if not content.startswith(b'%PDF'):
+                    if not head.startswith(b'%PDF'):
                         return FileValidationResult(
                             result=ValidationResult.INVALID_CONTENT,
                             file_type=file_type,
@@ -464,7 +534,7 @@ class MultiFormatValidator:
             
             # Office documents validation
             elif file_type in [FileType.DOCX, FileType.XLSX, FileType.PPTX, FileType.DOCM, FileType.XLSM]:
-                if not content.startswith(b'PK'):
+                if not head.startswith(b'PK'):
                     return FileValidationResult(
                         result=ValidationResult.INVALID_CONTENT,
                         file_type=file_type,
@@ -473,7 +543,7 @@ class MultiFormatValidator:
             
             # Image validation
             elif file_type in [FileType.JPG, FileType.JPEG]:
-                if not content.startswith(b'\xff\xd8\xff'):
+                if not head.startswith(b'\xff\xd8\xff'):
                     return FileValidationResult(
                         result=ValidationResult.INVALID_CONTENT,
                         file_type=file_type,
@@ -481,7 +551,7 @@ class MultiFormatValidator:
                     )
             
             elif file_type == FileType.PNG:
-                if not content.startswith(b'\x89PNG'):
+                if not head.startswith(b'\x89PNG'):
                     return FileValidationResult(
                         result=ValidationResult.INVALID_CONTENT,
                         file_type=file_type,
@@ -489,7 +559,7 @@ class MultiFormatValidator:
                     )
             
             elif file_type == FileType.GIF:
-                if not content.startswith(b'GIF'):
+                if not head.startswith(b'GIF'):
                     return FileValidationResult(
                         result=ValidationResult.INVALID_CONTENT,
                         file_type=file_type,
@@ -500,7 +570,7 @@ class MultiFormatValidator:
             elif file_type in [FileType.TXT, FileType.MD, FileType.CSV]:
                 try:
                     # Try to decode as UTF-8
-                    text = content.decode('utf-8')
+                    text = bytes(content).decode('utf-8')
                     if not text.strip():
                         return FileValidationResult(
                             result=ValidationResult.INVALID_CONTENT,
@@ -527,7 +597,7 @@ class MultiFormatValidator:
                         )
                 
                 elif file_type == FileType.WAV:
-                    if not content.startswith(b'RIFF'):
+                    if not head.startswith(b'RIFF'):
                         return FileValidationResult(
                             result=ValidationResult.INVALID_CONTENT,
                             file_type=file_type,
@@ -535,7 +605,7 @@ class MultiFormatValidator:
                         )
                 
                 elif file_type == FileType.MP3:
-                    if not (content.startswith(b'ID3') or content.startswith(b'\xff\xfb')):
+                    if not (head.startswith(b'ID3') or head.startswith(b'\xff\xfb')):
                         return FileValidationResult(
                             result=ValidationResult.INVALID_CONTENT,
                             file_type=file_type,
@@ -567,20 +637,25 @@ class MultiFormatValidator:
             b'exec(',
         ]
         
-        for pattern in suspicious_patterns:
-            if pattern in content.lower():
-                return FileValidationResult(
-                    result=ValidationResult.SECURITY_RISK,
-                    file_type=file_type,
-                    error_message=f"Suspicious content detected: {pattern.decode('utf-8', errors='ignore')}"
-                )
+        # Scan in overlapping windows so large (memory-mapped) files are never lowercased whole
+        overlap = max(len(p) for p in suspicious_patterns) - 1
+        for start in range(0, max(len(content), 1), SECURITY_SCAN_WINDOW):
+            window = bytes(content[max(start - overlap, 0):start + SECURITY_SCAN_WINDOW]).lower()
+            for pattern in suspicious_patterns:
+                if pattern in window:
+                    return FileValidationResult(
+                        result=ValidationResult.SECURITY_RISK,
+                        file_type=file_type,
+                        error_message=f"Suspicious content detected: {pattern.decode('utf-8', errors='ignore')}"
+                    )
         
         return FileValidationResult(
             result=ValidationResult.VALID,
             file_type=file_type
         )
     
-    def _extract_metadata(self, file_type: FileType, content: bytes) -> Dict[str, Any]:
+    def _extract_metadata(self, file_type: FileType, content: bytes,
+                          parsed: Optional[ParsedDocument] = None) -> Dict[str, Any]:
         """Extract basic metadata from file"""
         metadata = {
             'file_type': file_type.value,
@@ -589,21 +664,20 @@ class MultiFormatValidator:
         }
         
         # PDF-specific metadata (preserve existing pattern)
-        if file_type == FileType.PDF and PDF_VALIDATION_AVAILABLE:
-            try:
-                text, pages = extract_pdf_text(content)
-                metadata.update({
-                    'pages': pages,
-                    'text_length': len(text),
-                    'has_text': bool(text.strip())
-                })
-            except:
-                pass
+        if file_type == FileType.PDF and parsed is not None:
+            text = parsed.text
+            metadata.update({
+                'pages': parsed.pages_count,
+                'text_length': len(text),
+                'has_text': bool(text),
+                'image_count': parsed.image_count,
+                'content_sha256': parsed.sha256
+            })
         
         # Text file metadata
         elif file_type in [FileType.TXT, FileType.MD, FileType.CSV]:
             try:
-                text = content.decode('utf-8')
+                text = bytes(content).decode('utf-8')
                 metadata.update({
                     'text_length': len(text),
                     'line_count': len(text.splitlines())
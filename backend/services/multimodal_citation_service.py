@@ -15,6 +15,11 @@ import base64
 from io import BytesIO
 import hashlib
 
+try:
+    from services.pdf_artifact import detect_table_candidates, pdf_artifact_store
+except ImportError:
+    from .pdf_artifact import detect_table_candidates, pdf_artifact_store
+
 logger = logging.getLogger(__name__)
 
 class CitationType:
@@ -225,10 +230,10 @@ class MultiModalCitationService:
             
             for doc_path in documents:
                 # Check if document is already indexed
-                if doc_path not in self.document_index:
+                if str(doc_path) not in self.document_index:
                     await self._index_document_content(doc_path)
                 
-                doc_index = self.document_index.get(doc_path, {})
+                doc_index = self.document_index.get(str(doc_path), {})
                 
                 # Search for matching content based on reference type
                 if ref_type == "diagram" or ref_type == "figure":
@@ -266,7 +271,7 @@ class MultiModalCitationService:
             documents = await self._find_relevant_documents(current_equipment)
             
             for doc_path in documents:
-                if doc_path not in self.document_index:
+                if str(doc_path) not in self.document_index:
                     await self._index_document_content(doc_path)
                 
                 # Check for equipment-specific visual patterns
@@ -310,44 +315,28 @@ class MultiModalCitationService:
     
     async def _index_document_content(self, doc_path: Path) -> None:
         """
-        Index document content for fast lookup
+        Index document content for fast lookup from the shared parsed artifact
         """
         try:
+            parsed = await pdf_artifact_store.aload_or_parse(doc_path)
+            
             doc_index = {
                 "pages": {},
                 "images": {},
-                "tables": {},
-                "text_blocks": {}
+                "tables": {}
             }
             
-            # Open PDF document
-            doc = fitz.open(str(doc_path))
-            
-            for page_num in range(len(doc)):
-                page = doc[page_num]
-                
-                # Extract text blocks
-                text_blocks = page.get_text("dict")
-                doc_index["text_blocks"][page_num] = text_blocks
-                
-                # Find images
-                image_list = page.get_images()
-                if image_list:
-                    doc_index["images"][page_num] = image_list
-                
-                # Find tables (approximate detection)
-                tables = self._detect_tables_on_page(page)
-                if tables:
-                    doc_index["tables"][page_num] = tables
-                
-                # Store page info
-                doc_index["pages"][page_num] = {
-                    "width": page.rect.width,
-                    "height": page.rect.height,
-                    "text": page.get_text()
+            for page in parsed.pages:
+                if page.image_xrefs:
+                    doc_index["images"][page.number] = page.image_xrefs
+                if page.table_candidates:
+                    doc_index["tables"][page.number] = page.table_candidates
+                doc_index["pages"][page.number] = {
+                    "width": page.width,
+                    "height": page.height,
+                    "text": page.text
                 }
             
-            doc.close()
             self.document_index[str(doc_path)] = doc_index
             
         except Exception as e:
@@ -620,24 +609,7 @@ class MultiModalCitationService:
         Simple table detection based on text layout
         """
         try:
-            text_dict = page.get_text("dict")
-            tables = []
-            
-            # Look for rectangular text arrangements that might be tables
-            for block in text_dict.get("blocks", []):
-                if "lines" in block:
-                    # Simple heuristic: if block has multiple lines with similar spacing
-                    lines = block["lines"]
-                    if len(lines) > 2:
-                        # Check for table-like structure
-                        y_positions = [line["bbox"][1] for line in lines]
-                        if len(set(y_positions)) == len(y_positions):  # Distinct Y positions
-                            tables.append({
-                                "bbox": block["bbox"],
-                                "lines": len(lines)
-                            })
-            
-            return tables
+            return detect_table_candidates(page.get_text("dict"))
             
         except Exception as e:
             logger.error(f"Table detection failed: {e}")
@@ -931,53 +903,34 @@ class MultiModalCitationService:
         Process a document to extract and cache visual citations
         """
         try:
-            import fitz
-            
             doc_key = str(doc_path)
             if doc_key in self.citation_cache:
                 return  # Already processed
             
             logger.info(f"🔍 Processing {doc_path.name} for visual citations...")
             
-            doc = fitz.open(str(doc_path))
+            # Image xrefs come from the shared parsed artifact; pixels are extracted on demand
+            parsed = await pdf_artifact_store.aload_or_parse(doc_path)
             citations = []
             
             # Process first 10 pages to find diagrams and images
-            for page_num in range(min(10, len(doc))):
-                page = doc[page_num]
-                
-                # Extract images
-                image_list = page.get_images()
-                for img_index, img in enumerate(image_list):
-                    try:
-                        # Get image data
-                        xref = img[0]
-                        pix = fitz.Pixmap(doc, xref)
-                        
-                        # Create visual citation with proper metadata
-                        citation = VisualCitation(
-                            citation_type=CitationType.DIAGRAM,
-                            source_document=doc_path.name,
-                            page_number=page_num + 1,
-                            reference_text=f"diagram on page {page_num + 1}",
-                            content_data=None,  # We'll extract this on demand
-                            timing="during_speech"
-                        )
-                        
-                        # Store metadata for later extraction
-                        citation.image_xref = xref
-                        citation.doc_path = str(doc_path)
-                        
-                        citations.append(citation)
-                        pix = None
-                        
-                        # Limit to 5 images per page for performance
-                        if img_index >= 4:
-                            break
-                            
-                    except Exception as img_error:
-                        logger.warning(f"Failed to process image {img_index} on page {page_num + 1}: {img_error}")
-                        continue
+            for page in parsed.pages[:10]:
+                # Limit to 5 images per page for performance
+                for img in page.image_xrefs[:5]:
+                    citation = VisualCitation(
+                        citation_type=CitationType.DIAGRAM,
+                        source_document=doc_path.name,
+                        page_number=page.number + 1,
+                        reference_text=f"diagram on page {page.number + 1}",
+                        content_data=None,  # We'll extract this on demand
+                        timing="during_speech"
+                    )
+                    
+                    # Store metadata for later extraction
+                    citation.image_xref = img[0]
+                    citation.doc_path = str(doc_path)
+                    
+                    citations.append(citation)
             
             # Cache citations
             self.citation_cache[doc_key] = citations
@@ -986,8 +939,6 @@ class MultiModalCitationService:
             # Store visual citations in Neo4j for persistence
             await self._store_visual_citations_in_neo4j(citations, doc_path)
             
-            doc.close()
-            
         except Exception as e:
             logger.error(f"Document processing failed for {doc_path}: {e}")
             self.citation_cache[str(doc_path)] = []  # Cache empty list to avoid reprocessing
@@ -0,0 +1,446 @@
+#!/usr/bin/env python3
+"""
+Parsed PDF Artifact
+===================
+
+Parses an uploaded PDF once - page texts, page dimensions, image xrefs and
+table candidates - and caches the result on disk keyed by the file's SHA-256,
+so validation, text extraction, search indexing and citation indexing share a
+single parse instead of each reopening the file. Parsing runs in a worker
+process so a large manual does not hold the GIL of the API process. The disk
+cache is held to a byte budget with least-recently-used eviction, and a
+document's artifact is dropped when the document is deleted.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# Bump when the parsed layout changes so stale artifacts are re-parsed
+ARTIFACT_VERSION = 1
+
+PDF_ARTIFACT_DIR = os.getenv("PDF_ARTIFACT_DIR", "../data/pdf_artifacts")
+# 0 parses in the calling process; otherwise size of the spawned parse pool
+PDF_PARSE_WORKERS = int(os.getenv("PDF_PARSE_WORKERS", "1"))
+PDF_ARTIFACT_MEMORY_ENTRIES = int(os.getenv("PDF_ARTIFACT_MEMORY_ENTRIES", "16"))
+PDF_ARTIFACT_MAX_BYTES = int(os.getenv("PDF_ARTIFACT_MAX_BYTES", str(512 * 1024 * 1024)))
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class PDFParseError(ValueError):
+    """The file could not be parsed as a PDF"""
+
+
+@dataclass
+class ParsedPage:
+    """One page of a parsed PDF (page numbers are 0-based)"""
+    number: int
+    width: float
+    height: float
+    text: str
+    image_xrefs: List[List[Any]] = field(default_factory=list)  # page.get_images() rows, xref first
+    table_candidates: List[Dict[str, Any]] = field(default_factory=list)  # {"bbox", "lines"}
+
+
+@dataclass
+class ParsedDocument:
+    """Everything downstream consumers read from a PDF, produced by one parse"""
+    sha256: str
+    parser: str
+    pages: List[ParsedPage]
+
+    @property
+    def pages_count(self) -> int:
+        return len(self.pages)
+
+    @property
+    def text(self) -> str:
+        """Full document text, pages separated by newlines"""
+        return "\n".join(page.text for page in self.pages).strip()
+
+    @property
+    def image_count(self) -> int:
+        return sum(len(page.image_xrefs) for page in self.pages)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"version": ARTIFACT_VERSION, **asdict(self)}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ParsedDocument":
+        return cls(
+            sha256=data["sha256"],
+            parser=data["parser"],
+            pages=[ParsedPage(**page) for page in data["pages"]],
+        )
+
+
+def file_sha256(path: Union[str, Path]) -> str:
+    """SHA-256 of a file, read in fixed-size chunks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def detect_table_candidates(text_dict: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Simple table detection based on text layout
+
+    Args:
+        text_dict: PyMuPDF page.get_text("dict") output
+
+    Returns:
+        Blocks with more than two lines on distinct baselines
+    """
+    tables = []
+    for block in text_dict.get("blocks", []):
+        lines = block.get("lines")
+        if lines and len(lines) > 2:
+            y_positions = [line["bbox"][1] for line in lines]
+            if len(set(y_positions)) == len(y_positions):
+                tables.append({"bbox": list(block["bbox"]), "lines": len(lines)})
+    return tables
+
+
+def text_from_dict(text_dict: Dict[str, Any]) -> str:
+    """
+    Plain page text rebuilt from a layout dict
+
+    Matches page.get_text() output: one line per layout line, in block order.
+
+    Args:
+        text_dict: PyMuPDF page.get_text("dict") output
+
+    Returns:
+        Page text
+    """
+    return "".join(
+        "".join(span.get("text", "") for span in line.get("spans", [])) + "\n"
+        for block in text_dict.get("blocks", []) if block.get("type", 0) == 0
+        for line in block.get("lines", [])
+    )
+
+
+def parse_pdf(source: Union[str, Path, bytes], sha256: Optional[str] = None) -> ParsedDocument:
+    """
+    Parse a PDF into a ParsedDocument
+
+    Uses PyMuPDF when installed (text, layout, images and tables), otherwise
+    PyPDF2 (text and page sizes only). Runs inside parse worker processes.
+
+    Args:
+        source: File path, or PDF bytes / memory map
+        sha256: Content hash if already known
+
+    Returns:
+        ParsedDocument
+
+    Raises:
+        PDFParseError: If the file is not a readable PDF
+    """
+    is_path = isinstance(source, (str, Path))
+    if sha256 is None:
+        sha256 = file_sha256(source) if is_path else hashlib.sha256(source).hexdigest()
+
+    try:
+        import fitz  # PyMuPDF
+    except ImportError:
+        fitz = None
+
+    try:
+        if fitz is not None:
+            return _parse_with_pymupdf(fitz, source, is_path, sha256)
+        return _parse_with_pypdf2(source, is_path, sha256)
+    except Exception as e:
+        raise PDFParseError(f"Failed to parse PDF: {e}") from e
+
+
+def _parse_with_pymupdf(fitz, source, is_path: bool, sha256: str) -> ParsedDocument:
+    doc = fitz.open(str(source)) if is_path else fitz.open(stream=bytes(source), filetype="pdf")
+    try:
+        pages = []
+        for page in doc:
+            # One layout pass per page feeds both the text and the table heuristic
+            text_dict = page.get_text("dict")
+            pages.append(ParsedPage(
+                number=page.number,
+                width=float(page.rect.width),
+                height=float(page.rect.height),
+                text=text_from_dict(text_dict),
+                image_xrefs=[list(image) for image in page.get_images()],
+                table_candidates=detect_table_candidates(text_dict),
+            ))
+        return ParsedDocument(sha256=sha256, parser="pymupdf", pages=pages)
+    finally:
+        doc.close()
+
+
+def _parse_with_pypdf2(source, is_path: bool, sha256: str) -> ParsedDocument:
+    import PyPDF2
+
+    try:
+        from services.upload_streamer import as_binary_stream
+    except ImportError:
+        from .upload_streamer import as_binary_stream
+
+    def _read(stream) -> ParsedDocument:
+        reader = PyPDF2.PdfReader(stream)
+        pages = []
+        for number, page in enumerate(reader.pages):
+            box = page.mediabox
+            pages.append(ParsedPage(
+                number=number,
+                width=float(box.width),
+                height=float(box.height),
+                text=page.extract_text() or "",
+            ))
+        return ParsedDocument(sha256=sha256, parser="pypdf2", pages=pages)
+
+    if is_path:
+        with open(source, "rb") as f:
+            return _read(f)
+    return _read(as_binary_stream(source))
+
+
+class PDFArtifactStore:
+    """Content-addressed cache of parsed PDFs with a worker-process parser"""
+
+    def __init__(
+        self,
+        cache_dir: str = PDF_ARTIFACT_DIR,
+        workers: int = PDF_PARSE_WORKERS,
+        memory_entries: int = PDF_ARTIFACT_MEMORY_ENTRIES,
+        max_disk_bytes: int = PDF_ARTIFACT_MAX_BYTES,
+    ):
+        """
+        Args:
+            cache_dir: Directory holding <sha256>.json artifacts
+            workers: Parse worker processes (0 parses in the calling process)
+            memory_entries: Recently used artifacts kept in memory
+            max_disk_bytes: Artifact bytes kept on disk before LRU eviction
+        """
+        self.cache_dir = Path(cache_dir)
+        self.workers = workers
+        self.memory_entries = memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: "OrderedDict[str, ParsedDocument]" = OrderedDict()
+        # sha256 -> artifact size, in least-recently-used-first order; built on first use
+        self._disk: Optional["OrderedDict[str, int]"] = None
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "parses": 0, "disk_evictions": 0}
+
+    def _artifact_path(self, sha256: str) -> Path:
+        return self.cache_dir / f"{sha256}.json"
+
+    def _disk_index(self) -> "OrderedDict[str, int]":
+        """LRU order of on-disk artifacts, rebuilt from modification times (caller holds the lock)"""
+        if self._disk is None:
+            self._disk = OrderedDict()
+            files = []
+            try:
+                for entry in os.scandir(self.cache_dir):
+                    if entry.is_file() and entry.name.endswith(".json"):
+                        stat = entry.stat()
+                        files.append((stat.st_mtime, entry.name[:-len(".json")], stat.st_size))
+            except FileNotFoundError:
+                pass
+            for _, sha256, size in sorted(files):
+                self._disk[sha256] = size
+                self._disk_bytes += size
+        return self._disk
+
+    def _track_disk(self, sha256: str, size: int) -> List[str]:
+        """Record an artifact as most recently used; returns evicted hashes (caller holds the lock)"""
+        disk = self._disk_index()
+        self._disk_bytes -= disk.pop(sha256, 0)
+        disk[sha256] = size
+        self._disk_bytes += size
+        evicted = []
+        while disk and self._disk_bytes > self.max_disk_bytes:
+            old_sha256, old_size = disk.popitem(last=False)
+            self._disk_bytes -= old_size
+            self.stats["disk_evictions"] += 1
+            evicted.append(old_sha256)
+        return evicted
+
+    def _unlink(self, hashes: List[str]):
+        for sha256 in hashes:
+            try:
+                self._artifact_path(sha256).unlink()
+            except FileNotFoundError:
+                pass
+
+    def get(self, sha256: str) -> Optional[ParsedDocument]:
+        """Cached artifact for a content hash, from memory or disk"""
+        with self._lock:
+            parsed = self._memory.get(sha256)
+            if parsed is not None:
+                self._memory.move_to_end(sha256)
+                self.stats["memory_hits"] += 1
+                return parsed
+
+        path = self._artifact_path(sha256)
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Discarding unreadable PDF artifact {path.name}: {e}")
+            return None
+        if data.get("version") != ARTIFACT_VERSION:
+            return None
+
+        parsed = ParsedDocument.from_dict(data)
+        self._remember(parsed)
+        try:
+            os.utime(path)  # Persist recency for the next restart
+            size = path.stat().st_size
+        except OSError:
+            size = None
+        with self._lock:
+            self.stats["disk_hits"] += 1
+            evicted = self._track_disk(sha256, size) if size is not None else []
+        self._unlink([h for h in evicted if h != sha256])
+        return parsed
+
+    def put(self, parsed: ParsedDocument):
+        """Write an artifact to disk atomically and keep it in memory"""
+        self._remember(parsed)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self._artifact_path(parsed.sha256)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(parsed.to_dict(), f)
+            size = tmp_path.stat().st_size
+            if size > self.max_disk_bytes:
+                tmp_path.unlink()
+                return
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not persist PDF artifact {path.name}: {e}")
+            try:
+                tmp_path.unlink()
+            except FileNotFoundError:
+                pass
+            return
+        with self._lock:
+            evicted = self._track_disk(parsed.sha256, size)
+        self._unlink(evicted)
+        if evicted:
+            logger.info(f"🗑️ Evicted {len(evicted)} PDF artifacts to stay under {self.max_disk_bytes:,} bytes")
+
+    def remove(self, sha256: str):
+        """Drop a document's artifact from memory and disk, e.g. when it is deleted"""
+        with self._lock:
+            self._memory.pop(sha256, None)
+            if self._disk is not None:
+                self._disk_bytes -= self._disk.pop(sha256, 0)
+        self._unlink([sha256])
+
+    def _remember(self, parsed: ParsedDocument):
+        with self._lock:
+            self._memory[parsed.sha256] = parsed
+            self._memory.move_to_end(parsed.sha256)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _get_executor(self) -> Optional[ProcessPoolExecutor]:
+        if self.workers <= 0:
+            return None
+        with self._lock:
+            if self._executor is None:
+                # spawn keeps workers free of the parent's threads and event loop
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def _reset_executor(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def _record_parse(self, parsed: ParsedDocument, label: str) -> ParsedDocument:
+        with self._lock:
+            self.stats["parses"] += 1
+        self.put(parsed)
+        logger.info(f"📄 Parsed {label} once ({parsed.pages_count} pages, {parsed.parser})")
+        return parsed
+
+    def load_or_parse(self, path: Union[str, Path], sha256: Optional[str] = None) -> ParsedDocument:
+        """
+        Parsed artifact for a file on disk, parsing it on a cache miss
+
+        Blocks until the worker finishes; call from a thread, not the event loop.
+
+        Args:
+            path: PDF file path
+            sha256: Content hash if already known (e.g. from the upload stream)
+
+        Raises:
+            PDFParseError: If the file is not a readable PDF
+        """
+        sha256 = sha256 or file_sha256(path)
+        parsed = self.get(sha256)
+        if parsed is not None:
+            return parsed
+
+        executor = self._get_executor()
+        if executor is None:
+            parsed = parse_pdf(str(path), sha256)
+        else:
+            try:
+                parsed = executor.submit(parse_pdf, str(path), sha256).result()
+            except BrokenProcessPool:
+                logger.warning("PDF parse pool broke; parsing in-process")
+                self._reset_executor()
+                parsed = parse_pdf(str(path), sha256)
+        return self._record_parse(parsed, Path(path).name)
+
+    async def aload_or_parse(self, path: Union[str, Path], sha256: Optional[str] = None) -> ParsedDocument:
+        """Async load_or_parse that keeps hashing and parsing off the event loop"""
+        return await asyncio.to_thread(self.load_or_parse, path, sha256)
+
+    def load_or_parse_bytes(self, content) -> ParsedDocument:
+        """
+        Parsed artifact for in-memory PDF content (bytes or a memory map)
+
+        Content that is already in memory is parsed in-process rather than
+        copied to a worker.
+        """
+        sha256 = hashlib.sha256(content).hexdigest()
+        parsed = self.get(sha256)
+        if parsed is not None:
+            return parsed
+        return self._record_parse(parse_pdf(content, sha256), f"{sha256[:12]}")
+
+    def close(self):
+        """Stop the parse worker pool"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+# Global instance following the existing service pattern
+pdf_artifact_store = PDFArtifactStore()
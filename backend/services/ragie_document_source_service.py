@@ -23,11 +23,19 @@ import hashlib
 from typing import Dict, List, Optional, Any, Union, Tuple
 from dataclasses import dataclass
 from pathlib import Path
-from datetime import datetime, timedelta
+from datetime import timedelta
+import asyncio
 import aiofiles
 import aiohttp
 from dotenv import load_dotenv
 
+try:
+    from .source_download import SharedSourceDownload, SourceDownloadError, READ_CHUNK_SIZE
+    from .source_cache import SourceCacheIndex, SourceCacheEntry
+except ImportError:
+    from services.source_download import SharedSourceDownload, SourceDownloadError, READ_CHUNK_SIZE
+    from services.source_cache import SourceCacheIndex, SourceCacheEntry
+
 # Load environment variables
 load_dotenv()
 
@@ -52,6 +60,8 @@ class DocumentSourceResult:
     error: Optional[str] = None
     cached: bool = False
     document_id: Optional[str] = None
+    path: Optional[str] = None  # Complete cache file, when the source is on disk
+    download: Optional[SharedSourceDownload] = None  # In-flight upstream download otherwise
 
 @dataclass
 class DocumentMetadata:
@@ -80,6 +90,18 @@ class RagieDocumentSourceService:
         self.cache_dir = Path("cache/ragie_sources")
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         self.cache_ttl = timedelta(hours=24)  # Cache for 24 hours
+        self.cache_cleanup_interval = float(os.getenv("RAGIE_SOURCE_CACHE_CLEANUP_INTERVAL", "600"))
+        
+        # Size-bounded LRU index over the cached files (replaces per-file .meta sidecars)
+        self.cache_index = SourceCacheIndex(
+            self.cache_dir,
+            max_bytes=int(os.getenv("RAGIE_SOURCE_CACHE_MAX_BYTES", str(2 * 1024 * 1024 * 1024))),
+            ttl_seconds=self.cache_ttl.total_seconds()
+        )
+        
+        # In-flight upstream downloads, shared by concurrent cold requests
+        self._downloads: Dict[str, SharedSourceDownload] = {}
+        self._download_tasks: Dict[str, asyncio.Task] = {}
         
         # Initialize Ragie client
         self.client = None
@@ -97,110 +119,108 @@ class RagieDocumentSourceService:
         """Check if service is available"""
         return self.client is not None and self.api_key is not None
     
-    def _get_cache_path(self, document_id: str) -> Path:
-        """Get cache file path for document"""
+    def _get_cache_key(self, document_id: str) -> str:
+        """Get cache key for document"""
         # Use document ID hash for cache filename
-        cache_key = hashlib.md5(f"{document_id}_{self.partition}".encode()).hexdigest()
-        return self.cache_dir / f"{cache_key}.cache"
-    
-    def _get_cache_metadata_path(self, document_id: str) -> Path:
-        """Get cache metadata file path for document"""
-        cache_key = hashlib.md5(f"{document_id}_{self.partition}".encode()).hexdigest()
-        return self.cache_dir / f"{cache_key}.meta"
+        return hashlib.md5(f"{document_id}_{self.partition}".encode()).hexdigest()
     
-    async def _is_cache_valid(self, document_id: str) -> bool:
-        """Check if cached document is still valid"""
-        cache_path = self._get_cache_path(document_id)
-        meta_path = self._get_cache_metadata_path(document_id)
-        
-        if not cache_path.exists() or not meta_path.exists():
-            return False
-            
-        try:
-            # Check if cache is within TTL
-            cache_time = datetime.fromtimestamp(cache_path.stat().st_mtime)
-            if datetime.now() - cache_time > self.cache_ttl:
-                return False
-            
-            return True
-        except Exception as e:
-            logger.warning(f"Cache validation error for {document_id}: {e}")
-            return False
+    def _get_cache_path(self, document_id: str) -> Path:
+        """Get cache file path for document"""
+        return self.cache_index.path_for(self._get_cache_key(document_id))
     
     async def _get_cached_document(self, document_id: str) -> Optional[DocumentSourceResult]:
-        """Get document from cache if available"""
+        """Cached document file and metadata, without reading the content"""
         try:
-            if not await self._is_cache_valid(document_id):
+            entry = await self.cache_index.aget(self._get_cache_key(document_id))
+            if entry is None:
                 return None
             
-            cache_path = self._get_cache_path(document_id)
-            meta_path = self._get_cache_metadata_path(document_id)
-            
-            # Load metadata
-            async with aiofiles.open(meta_path, 'r') as f:
-                import json
-                metadata = json.loads(await f.read())
-            
-            # Load content
-            async with aiofiles.open(cache_path, 'rb') as f:
-                content = await f.read()
-            
             logger.info(f"📦 Cache hit for document {document_id}")
             
             return DocumentSourceResult(
                 success=True,
-                content=content,
-                content_type=metadata.get('content_type'),
-                filename=metadata.get('filename'),
-                size=metadata.get('size'),
+                content_type=entry.content_type,
+                filename=entry.filename,
+                size=entry.size,
                 cached=True,
-                document_id=document_id
+                document_id=document_id,
+                path=str(self._get_cache_path(document_id))
             )
             
         except Exception as e:
             logger.warning(f"Cache read error for {document_id}: {e}")
             return None
     
-    async def _cache_document(self, document_id: str, result: DocumentSourceResult) -> None:
-        """Cache document content and metadata"""
+    async def _download_source(self, document_id: str, download: SharedSourceDownload) -> None:
+        """Stream the upstream body into the cache, teeing it to every reader"""
+        start_time = time.time()
         try:
-            if not result.success or not result.content:
-                return
+            # Never decompress, so bytes written always match Content-Length,
+            # and ask for an unencoded body since the cached file is served
+            # byte-for-byte
+            async with aiohttp.ClientSession(auto_decompress=False) as session:
+                url = f"{self.base_url}/documents/{document_id}/source"
+                headers = {
+                    'Authorization': f'Bearer {self.api_key}',
+                    'Partition': self.partition,
+                    'Accept-Encoding': 'identity'
+                }
                 
-            cache_path = self._get_cache_path(document_id)
-            meta_path = self._get_cache_metadata_path(document_id)
-            
-            # Save content
-            async with aiofiles.open(cache_path, 'wb') as f:
-                await f.write(result.content)
-            
-            # Save metadata
-            metadata = {
-                'content_type': result.content_type,
-                'filename': result.filename,
-                'size': result.size,
-                'document_id': document_id,
-                'cached_at': datetime.now().isoformat()
-            }
-            
-            async with aiofiles.open(meta_path, 'w') as f:
-                import json
-                await f.write(json.dumps(metadata))
+                async with session.get(url, headers=headers) as response:
+                    if response.status == 404:
+                        await download.fail(f"Document {document_id} not found")
+                        return
+                    if response.status != 200:
+                        error_text = await response.text()
+                        await download.fail(f"HTTP {response.status}: {error_text}")
+                        return
+                    
+                    content_type = response.headers.get('Content-Type', 'application/octet-stream')
+                    
+                    # Try to extract filename from Content-Disposition header
+                    content_disposition = response.headers.get('Content-Disposition', '')
+                    filename = None
+                    if 'filename=' in content_disposition:
+                        filename = content_disposition.split('filename=')[1].strip('"')
+                    
+                    await download.start(content_type, filename, response.content_length)
+                    async for chunk in response.content.iter_chunked(READ_CHUNK_SIZE):
+                        await download.write(chunk)
             
-            logger.info(f"💾 Cached document {document_id} ({result.size} bytes)")
+            await download.finish()
+            if download.error is None:
+                await asyncio.to_thread(self.cache_index.add, SourceCacheEntry(
+                    key=self._get_cache_key(document_id),
+                    document_id=document_id,
+                    size=download.bytes_written,
+                    sha256=download.sha256,
+                    content_type=download.content_type,
+                    filename=download.filename
+                ))
+                fetch_time = time.time() - start_time
+                logger.info(f"✅ Document source fetched: {document_id} ({download.bytes_written} bytes, {fetch_time:.2f}s, {download.readers} readers)")
+                logger.info(f"💾 Cached document {document_id} ({download.bytes_written} bytes)")
             
         except Exception as e:
-            logger.warning(f"Cache write error for {document_id}: {e}")
+            logger.error(f"❌ Error fetching document source {document_id}: {e}")
+            await download.fail(str(e))
+        finally:
+            self._downloads.pop(document_id, None)
+            self._download_tasks.pop(document_id, None)
     
-    async def get_document_source(self, document_id: str) -> DocumentSourceResult:
+    async def open_document_source(self, document_id: str) -> DocumentSourceResult:
         """
-        Get original document file from Ragie
+        Locate a document's original file without loading it into memory
+        
+        Cache hits return the cache file path. Misses join (or start) the
+        single upstream download for the document, which readers can stream
+        from while it is still in progress.
         
         Args:
             document_id: Ragie document ID
             
         Returns:
-            DocumentSourceResult with file content and metadata
+            DocumentSourceResult with either path or download set
         """
         if not self.is_available():
             return DocumentSourceResult(
@@ -208,66 +228,43 @@ class RagieDocumentSourceService:
                 error="Ragie Document Source Service not available"
             )
         
+        self.cache_index.start_background_cleanup(self.cache_cleanup_interval)
+        
         try:
-            # Check cache first
-            cached_result = await self._get_cached_document(document_id)
-            if cached_result:
-                return cached_result
+            download = self._downloads.get(document_id)
+            if download is None:
+                # Check cache first
+                cached_result = await self._get_cached_document(document_id)
+                if cached_result:
+                    return cached_result
+                
+                download = self._downloads.get(document_id)
+                if download is None:
+                    logger.info(f"📥 Fetching document source for {document_id}")
+                    download = SharedSourceDownload(self._get_cache_path(document_id))
+                    self._downloads[document_id] = download
+                    self._download_tasks[document_id] = asyncio.create_task(
+                        self._download_source(document_id, download)
+                    )
+            else:
+                logger.info(f"🔗 Joining in-flight download for {document_id}")
             
-            logger.info(f"📥 Fetching document source for {document_id}")
-            start_time = time.time()
+            await download.wait_started()
+            return DocumentSourceResult(
+                success=True,
+                content_type=download.content_type,
+                filename=download.filename,
+                size=download.size,
+                document_id=document_id,
+                download=download
+            )
             
-            # Use aiohttp for async HTTP requests
-            async with aiohttp.ClientSession() as session:
-                url = f"{self.base_url}/documents/{document_id}/source"
-                headers = {
-                    'Authorization': f'Bearer {self.api_key}',
-                    'Partition': self.partition
-                }
-                
-                async with session.get(url, headers=headers) as response:
-                    if response.status == 200:
-                        content = await response.read()
-                        content_type = response.headers.get('Content-Type', 'application/octet-stream')
-                        
-                        # Try to extract filename from Content-Disposition header
-                        content_disposition = response.headers.get('Content-Disposition', '')
-                        filename = None
-                        if 'filename=' in content_disposition:
-                            filename = content_disposition.split('filename=')[1].strip('"')
-                        
-                        result = DocumentSourceResult(
-                            success=True,
-                            content=content,
-                            content_type=content_type,
-                            filename=filename,
-                            size=len(content),
-                            document_id=document_id
-                        )
-                        
-                        # Cache the result
-                        await self._cache_document(document_id, result)
-                        
-                        fetch_time = time.time() - start_time
-                        logger.info(f"✅ Document source fetched: {document_id} ({len(content)} bytes, {fetch_time:.2f}s)")
-                        
-                        return result
-                    
-                    elif response.status == 404:
-                        return DocumentSourceResult(
-                            success=False,
-                            error=f"Document {document_id} not found",
-                            document_id=document_id
-                        )
-                    
-                    else:
-                        error_text = await response.text()
-                        return DocumentSourceResult(
-                            success=False,
-                            error=f"HTTP {response.status}: {error_text}",
-                            document_id=document_id
-                        )
-                        
+        except SourceDownloadError as e:
+            return DocumentSourceResult(
+                success=False,
+                error=str(e),
+                document_id=document_id
+            )
         except Exception as e:
             logger.error(f"❌ Error fetching document source {document_id}: {e}")
             return DocumentSourceResult(
@@ -276,6 +273,45 @@ class RagieDocumentSourceService:
                 document_id=document_id
             )
     
+    async def get_document_source(self, document_id: str) -> DocumentSourceResult:
+        """
+        Get original document file from Ragie, loaded into memory
+        
+        Prefer open_document_source for serving; this is for callers that
+        need the whole body as bytes.
+        
+        Args:
+            document_id: Ragie document ID
+            
+        Returns:
+            DocumentSourceResult with file content and metadata
+        """
+        result = await self.open_document_source(document_id)
+        if not result.success:
+            return result
+        
+        try:
+            if result.download is not None:
+                await result.download.wait_finished()
+                path = result.download.final_path
+            else:
+                path = result.path
+            
+            async with aiofiles.open(path, 'rb') as f:
+                result.content = await f.read()
+            result.size = len(result.content)
+            result.path = str(path)
+            result.download = None
+            return result
+            
+        except Exception as e:
+            logger.error(f"❌ Error reading document source {document_id}: {e}")
+            return DocumentSourceResult(
+                success=False,
+                error=str(e),
+                document_id=document_id
+            )
+    
     async def get_document_metadata(self, document_id: str) -> Optional[DocumentMetadata]:
         """
         Get document metadata from Ragie
@@ -314,11 +350,7 @@ class RagieDocumentSourceService:
             Number of files cleared
         """
         try:
-            files_cleared = 0
-            for file_path in self.cache_dir.glob("*"):
-                if file_path.is_file():
-                    file_path.unlink()
-                    files_cleared += 1
+            files_cleared = await asyncio.to_thread(self.cache_index.clear)
             
             logger.info(f"🗑️ Cleared {files_cleared} cached files")
             return files_cleared
@@ -335,16 +367,9 @@ class RagieDocumentSourceService:
             Dictionary with cache statistics
         """
         try:
-            cache_files = list(self.cache_dir.glob("*.cache"))
-            meta_files = list(self.cache_dir.glob("*.meta"))
-            
-            total_size = sum(f.stat().st_size for f in cache_files)
-            
             return {
-                'cached_documents': len(cache_files),
-                'metadata_files': len(meta_files),
-                'total_size_bytes': total_size,
-                'total_size_mb': round(total_size / (1024 * 1024), 2),
+                **self.cache_index.get_stats(),
+                'in_flight_downloads': len(self._downloads),
                 'cache_directory': str(self.cache_dir),
                 'cache_ttl_hours': self.cache_ttl.total_seconds() / 3600
             }
@@ -352,6 +377,10 @@ class RagieDocumentSourceService:
         except Exception as e:
             logger.error(f"❌ Error getting cache stats: {e}")
             return {}
+    
+    async def close(self) -> None:
+        """Stop the cache cleanup task and persist the cache index"""
+        await self.cache_index.close()
 
 # Global service instance
 ragie_document_source_service = RagieDocumentSourceService()
\ No newline at end of file
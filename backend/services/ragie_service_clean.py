@@ -10,6 +10,7 @@ Author: Generated with Memex (https://memex.tech)
 """
 
 import os
+import asyncio
 import logging
 import time
 import datetime
@@ -19,12 +20,20 @@ import json
 from pathlib import Path
 from dotenv import load_dotenv
 
+try:
+    from services.retrieval_cache import RetrievalCache
+    from metrics_registry import instrumented
+except ImportError:
+    from .retrieval_cache import RetrievalCache
+    from ..metrics_registry import instrumented
+
 # Load environment variables
 load_dotenv()
 
 # Ragie SDK imports
 try:
     from ragie import Ragie
+    import httpx
     RAGIE_AVAILABLE = True
 except ImportError:
     RAGIE_AVAILABLE = False
@@ -59,6 +68,20 @@ class CleanRagieService:
         self.api_key = os.getenv("RAGIE_API_KEY")
         self.partition = os.getenv("RAGIE_PARTITION", "qsr_manuals")
         
+        # Non-blocking retrieval: shared keep-alive pool, bounded concurrency, request coalescing
+        self.max_concurrent_retrievals = int(os.getenv("RAGIE_MAX_CONCURRENT_RETRIEVALS", "8"))
+        self._retrieval_semaphore = asyncio.Semaphore(self.max_concurrent_retrievals)
+        self._inflight_retrievals: Dict[str, asyncio.Future] = {}
+        self.retrieval_stats = {"upstream_requests": 0, "coalesced_requests": 0, "failed_requests": 0}
+        self.async_http_client = None
+        
+        # Result cache in front of retrievals; invalidated on upload/delete
+        self.result_cache = RetrievalCache(
+            max_entries=int(os.getenv("RAGIE_CACHE_MAX_ENTRIES", "512")),
+            default_ttl=float(os.getenv("RAGIE_CACHE_TTL_SECONDS", "300")),
+            semantic_threshold=float(os.getenv("RAGIE_SEMANTIC_CACHE_THRESHOLD", "0.92"))
+        )
+        
         # Sanitize API key for HTTP headers to prevent Unicode encoding errors
         if self.api_key:
             try:
@@ -94,9 +117,20 @@ class CleanRagieService:
                 retry_connection_errors=True
             )
             
+            # Shared async connection pool so retrievals never block the event loop
+            self.async_http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrent_retrievals * 2,
+                    max_keepalive_connections=self.max_concurrent_retrievals,
+                    keepalive_expiry=60.0
+                ),
+                timeout=httpx.Timeout(30.0, connect=5.0)
+            )
+            
             self.client = Ragie(
                 auth=self.api_key,
                 retry_config=retry_config,
+                async_client=self.async_http_client,
                 debug_logger=logger  # Enable debug logging
             )
             logger.info("✅ Ragie client initialized with enhanced error handling")
@@ -108,6 +142,60 @@ class CleanRagieService:
         """Check if Ragie service is available"""
         return self.client is not None
     
+    async def close(self):
+        """Close the shared async HTTP connection pool"""
+        if self.async_http_client is not None:
+            await self.async_http_client.aclose()
+    
+    def get_retrieval_stats(self) -> Dict[str, Any]:
+        """Retrieval concurrency, coalescing and cache counters"""
+        return {
+            **self.retrieval_stats,
+            "in_flight": len(self._inflight_retrievals),
+            "max_concurrent_retrievals": self.max_concurrent_retrievals,
+            "cache": self.result_cache.get_stats()
+        }
+    
+    def invalidate_search_cache(self) -> int:
+        """Drop cached retrievals for this partition (call after uploads and deletes)"""
+        return self.result_cache.invalidate(self.partition)
+    
+    async def _retrieve(self, search_request: Dict[str, Any]):
+        """
+        Run a Ragie retrieval, coalescing identical in-flight requests
+        
+        Concurrent callers with the same request share one upstream call.
+        The shared task is shielded so one caller's cancellation doesn't
+        cancel it for the others.
+        """
+        key = json.dumps(search_request, sort_keys=True, default=str)
+        
+        inflight = self._inflight_retrievals.get(key)
+        if inflight is not None:
+            self.retrieval_stats["coalesced_requests"] += 1
+            logger.info(f"🔗 Coalescing Ragie retrieval with in-flight request: '{search_request.get('query')}'")
+            return await asyncio.shield(inflight)
+        
+        task = asyncio.ensure_future(self._retrieve_upstream(search_request))
+        self._inflight_retrievals[key] = task
+        task.add_done_callback(lambda _: self._inflight_retrievals.pop(key, None))
+        return await asyncio.shield(task)
+    
+    @instrumented("ragie", "retrieve_upstream")
+    async def _retrieve_upstream(self, search_request: Dict[str, Any]):
+        """Single upstream retrieval, bounded by the concurrency semaphore"""
+        async with self._retrieval_semaphore:
+            self.retrieval_stats["upstream_requests"] += 1
+            try:
+                retrievals = self.client.retrievals
+                if hasattr(retrievals, "retrieve_async"):
+                    return await retrievals.retrieve_async(request=search_request)
+                # Older SDKs without async support: keep the blocking call off the event loop
+                return await asyncio.to_thread(retrievals.retrieve, request=search_request)
+            except Exception:
+                self.retrieval_stats["failed_requests"] += 1
+                raise
+    
     async def setup_qsr_instructions(self) -> bool:
         """
         Setup QSR-specific instructions for better content extraction
@@ -440,6 +528,7 @@ Tag with equipment type (fryer, grill, oven) and procedure type (operation, main
         
         return processed
     
+    @instrumented("ragie", "search")
     async def search(self, query: str, limit: int = 5) -> List[RagieSearchResult]:
         """
         Enhanced search with intelligent filtering based on query analysis
@@ -478,7 +567,14 @@ Tag with equipment type (fryer, grill, oven) and procedure type (operation, main
             elif smart_filter and "_image_intent" in smart_filter:
                 logger.info(f"🎯 Image intent detected - using enhanced query processing")
             
-            response = self.client.retrievals.retrieve(request=search_request)
+            # Serve repeated (or semantically equivalent) retrievals from cache
+            cache_scope = self.result_cache.make_scope(self.partition, search_request.get("filter"), limit)
+            cached_results, query_embedding = await self.result_cache.lookup(processed_query, cache_scope)
+            if cached_results is not None:
+                logger.info(f"⚡ Ragie cache hit for '{processed_query}' ({len(cached_results)} results)")
+                return cached_results
+            
+            response = await self._retrieve(search_request)
             
             results = []
             if hasattr(response, 'scored_chunks') and response.scored_chunks:
@@ -574,6 +670,7 @@ Tag with equipment type (fryer, grill, oven) and procedure type (operation, main
                     results.append(result)
             
             logger.info(f"✅ Found {len(results)} results from Ragie")
+            self.result_cache.put(processed_query, self.partition, cache_scope, results, query_embedding)
             return results
             
         except Exception as e:
@@ -709,6 +806,7 @@ Tag with equipment type (fryer, grill, oven) and procedure type (operation, main
             
             if response and response.id:
                 logger.info(f"✅ Document uploaded to Ragie: {response.id} (took {upload_time:.2f}s)")
+                self.invalidate_search_cache()
                 logger.info(f"📊 Ragie processing stats: {getattr(response, 'chunk_count', 'unknown')} chunks, {getattr(response, 'page_count', 'unknown')} pages")
                 
                 return RagieUploadResult(
@@ -757,6 +855,7 @@ Tag with equipment type (fryer, grill, oven) and procedure type (operation, main
             
             self.client.documents.delete(id=document_id)
             logger.info(f"✅ Document deleted from Ragie: {document_id}")
+            self.invalidate_search_cache()
             return True
             
         except Exception as e:
@@ -11,7 +11,6 @@ Author: Generated with Memex (https://memex.tech)
 
 import logging
 import os
-import json
 import asyncio
 from typing import Dict, Any, List, Optional
 from datetime import datetime
@@ -21,6 +20,7 @@ import shutil
 
 from fastapi import UploadFile, BackgroundTasks
 from services.ragie_service import ragie_service
+from document_catalog import get_document_catalog
 from models.ragie_models import RagieUploadResponse, QSRMetadata
 
 logger = logging.getLogger(__name__)
@@ -293,18 +293,9 @@ class RagieUploadService:
                                   metadata: Dict[str, Any]) -> None:
         """Save document record for compatibility with existing system"""
         try:
-            # Load existing documents
-            docs_file = Path("../documents.json")
-            
-            if docs_file.exists():
-                with open(docs_file, 'r') as f:
-                    docs_db = json.load(f)
-            else:
-                docs_db = {}
-            
             # Create document record
             doc_id = upload_result["document_id"]
-            docs_db[doc_id] = {
+            get_document_catalog().put({
                 "id": doc_id,
                 "filename": upload_result["filename"],
                 "original_filename": metadata.get("display_name", upload_result["filename"]),
@@ -314,11 +305,7 @@ class RagieUploadService:
                 "text_preview": f"Document uploaded to Ragie: {upload_result['filename'][:100]}...",
                 "ragie_document_id": doc_id,
                 "source": "ragie_integration"
-            }
-            
-            # Save updated database
-            with open(docs_file, 'w') as f:
-                json.dump(docs_db, f, indent=2)
+            })
             
             logger.info(f"Saved document record for {doc_id}")
             
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Retrieval Result Cache
+======================
+
+LRU + TTL cache in front of Ragie retrievals. Entries are keyed on the
+normalized (preprocessed) query plus a scope made of the partition, metadata
+filter and limit. An optional semantic tier reuses results for queries whose
+embeddings are within a cosine-similarity threshold of a cached query in the
+same scope.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CacheEntry:
+    """Cached retrieval results for one normalized query"""
+    query: str
+    partition: str
+    scope: str
+    results: List[Any]
+    expires_at: float
+    embedding: Optional[np.ndarray] = None
+
+
+@dataclass
+class CacheStats:
+    """Hit/miss counters"""
+    exact_hits: int = 0
+    semantic_hits: int = 0
+    misses: int = 0
+    expirations: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+    stores: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        lookups = self.exact_hits + self.semantic_hits + self.misses
+        hits = self.exact_hits + self.semantic_hits
+        return {
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "expirations": self.expirations,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "stores": self.stores,
+        }
+
+
+class RetrievalCache:
+    """LRU retrieval cache with per-partition TTL and optional semantic matching"""
+
+    def __init__(
+        self,
+        max_entries: int = 512,
+        default_ttl: float = 300.0,
+        partition_ttls: Optional[Dict[str, float]] = None,
+        semantic_threshold: float = 0.92,
+        semantic_encoder: Optional[Callable[[str], np.ndarray]] = None,
+    ):
+        """
+        Args:
+            max_entries: Maximum cached queries before LRU eviction
+            default_ttl: Seconds an entry stays valid
+            partition_ttls: Per-partition TTL overrides
+            semantic_threshold: Minimum cosine similarity for a semantic hit
+            semantic_encoder: Callable mapping a query to an embedding; None disables the semantic tier
+        """
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.partition_ttls = partition_ttls or {}
+        self.semantic_threshold = semantic_threshold
+        self.semantic_encoder = semantic_encoder
+        self._entries: "OrderedDict[Tuple[str, str], CacheEntry]" = OrderedDict()
+        self.stats = CacheStats()
+
+    @property
+    def semantic_enabled(self) -> bool:
+        return self.semantic_encoder is not None
+
+    def set_semantic_encoder(self, encoder: Optional[Callable[[str], np.ndarray]]):
+        """Enable (or disable with None) the semantic tier"""
+        self.semantic_encoder = encoder
+
+    @staticmethod
+    def make_scope(partition: str, search_filter: Optional[Dict[str, Any]], limit: int) -> str:
+        """Canonical scope string; only queries in the same scope can share results"""
+        return json.dumps(
+            {"partition": partition, "filter": search_filter, "limit": limit},
+            sort_keys=True, default=str,
+        )
+
+    def ttl_for(self, partition: str) -> float:
+        return self.partition_ttls.get(partition, self.default_ttl)
+
+    async def embed(self, query: str) -> Optional[np.ndarray]:
+        """Embed a query for the semantic tier, off the event loop"""
+        if not self.semantic_enabled:
+            return None
+        try:
+            embedding = await asyncio.to_thread(self.semantic_encoder, query)
+            embedding = np.asarray(embedding, dtype=np.float32).ravel()
+            norm = np.linalg.norm(embedding)
+            return embedding / norm if norm else None
+        except Exception as e:
+            logger.warning(f"Semantic cache embedding failed: {e}")
+            return None
+
+    def get(self, query: str, scope: str, embedding: Optional[np.ndarray] = None) -> Optional[List[Any]]:
+        """
+        Look up cached results
+
+        Args:
+            query: Normalized query
+            scope: Scope from make_scope()
+            embedding: Query embedding for the semantic tier
+
+        Returns:
+            Cached results or None on a miss
+        """
+        results = self._get_exact(query, scope)
+        if results is None and embedding is not None:
+            results = self._get_semantic(query, scope, embedding)
+        if results is None:
+            self.stats.misses += 1
+        return results
+
+    async def lookup(self, query: str, scope: str) -> Tuple[Optional[List[Any]], Optional[np.ndarray]]:
+        """
+        Look up cached results, embedding the query only on an exact-key miss
+
+        Args:
+            query: Normalized query
+            scope: Scope from make_scope()
+
+        Returns:
+            Tuple of (cached results or None, query embedding to pass to put())
+        """
+        results = self._get_exact(query, scope)
+        if results is not None:
+            return results, None
+        embedding = await self.embed(query)
+        results = self._get_semantic(query, scope, embedding) if embedding is not None else None
+        if results is None:
+            self.stats.misses += 1
+        return results, embedding
+
+    def _get_exact(self, query: str, scope: str) -> Optional[List[Any]]:
+        now = time.time()
+        key = (scope, query)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at > now:
+            self._entries.move_to_end(key)
+            self.stats.exact_hits += 1
+            return list(entry.results)
+        del self._entries[key]
+        self.stats.expirations += 1
+        return None
+
+    def _get_semantic(self, query: str, scope: str, embedding: np.ndarray) -> Optional[List[Any]]:
+        now = time.time()
+        best_key, best_similarity = None, self.semantic_threshold
+        for candidate_key, candidate in list(self._entries.items()):
+            if candidate.scope != scope or candidate.embedding is None:
+                continue
+            if candidate.expires_at <= now:
+                del self._entries[candidate_key]
+                self.stats.expirations += 1
+                continue
+            similarity = float(candidate.embedding @ embedding)
+            if similarity >= best_similarity:
+                best_key, best_similarity = candidate_key, similarity
+        if best_key is None:
+            return None
+        self._entries.move_to_end(best_key)
+        self.stats.semantic_hits += 1
+        logger.info(
+            f"🧠 Semantic cache hit: '{query}' ~ '{best_key[1]}' (similarity {best_similarity:.3f})"
+        )
+        return list(self._entries[best_key].results)
+
+    def put(
+        self,
+        query: str,
+        partition: str,
+        scope: str,
+        results: List[Any],
+        embedding: Optional[np.ndarray] = None,
+    ):
+        """Store results, evicting least recently used entries beyond max_entries"""
+        key = (scope, query)
+        self._entries[key] = CacheEntry(
+            query=query,
+            partition=partition,
+            scope=scope,
+            results=list(results),
+            expires_at=time.time() + self.ttl_for(partition),
+            embedding=embedding,
+        )
+        self._entries.move_to_end(key)
+        self.stats.stores += 1
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def invalidate(self, partition: Optional[str] = None) -> int:
+        """
+        Drop cached results, e.g. after an upload or delete
+
+        Args:
+            partition: Only drop this partition's entries (None drops everything)
+
+        Returns:
+            Number of entries removed
+        """
+        if partition is None:
+            removed = len(self._entries)
+            self._entries.clear()
+        else:
+            keys = [k for k, e in self._entries.items() if e.partition == partition]
+            for key in keys:
+                del self._entries[key]
+            removed = len(keys)
+        self.stats.invalidations += 1
+        if removed:
+            logger.info(f"🧹 Invalidated {removed} cached retrievals (partition={partition or 'all'})")
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats.to_dict(),
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "default_ttl": self.default_ttl,
+            "semantic_enabled": self.semantic_enabled,
+            "semantic_threshold": self.semantic_threshold,
+        }
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Conversation Session Store
+==========================
+
+Bounded in-memory store for per-session conversation state (a pydantic
+context model plus the PydanticAI message history). Sessions are evicted
+least-recently-used once the session or byte budget is exceeded, and after an
+idle TTL. Message histories are compacted to a window of recent turns on every
+write. An optional SQLite spill tier keeps evicted sessions on disk so they can
+be rehydrated when the user comes back.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Type
+
+from pydantic import BaseModel
+from pydantic_ai.messages import (
+    ModelMessage,
+    ModelMessagesTypeAdapter,
+    ModelRequest,
+    SystemPromptPart,
+    UserPromptPart,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SessionState:
+    """One session's conversation state"""
+    context: BaseModel
+    messages: List[ModelMessage] = field(default_factory=list)
+    last_access: float = field(default_factory=time.time)
+    size_bytes: int = 0
+
+
+def compact_messages(messages: List[ModelMessage], max_turns: int) -> List[ModelMessage]:
+    """
+    Keep only the most recent user turns of a message history
+
+    A turn starts at a request carrying a user prompt and includes the tool
+    calls and returns that follow it, so tool call/return pairs are never
+    split. System prompt parts from dropped turns are carried over to the
+    first kept request, since the agent does not re-add them when a history
+    is supplied.
+
+    Args:
+        messages: Full message history, oldest first
+        max_turns: Number of user turns to keep
+
+    Returns:
+        Compacted message history
+    """
+    turn_starts = [
+        i for i, message in enumerate(messages)
+        if isinstance(message, ModelRequest)
+        and any(isinstance(part, UserPromptPart) for part in message.parts)
+    ]
+    if max_turns <= 0 or len(turn_starts) <= max_turns:
+        return messages
+
+    cut = turn_starts[-max_turns]
+    system_parts = [
+        part
+        for message in messages[:cut] if isinstance(message, ModelRequest)
+        for part in message.parts if isinstance(part, SystemPromptPart)
+    ]
+    kept = list(messages[cut:])
+    if system_parts:
+        kept[0] = replace(kept[0], parts=[*system_parts, *kept[0].parts])
+    return kept
+
+
+class SessionStore:
+    """LRU + idle-TTL session store with message-window compaction and optional SQLite spill"""
+
+    def __init__(
+        self,
+        context_model: Type[BaseModel],
+        max_sessions: int = 500,
+        max_total_bytes: int = 64 * 1024 * 1024,
+        idle_ttl: float = 3600.0,
+        max_turns: int = 12,
+        spill_path: Optional[str] = None,
+        spill_ttl: float = 7 * 24 * 3600.0,
+        sweep_interval: float = 60.0,
+    ):
+        """
+        Args:
+            context_model: Pydantic model used for per-session context
+            max_sessions: Maximum sessions held in memory
+            max_total_bytes: Approximate memory budget across all sessions
+            idle_ttl: Seconds without access before a session is evicted
+            max_turns: User turns kept in each message history and conversation log
+            spill_path: SQLite file for evicted sessions (None disables spilling)
+            spill_ttl: Seconds a spilled session is kept on disk
+            sweep_interval: Minimum seconds between idle-TTL sweeps
+        """
+        self.context_model = context_model
+        self.max_sessions = max_sessions
+        self.max_total_bytes = max_total_bytes
+        self.idle_ttl = idle_ttl
+        self.max_turns = max_turns
+        self.spill_ttl = spill_ttl
+        self.sweep_interval = sweep_interval
+
+        self._sessions: "OrderedDict[str, SessionState]" = OrderedDict()
+        self._total_bytes = 0
+        self._last_sweep = time.time()
+        self._lock = threading.RLock()
+        self.stats = {"evictions": 0, "expirations": 0, "spilled": 0, "rehydrated": 0, "compactions": 0}
+
+        self._spill: Optional[sqlite3.Connection] = None
+        if spill_path:
+            Path(spill_path).parent.mkdir(parents=True, exist_ok=True)
+            self._spill = sqlite3.connect(spill_path, check_same_thread=False)
+            self._spill.execute("PRAGMA journal_mode=WAL")
+            self._spill.execute(
+                """
+                CREATE TABLE IF NOT EXISTS sessions (
+                    session_id TEXT PRIMARY KEY,
+                    context_json TEXT NOT NULL,
+                    messages_json BLOB NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+            self._spill.commit()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    def session_ids(self) -> List[str]:
+        return list(self._sessions.keys())
+
+    def get_context(self, session_id: str) -> BaseModel:
+        """Get or create (or rehydrate) the context for a session"""
+        return self._get_session(session_id).context
+
+    def get_messages(self, session_id: str) -> List[ModelMessage]:
+        """Get the session's (compacted) message history"""
+        return self._get_session(session_id).messages
+
+    def set_messages(self, session_id: str, messages: List[ModelMessage]):
+        """Replace the session's message history, compacting it to the turn window"""
+        with self._lock:
+            session = self._get_session(session_id)
+            compacted = compact_messages(messages, self.max_turns)
+            if len(compacted) < len(messages):
+                self.stats["compactions"] += 1
+            session.messages = compacted
+            self._update_size(session_id, session)
+            self._enforce_limits()
+
+    def touch(self, session_id: str):
+        """Re-measure a session after its context was mutated in place"""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return
+            history = getattr(session.context, "conversation_history", None)
+            if isinstance(history, list) and len(history) > self.max_turns:
+                del history[:-self.max_turns]
+            self._update_size(session_id, session)
+            self._enforce_limits()
+
+    def end(self, session_id: str):
+        """Drop a session from memory and the spill tier"""
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+            if session is not None:
+                self._total_bytes -= session.size_bytes
+            if self._spill is not None:
+                self._spill.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+                self._spill.commit()
+
+    def clear(self):
+        """Drop every session, including spilled ones"""
+        with self._lock:
+            self._sessions.clear()
+            self._total_bytes = 0
+            if self._spill is not None:
+                self._spill.execute("DELETE FROM sessions")
+                self._spill.commit()
+
+    def close(self):
+        """Spill all in-memory sessions and close the spill database"""
+        with self._lock:
+            if self._spill is None:
+                return
+            while self._sessions:
+                session_id, session = self._sessions.popitem(last=False)
+                self._spill_session(session_id, session)
+            self._total_bytes = 0
+            self._spill.close()
+            self._spill = None
+
+    def evict_expired(self) -> int:
+        """
+        Evict sessions idle longer than idle_ttl
+
+        Returns:
+            Number of sessions evicted
+        """
+        with self._lock:
+            cutoff = time.time() - self.idle_ttl
+            expired = [sid for sid, s in self._sessions.items() if s.last_access < cutoff]
+            for session_id in expired:
+                self._evict(session_id)
+            self.stats["expirations"] += len(expired)
+            if self._spill is not None:
+                self._spill.execute(
+                    "DELETE FROM sessions WHERE last_access < ?", (time.time() - self.spill_ttl,)
+                )
+                self._spill.commit()
+            self._last_sweep = time.time()
+            if expired:
+                logger.info(f"🧹 Evicted {len(expired)} idle voice sessions")
+            return len(expired)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            spilled_sessions = 0
+            if self._spill is not None:
+                spilled_sessions = self._spill.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+            return {
+                **self.stats,
+                "active_sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "memory_bytes": self._total_bytes,
+                "max_total_bytes": self.max_total_bytes,
+                "idle_ttl": self.idle_ttl,
+                "max_turns": self.max_turns,
+                "spill_enabled": self._spill is not None,
+                "spilled_sessions": spilled_sessions,
+            }
+
+    def _get_session(self, session_id: str) -> SessionState:
+        with self._lock:
+            now = time.time()
+            if now - self._last_sweep >= self.sweep_interval:
+                self.evict_expired()
+
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = self._rehydrate(session_id) or SessionState(context=self.context_model())
+                self._sessions[session_id] = session
+                self._update_size(session_id, session)
+                self._enforce_limits(protect=session_id)
+            else:
+                self._sessions.move_to_end(session_id)
+            session.last_access = now
+            return session
+
+    def _update_size(self, session_id: str, session: SessionState):
+        size = len(session.context.model_dump_json())
+        if session.messages:
+            size += len(ModelMessagesTypeAdapter.dump_json(session.messages))
+        self._total_bytes += size - session.size_bytes
+        session.size_bytes = size
+
+    def _enforce_limits(self, protect: Optional[str] = None):
+        while len(self._sessions) > 1 and (
+            len(self._sessions) > self.max_sessions or self._total_bytes > self.max_total_bytes
+        ):
+            session_id = next(iter(self._sessions))
+            if session_id == protect:
+                self._sessions.move_to_end(session_id)
+                session_id = next(iter(self._sessions))
+            self._evict(session_id)
+            self.stats["evictions"] += 1
+
+    def _evict(self, session_id: str):
+        session = self._sessions.pop(session_id)
+        self._total_bytes -= session.size_bytes
+        if self._spill is not None:
+            self._spill_session(session_id, session)
+
+    def _spill_session(self, session_id: str, session: SessionState):
+        try:
+            self._spill.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, context_json, messages_json, last_access) "
+                "VALUES (?, ?, ?, ?)",
+                (
+                    session_id,
+                    session.context.model_dump_json(),
+                    ModelMessagesTypeAdapter.dump_json(session.messages),
+                    session.last_access,
+                ),
+            )
+            self._spill.commit()
+            self.stats["spilled"] += 1
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to spill voice session {session_id}: {e}")
+
+    def _rehydrate(self, session_id: str) -> Optional[SessionState]:
+        if self._spill is None:
+            return None
+        try:
+            row = self._spill.execute(
+                "SELECT context_json, messages_json FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            session = SessionState(
+                context=self.context_model.model_validate_json(row[0]),
+                messages=ModelMessagesTypeAdapter.validate_json(row[1]),
+            )
+            self.stats["rehydrated"] += 1
+            logger.info(f"♻️ Rehydrated voice session {session_id} from spill store")
+            return session
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to rehydrate voice session {session_id}: {e}")
+            return None
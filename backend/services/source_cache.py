@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+Document Source Cache Index
+===========================
+
+Size-bounded cache manager for original document files (PDFs, videos)
+downloaded from Ragie.
+
+- An in-memory index of entries (size, last access, sha256, content type)
+  is persisted as index.json next to the files, so stats and lookups never
+  walk the directory
+- A byte budget is enforced with least-recently-used eviction, alongside
+  the existing time-to-live
+- Content is checked against its sha256 the first time an entry is read in
+  a process, and again whenever the file's size or mtime changes
+- A background sweep expires old entries, removes orphaned files and
+  abandoned partial downloads, and flushes the index
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+HASH_CHUNK_SIZE = 1024 * 1024
+# Partial downloads untouched for this long belong to a crashed process
+STALE_PART_SECONDS = 3600
+# A download is renamed into place before it is indexed; unindexed files
+# younger than this may be about to be added rather than orphaned
+ORPHAN_GRACE_SECONDS = 300
+
+
+@dataclass
+class SourceCacheEntry:
+    """One cached document file"""
+    key: str
+    document_id: str
+    size: int
+    sha256: Optional[str]
+    content_type: Optional[str] = None
+    filename: Optional[str] = None
+    created_at: float = 0.0
+    last_access: float = 0.0
+    mtime_ns: int = 0
+
+
+def _hash_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class SourceCacheIndex:
+    """Persistent LRU index over `<key>.cache` files in one directory"""
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        max_bytes: int = 2 * 1024 * 1024 * 1024,
+        ttl_seconds: float = 24 * 3600,
+        extension: str = ".cache",
+    ):
+        """
+        Args:
+            cache_dir: Directory holding cached files and index.json
+            max_bytes: Byte budget before least recently used entries are evicted
+            ttl_seconds: Entries older than this are expired (0 disables)
+            extension: Suffix of cached content files
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.extension = extension
+        self.index_path = self.cache_dir / "index.json"
+
+        self._entries: Dict[str, SourceCacheEntry] = {}
+        self._total_bytes = 0
+        self._verified: set = set()
+        self._dirty = False
+        self._lock = threading.RLock()
+        self._cleanup_task: Optional[asyncio.Task] = None
+        self.metrics = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "corrupt": 0}
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._load()
+
+    def path_for(self, key: str) -> Path:
+        """Content file for a cache key"""
+        return self.cache_dir / f"{key}{self.extension}"
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _load(self):
+        """Load index.json, reconciling it with the files actually present"""
+        try:
+            with open(self.index_path, "r") as f:
+                data = json.load(f)
+            if data.get("version") != INDEX_VERSION:
+                raise ValueError(f"index version {data.get('version')}")
+            entries = [SourceCacheEntry(**entry) for entry in data.get("entries", [])]
+        except FileNotFoundError:
+            entries = []
+        except (ValueError, TypeError, KeyError) as e:
+            logger.warning(f"Rebuilding document source cache index: {e}")
+            entries = []
+
+        for entry in entries:
+            try:
+                st = self.path_for(entry.key).stat()
+            except FileNotFoundError:
+                continue
+            if st.st_size != entry.size:
+                continue
+            self._entries[entry.key] = entry
+            self._total_bytes += entry.size
+
+        self._import_unindexed()
+        self._dirty = True
+        self._evict_over_budget()
+        self.flush()
+        if self._entries:
+            logger.info(f"📦 Document source cache: {len(self._entries)} files ({self._total_bytes:,} bytes)")
+
+    def _import_unindexed(self):
+        """Adopt content files written before the index existed (legacy .meta pairs)"""
+        for path in self.cache_dir.glob(f"*{self.extension}"):
+            key = path.name[:-len(self.extension)]
+            if key in self._entries:
+                continue
+            meta_path = self.cache_dir / f"{key}.meta"
+            try:
+                with open(meta_path, "r") as f:
+                    meta = json.load(f)
+                st = path.stat()
+            except (OSError, ValueError):
+                path.unlink(missing_ok=True)
+                continue
+            self._entries[key] = SourceCacheEntry(
+                key=key,
+                document_id=meta.get("document_id", ""),
+                size=st.st_size,
+                sha256=None,  # Computed on first verified read
+                content_type=meta.get("content_type"),
+                filename=meta.get("filename"),
+                created_at=st.st_mtime,
+                last_access=st.st_mtime,
+                mtime_ns=st.st_mtime_ns,
+            )
+            self._total_bytes += st.st_size
+            meta_path.unlink(missing_ok=True)
+
+    def flush(self):
+        """Write index.json if it changed"""
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = {"version": INDEX_VERSION, "entries": [asdict(e) for e in self._entries.values()]}
+            self._dirty = False
+        tmp_path = self.index_path.with_name(f"{self.index_path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(payload, f)
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            logger.warning(f"Document source cache index write failed: {e}")
+            with self._lock:
+                self._dirty = True
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def _expired(self, entry: SourceCacheEntry, now: float) -> bool:
+        return bool(self.ttl_seconds) and now - entry.created_at > self.ttl_seconds
+
+    def get(self, key: str, verify: bool = True) -> Optional[SourceCacheEntry]:
+        """
+        Entry for a key if present, fresh and intact
+
+        Args:
+            key: Cache key
+            verify: Check the sha256 on the first read of this entry in this process
+
+        Returns:
+            The entry (its last access is refreshed) or None on a miss
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.metrics["misses"] += 1
+                return None
+            if self._expired(entry, now):
+                self.metrics["expirations"] += 1
+                self._remove_locked(key)
+                self.metrics["misses"] += 1
+                return None
+
+        try:
+            st = self.path_for(key).stat()
+        except FileNotFoundError:
+            with self._lock:
+                self._remove_locked(key)
+                self.metrics["misses"] += 1
+            return None
+
+        if st.st_size != entry.size:
+            return self._discard_corrupt(key, "size changed")
+        if st.st_mtime_ns != entry.mtime_ns:
+            with self._lock:
+                self._verified.discard(key)
+
+        if verify and key not in self._verified:
+            digest = _hash_file(self.path_for(key))
+            if entry.sha256 is not None and digest != entry.sha256:
+                return self._discard_corrupt(key, "checksum mismatch")
+            with self._lock:
+                entry.sha256 = digest
+                entry.mtime_ns = st.st_mtime_ns
+                self._verified.add(key)
+
+        with self._lock:
+            entry.last_access = now
+            self._dirty = True
+            self.metrics["hits"] += 1
+        return entry
+
+    async def aget(self, key: str) -> Optional[SourceCacheEntry]:
+        """Async get; stat and checksum run in a thread"""
+        return await asyncio.to_thread(self.get, key)
+
+    def _discard_corrupt(self, key: str, reason: str) -> None:
+        logger.warning(f"⚠️ Discarding corrupt cached document {key}: {reason}")
+        with self._lock:
+            self.metrics["corrupt"] += 1
+            self.metrics["misses"] += 1
+            self._remove_locked(key)
+        return None
+
+    # ------------------------------------------------------------------
+    # Mutations
+    # ------------------------------------------------------------------
+
+    def add(self, entry: SourceCacheEntry) -> List[str]:
+        """
+        Index a content file that is already in place, evicting to fit the budget
+
+        Args:
+            entry: Entry describing path_for(entry.key); its sha256 is trusted
+                because it was computed while the file was written
+
+        Returns:
+            Keys evicted to make room
+        """
+        path = self.path_for(entry.key)
+        if entry.size > self.max_bytes:
+            logger.info(f"Document {entry.document_id} ({entry.size:,} bytes) exceeds the cache budget; not cached")
+            path.unlink(missing_ok=True)
+            return []
+
+        now = time.time()
+        entry.created_at = entry.created_at or now
+        entry.last_access = now
+        entry.mtime_ns = path.stat().st_mtime_ns
+        with self._lock:
+            self._remove_locked(entry.key, delete_file=False)
+            self._entries[entry.key] = entry
+            self._total_bytes += entry.size
+            self._verified.add(entry.key)
+            self._dirty = True
+            evicted = self._evict_over_budget()
+        self.flush()
+        return evicted
+
+    def _evict_over_budget(self) -> List[str]:
+        """Drop least recently accessed entries until under budget (caller holds the lock)"""
+        evicted = []
+        if self._total_bytes <= self.max_bytes:
+            return evicted
+        for entry in sorted(self._entries.values(), key=lambda e: e.last_access):
+            if self._total_bytes <= self.max_bytes:
+                break
+            self._remove_locked(entry.key)
+            self.metrics["evictions"] += 1
+            evicted.append(entry.key)
+        if evicted:
+            logger.info(f"🗑️ Evicted {len(evicted)} cached documents to stay under {self.max_bytes:,} bytes")
+        return evicted
+
+    def _remove_locked(self, key: str, delete_file: bool = True):
+        entry = self._entries.pop(key, None)
+        self._verified.discard(key)
+        if entry is not None:
+            self._total_bytes -= entry.size
+            self._dirty = True
+        if delete_file:
+            self.path_for(key).unlink(missing_ok=True)
+
+    def remove(self, key: str):
+        """Forget an entry and delete its file"""
+        with self._lock:
+            self._remove_locked(key)
+        self.flush()
+
+    def clear(self) -> int:
+        """
+        Delete every cached file (in-flight .part downloads are left alone)
+
+        Returns:
+            Number of files removed
+        """
+        with self._lock:
+            keys = list(self._entries)
+            for key in keys:
+                self._remove_locked(key)
+        self.flush()
+        return len(keys)
+
+    # ------------------------------------------------------------------
+    # Background maintenance
+    # ------------------------------------------------------------------
+
+    def cleanup(self) -> Dict[str, int]:
+        """
+        Expire old entries, enforce the budget, delete orphaned files and
+        stale partial downloads, then persist the index
+
+        Returns:
+            Counts of removed items by reason
+        """
+        now = time.time()
+        removed = {"expired": 0, "evicted": 0, "orphans": 0, "stale_parts": 0}
+        with self._lock:
+            for key in [k for k, e in self._entries.items() if self._expired(e, now)]:
+                self._remove_locked(key)
+                self.metrics["expirations"] += 1
+                removed["expired"] += 1
+            removed["evicted"] = len(self._evict_over_budget())
+            known = set(self._entries)
+
+        for path in self.cache_dir.iterdir():
+            name = path.name
+            try:
+                if name.endswith(".part"):
+                    if now - path.stat().st_mtime > STALE_PART_SECONDS:
+                        path.unlink()
+                        removed["stale_parts"] += 1
+                elif name.endswith(self.extension) and name[:-len(self.extension)] not in known:
+                    if now - path.stat().st_mtime <= ORPHAN_GRACE_SECONDS:
+                        continue
+                    with self._lock:
+                        if name[:-len(self.extension)] in self._entries:
+                            continue  # Indexed since the snapshot
+                        path.unlink()
+                    removed["orphans"] += 1
+            except FileNotFoundError:
+                pass
+
+        self.flush()
+        if any(removed.values()):
+            logger.info(f"🧹 Document source cache cleanup: {removed}")
+        return removed
+
+    def start_background_cleanup(self, interval: float):
+        """Run cleanup() every `interval` seconds on the running loop (idempotent)"""
+        if interval <= 0 or (self._cleanup_task is not None and not self._cleanup_task.done()):
+            return
+        self._cleanup_task = asyncio.get_running_loop().create_task(self._cleanup_loop(interval))
+
+    async def _cleanup_loop(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self.cleanup)
+            except Exception as e:
+                logger.warning(f"Document source cache cleanup failed: {e}")
+
+    async def close(self):
+        """Stop the background sweep and persist the index"""
+        task, self._cleanup_task = self._cleanup_task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        await asyncio.to_thread(self.flush)
+
+    # ------------------------------------------------------------------
+    # Stats
+    # ------------------------------------------------------------------
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Index-backed statistics; no filesystem access"""
+        with self._lock:
+            lookups = self.metrics["hits"] + self.metrics["misses"]
+            return {
+                "cached_documents": len(self._entries),
+                "total_size_bytes": self._total_bytes,
+                "total_size_mb": round(self._total_bytes / (1024 * 1024), 2),
+                "max_size_bytes": self.max_bytes,
+                "utilization": self._total_bytes / self.max_bytes if self.max_bytes else 0.0,
+                "hit_rate": self.metrics["hits"] / lookups if lookups else 0.0,
+                **self.metrics,
+            }
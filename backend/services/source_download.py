@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Shared Tee Download
+===================
+
+One upstream download written to a cache file while clients read it.
+
+The download appends to a ``.part`` file and renames it into place when
+complete. Any number of readers follow the growing file with os.pread,
+waiting for more bytes when they catch up, so the first client is served
+while the body is still arriving and concurrent cold requests for the same
+document share the one upstream transfer instead of each starting their own.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+logger = logging.getLogger(__name__)
+
+READ_CHUNK_SIZE = 256 * 1024
+
+
+class SourceDownloadError(Exception):
+    """The upstream download failed"""
+
+
+class SharedSourceDownload:
+    """Upstream body teed into a cache file and to every waiting reader"""
+
+    def __init__(self, final_path: Path):
+        """
+        Args:
+            final_path: Cache file the completed download is renamed to
+        """
+        self.final_path = Path(final_path)
+        self.part_path = self.final_path.with_name(f"{self.final_path.name}.{os.getpid()}.part")
+
+        self.content_type: Optional[str] = None
+        self.filename: Optional[str] = None
+        self.size: Optional[int] = None  # Declared Content-Length, if any
+        self.bytes_written = 0
+        self.sha256: Optional[str] = None  # Set once the body is complete
+        self.done = False
+        self.error: Optional[str] = None
+        self.readers = 0
+
+        self._file = None
+        self._hash = hashlib.sha256()
+        self._started = asyncio.Event()
+        self._progress = asyncio.Condition()
+
+    # ------------------------------------------------------------------
+    # Writer side (the single upstream fetch)
+    # ------------------------------------------------------------------
+
+    async def start(self, content_type: Optional[str], filename: Optional[str], size: Optional[int]):
+        """Record response headers and open the part file; releases waiting readers"""
+        self.content_type = content_type
+        self.filename = filename
+        self.size = size
+        self.part_path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = await asyncio.to_thread(open, self.part_path, "wb")
+        self._started.set()
+
+    async def write(self, chunk: bytes):
+        """Append a body chunk and wake readers waiting for it"""
+        await asyncio.to_thread(self._write_through, chunk)
+        async with self._progress:
+            self.bytes_written += len(chunk)
+            self._progress.notify_all()
+
+    def _write_through(self, chunk: bytes):
+        self._file.write(chunk)
+        self._file.flush()  # Readers pread the file, not our buffer
+        self._hash.update(chunk)
+
+    async def finish(self):
+        """Close and rename the part file into the cache"""
+        if self.size is not None and self.bytes_written != self.size:
+            await self.fail(f"Upstream body ended after {self.bytes_written} of {self.size} bytes")
+            return
+        await asyncio.to_thread(self._close_and_publish)
+        async with self._progress:
+            self.size = self.bytes_written
+            self.sha256 = self._hash.hexdigest()
+            self.done = True
+            self._progress.notify_all()
+
+    def _close_and_publish(self):
+        self._file.close()
+        os.replace(self.part_path, self.final_path)
+
+    async def fail(self, error: str):
+        """Abort the download; readers that still need bytes raise SourceDownloadError"""
+        async with self._progress:
+            self.error = error
+            self._progress.notify_all()
+        self._started.set()
+        if self._file is not None:
+            await asyncio.to_thread(self._file.close)
+            try:
+                self.part_path.unlink()
+            except FileNotFoundError:
+                pass
+
+    # ------------------------------------------------------------------
+    # Reader side (every client request)
+    # ------------------------------------------------------------------
+
+    async def wait_started(self):
+        """
+        Wait until response headers are known
+
+        Raises:
+            SourceDownloadError: If the download failed before the body started
+        """
+        await self._started.wait()
+        if self.error is not None and self._file is None:
+            raise SourceDownloadError(self.error)
+
+    async def wait_finished(self):
+        """
+        Wait for the whole body to reach the cache file
+
+        Raises:
+            SourceDownloadError: If the download failed
+        """
+        async with self._progress:
+            await self._progress.wait_for(lambda: self.done or self.error is not None)
+        if self.error is not None:
+            raise SourceDownloadError(self.error)
+
+    def _open_for_read(self) -> int:
+        try:
+            return os.open(self.part_path, os.O_RDONLY)
+        except FileNotFoundError:
+            # Renamed into place (or failed) since the reader started
+            if self.error is not None:
+                raise SourceDownloadError(self.error)
+            return os.open(self.final_path, os.O_RDONLY)
+
+    async def iter_range(self, start: int = 0, end: Optional[int] = None) -> AsyncIterator[bytes]:
+        """
+        Stream bytes [start, end] (inclusive) as they arrive
+
+        Args:
+            start: First byte offset
+            end: Last byte offset, or None for the rest of the body
+
+        Raises:
+            SourceDownloadError: If the download fails before the range is complete
+        """
+        await self.wait_started()
+        fd = self._open_for_read()
+        self.readers += 1
+        try:
+            offset = start
+            while end is None or offset <= end:
+                async with self._progress:
+                    await self._progress.wait_for(
+                        lambda: self.bytes_written > offset or self.done or self.error is not None
+                    )
+                    available = self.bytes_written
+                    if self.error is not None:
+                        raise SourceDownloadError(self.error)
+                if offset >= available:
+                    break  # Done and fully read
+                limit = available if end is None else min(available, end + 1)
+                chunk = await asyncio.to_thread(os.pread, fd, min(READ_CHUNK_SIZE, limit - offset), offset)
+                if not chunk:
+                    break
+                offset += len(chunk)
+                yield chunk
+        finally:
+            os.close(fd)
+            self.readers -= 1
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+TTS Audio Cache
+===============
+
+Content-addressed cache for synthesized speech. Entries are keyed on a hash
+of the exact text sent to the TTS provider plus the voice, model and voice
+settings, so a repeated answer ("fryer temperature", "sanitizer ratio") is
+served without another synthesis round trip. A bounded in-memory LRU tier
+sits in front of an on-disk tier that evicts least recently used files once
+it grows past its byte budget.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TTSCacheStats:
+    """Hit/miss counters"""
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    memory_evictions: int = 0
+    disk_evictions: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        hits = self.memory_hits + self.disk_hits
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "stores": self.stores,
+            "memory_evictions": self.memory_evictions,
+            "disk_evictions": self.disk_evictions,
+        }
+
+
+class TTSAudioCache:
+    """Two-tier (memory LRU + size-bounded disk) cache of synthesized audio"""
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        max_memory_bytes: int = 32 * 1024 * 1024,
+        max_memory_entries: int = 512,
+        max_disk_bytes: int = 512 * 1024 * 1024,
+        extension: str = ".mp3",
+    ):
+        """
+        Args:
+            cache_dir: Directory for the disk tier; None keeps the cache memory-only
+            max_memory_bytes: Audio bytes held in memory before LRU eviction
+            max_memory_entries: Clips held in memory before LRU eviction
+            max_disk_bytes: Audio bytes kept on disk before LRU eviction
+            extension: File extension for cached clips
+        """
+        self.max_memory_bytes = max_memory_bytes
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.extension = extension
+        self.cache_dir = Path(cache_dir) if cache_dir and max_disk_bytes > 0 else None
+
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        # key -> file size, in least-recently-used-first order
+        self._disk: "OrderedDict[str, int]" = OrderedDict()
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        self.stats = TTSCacheStats()
+
+        if self.cache_dir is not None:
+            self._load_disk_index()
+
+    @staticmethod
+    def make_key(text: str, voice_id: str, model_id: str, voice_settings: Dict[str, Any]) -> str:
+        """Hash of everything that determines the synthesized audio"""
+        payload = json.dumps(
+            {"text": text, "voice_id": voice_id, "model_id": model_id, "voice_settings": voice_settings},
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}{self.extension}"
+
+    def _load_disk_index(self):
+        """Rebuild the disk LRU order from file modification times"""
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            files = []
+            for entry in os.scandir(self.cache_dir):
+                if entry.is_file() and entry.name.endswith(self.extension):
+                    stat = entry.stat()
+                    files.append((stat.st_mtime, entry.name[:-len(self.extension)], stat.st_size))
+        except OSError as e:
+            logger.warning(f"TTS disk cache unavailable at {self.cache_dir}: {e}")
+            self.cache_dir = None
+            return
+        for _, key, size in sorted(files):
+            self._disk[key] = size
+            self._disk_bytes += size
+        self._unlink(self._evict_disk())
+        if self._disk:
+            logger.info(f"🔊 TTS disk cache: {len(self._disk)} clips ({self._disk_bytes:,} bytes)")
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def get_from_memory(self, key: str) -> Optional[bytes]:
+        """Memory-tier lookup; never touches disk"""
+        with self._lock:
+            audio = self._memory.get(key)
+            if audio is not None:
+                self._memory.move_to_end(key)
+                self.stats.memory_hits += 1
+            return audio
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Cached audio for a key, promoting disk hits into memory
+
+        Returns:
+            Audio bytes or None on a miss
+        """
+        audio = self.get_from_memory(key)
+        if audio is not None:
+            return audio
+
+        audio = self._read_disk(key)
+        with self._lock:
+            if audio is None:
+                self.stats.misses += 1
+                return None
+            self.stats.disk_hits += 1
+            self._remember(key, audio)
+        return audio
+
+    async def aget(self, key: str) -> Optional[bytes]:
+        """Async get; memory hits return immediately, disk reads run in a thread"""
+        audio = self.get_from_memory(key)
+        if audio is not None:
+            return audio
+        return await asyncio.to_thread(self.get, key)
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        if self.cache_dir is None:
+            return None
+        with self._lock:
+            if key not in self._disk:
+                return None
+            self._disk.move_to_end(key)
+        path = self._path(key)
+        try:
+            audio = path.read_bytes()
+            os.utime(path)  # Persist recency for the next restart
+            return audio
+        except OSError:
+            with self._lock:
+                self._disk_bytes -= self._disk.pop(key, 0)
+            return None
+
+    # ------------------------------------------------------------------
+    # Stores
+    # ------------------------------------------------------------------
+
+    def put(self, key: str, audio: bytes):
+        """Store audio in memory and on disk"""
+        if not audio:
+            return
+        with self._lock:
+            self._remember(key, audio)
+            self.stats.stores += 1
+        self._write_disk(key, audio)
+
+    async def aput(self, key: str, audio: bytes):
+        """Async put; the disk write runs in a thread"""
+        await asyncio.to_thread(self.put, key, audio)
+
+    def _remember(self, key: str, audio: bytes):
+        """Insert into the memory tier (caller holds the lock)"""
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous)
+        if len(audio) > self.max_memory_bytes:
+            return
+        self._memory[key] = audio
+        self._memory_bytes += len(audio)
+        while self._memory and (
+            self._memory_bytes > self.max_memory_bytes or len(self._memory) > self.max_memory_entries
+        ):
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            self.stats.memory_evictions += 1
+
+    def _write_disk(self, key: str, audio: bytes):
+        if self.cache_dir is None or len(audio) > self.max_disk_bytes:
+            return
+        path = self._path(key)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            tmp_path.write_bytes(audio)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"TTS disk cache write failed: {e}")
+            try:
+                tmp_path.unlink()
+            except FileNotFoundError:
+                pass
+            return
+        with self._lock:
+            self._disk_bytes -= self._disk.pop(key, 0)
+            self._disk[key] = len(audio)
+            self._disk_bytes += len(audio)
+            evicted = self._evict_disk()
+        self._unlink(evicted)
+
+    def _unlink(self, keys):
+        for key in keys:
+            try:
+                self._path(key).unlink()
+            except FileNotFoundError:
+                pass
+
+    def _evict_disk(self) -> list:
+        """Drop least recently used clips until the disk tier fits its budget"""
+        evicted = []
+        while self._disk and self._disk_bytes > self.max_disk_bytes:
+            old_key, size = self._disk.popitem(last=False)
+            self._disk_bytes -= size
+            self.stats.disk_evictions += 1
+            evicted.append(old_key)
+        return evicted
+
+    def clear(self):
+        """Drop every cached clip from both tiers"""
+        with self._lock:
+            keys = list(self._disk)
+            self._memory.clear()
+            self._memory_bytes = 0
+            self._disk.clear()
+            self._disk_bytes = 0
+        if self.cache_dir is not None:
+            self._unlink(keys)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.stats.to_dict(),
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "disk_entries": len(self._disk),
+                "disk_bytes": self._disk_bytes,
+                "disk_enabled": self.cache_dir is not None,
+            }
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+TTS Request Scheduler
+=====================
+
+Runs text-to-speech requests concurrently up to the provider's concurrency
+limit instead of serializing every user behind one global interval.
+
+- A token bucket caps the request rate at the account's allowance.
+- A priority queue serves interactive replies ahead of prefetch work.
+- Start-time fair queuing inside each priority keeps one chatty session
+  from starving the others.
+- A 429 re-queues only the affected request with a backoff; the worker
+  moves on to other requests in the meantime.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TTSPriority(IntEnum):
+    """Lower values are served first"""
+    INTERACTIVE = 0
+    PREFETCH = 1
+
+
+class TTSRateLimited(Exception):
+    """Raised by a job when the provider answered 429"""
+
+    def __init__(self, retry_after: Optional[float] = None):
+        super().__init__("TTS provider rate limit")
+        self.retry_after = retry_after
+
+
+class TTSQueueFull(Exception):
+    """The scheduler queue is at capacity (backpressure)"""
+
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second, holding at most `capacity`"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> float:
+        """
+        Take one token, sleeping until one is available
+
+        Returns:
+            Seconds spent waiting
+        """
+        waited = 0.0
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+                await asyncio.sleep(delay)
+                waited += delay
+
+
+@dataclass(order=True)
+class _QueuedRequest:
+    priority: int
+    virtual_start: int
+    seq: int
+    job: Callable[[], Awaitable[Any]] = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    session_id: str = field(compare=False)
+    enqueued_at: float = field(compare=False)
+    not_before: float = field(compare=False, default=0.0)
+    attempts: int = field(compare=False, default=0)
+
+
+class TTSScheduler:
+    """Concurrency- and rate-limited priority scheduler for TTS calls"""
+
+    def __init__(
+        self,
+        max_concurrency: int = 3,
+        requests_per_second: float = 2.0,
+        burst: Optional[int] = None,
+        max_queue: int = 64,
+        max_rate_limit_retries: int = 3,
+        base_backoff: float = 1.0,
+    ):
+        """
+        Args:
+            max_concurrency: Requests in flight at once (the account's concurrency limit)
+            requests_per_second: Sustained request rate
+            burst: Token bucket capacity (defaults to max_concurrency)
+            max_queue: Queued requests before submit() raises TTSQueueFull
+            max_rate_limit_retries: Times a request is re-queued after a 429
+            base_backoff: First 429 backoff in seconds (doubles per attempt)
+        """
+        self.max_concurrency = max_concurrency
+        self.requests_per_second = requests_per_second
+        self.burst = burst or max_concurrency
+        self.max_queue = max_queue
+        self.max_rate_limit_retries = max_rate_limit_retries
+        self.base_backoff = base_backoff
+
+        self._heap: List[_QueuedRequest] = []
+        self._seq = itertools.count()
+        self._session_last_start: Dict[str, int] = {}
+        self._virtual_clock = 0
+        self._pending_by_session: Dict[str, int] = {}
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Condition] = None
+        self._bucket: Optional[TokenBucket] = None
+        self._workers: List[asyncio.Task] = []
+
+        self.in_flight = 0
+        self.metrics = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "rejected": 0,
+            "rate_limited": 0,
+            "total_queue_wait": 0.0,
+            "max_queue_wait": 0.0,
+            "total_throttle_wait": 0.0,
+        }
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def _ensure_started(self):
+        """Start workers on the running loop (restarting if the loop changed)"""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._workers:
+            return
+        self._loop = loop
+        self._wakeup = asyncio.Condition()
+        self._bucket = TokenBucket(self.requests_per_second, self.burst)
+        self._heap = []
+        self._pending_by_session = {}
+        self.in_flight = 0
+        self._workers = [loop.create_task(self._worker()) for _ in range(self.max_concurrency)]
+
+    async def close(self):
+        """Stop workers and fail anything still queued"""
+        workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.cancel()
+        for request in self._heap:
+            if not request.future.done():
+                request.future.cancel()
+        self._heap = []
+        self._pending_by_session = {}
+        if workers:
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    # ------------------------------------------------------------------
+    # Submission
+    # ------------------------------------------------------------------
+
+    async def submit(
+        self,
+        job: Callable[[], Awaitable[Any]],
+        priority: TTSPriority = TTSPriority.INTERACTIVE,
+        session_id: Optional[str] = None,
+    ) -> Any:
+        """
+        Queue a TTS call and wait for its result
+
+        Args:
+            job: Zero-argument coroutine function performing one provider call;
+                raises TTSRateLimited on a 429
+            priority: INTERACTIVE replies are served before PREFETCH work
+            session_id: Fairness key; requests from one session are interleaved with others
+
+        Returns:
+            The job's result
+
+        Raises:
+            TTSQueueFull: If the queue is at capacity
+            TTSRateLimited: If the request was still rate limited after all retries
+        """
+        self._ensure_started()
+        if len(self._heap) >= self.max_queue:
+            self.metrics["rejected"] += 1
+            raise TTSQueueFull(f"TTS queue full ({len(self._heap)} waiting)")
+
+        session_id = session_id or "default"
+        # Start-time fair queuing: a session's next request starts after its previous one
+        virtual_start = max(self._virtual_clock, self._session_last_start.get(session_id, 0)) + 1
+        self._session_last_start[session_id] = virtual_start
+
+        request = _QueuedRequest(
+            priority=int(priority),
+            virtual_start=virtual_start,
+            seq=next(self._seq),
+            job=job,
+            future=self._loop.create_future(),
+            session_id=session_id,
+            enqueued_at=time.monotonic(),
+        )
+        self._pending_by_session[session_id] = self._pending_by_session.get(session_id, 0) + 1
+        self.metrics["submitted"] += 1
+        await self._push(request)
+
+        try:
+            return await request.future
+        finally:
+            remaining = self._pending_by_session.get(session_id, 1) - 1
+            if remaining > 0:
+                self._pending_by_session[session_id] = remaining
+            else:
+                self._pending_by_session.pop(session_id, None)
+                if not any(r.session_id == session_id for r in self._heap):
+                    self._session_last_start.pop(session_id, None)
+
+    async def _push(self, request: _QueuedRequest):
+        async with self._wakeup:
+            heapq.heappush(self._heap, request)
+            self._wakeup.notify()
+
+    async def _pop_ready(self) -> _QueuedRequest:
+        """Highest-priority request whose backoff has elapsed"""
+        async with self._wakeup:
+            while True:
+                now = time.monotonic()
+                ready = [r for r in self._heap if r.not_before <= now]
+                if ready:
+                    request = min(ready)
+                    self._heap.remove(request)
+                    heapq.heapify(self._heap)
+                    return request
+                if self._heap:
+                    delay = min(r.not_before for r in self._heap) - now
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                    except asyncio.TimeoutError:
+                        pass
+                else:
+                    await self._wakeup.wait()
+
+    # ------------------------------------------------------------------
+    # Workers
+    # ------------------------------------------------------------------
+
+    async def _worker(self):
+        while True:
+            request = await self._pop_ready()
+            if request.future.done():
+                continue  # Caller gave up while queued
+
+            throttle_wait = await self._bucket.acquire()
+            self.metrics["total_throttle_wait"] += throttle_wait
+            if request.attempts == 0:
+                queue_wait = time.monotonic() - request.enqueued_at
+                self.metrics["total_queue_wait"] += queue_wait
+                self.metrics["max_queue_wait"] = max(self.metrics["max_queue_wait"], queue_wait)
+            self._virtual_clock = max(self._virtual_clock, request.virtual_start)
+
+            self.in_flight += 1
+            try:
+                result = await request.job()
+            except TTSRateLimited as e:
+                self.metrics["rate_limited"] += 1
+                request.attempts += 1
+                if request.attempts > self.max_rate_limit_retries:
+                    self.metrics["failed"] += 1
+                    if not request.future.done():
+                        request.future.set_exception(e)
+                else:
+                    backoff = e.retry_after or self.base_backoff * (2 ** (request.attempts - 1))
+                    logger.warning(
+                        f"TTS rate limited; re-queueing {request.session_id} request in {backoff:.1f}s "
+                        f"(attempt {request.attempts}/{self.max_rate_limit_retries})"
+                    )
+                    request.not_before = time.monotonic() + backoff
+                    await self._push(request)
+            except asyncio.CancelledError:
+                if not request.future.done():
+                    request.future.cancel()
+                raise
+            except Exception as e:
+                self.metrics["failed"] += 1
+                if not request.future.done():
+                    request.future.set_exception(e)
+            else:
+                self.metrics["completed"] += 1
+                if not request.future.done():
+                    request.future.set_result(result)
+            finally:
+                self.in_flight -= 1
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth, backpressure and throughput counters"""
+        started = self.metrics["completed"] + self.metrics["failed"]
+        queued_by_priority = {p.name.lower(): 0 for p in TTSPriority}
+        for request in self._heap:
+            queued_by_priority[TTSPriority(request.priority).name.lower()] += 1
+        return {
+            "max_concurrency": self.max_concurrency,
+            "requests_per_second": self.requests_per_second,
+            "in_flight": self.in_flight,
+            "queued": len(self._heap),
+            "queued_by_priority": queued_by_priority,
+            "queue_utilization": len(self._heap) / self.max_queue if self.max_queue else 0.0,
+            "sessions_waiting": len(self._pending_by_session),
+            "avg_queue_wait": self.metrics["total_queue_wait"] / started if started else 0.0,
+            **self.metrics,
+        }
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Streaming Upload Writer
+=======================
+
+Writes an UploadFile to disk in fixed-size chunks while hashing, size-checking
+and capturing the leading bytes for magic-number sniffing, so an upload is
+never held in memory as a whole. Later stages read the saved file through a
+read-only memory map instead of a Python bytes copy.
+"""
+
+import hashlib
+import logging
+import mmap
+import os
+from contextlib import contextmanager
+from dataclasses import dataclass
+from io import BytesIO
+from pathlib import Path
+from typing import Callable, Iterator, Optional, Union
+
+import aiofiles
+from fastapi import UploadFile
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+HEADER_BYTES = 8192
+
+
+class UploadRejectedError(ValueError):
+    """Upload stopped before completion (too large or failed the header check)"""
+
+
+@dataclass
+class StreamedUpload:
+    """A file written to disk by stream_upload_to_disk"""
+    path: Path
+    filename: str
+    size: int
+    sha256: str
+    head: bytes
+
+
+async def stream_upload_to_disk(
+    upload: UploadFile,
+    dest_path: Union[str, Path],
+    max_size: Optional[int] = None,
+    header_check: Optional[Callable[[bytes], Optional[str]]] = None,
+    chunk_size: int = UPLOAD_CHUNK_SIZE,
+) -> StreamedUpload:
+    """
+    Stream an upload to disk chunk by chunk
+
+    The file is written to a .part sibling and renamed into place only after
+    the whole body was received, so a rejected or interrupted upload never
+    leaves a partial file at dest_path.
+
+    Args:
+        upload: Incoming upload
+        dest_path: Final file path
+        max_size: Reject the upload as soon as it grows past this many bytes
+        header_check: Called once with the first HEADER_BYTES; returns an error message to reject
+        chunk_size: Bytes read per chunk
+
+    Returns:
+        StreamedUpload describing the saved file
+
+    Raises:
+        UploadRejectedError: If the size limit or header check fails
+    """
+    dest_path = Path(dest_path)
+    dest_path.parent.mkdir(parents=True, exist_ok=True)
+    part_path = dest_path.with_name(dest_path.name + ".part")
+
+    digest = hashlib.sha256()
+    head = bytearray()
+    size = 0
+    header_checked = header_check is None
+
+    try:
+        async with aiofiles.open(part_path, "wb") as out:
+            while True:
+                chunk = await upload.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if max_size is not None and size > max_size:
+                    raise UploadRejectedError(
+                        f"File size exceeds maximum allowed size ({max_size:,} bytes)"
+                    )
+                if len(head) < HEADER_BYTES:
+                    head.extend(chunk[:HEADER_BYTES - len(head)])
+                if not header_checked and len(head) >= HEADER_BYTES:
+                    _run_header_check(header_check, bytes(head))
+                    header_checked = True
+                digest.update(chunk)
+                await out.write(chunk)
+
+        if not header_checked:
+            _run_header_check(header_check, bytes(head))
+        os.replace(part_path, dest_path)
+    except BaseException:
+        try:
+            part_path.unlink()
+        except FileNotFoundError:
+            pass
+        raise
+
+    logger.info(f"📥 Streamed upload {upload.filename} to {dest_path} ({size:,} bytes)")
+    return StreamedUpload(
+        path=dest_path,
+        filename=upload.filename,
+        size=size,
+        sha256=digest.hexdigest(),
+        head=bytes(head),
+    )
+
+
+def _run_header_check(header_check: Callable[[bytes], Optional[str]], head: bytes):
+    error = header_check(head)
+    if error:
+        raise UploadRejectedError(error)
+
+
+@contextmanager
+def map_file(path: Union[str, Path]) -> Iterator[Union[mmap.mmap, bytes]]:
+    """
+    Read-only memory map of a saved file
+
+    Yields b"" for empty files, which cannot be mapped.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b""
+            return
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield mapped
+        finally:
+            mapped.close()
+
+
+def as_binary_stream(content):
+    """
+    Seekable binary stream over bytes or a memory map without copying the map
+
+    mmap objects already implement read/seek/tell; they are rewound and
+    returned as-is. Plain bytes are wrapped in BytesIO.
+    """
+    if isinstance(content, mmap.mmap):
+        content.seek(0)
+        return content
+    return BytesIO(content)
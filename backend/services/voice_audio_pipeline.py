@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Sentence-Pipelined Voice Audio
+==============================
+
+Turns a stream of answer text into a stream of audio without waiting for the
+whole answer. Text deltas are cut into sentences as soon as a sentence is
+complete. Each sentence is synthesized concurrently with the ones after it,
+up to a bounded window, and the clips are emitted strictly in sentence order,
+so the first audio is ready after one sentence's synthesis time.
+
+Frames sent over HTTP use a small binary envelope instead of base64-in-JSON:
+
+    1 byte kind | 4 bytes big-endian payload length | payload
+
+kind is b"M" for a UTF-8 JSON metadata message or b"A" for MP3 audio bytes.
+"""
+
+import asyncio
+import json
+import logging
+import struct
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+FRAME_HEADER = struct.Struct(">cI")
+FRAME_META = b"M"
+FRAME_AUDIO = b"A"
+
+# Sentences shorter than this are merged into the next one to avoid choppy audio
+MIN_SENTENCE_CHARS = 20
+
+
+def encode_frame(kind: bytes, payload: bytes) -> bytes:
+    """Length-prefixed binary frame"""
+    return FRAME_HEADER.pack(kind, len(payload)) + payload
+
+
+def encode_meta_frame(message: Dict[str, Any]) -> bytes:
+    """Metadata frame carrying a JSON object"""
+    return encode_frame(FRAME_META, json.dumps(message).encode("utf-8"))
+
+
+def decode_frames(data: bytes) -> List[Tuple[bytes, bytes]]:
+    """Split a buffer of complete frames into (kind, payload) pairs"""
+    frames = []
+    offset = 0
+    while offset < len(data):
+        kind, length = FRAME_HEADER.unpack_from(data, offset)
+        offset += FRAME_HEADER.size
+        frames.append((kind, data[offset:offset + length]))
+        offset += length
+    return frames
+
+
+class SentenceAccumulator:
+    """Buffers streamed text and releases complete sentences"""
+
+    def __init__(self, splitter: Callable[[str], List[str]], min_chars: int = MIN_SENTENCE_CHARS):
+        """
+        Args:
+            splitter: Sentence splitter (e.g. main.smart_sentence_split)
+            min_chars: Sentences shorter than this wait to be merged with the next one
+        """
+        self.splitter = splitter
+        self.min_chars = min_chars
+        self._buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        """
+        Add streamed text
+
+        Returns:
+            Sentences that are complete; the trailing (possibly unfinished)
+            sentence stays buffered
+        """
+        self._buffer += text
+        sentences = self.splitter(self._buffer)
+        if len(sentences) < 2:
+            return []
+
+        ready = []
+        pending = ""
+        for sentence in sentences[:-1]:
+            pending = f"{pending} {sentence}".strip() if pending else sentence
+            if len(pending) >= self.min_chars:
+                ready.append(pending)
+                pending = ""
+        if not ready:
+            return []
+
+        # Keep only what follows the last released sentence, including the
+        # trailing whitespace the splitter strips, so the next delta joins cleanly
+        trailing = self._buffer[len(self._buffer.rstrip()):]
+        tail = sentences[-1]
+        self._buffer = (f"{pending} {tail}".strip() if pending else tail) + trailing
+        return ready
+
+    def flush(self) -> List[str]:
+        """Release whatever is left once the text stream has ended"""
+        remaining, self._buffer = self._buffer.strip(), ""
+        if not remaining:
+            return []
+        merged = []
+        for sentence in (s for s in self.splitter(remaining) if s.strip()):
+            if merged and len(merged[-1]) < self.min_chars:
+                merged[-1] = f"{merged[-1]} {sentence}"
+            else:
+                merged.append(sentence)
+        return merged or [remaining]
+
+
+async def pipeline_sentence_audio(
+    sentences: AsyncIterator[str],
+    synthesize: Callable[[int, str], Awaitable[Optional[bytes]]],
+    window: int = 3,
+) -> AsyncIterator[Tuple[int, str, Optional[bytes]]]:
+    """
+    Synthesize sentences concurrently and yield their audio in order
+
+    At most `window` sentences are being synthesized or waiting to be
+    yielded at any time, which bounds both provider load and buffered audio.
+
+    Args:
+        sentences: Sentences in speaking order, as they become available
+        synthesize: Coroutine taking (index, sentence) and returning MP3 bytes (or None)
+        window: Maximum sentences synthesized ahead of playback
+
+    Yields:
+        (index, sentence, audio) in sentence order; audio is None if synthesis failed
+    """
+    ready: asyncio.Queue = asyncio.Queue()
+    slots = asyncio.Semaphore(window)
+    tasks: Deque[asyncio.Task] = deque()
+
+    async def _schedule():
+        # Runs independently of the consumer so a finished clip is emitted
+        # even while the next sentence is still being generated
+        try:
+            index = 0
+            async for sentence in sentences:
+                await slots.acquire()
+                task = asyncio.ensure_future(synthesize(index, sentence))
+                tasks.append(task)
+                await ready.put((index, sentence, task))
+                index += 1
+        finally:
+            await ready.put(None)
+
+    scheduler = asyncio.ensure_future(_schedule())
+    try:
+        while True:
+            item = await ready.get()
+            if item is None:
+                break
+            index, sentence, task = item
+            try:
+                audio = await task
+            except Exception as e:
+                logger.warning(f"Sentence {index} synthesis failed: {e}")
+                audio = None
+            finally:
+                tasks.popleft()
+                slots.release()
+            yield index, sentence, audio
+
+        # Surface errors raised by the sentence source
+        await scheduler
+    finally:
+        scheduler.cancel()
+        for task in tasks:
+            task.cancel()
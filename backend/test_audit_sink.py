@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Tests for the buffered audit log writer
+"""
+
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from audit_sink import AuditDurability, AuditSink
+
+STATEMENTS = {"event": "INSERT INTO events (id, note) VALUES (?, ?)"}
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / "audit.db"
+    con = sqlite3.connect(path)
+    con.execute("CREATE TABLE events (id INTEGER PRIMARY KEY, note TEXT)")
+    con.commit()
+    con.close()
+    return path
+
+
+def _count(db_path):
+    con = sqlite3.connect(db_path)
+    try:
+        return con.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+    finally:
+        con.close()
+
+
+def test_rows_are_batched_by_size_and_age(db_path):
+    sink = AuditSink(db_path, STATEMENTS, max_batch=50, max_age=0.05, durability=AuditDurability.BUFFERED)
+    try:
+        for i in range(120):
+            assert sink.write("event", (i, "query"))
+        assert sink.flush(timeout=5)
+        assert _count(db_path) == 120
+        stats = sink.get_stats()
+        assert stats["written"] == 120
+        assert stats["batches"] < 120
+        assert stats["max_batch_seen"] <= 50
+
+        # A lone row is written once it ages out, without an explicit flush
+        sink.write("event", (500, "late"))
+        deadline = time.monotonic() + 5
+        while _count(db_path) < 121 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert _count(db_path) == 121
+    finally:
+        sink.close()
+
+
+def test_critical_rows_are_committed_before_returning(db_path):
+    sink = AuditSink(db_path, STATEMENTS, max_age=60, durability=AuditDurability.FLUSH_ON_CRITICAL)
+    try:
+        sink.write("event", (1, "routine"))
+        assert _count(db_path) == 0  # Buffered, far from its deadline
+        assert sink.write("event", (2, "critical"), critical=True)
+        # The critical commit carries the earlier buffered row with it
+        assert _count(db_path) == 2
+        assert sink.get_stats()["critical_flushes"] == 1
+    finally:
+        sink.close()
+
+
+def test_overflow_drops_oldest_and_counts(db_path):
+    sink = AuditSink(db_path, STATEMENTS, capacity=5, max_batch=1000, max_age=60,
+                     durability=AuditDurability.BUFFERED)
+    try:
+        for i in range(8):
+            sink.write("event", (i, "burst"))
+        assert sink.get_stats()["dropped"] == 3
+        sink.flush(timeout=5)
+        con = sqlite3.connect(db_path)
+        ids = [row[0] for row in con.execute("SELECT id FROM events ORDER BY id")]
+        con.close()
+        assert ids == [3, 4, 5, 6, 7]
+    finally:
+        sink.close()
+
+
+def _wait_until(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert predicate()
+
+
+def test_waiting_writer_is_told_when_its_row_is_dropped(db_path):
+    sink = AuditSink(db_path, STATEMENTS, capacity=2, max_batch=1000, max_age=60,
+                     durability=AuditDurability.FLUSH_ON_CRITICAL)
+    gate = threading.Event()
+    write_batch = sink._write_batch
+    sink._write_batch = lambda batch: gate.wait(5) and write_batch(batch)
+    results = {}
+
+    def critical_write(row_id):
+        results[row_id] = sink.write("event", (row_id, "critical"), critical=True)
+
+    try:
+        first = threading.Thread(target=critical_write, args=(1,))
+        first.start()
+        _wait_until(lambda: not sink._buffer)  # The stalled writer holds row 1
+        second = threading.Thread(target=critical_write, args=(2,))
+        second.start()
+        _wait_until(lambda: len(sink._waiting) == 2)
+
+        sink.write("event", (3, "burst"))
+        sink.write("event", (4, "burst"))  # Overflows and drops row 2
+        second.join(5)
+        assert results == {2: False}
+
+        gate.set()
+        first.join(5)
+        assert results == {1: True, 2: False}
+        assert sink.flush(timeout=5)
+        con = sqlite3.connect(db_path)
+        ids = [row[0] for row in con.execute("SELECT id FROM events ORDER BY id")]
+        con.close()
+        assert ids == [1, 3, 4]
+    finally:
+        gate.set()
+        sink.close()
+
+
+def test_bad_row_does_not_lose_batch(db_path):
+    sink = AuditSink(db_path, STATEMENTS, durability=AuditDurability.SYNC)
+    try:
+        sink.write("event", (1, "first"))
+        sink.write("event", (1, "duplicate key"))
+        sink.write("event", (2, "second"))
+        assert _count(db_path) == 2
+        assert sink.get_stats()["failed"] == 1
+    finally:
+        sink.close()
+
+
+def test_close_drains_pending_rows(db_path):
+    sink = AuditSink(db_path, STATEMENTS, max_age=60, durability=AuditDurability.BUFFERED)
+    for i in range(10):
+        sink.write("event", (i, "pending"))
+    sink.close()
+    assert _count(db_path) == 10
+    assert not sink.write("event", (99, "after close"))
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Tests for SQL-aggregated compliance reports and paginated audit event reads
+"""
+
+import asyncio
+import importlib
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+
+@pytest.fixture
+def scl(tmp_path, monkeypatch):
+    # The module builds a global layer under ./data at import time
+    monkeypatch.chdir(tmp_path)
+    module = importlib.import_module("security_compliance_layer")
+    layer = module.SecurityComplianceLayer()
+    layer.violation_detection_enabled = False
+    yield module, layer
+    layer.audit_sink.close()
+
+
+def _user(module, user_id):
+    return module.UserContext(user_id=user_id, username=user_id, email=f"{user_id}@store.example",
+                              access_level=module.AccessLevel.ADMIN)
+
+
+def _seed(module, layer, start):
+    """Insert events directly with controlled timestamps; returns (event_type, result, user, risk) rows"""
+    rows = []
+    conn = sqlite3.connect(layer.audit_db_path)
+    for i in range(300):
+        event_type = ["document_query", "document_upload", "user_access"][i % 3]
+        result = "failure" if i % 10 == 0 else "success"
+        user_id = f"user-{i % 4}"
+        risk = (i % 10) * 1.0
+        tags = '["consent"]' if i % 2 == 0 else "[]"
+        timestamp = start + timedelta(hours=i)
+        conn.execute(module.INSERT_AUDIT_EVENT_SQL, (
+            f"evt-{i:04d}", event_type, user_id, user_id, "", "admin", timestamp.isoformat(),
+            "data_lookup" if i % 5 == 0 else "query", "manual.pdf", result, "{}",
+            "internal", tags, risk, "{}", "", ""
+        ))
+        rows.append((event_type, result, user_id, risk))
+    for i, severity in enumerate(["high", "high", "medium", "low"]):
+        conn.execute(module.INSERT_SECURITY_VIOLATION_SQL, (
+            f"vio-{i}", "rate_limit_violation", "user-1", "user-1",
+            (start + timedelta(hours=i)).isoformat(), severity, "too fast", "rate_limiting", "{}"
+        ))
+    conn.commit()
+    conn.close()
+    return rows
+
+
+def test_report_aggregates_match_event_rows(scl):
+    module, layer = scl
+    start = datetime(2026, 1, 1)
+    rows = _seed(module, layer, start)
+
+    stats = layer._aggregate_period(start, start + timedelta(days=30))
+    assert stats.total_events == 300
+    assert stats.event_types == {"document_query": 100, "document_upload": 100, "user_access": 100}
+    assert stats.results == {"success": 270, "failure": 30}
+    assert stats.user_activity == {f"user-{u}": 75 for u in range(4)}
+    assert stats.risk_distribution == {
+        "low": sum(r[3] < 3 for r in rows),
+        "medium": sum(3 <= r[3] < 7 for r in rows),
+        "high": sum(r[3] >= 7 for r in rows),
+    }
+    assert stats.risk_over_8 == sum(r[3] > 8 for r in rows)
+    assert stats.data_processing == 60
+    assert stats.consent_events == 150
+    assert len(stats.daily) == 13 and stats.daily["2026-01-01"]["events"] == 24
+    assert stats.violations_by_severity == {"high": 2, "medium": 1, "low": 1}
+
+    report = layer.generate_compliance_report(module.ComplianceFramework.SOC2, start, start + timedelta(days=30))
+    # 2 high, 1 medium, 1 low violations; no delete or config events
+    assert report.compliance_score == 100 - (2 * 15 + 8 + 3) - 20
+    assert report.audit_events == 300 and report.violations == 4
+    assert report.details["compliance_metrics"]["security_controls"]["access_logging"] == 100
+
+
+def test_audit_events_stream_in_pages(scl):
+    module, layer = scl
+    start = datetime(2026, 1, 1)
+    _seed(module, layer, start)
+    end = start + timedelta(hours=99)
+
+    events, cursor = layer.get_audit_events_page(start, end, limit=40)
+    assert len(events) == 40 and cursor is not None
+    streamed = list(layer.iter_audit_events(start, end, page_size=40))
+    assert [e.event_id for e in streamed] == [f"evt-{i:04d}" for i in range(100)]
+    assert streamed[0].user_context.user_id == "user-0"
+
+
+def test_report_queries_use_covering_index(scl):
+    module, layer = scl
+    conn = sqlite3.connect(layer.audit_db_path)
+    bounds = ("2026-01-01", "2026-02-01")
+    plan = " ".join(row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + module.AUDIT_DAILY_AGGREGATE_SQL, bounds))
+    page_plan = " ".join(row[3] for row in conn.execute(
+        "EXPLAIN QUERY PLAN " + module.SELECT_AUDIT_EVENTS_PAGE_SQL, bounds + ("", "", 10)
+    ))
+    conn.close()
+    assert "COVERING INDEX idx_audit_report" in plan
+    assert "idx_audit_report" in page_plan and "TEMP B-TREE FOR ORDER BY" not in page_plan
+
+
+def test_async_audit_waits_off_the_event_loop(scl, monkeypatch):
+    module, layer = scl
+    threads = []
+    monkeypatch.setattr(layer, "audit_operation", lambda *args, **kwargs: threads.append(threading.current_thread()) or "evt")
+
+    async def audit():
+        return await layer.audit_operation_async(
+            module.AuditEventType.DOCUMENT_DELETE, _user(module, "user-1"), "document_delete",
+            "manual.pdf", "success", security_level=module.SecurityLevel.CRITICAL
+        )
+
+    assert asyncio.run(audit()) == "evt"
+    assert threads[-1] is not threading.main_thread()
+
+    # Non-critical rows never wait in flush-on-critical mode
+    non_critical = asyncio.run(layer.audit_operation_async(
+        module.AuditEventType.DOCUMENT_QUERY, _user(module, "user-1"), "document_query",
+        "manual.pdf", "success"
+    ))
+    assert non_critical == "evt"
+    assert threads[-1] is threading.main_thread()
+
+    # Fully buffered writes never wait, so they skip the thread hop
+    monkeypatch.setattr(layer.audit_sink, "durability", module.AuditDurability.BUFFERED)
+    assert asyncio.run(audit()) == "evt"
+    assert threads[-1] is threading.main_thread()
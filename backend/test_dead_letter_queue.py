@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Tests for the SQLite-backed dead letter queue and its concurrent retries
+"""
+
+import asyncio
+import importlib
+import json
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+
+@pytest.fixture
+def reliability(tmp_path, monkeypatch):
+    # The module builds a global queue under ./data at import time
+    monkeypatch.chdir(tmp_path)
+    return importlib.import_module("reliability_infrastructure")
+
+
+@pytest.fixture
+def make_queue(reliability, tmp_path, monkeypatch):
+    queues = []
+
+    def make(retry_concurrency=4, due_now=True):
+        dlq = reliability.DeadLetterQueue(str(tmp_path / "dlq"), retry_concurrency=retry_concurrency)
+        if due_now:
+            monkeypatch.setattr(dlq, "_calculate_next_retry_time", lambda strategy, count: datetime.now())
+        queues.append(dlq)
+        return dlq
+
+    yield make
+    for dlq in queues:
+        dlq.close()
+
+
+def test_outcomes_persist_per_operation(make_queue, monkeypatch):
+    dlq = make_queue()
+    ok_id = dlq.add_failed_operation("neo4j_write", {"doc": "fryer.pdf"}, Exception("Connection reset"))
+    bad_id = dlq.add_failed_operation("neo4j_write", {"doc": "grill.pdf"}, Exception("Connection reset"), max_retries=2)
+    manual_id = dlq.add_failed_operation("file_processing", {}, Exception("Schema validation failed"))
+    monkeypatch.setattr(dlq, "_retry_operation", lambda op: op.operation_id == ok_id)
+
+    assert dlq._process_ready_operations() == 2
+    assert [op.operation_id for op in dlq.failed_operations] == [bad_id]
+    assert dlq.failed_operations[0].retry_count == 1
+    assert dlq._process_ready_operations() == 1
+    assert dlq.failed_operations == ()
+    assert {op["operation_id"] for op in dlq.get_manual_review_operations()} == {bad_id, manual_id}
+
+    reopened = make_queue()
+    assert reopened.failed_operations == ()
+    moved = {op.operation_id: op for op in reopened.manual_review_queue}
+    assert moved[bad_id].retry_count == 2 and moved[bad_id].operation_data == {"doc": "grill.pdf"}
+    assert reopened.resolve_manual_operation(manual_id, "fixed upstream")
+    assert not reopened.resolve_manual_operation(manual_id, "again")
+    assert len(make_queue().manual_review_queue) == 1
+
+
+def test_retries_run_concurrently_within_limit(make_queue, monkeypatch):
+    dlq = make_queue(retry_concurrency=3)
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def slow_retry(op):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.1)
+        with lock:
+            active -= 1
+        return True
+
+    monkeypatch.setattr(dlq, "_retry_operation", slow_retry)
+    for i in range(9):
+        dlq.add_failed_operation("neo4j_write", {"i": i}, Exception("timeout"))
+
+    started = time.monotonic()
+    assert dlq._process_ready_operations() == 9
+    elapsed = time.monotonic() - started
+    assert peak == 3
+    assert elapsed < 0.6  # Serial retries would take 0.9s
+    assert dlq.get_queue_status()["failed_operations"] == 0
+
+
+def test_async_callers_do_not_block_the_event_loop(make_queue, monkeypatch):
+    dlq = make_queue()
+    release = threading.Event()
+    monkeypatch.setattr(dlq, "_retry_operation", lambda op: release.wait(2))
+    dlq.add_failed_operation("neo4j_write", {}, Exception("timeout"))
+
+    async def main():
+        retry = asyncio.ensure_future(dlq.process_ready_operations())
+        # The loop stays responsive while the retry runs on the pool
+        await asyncio.sleep(0.05)
+        assert not retry.done()
+        release.set()
+        assert await retry == 1
+
+        dlq.add_failed_operation("neo4j_write", {}, Exception("timeout"))
+        release.clear()
+        started = time.monotonic()
+        # The sync entry point starts the processor instead of waiting
+        assert dlq._process_ready_operations() == 1
+        assert time.monotonic() - started < 0.5
+        release.set()
+
+    asyncio.run(main())
+    assert dlq.get_queue_status()["background_processor_running"]
+    deadline = time.monotonic() + 2
+    while dlq.failed_operations and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert dlq.failed_operations == ()
+
+
+def test_background_loop_wakes_for_new_operations(make_queue, monkeypatch):
+    dlq = make_queue()
+    retried = threading.Event()
+    monkeypatch.setattr(dlq, "_retry_operation", lambda op: retried.set() or True)
+    dlq.start_background_processing()
+    time.sleep(0.05)  # Let the loop go idle on its 10s poll
+
+    dlq.add_failed_operation("neo4j_write", {}, Exception("Service unavailable"))
+    assert retried.wait(2)
+    deadline = time.monotonic() + 2
+    while dlq.failed_operations and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert dlq.failed_operations == ()
+    assert dlq.get_queue_status()["background_processor_running"]
+
+
+def test_legacy_json_snapshots_are_imported(reliability, make_queue, tmp_path):
+    storage = tmp_path / "dlq"
+    storage.mkdir()
+    (storage / "failed_operations.json").write_text(json.dumps([{
+        "operation_id": "failed_1", "operation_type": "neo4j_write", "operation_data": {"doc": "a"},
+        "error_message": "timeout", "error_type": "TimeoutError",
+        "failure_time": "2026-01-01T10:00:00", "retry_count": 1, "max_retries": 3,
+        "retry_strategy": "exponential", "next_retry_time": "2026-01-01T10:05:00", "manual_review": False,
+    }]))
+    (storage / "manual_review_queue.json").write_text("[]")
+
+    dlq = make_queue(due_now=False)
+    assert [op.operation_id for op in dlq.failed_operations] == ["failed_1"]
+    assert dlq.get_queue_status()["ready_for_retry"] == 1
+
+    # Imported once; the database is authoritative afterwards
+    (storage / "failed_operations.json").write_text("[]")
+    assert len(make_queue(due_now=False).failed_operations) == 1
+
+
+def test_escalation_moves_operation_to_manual_review(make_queue, monkeypatch):
+    dlq = make_queue()
+    op_id = dlq.add_failed_operation("neo4j_write", {"doc": "fryer.pdf"}, Exception("Connection reset"))
+    retried = []
+    monkeypatch.setattr(dlq, "_retry_operation", lambda op: retried.append(op) or False)
+
+    with pytest.raises(AttributeError):
+        dlq.failed_operations.remove(dlq.failed_operations[0])
+    assert dlq.escalate_to_manual_review(op_id)
+    assert not dlq.escalate_to_manual_review(op_id)
+    assert dlq.failed_operations == ()
+    assert dlq._process_ready_operations() == 0 and retried == []
+
+    reopened = make_queue()
+    assert [op["operation_id"] for op in reopened.get_manual_review_operations()] == [op_id]
+    assert reopened.failed_operations == ()
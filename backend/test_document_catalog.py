@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Tests for the SQLite document catalog
+"""
+
+import json
+
+import document_catalog
+from document_catalog import DocumentCatalog, get_document_catalog
+
+
+def _doc(doc_id, timestamp, text="fryer manual text"):
+    return {
+        "id": doc_id,
+        "filename": f"{doc_id}.pdf",
+        "original_filename": f"{doc_id} manual.pdf",
+        "upload_timestamp": timestamp,
+        "file_size": 1024,
+        "pages_count": 3,
+        "text_content": text,
+        "text_preview": text[:20],
+        "ragie_document_id": f"ragie-{doc_id}",
+    }
+
+
+def test_put_get_keeps_text_separate(tmp_path):
+    catalog = DocumentCatalog(str(tmp_path / "docs.sqlite"))
+    catalog.put(_doc("a", "2024-01-01T00:00:00"))
+
+    metadata = catalog.get("a")
+    assert "text_content" not in metadata
+    assert metadata["ragie_document_id"] == "ragie-a"
+    assert catalog.get("a", include_text=True)["text_content"] == "fryer manual text"
+    assert catalog.get("missing") is None
+
+
+def test_list_is_newest_first_and_paged(tmp_path):
+    catalog = DocumentCatalog(str(tmp_path / "docs.sqlite"))
+    catalog.put_many([_doc(f"d{i}", f"2024-01-0{i}T00:00:00") for i in range(1, 6)])
+
+    assert [d["id"] for d in catalog.list()] == ["d5", "d4", "d3", "d2", "d1"]
+    assert [d["id"] for d in catalog.list(offset=1, limit=2)] == ["d4", "d3"]
+    assert catalog.count() == 5
+
+
+def test_update_and_delete(tmp_path):
+    catalog = DocumentCatalog(str(tmp_path / "docs.sqlite"))
+    catalog.put(_doc("a", "2024-01-01T00:00:00"))
+
+    assert catalog.update("a", processing_source="ragie")
+    assert catalog.get("a")["processing_source"] == "ragie"
+    assert not catalog.update("missing", processing_source="local")
+
+    assert catalog.delete("a")
+    assert not catalog.delete("a")
+    assert catalog.get_text("a") is None
+    assert catalog.count() == 0
+
+
+def test_second_connection_writes_are_visible(tmp_path):
+    path = str(tmp_path / "docs.sqlite")
+    reader = DocumentCatalog(path)
+    writer = DocumentCatalog(path)
+    assert reader.count() == 0
+
+    writer.put(_doc("a", "2024-01-01T00:00:00"))
+    assert reader.get("a")["filename"] == "a.pdf"
+    writer.delete("a")
+    assert "a" not in reader
+
+
+def test_legacy_json_import_and_replace_all(tmp_path):
+    legacy = tmp_path / "documents.json"
+    legacy.write_text(json.dumps({"a": _doc("a", "2024-01-01"), "b": _doc("b", "2024-01-02")}))
+    catalog = DocumentCatalog(str(tmp_path / "docs.sqlite"), legacy_json_path=str(legacy))
+    assert catalog.count() == 2
+
+    db = catalog.as_dict()
+    assert db["a"]["text_content"] == "fryer manual text"
+    del db["a"]
+    db["c"] = _doc("c", "2024-01-03")
+    catalog.replace_all(db)
+
+    assert sorted(catalog.as_dict(include_text=False)) == ["b", "c"]
+    assert catalog.get_text("a") is None
+
+
+def test_ids_with_text_skips_empty_and_missing_text(tmp_path):
+    catalog = DocumentCatalog(str(tmp_path / "docs.sqlite"))
+    catalog.put(_doc("a", "2024-01-01"))
+    catalog.put(_doc("b", "2024-01-02", text=""))
+    catalog.put({"id": "c", "filename": "c.pdf", "text_preview": "Document uploaded to Ragie: c.pdf..."})
+    assert catalog.ids_with_text() == {"a"}
+
+
+def test_shared_catalog_is_created_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(document_catalog, "_document_catalog", None)
+    legacy = tmp_path / "documents.json"
+    legacy.write_text(json.dumps({"a": _doc("a", "2024-01-01")}))
+
+    shared = get_document_catalog(str(tmp_path / "docs.sqlite"), legacy_json_path=str(legacy))
+    assert get_document_catalog() is shared
+    assert shared.get("a")["filename"] == "a.pdf"
+    shared.close()
+
+
+def test_legacy_json_is_not_reimported_after_deleting_everything(tmp_path):
+    legacy = tmp_path / "documents.json"
+    legacy.write_text(json.dumps({"a": _doc("a", "2024-01-01"), "b": _doc("b", "2024-01-02")}))
+    path = str(tmp_path / "docs.sqlite")
+    catalog = DocumentCatalog(path, legacy_json_path=str(legacy))
+    assert catalog.count() == 2
+
+    catalog.delete("a")
+    catalog.delete("b")
+    catalog.close()
+
+    reopened = DocumentCatalog(path, legacy_json_path=str(legacy))
+    assert reopened.count() == 0
+    assert reopened.get_text("a") is None
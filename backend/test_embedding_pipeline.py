@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Tests for the batched embedding pipeline
+"""
+
+import numpy as np
+
+from embedding_pipeline import encode_in_batches
+
+
+class CountingModel:
+    """Deterministic stand-in for a SentenceTransformer that records batch sizes"""
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def encode(self, texts, convert_to_numpy=True, normalize_embeddings=False):
+        self.batch_sizes.append(len(texts))
+        vectors = np.array([[len(text), text.count("a") + 1.0, 1.0] for text in texts])
+        if normalize_embeddings:
+            vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors
+
+
+def test_batches_are_fixed_size_and_ordered():
+    model = CountingModel()
+    texts = [f"chunk {'a' * i}" for i in range(10)]
+
+    embeddings = encode_in_batches(texts, "unused", local_model=model, batch_size=4, workers=1)
+
+    assert model.batch_sizes == [4, 4, 2]
+    assert embeddings.shape == (10, 3)
+    assert embeddings.dtype == np.float32
+    assert np.allclose(np.linalg.norm(embeddings, axis=1), 1.0)
+    # Row order follows input order
+    assert embeddings[9][1] > embeddings[0][1]
+
+
+def test_progress_callback_reports_each_batch():
+    progress = []
+    encode_in_batches(
+        ["x"] * 5, "unused", local_model=CountingModel(), batch_size=2, workers=1,
+        progress_callback=lambda done, total: progress.append((done, total)),
+    )
+    assert progress == [(2, 5), (4, 5), (5, 5)]
+
+
+def test_empty_input():
+    embeddings = encode_in_batches([], "unused", local_model=CountingModel())
+    assert embeddings.shape[0] == 0
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Tests for the persistent, memory-mapped embedding store
+"""
+
+import json
+
+import numpy as np
+
+from embedding_store import EmbeddingStore, content_hash
+
+
+def _documents():
+    return {
+        "doc-a": {"content_hash": content_hash("fryer"), "filename": "fryer.pdf", "offset": 0,
+                  "chunks": ["clean the fryer", "filter the oil"]},
+        "doc-b": {"content_hash": content_hash("grill"), "filename": "grill.pdf", "offset": 2,
+                  "chunks": ["preheat the grill"]},
+    }
+
+
+def test_content_hash_is_stable():
+    assert content_hash("abc") == content_hash("abc")
+    assert content_hash("abc") != content_hash("abd")
+
+
+def test_save_and_load_round_trip(tmp_path):
+    store = EmbeddingStore(str(tmp_path))
+    embeddings = np.random.default_rng(0).random((3, 8)).astype(np.float32)
+
+    assert store.save("model-x", embeddings, _documents())
+    loaded = store.load("model-x")
+
+    assert loaded is not None
+    mapped, documents = loaded
+    assert isinstance(mapped, np.memmap)
+    assert not mapped.flags.writeable
+    assert np.allclose(mapped, embeddings)
+    assert documents["doc-b"]["offset"] == 2
+    assert documents["doc-a"]["chunks"] == ["clean the fryer", "filter the oil"]
+
+
+def test_model_mismatch_invalidates(tmp_path):
+    store = EmbeddingStore(str(tmp_path))
+    store.save("model-x", np.zeros((3, 4), dtype=np.float32), _documents())
+    assert store.load("model-y") is None
+
+
+def test_row_count_mismatch_invalidates(tmp_path):
+    store = EmbeddingStore(str(tmp_path))
+    store.save("model-x", np.zeros((3, 4), dtype=np.float32), _documents())
+
+    metadata = json.loads(store.metadata_file.read_text())
+    metadata["total_chunks"] = 5
+    store.metadata_file.write_text(json.dumps(metadata))
+
+    assert store.load("model-x") is None
+
+
+def test_missing_store_and_clear(tmp_path):
+    store = EmbeddingStore(str(tmp_path / "missing"))
+    assert store.load("model-x") is None
+
+    store.save("model-x", None, {})
+    assert store.load("model-x") is not None
+    store.clear()
+    assert store.load("model-x") is None
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Tests for range-aware file serving
+"""
+
+import asyncio
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.routing import Route
+
+from services.file_server import (
+    FileStatCache,
+    RangeNotSatisfiable,
+    build_file_response,
+    parse_range_header,
+)
+
+CONTENT = bytes(range(256)) * 40  # 10240 bytes
+
+
+@pytest.fixture
+def served(tmp_path):
+    path = tmp_path / "manual.pdf"
+    path.write_bytes(CONTENT)
+    cache = FileStatCache()
+
+    async def endpoint(request: Request):
+        return build_file_response(request, str(path), "application/pdf",
+                                   headers={"Cache-Control": "public, max-age=3600"}, stat_cache=cache)
+
+    app = Starlette(routes=[Route("/file", endpoint, methods=["GET", "HEAD"])])
+    return app, path
+
+
+def _request(app, method="GET", headers=None):
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.request(method, "/file", headers=headers or {})
+    return asyncio.run(run())
+
+
+def test_parse_range_header_forms():
+    assert parse_range_header("bytes=0-99", 1000) == [(0, 99)]
+    assert parse_range_header("bytes=-100", 1000) == [(900, 999)]
+    assert parse_range_header("bytes=900-", 1000) == [(900, 999)]
+    assert parse_range_header("bytes=990-2000", 1000) == [(990, 999)]
+    # Overlapping and adjacent ranges are coalesced
+    assert parse_range_header("bytes=50-99, 0-60, 100-120, 500-", 1000) == [(0, 120), (500, 999)]
+    assert parse_range_header("items=0-1", 1000) is None
+    assert parse_range_header("bytes=5-1", 1000) is None
+    assert parse_range_header("bytes=abc", 1000) is None
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range_header("bytes=1000-1100", 1000)
+
+
+def test_full_response_has_validators(served):
+    app, _ = served
+    response = _request(app)
+    assert response.status_code == 200
+    assert response.content == CONTENT
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.headers["etag"].startswith('"')
+    assert response.headers["last-modified"]
+    assert response.headers["cache-control"] == "public, max-age=3600"
+
+
+def test_single_and_suffix_ranges(served):
+    app, _ = served
+    response = _request(app, headers={"Range": "bytes=100-199"})
+    assert response.status_code == 206
+    assert response.content == CONTENT[100:200]
+    assert response.headers["content-range"] == f"bytes 100-199/{len(CONTENT)}"
+
+    response = _request(app, headers={"Range": "bytes=-10"})
+    assert response.content == CONTENT[-10:]
+
+
+def test_multi_range_is_multipart(served):
+    app, _ = served
+    response = _request(app, headers={"Range": "bytes=0-9,5000-5009"})
+    assert response.status_code == 206
+    content_type = response.headers["content-type"]
+    assert content_type.startswith("multipart/byteranges; boundary=")
+    boundary = content_type.split("boundary=")[1].encode()
+    body = response.content
+    assert int(response.headers["content-length"]) == len(body)
+    assert body.endswith(b"--" + boundary + b"--\r\n")
+
+    parts = body.split(b"--" + boundary)[1:-1]
+    assert len(parts) == 2
+    first_headers, first_body = parts[0].split(b"\r\n\r\n", 1)
+    assert b"Content-Range: bytes 0-9/10240" in first_headers
+    assert first_body == CONTENT[0:10] + b"\r\n"
+    second_headers, second_body = parts[1].split(b"\r\n\r\n", 1)
+    assert b"Content-Range: bytes 5000-5009/10240" in second_headers
+    assert second_body == CONTENT[5000:5010] + b"\r\n"
+
+
+def test_unsatisfiable_range(served):
+    app, _ = served
+    response = _request(app, headers={"Range": "bytes=20000-"})
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{len(CONTENT)}"
+
+
+def test_conditional_requests(served):
+    app, _ = served
+    first = _request(app)
+    etag, last_modified = first.headers["etag"], first.headers["last-modified"]
+
+    assert _request(app, headers={"If-None-Match": etag}).status_code == 304
+    assert _request(app, headers={"If-None-Match": f"W/{etag}"}).status_code == 304
+    assert _request(app, headers={"If-None-Match": '"other"'}).status_code == 200
+    assert _request(app, headers={"If-Modified-Since": last_modified}).status_code == 304
+
+    # If-Range with a stale validator falls back to the full file
+    stale = _request(app, headers={"Range": "bytes=0-9", "If-Range": '"stale"'})
+    assert stale.status_code == 200 and stale.content == CONTENT
+    fresh = _request(app, headers={"Range": "bytes=0-9", "If-Range": etag})
+    assert fresh.status_code == 206 and fresh.content == CONTENT[:10]
+
+
+def test_head_sends_headers_only(served):
+    app, _ = served
+    response = _request(app, method="HEAD", headers={"Range": "bytes=0-99"})
+    assert response.status_code == 206
+    assert response.headers["content-length"] == "100"
+    assert response.content == b""
+
+
+def test_zerocopy_extension_used_when_offered(tmp_path):
+    path = tmp_path / "clip.mp3"
+    path.write_bytes(CONTENT)
+    sent = []
+
+    async def run():
+        scope = {
+            "type": "http", "method": "GET", "path": "/file", "query_string": b"",
+            "headers": [(b"range", b"bytes=10-19")],
+            "extensions": {"http.response.zerocopy": {}},
+        }
+        response = build_file_response(Request(scope), str(path), "audio/mpeg")
+
+        async def send(message):
+            if message["type"] == "http.response.zerocopy":
+                message = {**message, "data": message["file"].read()[message["offset"]:][:message["count"]]}
+            sent.append(message)
+
+        await response(scope, None, send)
+
+    asyncio.run(run())
+    assert sent[0]["status"] == 206
+    assert sent[1]["type"] == "http.response.zerocopy"
+    assert (sent[1]["offset"], sent[1]["count"], sent[1]["more_body"]) == (10, 10, False)
+    assert sent[1]["data"] == CONTENT[10:20]
+
+
+def test_stat_cache_reuses_and_invalidates(tmp_path):
+    path = tmp_path / "a.pdf"
+    path.write_bytes(b"one")
+    cache = FileStatCache(ttl=60)
+    first = cache.get(str(path))
+    path.write_bytes(b"longer content")
+    assert cache.get(str(path)) is first
+    cache.invalidate(str(path))
+    assert cache.get(str(path)).size == len(b"longer content")
+    with pytest.raises(FileNotFoundError):
+        cache.get(str(tmp_path))
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Tests for the BM25 lexical index and reciprocal rank fusion
+"""
+
+import numpy as np
+
+from lexical_index import BM25Index, reciprocal_rank_fusion, tokenize
+
+
+CHUNKS = [
+    "Baxter OV520E1 rotating rack oven operator manual",
+    "Clean the fryer basket with part 8-1234 daily",
+    "Fryer oil temperature should be 350 degrees",
+    "Replace the oven door gasket every six months",
+]
+
+
+def test_tokenize_keeps_model_numbers_and_codes():
+    assert tokenize("Check OV520E1") == ["check", "ov520e1"]
+    assert tokenize("part 8-1234") == ["part", "8-1234", "8", "1234"]
+
+
+def test_exact_model_number_ranks_first():
+    index = BM25Index()
+    index.add(CHUNKS)
+    rows, scores = index.search("OV520E1 oven", top_k=3)
+    assert list(rows) == [0, 3]
+    assert scores[0] > scores[1] > 0
+
+
+def test_only_matching_rows_are_scored():
+    index = BM25Index()
+    index.add(CHUNKS)
+    rows, _ = index.search("8-1234", top_k=10)
+    assert list(rows) == [1]
+    assert len(index.search("pizza", top_k=10)[0]) == 0
+
+
+def test_incremental_add_matches_bulk_add():
+    bulk = BM25Index()
+    bulk.add(CHUNKS)
+    incremental = BM25Index()
+    for chunk in CHUNKS:
+        incremental.add([chunk])
+
+    for query in ("fryer", "oven gasket", "OV520E1"):
+        bulk_rows, bulk_scores = bulk.search(query, 4)
+        inc_rows, inc_scores = incremental.search(query, 4)
+        assert list(bulk_rows) == list(inc_rows)
+        assert np.allclose(bulk_scores, inc_scores)
+
+
+def test_remove_renumbers_rows():
+    index = BM25Index()
+    index.add(CHUNKS)
+    index.remove(np.array([True, False, True, True]))
+
+    assert index.ntotal == 3
+    assert list(index.search("fryer", 3)[0]) == [1]
+    assert list(index.search("gasket", 3)[0]) == [2]
+    assert len(index.search("8-1234", 3)[0]) == 0
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    rows, scores = reciprocal_rank_fusion([np.array([3, 1, 2]), np.array([1, 5])])
+    assert rows[0] == 1
+    assert set(rows) == {1, 2, 3, 5}
+    assert np.all(np.diff(scores) <= 0)
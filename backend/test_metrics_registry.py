@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Tests for the in-process Prometheus metrics registry, middleware and instrumentation
+"""
+
+import asyncio
+import threading
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from metrics_registry import (
+    DEPENDENCY_DURATION, DEPENDENCY_FIRST_ITEM, HTTP_REQUEST_DURATION, HTTP_REQUESTS,
+    MetricsMiddleware, MetricsRegistry, instrumented
+)
+
+
+def test_exposition_format():
+    registry = MetricsRegistry()
+    requests = registry.counter("app_requests_total", "Requests\nserved", ("path",))
+    requests.labels(path='/a"b\\c').inc(3)
+    registry.gauge("app_queue_depth", "Queued items").set(7)
+    latency = registry.histogram("app_latency_seconds", "Latency", buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        latency.observe(value)
+    registry.register_collector(lambda: [("app_up", "gauge", "Up", [({"node": "a"}, 1)])])
+
+    assert registry.render().splitlines() == [
+        "# HELP app_requests_total Requests\\nserved",
+        "# TYPE app_requests_total counter",
+        'app_requests_total{path="/a\\"b\\\\c"} 3',
+        "# HELP app_queue_depth Queued items",
+        "# TYPE app_queue_depth gauge",
+        "app_queue_depth 7",
+        "# HELP app_latency_seconds Latency",
+        "# TYPE app_latency_seconds histogram",
+        'app_latency_seconds_bucket{le="0.1"} 2',
+        'app_latency_seconds_bucket{le="1.0"} 3',
+        'app_latency_seconds_bucket{le="+Inf"} 4',
+        "app_latency_seconds_sum 2.65",
+        "app_latency_seconds_count 4",
+        "# HELP app_up Up",
+        "# TYPE app_up gauge",
+        'app_up{node="a"} 1',
+    ]
+
+
+def test_per_thread_shards_sum_exactly():
+    registry = MetricsRegistry()
+    counter = registry.counter("app_events_total", "Events")
+    histogram = registry.histogram("app_sizes", "Sizes", buckets=(1.0,))
+
+    def work():
+        for _ in range(10000):
+            counter.inc()
+            histogram.observe(0.5)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert counter.labels().get() == 80000
+    cumulative, total, count = histogram.labels().snapshot()
+    assert cumulative == [80000, 80000] and count == 80000 and total == 40000
+
+
+def test_registering_same_name_returns_existing_metric():
+    registry = MetricsRegistry()
+    first = registry.counter("app_jobs_total", "Jobs", ("kind",))
+    assert registry.counter("app_jobs_total", "Jobs", ("kind",)) is first
+    with pytest.raises(ValueError):
+        registry.gauge("app_jobs_total", "Jobs", ("kind",))
+
+
+def test_middleware_labels_route_templates_and_status():
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/metrics-test/items/{item_id}")
+    async def get_item(item_id: str):
+        return {"item": item_id}
+
+    @app.get("/metrics-test/boom")
+    async def boom():
+        raise RuntimeError("boom")
+
+    client = TestClient(app, raise_server_exceptions=False)
+    for item in ("fryer", "grill", "shake"):
+        assert client.get(f"/metrics-test/items/{item}").status_code == 200
+    assert client.get("/metrics-test/boom").status_code == 500
+    assert client.get("/metrics-test/nowhere").status_code == 404
+
+    assert HTTP_REQUESTS.labels("GET", "/metrics-test/items/{item_id}", 200).get() == 3
+    assert HTTP_REQUESTS.labels("GET", "/metrics-test/boom", 500).get() == 1
+    assert HTTP_REQUESTS.labels("GET", "unmatched", 404).get() >= 1
+    _, _, count = HTTP_REQUEST_DURATION.labels("GET", "/metrics-test/items/{item_id}").snapshot()
+    assert count == 3
+
+
+def test_instrumented_records_outcomes_and_first_item():
+    released = []
+
+    @instrumented("test_dep", "fetch")
+    async def fetch(fail):
+        await asyncio.sleep(0)
+        if fail:
+            raise RuntimeError("upstream down")
+        return "ok"
+
+    @instrumented("test_dep", "stream")
+    async def stream():
+        try:
+            for token in ("a", "b", "c"):
+                yield token
+        finally:
+            released.append(True)
+
+    async def run():
+        assert await fetch(False) == "ok"
+        with pytest.raises(RuntimeError):
+            await fetch(True)
+        assert [token async for token in stream()] == ["a", "b", "c"]
+        # Consumer stops early: the wrapped stream is still closed
+        partial = stream()
+        assert await partial.__anext__() == "a"
+        await partial.aclose()
+
+    asyncio.run(run())
+
+    def count(*labels):
+        return DEPENDENCY_DURATION.labels(*labels).snapshot()[2]
+
+    assert count("test_dep", "fetch", "ok") == 1
+    assert count("test_dep", "fetch", "error") == 1
+    assert count("test_dep", "stream", "ok") == 1
+    assert count("test_dep", "stream", "cancelled") == 1
+    assert DEPENDENCY_FIRST_ITEM.labels("test_dep", "stream").snapshot()[2] == 2
+    assert released == [True, True]
+
+
+def test_app_serves_prometheus_metrics():
+    main = pytest.importorskip("main")
+    client = TestClient(main.app)
+
+    assert client.get("/keep-alive").status_code == 200
+    response = client.get("/metrics/prometheus")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'qsr_http_requests_total{method="GET",route="/keep-alive",status="200"}' in response.text
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Tests for the non-blocking, concurrency-bounded OpenAI client in QSRAssistant
+"""
+
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from openai_integration import QSRAssistant
+
+
+class FakeStream:
+    """Async iterator of streamed completion chunks"""
+
+    def __init__(self, tokens):
+        self.tokens = list(tokens)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self.tokens:
+            raise StopAsyncIteration
+        await asyncio.sleep(0)
+        token = self.tokens.pop(0)
+        return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=token))])
+
+
+class FakeCompletions:
+    """Async completions API that tracks concurrency"""
+
+    def __init__(self, delay=0.02):
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+
+    async def create(self, stream=False, **kwargs):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        if stream:
+            return FakeStream(["Heat ", "oil ", "to 350", None])
+        message = SimpleNamespace(content="Heat oil to 350 degrees.")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def _assistant(completions, max_concurrency=16):
+    assistant = QSRAssistant()
+    assistant.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    assistant.max_concurrent_requests = max_concurrency
+    assistant._request_semaphore = asyncio.Semaphore(max_concurrency)
+    return assistant
+
+
+@pytest.mark.asyncio
+async def test_concurrent_completions_are_bounded():
+    completions = FakeCompletions()
+    assistant = _assistant(completions, max_concurrency=3)
+
+    results = await asyncio.gather(
+        *[assistant.generate_response(f"fryer question {i}", []) for i in range(10)]
+    )
+
+    assert all(r["type"] == "ai_powered" for r in results)
+    assert completions.max_active == 3
+
+
+@pytest.mark.asyncio
+async def test_stream_yields_tokens_as_they_arrive():
+    assistant = _assistant(FakeCompletions(delay=0))
+
+    chunks = [c async for c in assistant.generate_response_stream("fryer temperature?", [])]
+
+    tokens = [c["chunk"] for c in chunks if not c["done"]]
+    assert tokens == ["Heat ", "oil ", "to 350"]
+    assert chunks[-1]["done"] is True
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Tests for the single-pass parsed PDF artifact
+"""
+
+import pytest
+
+from services.multi_format_validator import MultiFormatValidator
+from services.pdf_artifact import (
+    PDFArtifactStore,
+    PDFParseError,
+    ParsedDocument,
+    detect_table_candidates,
+    file_sha256,
+    text_from_dict,
+)
+import services.multi_format_validator as multi_format_validator_module
+
+
+def _make_pdf(page_texts):
+    """Build a minimal uncompressed PDF with one line of Helvetica text per page"""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None,
+               "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for text in page_texts:
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        content_id = len(objects)
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>")
+        page_ids.append(len(objects))
+    kids = " ".join(f"{i} 0 R" for i in page_ids)
+    objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode()
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return PDFArtifactStore(cache_dir=str(tmp_path / "artifacts"), workers=0)
+
+
+def test_parse_once_then_cached_in_memory_and_on_disk(tmp_path, store):
+    path = tmp_path / "fryer.pdf"
+    path.write_bytes(_make_pdf(["Fryer cleaning", "Oil temperature 350F"]))
+
+    parsed = store.load_or_parse(path)
+    assert parsed.pages_count == 2
+    assert "Fryer cleaning" in parsed.pages[0].text
+    assert "Oil temperature" in parsed.text
+    assert parsed.pages[1].width == 612
+    assert parsed.sha256 == file_sha256(path)
+
+    assert store.load_or_parse(path) is parsed
+    assert store.stats == {"memory_hits": 1, "disk_hits": 0, "parses": 1, "disk_evictions": 0}
+
+    # A fresh store (e.g. after a restart) reads the artifact back from disk
+    restarted = PDFArtifactStore(cache_dir=str(store.cache_dir), workers=0)
+    reloaded = restarted.load_or_parse(path)
+    assert restarted.stats["parses"] == 0 and restarted.stats["disk_hits"] == 1
+    assert reloaded.to_dict() == parsed.to_dict()
+    assert ParsedDocument.from_dict(parsed.to_dict()).text == parsed.text
+
+
+def test_disk_budget_evicts_least_recently_used_and_remove(tmp_path):
+    paths = []
+    for name in ("a", "b", "c"):
+        path = tmp_path / f"{name}.pdf"
+        path.write_bytes(_make_pdf([f"Manual {name}"]))
+        paths.append(path)
+    probe = PDFArtifactStore(cache_dir=str(tmp_path / "probe"), workers=0)
+    probe.load_or_parse(paths[0])
+    artifact_size = probe._artifact_path(file_sha256(paths[0])).stat().st_size
+
+    store = PDFArtifactStore(cache_dir=str(tmp_path / "artifacts"), workers=0,
+                             memory_entries=0, max_disk_bytes=artifact_size * 2 + 10)
+    a, b, c = (file_sha256(path) for path in paths)
+    store.load_or_parse(paths[0])
+    store.load_or_parse(paths[1])
+    store.load_or_parse(paths[0])  # Disk hit: "b" becomes least recently used
+    store.load_or_parse(paths[2])
+
+    assert not store._artifact_path(b).exists()
+    assert store._artifact_path(a).exists() and store._artifact_path(c).exists()
+    assert store.stats["disk_evictions"] == 1
+
+    store.remove(a)
+    assert not store._artifact_path(a).exists() and store.get(a) is None
+    # The budget is rebuilt from the directory after a restart
+    restarted = PDFArtifactStore(cache_dir=str(store.cache_dir), workers=0, max_disk_bytes=artifact_size)
+    restarted.load_or_parse(paths[1])
+    assert sorted(p.stem for p in store.cache_dir.glob("*.json")) == [b]
+
+
+def test_invalid_pdf_raises(tmp_path, store):
+    path = tmp_path / "broken.pdf"
+    path.write_bytes(b"%PDF-1.4\nnot really a pdf")
+    with pytest.raises(PDFParseError):
+        store.load_or_parse(path)
+
+
+def test_worker_process_parse(tmp_path):
+    path = tmp_path / "grill.pdf"
+    path.write_bytes(_make_pdf(["Grill startup"]))
+    store = PDFArtifactStore(cache_dir=str(tmp_path / "artifacts"), workers=1)
+    try:
+        assert "Grill startup" in store.load_or_parse(path).text
+    finally:
+        store.close()
+
+
+def test_validator_reuses_artifact(tmp_path, store, monkeypatch):
+    monkeypatch.setattr(multi_format_validator_module, "pdf_artifact_store", store)
+    path = tmp_path / "manual.pdf"
+    path.write_bytes(_make_pdf(["Shake machine sanitizing"]))
+
+    result = MultiFormatValidator().validate_path("manual.pdf", str(path))
+    assert result.result.value == "valid"
+    assert result.metadata["pages"] == 1
+    assert result.metadata["content_sha256"] == file_sha256(path)
+    # Validation and metadata extraction shared one parse
+    assert store.stats["parses"] == 1
+
+    store.load_or_parse(path)
+    assert store.stats["parses"] == 1
+
+
+def test_table_candidates_need_distinct_rows():
+    def line(y):
+        return {"bbox": (0, y, 10, y + 5)}
+
+    text_dict = {"blocks": [
+        {"bbox": (0, 0, 100, 50), "lines": [line(0), line(10), line(20)]},
+        {"bbox": (0, 60, 100, 80), "lines": [line(60), line(60), line(70)]},
+        {"bbox": (0, 90, 100, 95), "type": 1},
+    ]}
+    assert detect_table_candidates(text_dict) == [{"bbox": [0, 0, 100, 50], "lines": 3}]
+
+
+def test_text_rebuilt_from_layout_dict():
+    text_dict = {"blocks": [
+        {"type": 0, "lines": [
+            {"spans": [{"text": "Fryer "}, {"text": "350F"}]},
+            {"spans": [{"text": "Drain oil"}]},
+        ]},
+        {"type": 1, "image": b""},
+        {"type": 0, "lines": [{"spans": [{"text": "Step 2"}]}]},
+    ]}
+    assert text_from_dict(text_dict) == "Fryer 350F\nDrain oil\nStep 2\n"
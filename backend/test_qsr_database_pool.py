@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Tests for the pooled WAL-mode QSR database
+"""
+
+import asyncio
+import sqlite3
+
+import pytest
+from pydantic_ai.messages import ModelMessagesTypeAdapter, ModelRequest
+
+from database.qsr_database import QSRDatabase
+from database.sqlite_pool import GroupCommitWriter, SQLitePool
+
+
+def _messages(text):
+    return ModelMessagesTypeAdapter.dump_json([ModelRequest.user_text_prompt(text)])
+
+
+@pytest.mark.parametrize("group_commit", [False, True])
+def test_add_messages_single_transaction(tmp_path, group_commit):
+    async def run():
+        async with QSRDatabase.connect(tmp_path / "qsr.sqlite", max_workers=2, group_commit=group_commit) as db:
+            results = await asyncio.gather(*[
+                db.add_messages(f"conv-{i % 3}", _messages(f"fryer question {i}"), "agent", 0.5)
+                for i in range(30)
+            ])
+            assert all(results)
+
+            metadata = await db.get_conversation_metadata("conv-0")
+            assert metadata.total_messages == 10
+            messages = await db.get_messages("conv-0")
+            assert len(messages) == 10
+
+            analytics = await db.get_conversation_analytics("conv-1")
+            assert analytics["message_count"] == 10
+            return db.get_pool_stats()
+
+    stats = asyncio.run(run())
+    if group_commit:
+        # Thirty concurrent inserts shared far fewer transactions
+        assert stats["group_commit"]["writes"] == 30
+        assert stats["group_commit"]["batches"] < 30
+    else:
+        assert stats["transactions"] >= 30
+
+
+def test_database_file_is_wal(tmp_path):
+    async def run():
+        async with QSRDatabase.connect(tmp_path / "qsr.sqlite") as db:
+            assert await db.add_messages("conv", _messages("sanitizer ratio"))
+            await db.add_analytics_metric("conv", "response_time", 1.2)
+            assert await db.add_analytics_metrics([
+                {"conversation_id": "conv", "metric_type": "confidence", "metric_value": 0.9},
+                {"conversation_id": "conv", "metric_type": "confidence", "metric_value": 0.7},
+            ]) == 2
+            return await db.get_conversation_analytics("conv")
+
+    analytics = asyncio.run(run())
+    by_type = {m["metric_type"]: m for m in analytics["performance_metrics"]}
+    assert by_type["confidence"]["count"] == 2
+    con = sqlite3.connect(tmp_path / "qsr.sqlite")
+    assert con.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_group_commit_isolates_failing_write(tmp_path):
+    async def run():
+        pool = SQLitePool(tmp_path / "pool.sqlite", readers=1)
+        await pool.open(schema=lambda con: con.execute("CREATE TABLE t (v INTEGER UNIQUE)"))
+        writer = GroupCommitWriter(pool, max_delay=0.05)
+
+        def insert(value):
+            return lambda con: con.execute("INSERT INTO t (v) VALUES (?)", (value,)).rowcount
+
+        outcomes = await asyncio.gather(
+            writer.submit(insert(1)), writer.submit(insert(1)), writer.submit(insert(2)),
+            return_exceptions=True,
+        )
+        rows = await pool.fetchall("SELECT v FROM t ORDER BY v")
+        stats = writer.get_stats()
+        await writer.close()
+        await pool.close()
+        return outcomes, [row["v"] for row in rows], stats
+
+    outcomes, values, stats = asyncio.run(run())
+    assert outcomes[0] == 1 and outcomes[2] == 1
+    assert isinstance(outcomes[1], sqlite3.IntegrityError)
+    assert values == [1, 2]
+    assert stats["batches"] == 1
+
+
+def test_group_commit_close_flushes_queue(tmp_path):
+    async def run():
+        pool = SQLitePool(tmp_path / "pool.sqlite", readers=1)
+        await pool.open(schema=lambda con: con.execute("CREATE TABLE t (v INTEGER)"))
+        writer = GroupCommitWriter(pool, max_delay=1.0)
+        pending = [asyncio.ensure_future(writer.submit(
+            lambda con, v=v: con.execute("INSERT INTO t (v) VALUES (?)", (v,))
+        )) for v in range(5)]
+        await asyncio.sleep(0.01)
+        await writer.close()
+        await asyncio.gather(*pending)
+        count = (await pool.fetchone("SELECT COUNT(*) AS n FROM t"))["n"]
+        await pool.close()
+        return count
+
+    assert asyncio.run(run()) == 5
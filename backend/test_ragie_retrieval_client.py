@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Tests for non-blocking, coalesced Ragie retrievals in CleanRagieService
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from services.ragie_service_clean import CleanRagieService
+
+
+class FakeRetrievals:
+    """Async retrievals API that records upstream calls"""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.calls = []
+        self.active = 0
+        self.max_active = 0
+
+    async def retrieve_async(self, request):
+        self.calls.append(request["query"])
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        chunk = SimpleNamespace(
+            text=f"answer for {request['query']}", score=0.9,
+            document_id="doc-1", chunk_id="chunk-1", metadata={"file_type": "pdf"},
+        )
+        return SimpleNamespace(scored_chunks=[chunk])
+
+
+def _service(retrievals, max_concurrency=8):
+    service = CleanRagieService()
+    service.client = SimpleNamespace(retrievals=retrievals)
+    service.max_concurrent_retrievals = max_concurrency
+    service._retrieval_semaphore = asyncio.Semaphore(max_concurrency)
+    return service
+
+
+@pytest.mark.asyncio
+async def test_identical_queries_are_coalesced():
+    retrievals = FakeRetrievals()
+    service = _service(retrievals)
+
+    results = await asyncio.gather(
+        *[service.search("how do I clean the fryer", limit=5) for _ in range(10)]
+    )
+
+    assert len(retrievals.calls) == 1
+    assert all(r and r[0].text.startswith("answer for") for r in results)
+    stats = service.get_retrieval_stats()
+    assert stats["upstream_requests"] == 1
+    assert stats["coalesced_requests"] == 9
+    assert stats["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_different_queries_run_concurrently_within_bound():
+    retrievals = FakeRetrievals()
+    service = _service(retrievals, max_concurrency=2)
+
+    await asyncio.gather(
+        service.search("fryer temperature"),
+        service.search("grill cleaning"),
+        service.search("oven door gasket"),
+    )
+
+    assert len(retrievals.calls) == 3
+    assert retrievals.max_active == 2
+
+
+@pytest.mark.asyncio
+async def test_repeated_queries_served_from_cache_until_invalidated():
+    retrievals = FakeRetrievals(delay=0)
+    service = _service(retrievals)
+
+    await service.search("fryer temperature")
+    cached = await service.search("fryer temperature")
+    assert len(retrievals.calls) == 1
+    assert cached[0].text.startswith("answer for")
+
+    service.invalidate_search_cache()
+    await service.search("fryer temperature")
+    assert len(retrievals.calls) == 2
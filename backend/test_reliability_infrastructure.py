@@ -299,25 +299,14 @@ class TestDeadLetterQueue:
         with tempfile.TemporaryDirectory() as temp_dir:
             dlq = DeadLetterQueue(temp_dir)
             
-            # Add to manual review queue directly
-            from reliability_infrastructure import FailedOperation
-            from datetime import datetime
-            
-            failed_op = FailedOperation(
-                operation_id="manual_test",
-                operation_type="test",
-                operation_data={},
-                error_message="Test",
-                error_type="TestError",
-                failure_time=datetime.now(),
-                manual_review=True
-            )
-            
-            dlq.manual_review_queue.append(failed_op)
-            dlq._save_operations()
+            # Escalate a pending operation to manual review
+            op_id = dlq.add_failed_operation("test", {}, Exception("Test"))
+            assert dlq.escalate_to_manual_review(op_id)
+            assert len(dlq.failed_operations) == 0
+            assert len(dlq.manual_review_queue) == 1
             
             # Resolve operation
-            success = dlq.resolve_manual_operation("manual_test", "Resolved by test")
+            success = dlq.resolve_manual_operation(op_id, "Resolved by test")
             
             assert success
             assert len(dlq.manual_review_queue) == 0
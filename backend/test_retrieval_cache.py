@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Tests for the Ragie retrieval result cache
+"""
+
+import time
+
+import numpy as np
+import pytest
+
+from services.retrieval_cache import RetrievalCache
+
+
+SCOPE = RetrievalCache.make_scope("qsr_manuals", None, 5)
+
+
+def test_exact_hit_and_miss_counters():
+    cache = RetrievalCache()
+    assert cache.get("fryer cleaning", SCOPE) is None
+
+    cache.put("fryer cleaning", "qsr_manuals", SCOPE, ["result"])
+    assert cache.get("fryer cleaning", SCOPE) == ["result"]
+
+    stats = cache.get_stats()
+    assert stats["exact_hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == pytest.approx(0.5)
+
+
+def test_scope_separates_filters_and_limits():
+    cache = RetrievalCache()
+    cache.put("oven", "qsr_manuals", SCOPE, ["a"])
+    other_scope = RetrievalCache.make_scope("qsr_manuals", {"document_type": "pdf"}, 5)
+    assert cache.get("oven", other_scope) is None
+    assert cache.get("oven", RetrievalCache.make_scope("qsr_manuals", None, 10)) is None
+
+
+def test_lru_eviction():
+    cache = RetrievalCache(max_entries=2)
+    cache.put("a", "p", SCOPE, [1])
+    cache.put("b", "p", SCOPE, [2])
+    cache.get("a", SCOPE)
+    cache.put("c", "p", SCOPE, [3])
+
+    assert cache.get("b", SCOPE) is None
+    assert cache.get("a", SCOPE) == [1]
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_per_partition_ttl():
+    cache = RetrievalCache(default_ttl=60, partition_ttls={"fast": 0.01})
+    cache.put("q", "fast", SCOPE, [1])
+    cache.put("q2", "slow", SCOPE, [2])
+    time.sleep(0.02)
+
+    assert cache.get("q", SCOPE) is None
+    assert cache.get("q2", SCOPE) == [2]
+    assert cache.get_stats()["expirations"] == 1
+
+
+def test_invalidate_by_partition():
+    cache = RetrievalCache()
+    cache.put("q1", "qsr_manuals", SCOPE, [1])
+    cache.put("q2", "other", SCOPE, [2])
+
+    assert cache.invalidate("qsr_manuals") == 1
+    assert cache.get("q1", SCOPE) is None
+    assert cache.get("q2", SCOPE) == [2]
+    assert cache.invalidate() == 1
+
+
+@pytest.mark.asyncio
+async def test_semantic_tier_reuses_similar_queries():
+    vectors = {
+        "fryer cleaning": np.array([1.0, 0.0, 0.0]),
+        "clean the fryer": np.array([0.98, 0.2, 0.0]),
+        "grill temperature": np.array([0.0, 0.0, 1.0]),
+    }
+    cache = RetrievalCache(semantic_threshold=0.9, semantic_encoder=vectors.__getitem__)
+
+    embedding = await cache.embed("fryer cleaning")
+    cache.put("fryer cleaning", "qsr_manuals", SCOPE, ["fryer doc"], embedding)
+
+    assert cache.get("clean the fryer", SCOPE, await cache.embed("clean the fryer")) == ["fryer doc"]
+    assert cache.get("grill temperature", SCOPE, await cache.embed("grill temperature")) is None
+    assert cache.get_stats()["semantic_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_lookup_embeds_only_on_exact_miss():
+    encoded = []
+
+    def encoder(query):
+        encoded.append(query)
+        return np.array([1.0, 0.0]) if "fryer" in query else np.array([0.0, 1.0])
+
+    cache = RetrievalCache(semantic_threshold=0.9, semantic_encoder=encoder)
+    results, embedding = await cache.lookup("fryer cleaning", SCOPE)
+    assert results is None and embedding is not None
+    cache.put("fryer cleaning", "qsr_manuals", SCOPE, ["fryer doc"], embedding)
+
+    assert await cache.lookup("fryer cleaning", SCOPE) == (["fryer doc"], None)
+    assert encoded == ["fryer cleaning"]
+
+    results, _ = await cache.lookup("clean the fryer", SCOPE)
+    assert results == ["fryer doc"] and encoded[-1] == "clean the fryer"
+    stats = cache.get_stats()
+    assert (stats["exact_hits"], stats["semantic_hits"], stats["misses"]) == (1, 1, 1)
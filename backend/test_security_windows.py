@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Tests for the sliding-window security activity counters
+"""
+
+from datetime import datetime, timedelta
+
+from security_windows import SecurityWindowIndex, SlidingWindowCounter
+
+
+def test_counter_expires_old_buckets():
+    counter = SlidingWindowCounter(60, buckets=60)
+    for second in range(30):
+        counter.add(1000.0 + second)
+    assert counter.count(1029.0) == 30
+    assert counter.count(1075.0) == 14  # Seconds 1000-1015 left the window
+    assert counter.count(5000.0) == 0
+
+    # Late events still inside the window count; older ones are ignored
+    counter.add(4990.0)
+    counter.add(100.0)
+    assert counter.count(5000.0) == 1
+
+
+def test_index_tracks_hours_and_rate_limits():
+    index = SecurityWindowIndex()
+    now = datetime(2026, 3, 2, 23, 30)
+    for day in range(1, 20):
+        index.record("alice", now - timedelta(days=day, hours=10))  # 13:30, normal hours
+    index.record("alice", now, rate_limit=("data_export", 3600))
+    index.record("alice", now - timedelta(minutes=10), rate_limit=("data_export", 3600))
+    index.record("alice", now - timedelta(hours=3), rate_limit=("data_export", 3600))
+
+    assert index.hour_profile_30d("alice", now) == (20, 2)
+    assert index.events_last_hour("alice", now) == 2
+    assert index.rate_count("alice", "data_export", now) == 2
+    assert index.rate_count("bob", "data_export", now) == 0
+
+
+def test_index_bounds_tracked_users():
+    index = SecurityWindowIndex(max_users=2)
+    now = datetime.now()
+    index.record("a", now)
+    index.record("b", now)
+    index.record("a", now)
+    index.record("c", now)  # Evicts "b", the least recently active
+    assert index.events_last_hour("b", now) == 0
+    assert index.events_last_hour("a", now) == 2
+    assert index.get_stats()["tracked_users"] == 2
+
+
+def test_counter_state_is_constant_as_history_grows():
+    def counter_sizes(history):
+        index = SecurityWindowIndex()
+        start = datetime(2026, 3, 2, 12, 0)
+        for i in range(history):
+            index.record("user", start + timedelta(seconds=i), rate_limit=("document_query", 60))
+        windows = index._users["user"]
+        counters = [windows.last_hour, windows.normal_hours_30d, windows.off_hours_30d,
+                    *windows.rate_windows.values()]
+        now = start + timedelta(seconds=history)
+        return [len(counter._counts) for counter in counters], index.events_last_hour("user", now)
+
+    small_sizes, small_count = counter_sizes(1000)
+    large_sizes, large_count = counter_sizes(100000)
+    # Lookups read a fixed ring of buckets, not the event history
+    assert small_sizes == large_sizes == [60, 30, 30, 60]
+    assert small_count == 1000
+    assert 3600 - 60 <= large_count <= 3600  # Exact to one 60s bucket
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Tests for the bounded voice session store
+"""
+
+import os
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+
+from pydantic_ai.messages import (
+    ModelRequest,
+    ModelResponse,
+    SystemPromptPart,
+    TextPart,
+    ToolCallPart,
+    ToolReturnPart,
+    UserPromptPart,
+)
+
+from services.session_store import SessionStore, compact_messages
+from voice_agent import ConversationContext
+
+
+def _turn(i, with_system=False):
+    parts = [SystemPromptPart(content="You are Line Lead")] if with_system else []
+    return [
+        ModelRequest(parts=[*parts, UserPromptPart(content=f"question {i}")]),
+        ModelResponse(parts=[ToolCallPart(tool_name="get_equipment_image", args="{}", tool_call_id=f"c{i}")]),
+        ModelRequest(parts=[ToolReturnPart(tool_name="get_equipment_image", content="ok", tool_call_id=f"c{i}")]),
+        ModelResponse(parts=[TextPart(content=f"answer {i}")]),
+    ]
+
+
+def _history(turns):
+    messages = []
+    for i in range(turns):
+        messages.extend(_turn(i, with_system=(i == 0)))
+    return messages
+
+
+def test_compaction_keeps_recent_turns_and_system_prompt():
+    compacted = compact_messages(_history(5), max_turns=2)
+
+    assert len(compacted) == 8
+    first_parts = compacted[0].parts
+    assert isinstance(first_parts[0], SystemPromptPart)
+    assert first_parts[1].content == "question 3"
+    # Tool call/return pairs stay together
+    assert compacted[1].parts[0].tool_call_id == compacted[2].parts[0].tool_call_id
+
+
+def test_lru_eviction_by_session_count():
+    store = SessionStore(ConversationContext, max_sessions=2)
+    store.get_context("a")
+    store.get_context("b")
+    store.get_context("a")
+    store.get_context("c")
+
+    assert set(store.session_ids()) == {"a", "c"}
+    assert store.get_stats()["evictions"] == 1
+
+
+def test_memory_budget_and_window():
+    store = SessionStore(ConversationContext, max_turns=3, max_total_bytes=10**9)
+    store.set_messages("a", _history(10))
+
+    assert len(store.get_messages("a")) == 12
+    stats = store.get_stats()
+    assert stats["memory_bytes"] > 0
+    assert stats["compactions"] == 1
+
+    store.max_total_bytes = stats["memory_bytes"]
+    store.set_messages("b", _history(2))
+    assert "a" not in store and "b" in store
+    assert store.get_stats()["memory_bytes"] <= stats["memory_bytes"]
+
+
+def test_idle_sessions_spill_and_rehydrate(tmp_path):
+    store = SessionStore(ConversationContext, idle_ttl=60, spill_path=str(tmp_path / "sessions.sqlite"))
+    context = store.get_context("line-1")
+    context.current_entity = "fryer"
+    context.conversation_history.extend({"user": f"q{i}"} for i in range(20))
+    store.touch("line-1")
+    store.set_messages("line-1", _history(2))
+    assert len(context.conversation_history) == store.max_turns
+
+    store._sessions["line-1"].last_access = time.time() - 120
+    assert store.evict_expired() == 1
+    assert "line-1" not in store
+    assert store.get_stats()["spilled_sessions"] == 1
+
+    rehydrated = store.get_context("line-1")
+    assert rehydrated.current_entity == "fryer"
+    assert len(store.get_messages("line-1")) == 8
+    assert store.get_stats()["rehydrated"] == 1
+
+    store.end("line-1")
+    assert store.get_stats()["spilled_sessions"] == 0
+
+
+def test_spilled_history_and_entities_survive_rehydration(tmp_path):
+    store = SessionStore(ConversationContext, idle_ttl=60, spill_path=str(tmp_path / "sessions.sqlite"))
+    context = store.get_context("line-2")
+    context.current_entity = "fryer"
+    context.entity_history.extend(["fryer", "grill"])
+    context.conversation_history.append({"user": "how do I clean the fryer", "timestamp": time.time()})
+    context.conversation_history.append({"assistant": "Turn it off first", "timestamp": time.time()})
+    store.touch("line-2")
+
+    store._sessions["line-2"].last_access = time.time() - 120
+    assert store.evict_expired() == 1
+
+    rehydrated = store.get_context("line-2")
+    assert store.get_stats()["rehydrated"] == 1
+    assert rehydrated.entity_history == ["fryer", "grill"]
+    assert [turn.get("user") or turn.get("assistant") for turn in rehydrated.conversation_history] == [
+        "how do I clean the fryer",
+        "Turn it off first",
+    ]
+    assert isinstance(rehydrated.conversation_history[0]["timestamp"], float)
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Tests for the size-bounded document source cache index
+"""
+
+import hashlib
+import json
+import os
+import time
+
+from services.source_cache import SourceCacheEntry, SourceCacheIndex
+
+
+def _store(index, key, data, **fields):
+    index.path_for(key).write_bytes(data)
+    return index.add(SourceCacheEntry(
+        key=key, document_id=f"doc-{key}", size=len(data),
+        sha256=hashlib.sha256(data).hexdigest(), content_type="video/mp4", **fields,
+    ))
+
+
+def test_lru_eviction_respects_byte_budget(tmp_path):
+    index = SourceCacheIndex(tmp_path, max_bytes=250)
+    _store(index, "a", b"a" * 100)
+    _store(index, "b", b"b" * 100)
+    time.sleep(0.01)
+    assert index.get("a") is not None  # "b" is now least recently used
+
+    evicted = _store(index, "c", b"c" * 100)
+    assert evicted == ["b"]
+    assert not index.path_for("b").exists()
+    stats = index.get_stats()
+    assert stats["cached_documents"] == 2 and stats["total_size_bytes"] == 200
+    assert stats["evictions"] == 1
+
+    # Larger than the whole budget: never cached
+    assert _store(index, "huge", b"x" * 300) == []
+    assert index.get("huge") is None and not index.path_for("huge").exists()
+
+
+def test_index_persists_across_restarts(tmp_path):
+    index = SourceCacheIndex(tmp_path, max_bytes=1000)
+    _store(index, "a", b"hello", filename="fryer.mp4")
+    index.flush()
+
+    reopened = SourceCacheIndex(tmp_path, max_bytes=1000)
+    entry = reopened.get("a")
+    assert entry.filename == "fryer.mp4" and entry.size == 5
+    assert reopened.get_stats()["cached_documents"] == 1
+
+
+def test_checksum_mismatch_discards_entry(tmp_path):
+    index = SourceCacheIndex(tmp_path, max_bytes=1000)
+    _store(index, "a", b"original")
+
+    reopened = SourceCacheIndex(tmp_path, max_bytes=1000)
+    # Same size, different bytes: only the checksum can tell
+    reopened.path_for("a").write_bytes(b"tampered")
+    assert reopened.get("a") is None
+    assert reopened.get_stats()["corrupt"] == 1
+    assert not reopened.path_for("a").exists()
+
+
+def test_ttl_expiry_and_cleanup(tmp_path):
+    index = SourceCacheIndex(tmp_path, max_bytes=1000, ttl_seconds=60)
+    _store(index, "old", b"old", created_at=time.time() - 120)
+    _store(index, "new", b"new")
+    index.path_for("orphan").write_bytes(b"stray")
+    os.utime(index.path_for("orphan"), (time.time() - 600, time.time() - 600))
+    # Just renamed into place by a download that hasn't called add() yet
+    index.path_for("published").write_bytes(b"fresh")
+    stale_part = tmp_path / "x.cache.123.part"
+    stale_part.write_bytes(b"partial")
+    os.utime(stale_part, (time.time() - 7200, time.time() - 7200))
+    fresh_part = tmp_path / "y.cache.123.part"
+    fresh_part.write_bytes(b"in flight")
+
+    removed = index.cleanup()
+    assert removed == {"expired": 1, "evicted": 0, "orphans": 1, "stale_parts": 1}
+    assert fresh_part.exists()
+    assert index.path_for("published").exists()
+    assert index.get("new") is not None
+
+
+def test_legacy_meta_files_are_imported(tmp_path):
+    (tmp_path / "abc.cache").write_bytes(b"legacy body")
+    (tmp_path / "abc.meta").write_text(json.dumps(
+        {"document_id": "doc-1", "content_type": "application/pdf", "filename": "manual.pdf"}
+    ))
+    (tmp_path / "nometa.cache").write_bytes(b"unknown")
+
+    index = SourceCacheIndex(tmp_path, max_bytes=1000)
+    entry = index.get("abc")
+    assert entry.content_type == "application/pdf"
+    assert entry.sha256 == hashlib.sha256(b"legacy body").hexdigest()
+    assert not (tmp_path / "abc.meta").exists()
+    assert not (tmp_path / "nometa.cache").exists()
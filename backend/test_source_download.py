@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared tee download used by the document source endpoint
+"""
+
+import asyncio
+
+import pytest
+
+from services.source_download import SharedSourceDownload, SourceDownloadError
+
+BODY = bytes(range(256)) * 64  # 16 KB
+
+
+async def _collect(iterator):
+    return b"".join([chunk async for chunk in iterator])
+
+
+def test_readers_follow_download_and_file_is_published(tmp_path):
+    async def run():
+        download = SharedSourceDownload(tmp_path / "doc.cache")
+        first = asyncio.ensure_future(_collect(download.iter_range(0)))
+        ranged = asyncio.ensure_future(_collect(download.iter_range(1000, 4999)))
+
+        await download.start("video/mp4", "clip.mp4", len(BODY))
+        for offset in range(0, len(BODY), 1024):
+            await download.write(BODY[offset:offset + 1024])
+            await asyncio.sleep(0)
+        # Readers received bytes before the body finished
+        assert not first.done()
+        await download.finish()
+
+        late = await _collect(download.iter_range(len(BODY) - 10))
+        return await first, await ranged, late, download
+
+    first, ranged, late, download = asyncio.run(run())
+    assert first == BODY
+    assert ranged == BODY[1000:5000]
+    assert late == BODY[-10:]
+    assert download.done and download.readers == 0
+    assert (tmp_path / "doc.cache").read_bytes() == BODY
+    assert not download.part_path.exists()
+
+
+def test_failure_before_start_raises_for_waiters(tmp_path):
+    async def run():
+        download = SharedSourceDownload(tmp_path / "doc.cache")
+        waiter = asyncio.ensure_future(download.wait_started())
+        await asyncio.sleep(0)
+        await download.fail("Document abc not found")
+        with pytest.raises(SourceDownloadError, match="not found"):
+            await waiter
+
+    asyncio.run(run())
+    assert not (tmp_path / "doc.cache").exists()
+
+
+def test_short_body_fails_readers_and_discards_part(tmp_path):
+    async def run():
+        download = SharedSourceDownload(tmp_path / "doc.cache")
+        await download.start("application/pdf", None, len(BODY))
+        reader = asyncio.ensure_future(_collect(download.iter_range(0)))
+        await download.write(BODY[:100])
+        await download.finish()
+        with pytest.raises(SourceDownloadError, match="ended after 100"):
+            await reader
+        return download
+
+    download = asyncio.run(run())
+    assert not download.part_path.exists()
+    assert not (tmp_path / "doc.cache").exists()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Tests for the content-addressed TTS audio cache
+"""
+
+import httpx
+import pytest
+
+from services.tts_audio_cache import TTSAudioCache
+from voice_service import ElevenLabsVoiceService
+
+
+def test_key_covers_voice_and_settings():
+    key = TTSAudioCache.make_key("Set fryer to 350.", "rachel", "v1", {"stability": 0.85})
+    assert key == TTSAudioCache.make_key("Set fryer to 350.", "rachel", "v1", {"stability": 0.85})
+    assert key != TTSAudioCache.make_key("Set fryer to 350.", "rachel", "v1", {"stability": 0.5})
+    assert key != TTSAudioCache.make_key("Set fryer to 350.", "adam", "v1", {"stability": 0.85})
+
+
+def test_memory_tier_is_lru_bounded():
+    cache = TTSAudioCache(max_memory_bytes=10, max_memory_entries=10)
+    cache.put("a", b"aaaa")
+    cache.put("b", b"bbbb")
+    assert cache.get("a") == b"aaaa"
+    cache.put("c", b"cccc")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"aaaa" and cache.get("c") == b"cccc"
+    stats = cache.get_stats()
+    assert stats["memory_bytes"] <= 10
+    assert stats["memory_evictions"] == 1
+
+
+def test_disk_tier_survives_restart_and_evicts_by_size(tmp_path):
+    cache = TTSAudioCache(cache_dir=str(tmp_path), max_memory_bytes=0, max_disk_bytes=25)
+    cache.put("a", b"a" * 10)
+    cache.put("b", b"b" * 10)
+    assert cache.get("a") == b"a" * 10  # a is now most recently used
+    cache.put("c", b"c" * 10)
+
+    assert sorted(p.stem for p in tmp_path.glob("*.mp3")) == ["a", "c"]
+    assert cache.get_stats()["disk_evictions"] == 1
+
+    restarted = TTSAudioCache(cache_dir=str(tmp_path), max_disk_bytes=25)
+    assert restarted.get("c") == b"c" * 10
+    assert restarted.get_stats()["disk_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_repeated_answer_is_synthesized_once(tmp_path):
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(200, content=b"ID3-fake-mp3")
+
+    service = ElevenLabsVoiceService()
+    service.api_key = "test-key"
+    service.audio_cache = TTSAudioCache(cache_dir=str(tmp_path))
+    service.http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    first = await service.generate_audio_safely("Check the **sanitizer** ratio")
+    second = await service.generate_audio_safely("Check the sanitizer ratio")
+
+    assert first == second == b"ID3-fake-mp3"
+    assert len(calls) == 1
+    assert service.get_cache_stats()["memory_hits"] == 1
+
+    client = service.http_client
+    await service.close()
+    assert client.is_closed
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Tests for the concurrent TTS request scheduler
+"""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from services.tts_scheduler import TTSPriority, TTSQueueFull, TTSRateLimited, TTSScheduler
+from voice_service import ElevenLabsVoiceService
+
+
+def _job(log, name, delay=0.02):
+    async def run():
+        log.append(("start", name))
+        await asyncio.sleep(delay)
+        log.append(("end", name))
+        return name
+    return run
+
+
+@pytest.mark.asyncio
+async def test_requests_run_concurrently_up_to_the_limit():
+    scheduler = TTSScheduler(max_concurrency=3, requests_per_second=1000)
+    log = []
+    started = time.monotonic()
+    results = await asyncio.gather(*(scheduler.submit(_job(log, i, 0.1)) for i in range(3)))
+    elapsed = time.monotonic() - started
+
+    assert sorted(results) == [0, 1, 2]
+    assert elapsed < 0.25  # Not serialized behind a global interval
+    await scheduler.close()
+
+
+@pytest.mark.asyncio
+async def test_interactive_before_prefetch_and_fair_across_sessions():
+    scheduler = TTSScheduler(max_concurrency=1, requests_per_second=1000)
+    log = []
+    blocker = asyncio.ensure_future(scheduler.submit(_job(log, "blocker", 0.05)))
+    await asyncio.sleep(0.01)
+
+    waiting = [
+        scheduler.submit(_job(log, "prefetch"), priority=TTSPriority.PREFETCH, session_id="a"),
+        scheduler.submit(_job(log, "a1"), session_id="a"),
+        scheduler.submit(_job(log, "a2"), session_id="a"),
+        scheduler.submit(_job(log, "a3"), session_id="a"),
+        scheduler.submit(_job(log, "b1"), session_id="b"),
+    ]
+    await asyncio.gather(blocker, *waiting)
+
+    order = [name for event, name in log if event == "start"]
+    assert order[0] == "blocker"
+    assert order[-1] == "prefetch"
+    assert order.index("b1") < order.index("a2")
+    await scheduler.close()
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_request_does_not_block_others():
+    scheduler = TTSScheduler(max_concurrency=1, requests_per_second=1000, base_backoff=0.1)
+    log = []
+    attempts = {"n": 0}
+
+    async def throttled():
+        attempts["n"] += 1
+        if attempts["n"] == 1:
+            raise TTSRateLimited()
+        return "retried"
+
+    first = asyncio.ensure_future(scheduler.submit(throttled, session_id="a"))
+    await asyncio.sleep(0.01)
+    other = await scheduler.submit(_job(log, "other"), session_id="b")
+
+    assert other == "other"
+    assert not first.done()  # Still backing off while the other request ran
+    assert await first == "retried"
+    assert scheduler.get_stats()["rate_limited"] == 1
+    await scheduler.close()
+
+
+@pytest.mark.asyncio
+async def test_backpressure_rejects_when_queue_is_full():
+    scheduler = TTSScheduler(max_concurrency=1, requests_per_second=1000, max_queue=1)
+    log = []
+    running = asyncio.ensure_future(scheduler.submit(_job(log, "running", 0.05)))
+    await asyncio.sleep(0.01)
+    queued = asyncio.ensure_future(scheduler.submit(_job(log, "queued")))
+    await asyncio.sleep(0)
+
+    with pytest.raises(TTSQueueFull):
+        await scheduler.submit(_job(log, "rejected"))
+    await asyncio.gather(running, queued)
+    assert scheduler.get_stats()["rejected"] == 1
+    await scheduler.close()
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_caps_request_rate():
+    scheduler = TTSScheduler(max_concurrency=4, requests_per_second=20, burst=1)
+    started = time.monotonic()
+    await asyncio.gather(*(scheduler.submit(_job([], i, 0)) for i in range(4)))
+    # One token up front, then three more at 20/s
+    assert time.monotonic() - started >= 0.14
+    await scheduler.close()
+
+
+@pytest.mark.asyncio
+async def test_voice_service_retries_429_through_scheduler(tmp_path):
+    responses = [httpx.Response(429, headers={"retry-after": "0.05"}), httpx.Response(200, content=b"mp3")]
+
+    def handler(request):
+        return responses.pop(0)
+
+    service = ElevenLabsVoiceService()
+    service.api_key = "test-key"
+    service.audio_cache.max_memory_bytes = 0
+    service.audio_cache.cache_dir = None
+    service.http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    assert await service.generate_audio_safely("Sanitizer ratio check", session_id="line-1") == b"mp3"
+    assert service.get_scheduler_stats()["rate_limited"] == 1
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_pipelined_lookahead_sentences_are_prefetch():
+    from services.voice_audio_pipeline import pipeline_sentence_audio
+
+    async def sentences():
+        for sentence in ["Turn off the fryer.", "Let the oil cool.", "Drain the vat."]:
+            yield sentence
+
+    service = ElevenLabsVoiceService()
+    service.api_key = "test-key"
+    service.audio_cache.max_memory_bytes = 0
+    service.audio_cache.cache_dir = None
+    service.http_client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(200, content=b"mp3")))
+
+    submitted = []
+    submit = service.scheduler.submit
+
+    async def recording_submit(job, priority=TTSPriority.INTERACTIVE, session_id=None):
+        submitted.append((priority, session_id))
+        return await submit(job, priority=priority, session_id=session_id)
+
+    service.scheduler.submit = recording_submit
+
+    async def synthesize(index, sentence):
+        return await service.synthesize_sentence(index, sentence, session_id="line-1")
+
+    results = [item async for item in pipeline_sentence_audio(sentences(), synthesize)]
+
+    assert [audio for _, _, audio in results] == [b"mp3"] * 3
+    assert sorted(submitted, key=lambda item: item[0]) == [
+        (TTSPriority.INTERACTIVE, "line-1"),
+        (TTSPriority.PREFETCH, "line-1"),
+        (TTSPriority.PREFETCH, "line-1"),
+    ]
+    await service.close()
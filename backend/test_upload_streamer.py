@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Tests for streaming uploads to disk and validating memory-mapped files
+"""
+
+import hashlib
+import io
+
+import pytest
+from fastapi import UploadFile
+
+import services.multi_format_validator as multi_format_validator_module
+from services.multi_format_validator import MultiFormatValidator
+from services.upload_streamer import (
+    UploadRejectedError,
+    as_binary_stream,
+    map_file,
+    stream_upload_to_disk,
+)
+
+
+class CountingStream(io.BytesIO):
+    """BytesIO that records the largest single read"""
+
+    max_read = 0
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        CountingStream.max_read = max(CountingStream.max_read, len(chunk))
+        return chunk
+
+
+def _upload(data: bytes, filename: str = "manual.txt") -> UploadFile:
+    return UploadFile(file=CountingStream(data), filename=filename)
+
+
+@pytest.mark.asyncio
+async def test_stream_writes_in_chunks_and_hashes(tmp_path):
+    data = b"fryer cleaning steps\n" * 5000
+    CountingStream.max_read = 0
+
+    saved = await stream_upload_to_disk(_upload(data), tmp_path / "out.txt", chunk_size=4096)
+
+    assert saved.size == len(data)
+    assert saved.sha256 == hashlib.sha256(data).hexdigest()
+    assert saved.head == data[:8192]
+    assert (tmp_path / "out.txt").read_bytes() == data
+    assert CountingStream.max_read <= 4096
+
+
+@pytest.mark.asyncio
+async def test_oversized_upload_is_rejected_without_partial_file(tmp_path):
+    with pytest.raises(UploadRejectedError):
+        await stream_upload_to_disk(_upload(b"x" * 10000), tmp_path / "big.txt", max_size=5000, chunk_size=1024)
+
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_header_check_rejects_early(tmp_path):
+    def require_pdf(head):
+        return None if head.startswith(b"%PDF") else "Invalid PDF file"
+
+    with pytest.raises(UploadRejectedError, match="Invalid PDF"):
+        await stream_upload_to_disk(_upload(b"MZ" + b"\0" * 20000, "manual.pdf"), tmp_path / "m.pdf",
+                                    header_check=require_pdf, chunk_size=1024)
+    assert not (tmp_path / "m.pdf").exists()
+
+
+def test_validator_accepts_memory_mapped_file(tmp_path, monkeypatch):
+    validator = MultiFormatValidator()
+    path = tmp_path / "notes.txt"
+    path.write_bytes(b"Check fryer oil temperature daily.\n" * 100)
+
+    result = validator.validate_path("notes.txt", str(path))
+    assert result.result.value == "valid"
+    assert result.file_size == path.stat().st_size
+
+    # Suspicious pattern straddling two scan windows is still caught
+    monkeypatch.setattr(multi_format_validator_module, "SECURITY_SCAN_WINDOW", 64)
+    path.write_bytes(b"a" * 61 + b"<SCRIPT>alert(1)</script>")
+    assert validator.validate_path("notes.txt", str(path)).result.value == "security_risk"
+
+
+def test_mapped_file_is_a_seekable_stream(tmp_path):
+    path = tmp_path / "data.bin"
+    path.write_bytes(b"0123456789")
+
+    with map_file(path) as mapped:
+        stream = as_binary_stream(mapped)
+        stream.read(4)
+        assert as_binary_stream(mapped).read(3) == b"012"
+        assert mapped[:2] == b"01"
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Tests for the local vector index backends (exact and IVF-flat)
+"""
+
+import numpy as np
+import pytest
+
+from vector_index import (
+    ExactIndex,
+    GrowableArray,
+    IVFFlatIndex,
+    benchmark_index,
+    create_vector_index,
+    normalize_vectors,
+    top_k_indices,
+)
+
+
+def _clustered_vectors(n=3000, dim=32, clusters=20, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = normalize_vectors(rng.standard_normal((clusters, dim)))
+    noise = rng.standard_normal((n, dim)).astype(np.float32) / np.sqrt(dim)
+    return centers[rng.integers(0, clusters, n)] + noise
+
+
+class TestHelpers:
+    """Test normalization and top-k selection"""
+
+    def test_normalize_vectors_unit_rows(self):
+        vectors = normalize_vectors(np.array([[3.0, 4.0], [0.0, 0.0]]))
+        assert vectors.dtype == np.float32
+        assert np.allclose(vectors[0], [0.6, 0.8])
+        assert np.allclose(vectors[1], [0.0, 0.0])
+
+    def test_top_k_indices_matches_full_sort(self):
+        scores = np.random.default_rng(1).random(500)
+        expected = np.argsort(scores)[::-1][:7]
+        assert list(top_k_indices(scores, 7)) == list(expected)
+
+    def test_top_k_larger_than_scores(self):
+        assert list(top_k_indices(np.array([0.1, 0.9, 0.5]), 10)) == [1, 2, 0]
+
+
+class TestGrowableArray:
+    """Test amortized append buffer"""
+
+    def test_append_doubles_capacity(self):
+        buffer = GrowableArray(np.float32, initial_capacity=4)
+        for i in range(5):
+            assert buffer.append(np.full((3, 2), i)) == i * 3
+        assert len(buffer) == 15
+        assert buffer.capacity == 16
+        assert buffer.view.shape == (15, 2)
+        assert np.all(buffer.view[12:] == 4)
+
+    def test_compact_preserves_order(self):
+        buffer = GrowableArray(np.int32)
+        buffer.append(np.arange(6))
+        buffer.compact(buffer.view % 2 == 0)
+        assert list(buffer.view) == [0, 2, 4]
+
+    def test_wrapped_array_is_not_modified(self):
+        source = np.arange(4, dtype=np.int32)
+        source.setflags(write=False)
+        buffer = GrowableArray(np.int32)
+        buffer.wrap(source)
+        buffer.compact(np.array([False, True, True, True]))
+        buffer.append(np.array([9]))
+        assert list(source) == [0, 1, 2, 3]
+        assert list(buffer.view) == [1, 2, 3, 9]
+
+
+class TestExactIndex:
+    """Test brute-force baseline"""
+
+    def test_search_returns_cosine_order(self):
+        index = ExactIndex()
+        index.add(np.array([[1.0, 0.0], [0.0, 1.0], [1.0, 1.0]]))
+        indices, scores = index.search(np.array([1.0, 0.1]), top_k=2)
+        assert list(indices) == [0, 2]
+        assert scores[0] == pytest.approx(0.995, abs=1e-3)
+
+    def test_empty_index(self):
+        indices, scores = ExactIndex().search(np.ones(4), top_k=3)
+        assert len(indices) == 0 and len(scores) == 0
+
+
+class TestIVFFlatIndex:
+    """Test approximate index"""
+
+    def test_untrained_index_is_exact(self):
+        vectors = _clustered_vectors(n=200)
+        ivf = IVFFlatIndex(min_train_size=1000)
+        exact = ExactIndex()
+        ivf.add(vectors)
+        exact.add(vectors)
+        assert not ivf.is_trained
+        query = vectors[5]
+        assert list(ivf.search(query, 10)[0]) == list(exact.search(query, 10)[0])
+
+    def test_trains_and_keeps_recall(self):
+        vectors = _clustered_vectors()
+        ivf = IVFFlatIndex(min_train_size=1000, nprobe=4)
+        for batch in np.array_split(vectors, 6):
+            ivf.add(batch)
+        assert ivf.is_trained
+        assert sum(len(cell) for cell in ivf.inverted_lists) == ivf.ntotal
+
+        result = benchmark_index(ivf, vectors[:50], top_k=10)
+        assert result["recall_at_k"] >= 0.9
+
+    def test_nprobe_covering_all_lists_is_exact(self):
+        vectors = _clustered_vectors(n=1500)
+        ivf = IVFFlatIndex(min_train_size=500)
+        ivf.add(vectors)
+        result = benchmark_index(ivf, vectors[:20], top_k=5, nprobe=len(ivf.inverted_lists))
+        assert result["recall_at_k"] == pytest.approx(1.0)
+
+    def test_remove_remaps_inverted_lists(self):
+        vectors = _clustered_vectors(n=2000)
+        ivf = IVFFlatIndex(min_train_size=500, nprobe=1000)
+        exact = ExactIndex()
+        ivf.add(vectors)
+        exact.add(vectors)
+
+        keep = np.arange(2000) % 3 != 0
+        ivf.remove(keep)
+        exact.remove(keep)
+
+        assert ivf.ntotal == exact.ntotal == int(keep.sum())
+        assert sum(len(cell) for cell in ivf.inverted_lists) == ivf.ntotal
+        query = vectors[1]
+        assert list(ivf.search(query, 5)[0]) == list(exact.search(query, 5)[0])
+
+    def test_reset(self):
+        ivf = IVFFlatIndex(min_train_size=100)
+        ivf.add(_clustered_vectors(n=300))
+        ivf.reset()
+        assert ivf.ntotal == 0 and not ivf.is_trained
+
+
+def test_create_vector_index():
+    assert isinstance(create_vector_index("exact"), ExactIndex)
+    assert create_vector_index("ivf", nprobe=3).nprobe == 3
+    with pytest.raises(ValueError):
+        create_vector_index("hnsw")
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Tests for sentence-pipelined voice audio
+"""
+
+import asyncio
+import re
+
+import pytest
+
+from services.voice_audio_pipeline import (
+    FRAME_AUDIO,
+    FRAME_META,
+    SentenceAccumulator,
+    decode_frames,
+    encode_frame,
+    encode_meta_frame,
+    pipeline_sentence_audio,
+)
+
+
+def split(text):
+    return [s.strip() for s in re.split(r"(?<=[.!?])\s+", text.strip()) if s.strip()]
+
+
+def test_accumulator_releases_complete_sentences_only():
+    acc = SentenceAccumulator(split, min_chars=10)
+    assert acc.feed("Turn off the fryer and") == []
+    assert acc.feed(" let the oil cool. Drain the ") == ["Turn off the fryer and let the oil cool."]
+    # Short sentences are merged with the next one rather than spoken alone
+    assert acc.feed("oil. Ok. Wipe the vat") == ["Drain the oil."]
+    assert acc.flush() == ["Ok. Wipe the vat"]
+    assert acc.flush() == []
+
+
+async def _sentences(items, delay=0.0):
+    for item in items:
+        await asyncio.sleep(delay)
+        yield item
+
+
+@pytest.mark.asyncio
+async def test_audio_is_emitted_in_order_with_bounded_concurrency():
+    active = {"now": 0, "max": 0}
+    delays = [0.06, 0.01, 0.03, 0.0, 0.02]
+
+    async def synthesize(index, sentence):
+        active["now"] += 1
+        active["max"] = max(active["max"], active["now"])
+        await asyncio.sleep(delays[int(sentence)])
+        active["now"] -= 1
+        return sentence.encode()
+
+    results = [item async for item in pipeline_sentence_audio(_sentences(["0", "1", "2", "3", "4"]), synthesize, window=2)]
+
+    assert [index for index, _, _ in results] == [0, 1, 2, 3, 4]
+    assert [audio for _, _, audio in results] == [b"0", b"1", b"2", b"3", b"4"]
+    assert active["max"] == 2
+
+
+@pytest.mark.asyncio
+async def test_first_clip_does_not_wait_for_remaining_text():
+    loop = asyncio.get_running_loop()
+    source_done = loop.create_future()
+
+    async def slow_source():
+        yield "First sentence."
+        await asyncio.sleep(0.2)  # Model still generating
+        yield "Second sentence."
+        source_done.set_result(True)
+
+    async def synthesize(index, sentence):
+        await asyncio.sleep(0.01)
+        return b"mp3"
+
+    stream = pipeline_sentence_audio(slow_source(), synthesize)
+    index, sentence, audio = await stream.__anext__()
+    assert (index, sentence, audio) == (0, "First sentence.", b"mp3")
+    assert not source_done.done()
+    assert [item async for item in stream][0][1] == "Second sentence."
+
+
+@pytest.mark.asyncio
+async def test_failed_sentence_yields_none_and_continues():
+    async def synthesize(index, sentence):
+        if sentence == "bad":
+            raise RuntimeError("tts down")
+        return b"ok"
+
+    results = [item async for item in pipeline_sentence_audio(_sentences(["good", "bad", "good"]), synthesize)]
+    assert [audio for _, _, audio in results] == [b"ok", None, b"ok"]
+
+
+def test_frames_round_trip():
+    data = encode_meta_frame({"type": "sentence", "index": 0}) + encode_frame(FRAME_AUDIO, b"\xff\xfb\x90")
+    frames = decode_frames(data)
+    assert frames[0] == (FRAME_META, b'{"type": "sentence", "index": 0}')
+    assert frames[1] == (FRAME_AUDIO, b"\xff\xfb\x90")
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Tests for token-level streaming in VoiceOrchestrator
+"""
+
+import asyncio
+import json
+import os
+
+import pytest
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+
+from pydantic_ai.messages import ToolReturnPart
+from pydantic_ai.models.function import DeltaToolCall, FunctionModel
+
+import voice_agent
+from voice_agent import VoiceOrchestrator
+
+ANSWER = "1. Turn off the fryer.\n2. Drain the oil into the caddy.\n3. Wipe the \"vat\" dry."
+
+
+def _answer_pieces():
+    payload = json.dumps({"text_response": ANSWER, "detected_intent": "equipment_question"})
+    return [payload[i:i + 7] for i in range(0, len(payload), 7)]
+
+
+async def _stream_answer(messages, info):
+    """Call the image tool first, then stream the structured answer in small pieces"""
+    tool_returned = any(
+        isinstance(part, ToolReturnPart) for message in messages for part in message.parts
+    )
+    if not tool_returned:
+        yield {0: DeltaToolCall(name="get_equipment_image", json_args='{"equipment_name": "Baxter oven"}')}
+        return
+    output_tool = info.output_tools[0].name
+    for i, piece in enumerate(_answer_pieces()):
+        await asyncio.sleep(0.02)  # slower than the orchestrator's debounce window
+        yield {0: DeltaToolCall(name=output_tool if i == 0 else None, json_args=piece)}
+
+
+@pytest.mark.asyncio
+async def test_stream_yields_citations_then_deltas_then_final():
+    orchestrator = VoiceOrchestrator()
+
+    with voice_agent.voice_agent.override(model=FunctionModel(stream_function=_stream_answer)):
+        events = [e async for e in orchestrator.stream_voice_message("how do I drain the fryer", [], "s1")]
+
+    assert events[0]["type"] == "visual_citations"
+    assert events[0]["visual_citations"][0]["equipment_name"] == "Baxter oven"
+
+    deltas = [e["text"] for e in events if e["type"] == "delta"]
+    assert len(deltas) > 1
+    assert "".join(deltas) == ANSWER
+
+    final = events[-1]
+    assert final["type"] == "final"
+    assert final["response"].text_response == ANSWER
+    assert final["response"].parsed_steps.has_steps
+    assert final["response"].visual_citations == events[0]["visual_citations"]
+    assert orchestrator.get_message_history("s1")
+
+
+def test_partial_text_response_handles_incomplete_json():
+    class Part:
+        args = '{"text_response": "Turn off the fr'
+
+    class Response:
+        parts = [Part()]
+
+    assert voice_agent._partial_text_response(Response()) == "Turn off the fr"
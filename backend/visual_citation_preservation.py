@@ -33,6 +33,7 @@ from reliability_infrastructure import (
     transaction_manager,
     dead_letter_queue
 )
+from services.pdf_artifact import pdf_artifact_store
 
 logger = logging.getLogger(__name__)
 
@@ -263,18 +264,21 @@ class VisualCitationPreservationLayer:
         """Extract visual content from document"""
         visual_citations = []
         
+        # Page layout and image xrefs come from the shared parsed artifact
+        parsed = await pdf_artifact_store.aload_or_parse(document_path)
+        
         try:
             # Import PDF processing libraries
             import fitz  # PyMuPDF for visual extraction
             
             doc = fitz.open(document_path)
             
-            for page_num in range(len(doc)):
+            for parsed_page in parsed.pages:
+                page_num = parsed_page.number
                 page = doc.load_page(page_num)
                 
                 # Extract images
-                image_list = page.get_images()
-                for img_index, img in enumerate(image_list):
+                for img_index, img in enumerate(map(tuple, parsed_page.image_xrefs)):
                     citation = await self._process_image_extraction(
                         doc, page, page_num, img_index, img
                     )
@@ -304,7 +308,7 @@ class VisualCitationPreservationLayer:
         except ImportError:
             logger.warning("PyMuPDF not available, using fallback visual extraction")
             # Fallback to basic PDF processing
-            visual_citations = await self._fallback_visual_extraction(document_path)
+            visual_citations = await self._fallback_visual_extraction(document_path, parsed)
         
         return visual_citations
     
@@ -448,54 +452,52 @@ class VisualCitationPreservationLayer:
             logger.warning(f"Failed to extract drawing {drawing_index} from page {page_num}: {e}")
             return None
     
-    async def _fallback_visual_extraction(self, document_path: str) -> List[VisualCitation]:
-        """Fallback visual extraction when PyMuPDF is not available"""
+    async def _fallback_visual_extraction(self, document_path: str, parsed=None) -> List[VisualCitation]:
+        """Fallback visual extraction from page texts when PyMuPDF is not available"""
         logger.info("🔄 Using fallback visual extraction")
         
         # Create placeholder citations for demonstration
         visual_citations = []
         
         try:
-            import PyPDF2
+            if parsed is None:
+                parsed = await pdf_artifact_store.aload_or_parse(document_path)
             
-            with open(document_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
+            for page_num, page in enumerate(parsed.pages):
+                # Extract text for potential visual references
+                text = page.text
                 
-                for page_num, page in enumerate(pdf_reader.pages):
-                    # Extract text for potential visual references
-                    text = page.extract_text()
-                    
-                    # Look for visual reference patterns
-                    visual_patterns = [
-                        "figure", "diagram", "image", "photo", "chart", 
-                        "table", "schematic", "drawing", "illustration"
-                    ]
-                    
-                    for pattern in visual_patterns:
-                        if pattern.lower() in text.lower():
-                            # Create placeholder visual citation
-                            citation_id = f"ref_{page_num}_{pattern}_{hash(text[:100]) % 10000}"
-                            content_hash = hashlib.sha256(text.encode()).hexdigest()
-                            
-                            citation = VisualCitation(
-                                citation_id=citation_id,
-                                citation_type=VisualCitationType.IMAGE,
-                                content_format=VisualContentFormat.PDF_EXTRACT,
-                                source_document=Path(document_path).name,
-                                page_number=page_num + 1,
-                                bounding_box={"x": 0, "y": 0, "width": 100, "height": 100},
-                                content_hash=content_hash,
-                                extraction_metadata={
-                                    "extraction_method": "fallback_text_reference",
-                                    "reference_pattern": pattern,
-                                    "confidence": 0.5
-                                },
-                                visual_content=text.encode('utf-8')
-                            )
-                            
-                            visual_citations.append(citation)
-                            break  # One citation per page
-            
+                # Look for visual reference patterns
+                visual_patterns = [
+                    "figure", "diagram", "image", "photo", "chart", 
+                    "table", "schematic", "drawing", "illustration"
+                ]
+                
+                for pattern in visual_patterns:
+                    if pattern.lower() in text.lower():
+                        # Create placeholder visual citation
+                        citation_id = f"ref_{page_num}_{pattern}_{hash(text[:100]) % 10000}"
+                        content_hash = hashlib.sha256(text.encode()).hexdigest()
+                        
+                        citation = VisualCitation(
+                            citation_id=citation_id,
+                            citation_type=VisualCitationType.IMAGE,
+                            content_format=VisualContentFormat.PDF_EXTRACT,
+                            source_document=Path(document_path).name,
+                            page_number=page_num + 1,
+                            bounding_box={"x": 0, "y": 0, "width": 100, "height": 100},
+                            content_hash=content_hash,
+                            extraction_metadata={
+                                "extraction_method": "fallback_text_reference",
+                                "reference_pattern": pattern,
+                                "confidence": 0.5
+                            },
+                            visual_content=text.encode('utf-8')
+                        )
+                        
+                        visual_citations.append(citation)
+                        break  # One citation per page
+        
         except Exception as e:
             logger.error(f"❌ Fallback visual extraction failed: {e}")
         
@@ -8,6 +8,7 @@ from pydantic_ai import Agent, RunContext
 from pydantic_ai.models.openai import OpenAIModel
 from pydantic_ai.messages import ModelMessage
 from pydantic import BaseModel, Field
+from pydantic_core import from_json
 from typing import Optional, List, Dict, Any, Literal, Union
 from enum import Enum
 import time
@@ -34,6 +35,11 @@ except ImportError:
 # Initialize logger early
 logger = logging.getLogger(__name__)
 
+try:
+    from .services.session_store import SessionStore
+except ImportError:
+    from services.session_store import SessionStore
+
 # Import image request handler
 try:
     from .services.image_request_handler import image_request_handler
@@ -109,7 +115,7 @@ class ConversationContext(BaseModel):
         """Backward compatibility property - maps to current_entity"""
         return self.current_entity
     last_document_referenced: Optional[str] = None
-    conversation_history: List[Dict[str, str]] = Field(default_factory=list)
+    conversation_history: List[Dict[str, Any]] = Field(default_factory=list)
     voice_state: VoiceState = VoiceState.LISTENING
     hands_free_active: bool = False
     error_count: int = 0
@@ -735,17 +741,43 @@ except Exception as e:
     qsr_maintenance_agent = None
     agent_classifier = None
 
+def _partial_text_response(response) -> str:
+    """
+    Best-effort text_response from a partially streamed structured output
+    
+    The output arrives as incrementally growing tool-call JSON; parse it in
+    partial mode so the answer text can be forwarded before the JSON closes.
+    """
+    for part in getattr(response, "parts", []):
+        args = getattr(part, "args", None)
+        if args is None:
+            continue
+        if isinstance(args, dict):
+            return str(args.get("text_response") or "")
+        try:
+            parsed = from_json(args, allow_partial="trailing-strings")
+        except ValueError:
+            continue
+        if isinstance(parsed, dict) and isinstance(parsed.get("text_response"), str):
+            return parsed["text_response"]
+    return ""
+
 class VoiceOrchestrator:
     """Intelligent voice conversation orchestrator using PydanticAI with Neo4j graph context"""
     
     def __init__(self):
-        self.active_contexts: Dict[str, ConversationContext] = {}
         self.default_session = "default"
         self.voice_graph_service = None  # Will be set by main.py startup
         
-        # SESSION-BASED MESSAGE HISTORY STORAGE
-        self.conversation_contexts: Dict[str, ConversationContext] = {}
-        self.message_histories: Dict[str, List[ModelMessage]] = {}  # session_id -> message_history
+        # BOUNDED SESSION STORE: context + message history per session, LRU/idle-TTL evicted
+        self.sessions = SessionStore(
+            context_model=ConversationContext,
+            max_sessions=int(os.getenv("VOICE_SESSION_MAX_SESSIONS", "500")),
+            max_total_bytes=int(os.getenv("VOICE_SESSION_MAX_BYTES", str(64 * 1024 * 1024))),
+            idle_ttl=float(os.getenv("VOICE_SESSION_IDLE_TTL_SECONDS", "3600")),
+            max_turns=int(os.getenv("VOICE_SESSION_MAX_TURNS", "12")),
+            spill_path=os.getenv("VOICE_SESSION_SPILL_PATH") or None
+        )
     
     def set_voice_graph_service(self, voice_graph_service):
         """Set the voice graph query service for Neo4j integration"""
@@ -754,36 +786,35 @@ class VoiceOrchestrator:
     
     def clear_all_contexts(self):
         """Clear all conversation contexts (useful for model updates)"""
-        self.active_contexts.clear()
-        self.message_histories.clear()
+        self.sessions.clear()
         logger.info("🧹 Cleared all conversation contexts and message histories")
     
     def get_message_history(self, session_id: str) -> List[ModelMessage]:
         """Get stored message history for session"""
         session_id = session_id or self.default_session
-        return self.message_histories.get(session_id, [])
+        return self.sessions.get_messages(session_id)
     
     def store_message_history(self, session_id: str, messages: List[ModelMessage]):
-        """Store message history for session"""
+        """Store message history for session, compacted to the recent-turn window"""
         session_id = session_id or self.default_session
-        self.message_histories[session_id] = messages
-        logger.info(f"💾 Stored {len(messages)} messages for session {session_id}")
+        self.sessions.set_messages(session_id, messages)
+        logger.info(f"💾 Stored {len(self.sessions.get_messages(session_id))} of {len(messages)} messages for session {session_id}")
     
     def add_message_to_history(self, session_id: str, role: str, content: str):
         """Add a single message to session history"""
         session_id = session_id or self.default_session
-        if session_id not in self.message_histories:
-            self.message_histories[session_id] = []
-        
-        self.message_histories[session_id].append(ModelMessage(role=role, content=content))
+        messages = self.get_message_history(session_id) + [ModelMessage(role=role, content=content)]
+        self.sessions.set_messages(session_id, messages)
         logger.debug(f"➕ Added {role} message to session {session_id}")
         
     def get_context(self, session_id: str = None) -> ConversationContext:
         """Get or create conversation context for session"""
         session_id = session_id or self.default_session
-        if session_id not in self.active_contexts:
-            self.active_contexts[session_id] = ConversationContext()
-        return self.active_contexts[session_id]
+        return self.sessions.get_context(session_id)
+    
+    def get_session_stats(self) -> Dict[str, Any]:
+        """Session store size, memory and eviction counters"""
+        return self.sessions.get_stats()
     
     def update_context(self, session_id: str, updates: Dict[str, Any]):
         """Update conversation context with new information"""
@@ -791,6 +822,7 @@ class VoiceOrchestrator:
         for key, value in updates.items():
             if hasattr(context, key):
                 setattr(context, key, value)
+        self.sessions.touch(session_id or self.default_session)
     
     # ===============================================================================
     # SIMPLIFIED ARCHITECTURE: Agent classification removed - single agent handles all queries
@@ -1390,92 +1422,197 @@ class VoiceOrchestrator:
                 logger.warning("PydanticAI voice agent not available, using fallback")
                 return self._fallback_response(message, context)
             
-            # Build simplified prompt - let the agent handle complexity
-            enhanced_prompt = f"""
-VOICE MESSAGE: "{message}"
-
-CURRENT CONTEXT:
-- Current Entity/Topic: {context.current_entity or 'None'} 
-- Entity history: {', '.join(context.entity_history) if context.entity_history else 'None'}
-- Topics covered: {', '.join(context.topics_covered) if context.topics_covered else 'None'}
-
-RELEVANT DOCUMENTS:
-{json.dumps(relevant_docs or [], indent=2)}
-
-Process this QSR query using your comprehensive knowledge and call appropriate tools as needed.
-"""
+            enhanced_prompt = self._build_agent_prompt(message, context, relevant_docs)
             
             # STEP 3: Single comprehensive QSR expert agent processing
             logger.info(f"🧠 Using comprehensive QSR expert agent for query: {message[:50]}...")
             
-            # Process with single comprehensive agent
-            if voice_agent:
-                # GET MESSAGE HISTORY FOR CONTEXT PERSISTENCE
-                message_history = self.get_message_history(session_id)
-                logger.info(f"🧠 Running comprehensive QSR expert agent with {len(message_history)} previous messages")
-                
-                result = await voice_agent.run(user_prompt=enhanced_prompt, message_history=message_history)
-                result_data = result.output
-                
-                # STORE UPDATED MESSAGE HISTORY
-                all_messages = result.all_messages()
-                logger.info(f"💾 Storing {len(all_messages)} messages (was {len(message_history)})")
-                self.store_message_history(session_id, all_messages)
-                
-                # Verify storage
-                stored_messages = self.get_message_history(session_id)
-                logger.info(f"✅ Verified: {len(stored_messages)} messages stored for session {session_id}")
-                
-                # Extract visual citations from tool usage
-                global _last_tool_visual_citations
-                if _last_tool_visual_citations:
-                    logger.info(f"🔧 Found visual citations from tool: {len(_last_tool_visual_citations)}")
-                    result_data.visual_citations = _last_tool_visual_citations.copy()
-                    # Also add to specialized insights for text chat extraction
-                    if not result_data.specialized_insights:
-                        result_data.specialized_insights = {}
-                    result_data.specialized_insights['visual_citations'] = _last_tool_visual_citations.copy()
-                    # Clear global variable for next request
-                    _last_tool_visual_citations = []
-                
-                # Mark as comprehensive agent response
-                result_data.primary_agent = AgentType.GENERAL
-                result_data.coordination_strategy = AgentCoordinationStrategy.SINGLE_AGENT
-                logger.info(f"🎯 Comprehensive QSR expert agent processing")
-            else:
-                # Fallback if no agents available
-                result_data = await self._fallback_to_general_agent(message, context, enhanced_context, session_id)
-            
-            # STEP 3C: Enhanced context updates with multi-agent insights
-            self._apply_advanced_context_updates(result_data, context, session_id)
+            # GET MESSAGE HISTORY FOR CONTEXT PERSISTENCE
+            message_history = self.get_message_history(session_id)
+            logger.info(f"🧠 Running comprehensive QSR expert agent with {len(message_history)} previous messages")
             
-            # Add multi-agent specific context updates
-            if hasattr(result_data, 'specialized_insights') and result_data.specialized_insights:
-                context.context_references.extend([f"Consulted {agent}" for agent in result_data.specialized_insights.keys()])
+            result = await voice_agent.run(user_prompt=enhanced_prompt, message_history=message_history)
+            result_data = result.output
             
-            # STEP 3D: Parse steps for future Playbooks UX (preserved functionality)
-            result_data.parsed_steps = self._parse_response_steps(result_data.text_response)
-            if result_data.parsed_steps.has_steps:
-                logger.info(f"📋 Parsed {result_data.parsed_steps.total_steps} steps: {result_data.parsed_steps.procedure_title}")
+            # STORE UPDATED MESSAGE HISTORY
+            all_messages = result.all_messages()
+            logger.info(f"💾 Storing {len(all_messages)} messages (was {len(message_history)})")
+            self.store_message_history(session_id, all_messages)
             
-            # STEP 3E: Enhanced logging with single agent details
-            logger.info(f"🎯 Comprehensive QSR expert agent processing complete")
-            logger.info(f"🎯 Intent: {result_data.detected_intent}, Equipment: {result_data.equipment_mentioned}")
-            logger.info(f"🔄 Continue listening: {result_data.should_continue_listening}, Hands-free: {result_data.hands_free_recommendation}")
-            logger.info(f"⚠️ Safety priority: {getattr(result_data, 'safety_priority', False)}")
+            # Extract visual citations from tool usage
+            visual_citations = self._pop_tool_visual_citations()
+            if visual_citations:
+                logger.info(f"🔧 Found visual citations from tool: {len(visual_citations)}")
             
-            return result_data
+            return self._finalize_agent_output(result_data, context, session_id, visual_citations)
             
         except Exception as e:
             logger.error(f"🚨 Voice orchestration error: {str(e)}")
+            return self._recover_from_error(message, detected_entity, context, relevant_docs)
+    
+    async def stream_voice_message(
+        self,
+        message: str,
+        relevant_docs: List[Dict] = None,
+        session_id: str = None
+    ):
+        """
+        Stream the agent's answer as it is generated
+        
+        Text deltas are read from the partially streamed structured output, so the
+        first words reach the client while the model is still generating.
+        
+        Args:
+            message: User message
+            relevant_docs: Document chunks to ground the answer
+            session_id: Conversation session
             
-            # Use intelligent fallback instead of error recovery when entity is detected
-            if detected_entity:
-                logger.info(f"🔄 Using intelligent fallback for entity: {detected_entity}")
-                return self._intelligent_entity_fallback(message, detected_entity, context, relevant_docs)
-            else:
-                # Enhanced error recovery with context preservation
-                return self._enhanced_error_recovery(message, context)
+        Yields:
+            Event dicts: {"type": "visual_citations", "visual_citations": [...]} as soon as
+            the image tool has returned, {"type": "delta", "text": ...} per text increment,
+            and finally {"type": "final", "response": VoiceResponse}
+        """
+        context = self.get_context(session_id)
+        session_id = session_id or self.default_session
+        
+        detected_entity = self._detect_entity_from_message(message)
+        self._detect_entity_switch(detected_entity, context)
+        
+        context.conversation_history.append({
+            "user": message,
+            "timestamp": time.time()
+        })
+        
+        if voice_agent is None:
+            logger.warning("PydanticAI voice agent not available, using fallback")
+            response = self._fallback_response(message, context)
+            yield {"type": "delta", "text": response.text_response}
+            yield {"type": "final", "response": response}
+            return
+        
+        streamed_text = ""
+        visual_citations: List[Dict[str, Any]] = []
+        try:
+            logger.info(f"🌊 Streaming QSR expert agent for query: {message[:50]}...")
+            enhanced_prompt = self._build_agent_prompt(message, context, relevant_docs)
+            message_history = self.get_message_history(session_id)
+            
+            async with voice_agent.run_stream(user_prompt=enhanced_prompt, message_history=message_history) as result:
+                # Tools run before the final output is streamed, so citations are ready by the first frame
+                visual_citations = self._pop_tool_visual_citations()
+                if visual_citations:
+                    logger.info(f"🔧 Streaming visual citations from tool: {len(visual_citations)}")
+                    yield {"type": "visual_citations", "visual_citations": visual_citations}
+                
+                async for partial_response, _ in result.stream_structured(debounce_by=0.01):
+                    text = _partial_text_response(partial_response)
+                    if len(text) > len(streamed_text) and text.startswith(streamed_text):
+                        yield {"type": "delta", "text": text[len(streamed_text):]}
+                        streamed_text = text
+                
+                result_data = await result.get_output()
+                self.store_message_history(session_id, result.all_messages())
+            
+            # Catch any text the partial parser held back (e.g. a trailing escape sequence)
+            if result_data.text_response.startswith(streamed_text) and len(result_data.text_response) > len(streamed_text):
+                yield {"type": "delta", "text": result_data.text_response[len(streamed_text):]}
+            
+            response = self._finalize_agent_output(result_data, context, session_id, visual_citations)
+            yield {"type": "final", "response": response}
+            
+        except Exception as e:
+            if streamed_text:
+                # Part of an answer is already on screen; let the caller report the failure
+                raise
+            logger.error(f"🚨 Voice streaming error: {str(e)}")
+            response = self._recover_from_error(message, detected_entity, context, relevant_docs)
+            yield {"type": "delta", "text": response.text_response}
+            yield {"type": "final", "response": response}
+    
+    def _build_agent_prompt(
+        self,
+        message: str,
+        context: ConversationContext,
+        relevant_docs: List[Dict] = None
+    ) -> str:
+        """Build simplified prompt - let the agent handle complexity"""
+        return f"""
+VOICE MESSAGE: "{message}"
+
+CURRENT CONTEXT:
+- Current Entity/Topic: {context.current_entity or 'None'} 
+- Entity history: {', '.join(context.entity_history) if context.entity_history else 'None'}
+- Topics covered: {', '.join(context.topics_covered) if context.topics_covered else 'None'}
+
+RELEVANT DOCUMENTS:
+{json.dumps(relevant_docs or [], indent=2)}
+
+Process this QSR query using your comprehensive knowledge and call appropriate tools as needed.
+"""
+    
+    def _pop_tool_visual_citations(self) -> List[Dict[str, Any]]:
+        """Take visual citations stored by the image tool and clear them for the next request"""
+        global _last_tool_visual_citations
+        citations = _last_tool_visual_citations.copy()
+        _last_tool_visual_citations = []
+        return citations
+    
+    def _finalize_agent_output(
+        self,
+        result_data: VoiceResponse,
+        context: ConversationContext,
+        session_id: str,
+        visual_citations: List[Dict[str, Any]]
+    ) -> VoiceResponse:
+        """Attach citations, update context and parse steps on the agent's final output"""
+        if visual_citations:
+            result_data.visual_citations = visual_citations
+            # Also add to specialized insights for text chat extraction
+            if not result_data.specialized_insights:
+                result_data.specialized_insights = {}
+            result_data.specialized_insights['visual_citations'] = visual_citations.copy()
+        
+        # Mark as comprehensive agent response
+        result_data.primary_agent = AgentType.GENERAL
+        result_data.coordination_strategy = AgentCoordinationStrategy.SINGLE_AGENT
+        
+        # STEP 3C: Enhanced context updates with multi-agent insights
+        self._apply_advanced_context_updates(result_data, context, session_id)
+        
+        # Add multi-agent specific context updates
+        if hasattr(result_data, 'specialized_insights') and result_data.specialized_insights:
+            context.context_references.extend([f"Consulted {agent}" for agent in result_data.specialized_insights.keys()])
+        
+        # STEP 3D: Parse steps for future Playbooks UX (preserved functionality)
+        result_data.parsed_steps = self._parse_response_steps(result_data.text_response)
+        if result_data.parsed_steps.has_steps:
+            logger.info(f"📋 Parsed {result_data.parsed_steps.total_steps} steps: {result_data.parsed_steps.procedure_title}")
+        
+        # STEP 3E: Enhanced logging with single agent details
+        logger.info(f"🎯 Comprehensive QSR expert agent processing complete")
+        logger.info(f"🎯 Intent: {result_data.detected_intent}, Equipment: {result_data.equipment_mentioned}")
+        logger.info(f"🔄 Continue listening: {result_data.should_continue_listening}, Hands-free: {result_data.hands_free_recommendation}")
+        logger.info(f"⚠️ Safety priority: {getattr(result_data, 'safety_priority', False)}")
+        
+        # Trim the conversation log and re-measure the session after in-place updates
+        self.sessions.touch(session_id)
+        
+        return result_data
+    
+    def _recover_from_error(
+        self,
+        message: str,
+        detected_entity: Optional[str],
+        context: ConversationContext,
+        relevant_docs: List[Dict] = None
+    ) -> VoiceResponse:
+        """Pick the fallback response after an agent failure"""
+        # Use intelligent fallback instead of error recovery when entity is detected
+        if detected_entity:
+            logger.info(f"🔄 Using intelligent fallback for entity: {detected_entity}")
+            return self._intelligent_entity_fallback(message, detected_entity, context, relevant_docs)
+        # Enhanced error recovery with context preservation
+        return self._enhanced_error_recovery(message, context)
     
     def _format_enhanced_context(self, enhanced_context: Dict[str, Any]) -> str:
         """Format enhanced context from graph service for LLM processing"""
@@ -1553,8 +1690,7 @@ Process this QSR query using your comprehensive knowledge and call appropriate t
     def end_conversation(self, session_id: str = None):
         """Clean up conversation context"""
         session_id = session_id or self.default_session
-        if session_id in self.active_contexts:
-            del self.active_contexts[session_id]
+        self.sessions.end(session_id)
     
     def get_conversation_summary(self, session_id: str = None) -> Dict[str, Any]:
         """Get summary of conversation for analytics"""
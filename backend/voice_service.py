@@ -7,13 +7,21 @@ import logging
 import os
 import asyncio
 import httpx
-import time
 import tempfile
 import base64
 from typing import Dict, Optional, List
 from fastapi import HTTPException
 import re
 
+try:
+    from services.tts_audio_cache import TTSAudioCache
+    from services.tts_scheduler import TTSScheduler, TTSPriority, TTSRateLimited, TTSQueueFull
+    from metrics_registry import instrumented
+except ImportError:
+    from .services.tts_audio_cache import TTSAudioCache
+    from .services.tts_scheduler import TTSScheduler, TTSPriority, TTSRateLimited, TTSQueueFull
+    from .metrics_registry import instrumented
+
 logger = logging.getLogger(__name__)
 
 class ElevenLabsVoiceService:
@@ -33,11 +41,25 @@ class ElevenLabsVoiceService:
             "speaking_rate": 0.95   # SLIGHTLY SLOWER for clarity
         }
         
-        # Rate limiting to prevent API throttling issues
-        self.last_request_time = 0
-        self.min_request_interval = 1.5  # Minimum 1.5 seconds between requests
+        # Concurrency/rate limiting sized to the ElevenLabs account instead of a global gate
+        self.scheduler = TTSScheduler(
+            max_concurrency=int(os.getenv("ELEVENLABS_MAX_CONCURRENCY", "3")),
+            requests_per_second=float(os.getenv("ELEVENLABS_REQUESTS_PER_SECOND", "2.0")),
+            max_queue=int(os.getenv("TTS_QUEUE_MAX", "64")),
+            base_backoff=2.0
+        )
         self.is_processing = False
         
+        # Shared keep-alive connection pool (created on first request)
+        self.http_client: Optional[httpx.AsyncClient] = None
+        
+        # Repeated answers are served from cache instead of re-synthesized
+        self.audio_cache = TTSAudioCache(
+            cache_dir=os.getenv("TTS_CACHE_DIR", "../data/tts_cache"),
+            max_memory_bytes=int(os.getenv("TTS_CACHE_MEMORY_BYTES", str(32 * 1024 * 1024))),
+            max_disk_bytes=int(os.getenv("TTS_CACHE_DISK_BYTES", str(512 * 1024 * 1024))),
+        )
+        
         if not self.api_key:
             logger.warning("ELEVENLABS_API_KEY not found in environment variables")
     
@@ -45,6 +67,30 @@ class ElevenLabsVoiceService:
         """Check if ElevenLabs service is available"""
         return bool(self.api_key)
     
+    def _get_http_client(self) -> httpx.AsyncClient:
+        """Shared pooled HTTP client so each synthesis reuses a warm TLS connection"""
+        if self.http_client is None or self.http_client.is_closed:
+            self.http_client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=60.0),
+                timeout=httpx.Timeout(30.0, connect=5.0)
+            )
+        return self.http_client
+    
+    async def close(self):
+        """Stop the TTS scheduler and close the shared HTTP connection pool"""
+        await self.scheduler.close()
+        if self.http_client is not None:
+            await self.http_client.aclose()
+            self.http_client = None
+    
+    def get_cache_stats(self) -> Dict:
+        """TTS audio cache hit/miss counters and sizes"""
+        return self.audio_cache.get_stats()
+    
+    def get_scheduler_stats(self) -> Dict:
+        """TTS queue depth, backpressure and rate-limit counters"""
+        return self.scheduler.get_stats()
+    
     def clean_text_for_speech(self, text: str) -> str:
         """Enhanced text optimization with temperature and number range handling"""
         # Remove markdown formatting
@@ -124,26 +170,27 @@ class ElevenLabsVoiceService:
             }
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/voices",
-                    headers={"xi-api-key": self.api_key},
-                    timeout=10.0
-                )
-                
-                if response.status_code == 200:
-                    voices_data = response.json()
-                    return {
-                        "available": True,
-                        "voice_count": len(voices_data.get("voices", [])),
-                        "current_voice": "Rachel",
-                        "voice_id": self.voice_id
-                    }
-                else:
-                    return {
-                        "available": False,
-                        "error": f"API returned status {response.status_code}"
-                    }
+            response = await self._get_http_client().get(
+                f"{self.base_url}/voices",
+                headers={"xi-api-key": self.api_key},
+                timeout=10.0
+            )
+            
+            if response.status_code == 200:
+                voices_data = response.json()
+                return {
+                    "available": True,
+                    "voice_count": len(voices_data.get("voices", [])),
+                    "current_voice": "Rachel",
+                    "voice_id": self.voice_id,
+                    "cache": self.get_cache_stats(),
+                    "scheduler": self.get_scheduler_stats()
+                }
+            else:
+                return {
+                    "available": False,
+                    "error": f"API returned status {response.status_code}"
+                }
                     
         except Exception as e:
             logger.error(f"ElevenLabs status check failed: {e}")
@@ -152,8 +199,44 @@ class ElevenLabsVoiceService:
                 "error": str(e)
             }
     
-    async def generate_audio_safely(self, text: str, retries: int = 3) -> Optional[bytes]:
-        """ENHANCED audio generation with diagnostic logging"""
+    async def synthesize_sentence(self, index: int, sentence: str,
+                                  session_id: Optional[str] = None) -> Optional[bytes]:
+        """
+        Synthesize one sentence of a pipelined voice answer
+        
+        Only the first sentence is waited on by the listener; later ones are
+        synthesized ahead of playback, so they are submitted as PREFETCH and
+        yield to other sessions' interactive replies.
+        
+        Args:
+            index: Position of the sentence in the answer
+            sentence: Sentence text
+            session_id: Voice session, used for fair scheduling between headsets
+            
+        Returns:
+            MP3 bytes, or None if the service is unavailable or synthesis failed
+        """
+        if not self.is_available():
+            return None
+        priority = TTSPriority.INTERACTIVE if index == 0 else TTSPriority.PREFETCH
+        return await self.generate_audio_safely(sentence, priority=priority, session_id=session_id)
+    
+    @instrumented("elevenlabs", "generate_audio")
+    async def generate_audio_safely(self, text: str, retries: int = 3,
+                                    priority: TTSPriority = TTSPriority.INTERACTIVE,
+                                    session_id: Optional[str] = None) -> Optional[bytes]:
+        """
+        ENHANCED audio generation with diagnostic logging
+        
+        Args:
+            text: Text to speak
+            retries: Attempts for timeouts and API errors (429s are retried by the scheduler)
+            priority: INTERACTIVE replies are synthesized ahead of PREFETCH work
+            session_id: Voice session, used for fair scheduling between headsets
+            
+        Returns:
+            MP3 bytes, or None if synthesis failed
+        """
         if not self.api_key:
             logger.error("ElevenLabs API key not configured")
             return None
@@ -171,15 +254,6 @@ class ElevenLabsVoiceService:
         if text.endswith("..."):
             logger.warning(f"🚨 TEXT ENDS WITH ELLIPSIS: {text}")
         
-        # CRITICAL: Rate limiting to prevent throttling
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        
-        if time_since_last < self.min_request_interval:
-            wait_time = self.min_request_interval - time_since_last
-            logger.info(f"Rate limiting: waiting {wait_time:.1f}s")
-            await asyncio.sleep(wait_time)
-        
         # Clean and optimize text for speech
         clean_text = self.clean_text_for_speech(text)
         logger.info(f"🎙️ OPTIMIZED TEXT: '{clean_text}'")
@@ -193,48 +267,32 @@ class ElevenLabsVoiceService:
             logger.warning(f"Text too long ({len(clean_text)} chars), truncating to prevent chunking")
             clean_text = clean_text[:500] + "."
         
+        # Cached audio skips both the rate limit and the synthesis round trip
+        cache_key = self.audio_cache.make_key(clean_text, self.voice_id, self.model_id, self.voice_settings)
+        cached_audio = await self.audio_cache.aget(cache_key)
+        if cached_audio is not None:
+            logger.info(f"🎙️ TTS CACHE HIT for: '{clean_text[:50]}...'")
+            return cached_audio
+        
+        async def synthesize() -> bytes:
+            return await self._synthesize(clean_text)
+        
         for attempt in range(retries):
             try:
-                async with httpx.AsyncClient() as client:
-                    response = await client.post(
-                        f"{self.base_url}/text-to-speech/{self.voice_id}",
-                        headers={
-                            "Accept": "audio/mpeg",
-                            "Content-Type": "application/json",
-                            "xi-api-key": self.api_key
-                        },
-                        json={
-                            "text": clean_text,
-                            "model_id": self.model_id,
-                            "voice_settings": self.voice_settings
-                        },
-                        timeout=30.0
-                    )
-                    
-                    if response.status_code == 200:
-                        self.last_request_time = time.time()
-                        logger.info(f"🎙️ ELEVENLABS SUCCESS for: '{clean_text[:50]}...'")
-                        return response.content
-                    
-                    elif response.status_code == 429:
-                        # Rate limited - wait longer and retry
-                        if attempt < retries - 1:
-                            wait_time = 3 + (2 ** attempt)  # Longer exponential backoff
-                            logger.warning(f"Rate limited, waiting {wait_time}s (attempt {attempt + 1}/{retries})")
-                            await asyncio.sleep(wait_time)
-                            continue
-                        else:
-                            logger.error("Rate limit exceeded after retries")
-                            return None
+                # Scheduler enforces the account's concurrency and rate limits
+                audio = await self.scheduler.submit(synthesize, priority=priority, session_id=session_id)
+                logger.info(f"🎙️ ELEVENLABS SUCCESS for: '{clean_text[:50]}...'")
+                await self.audio_cache.aput(cache_key, audio)
+                return audio
+            
+            except TTSQueueFull as e:
+                logger.warning(f"TTS backpressure, skipping audio: {e}")
+                return None
+            
+            except TTSRateLimited:
+                logger.error("Rate limit exceeded after retries")
+                return None
                     
-                    else:
-                        logger.error(f"ElevenLabs API error: {response.status_code} - {response.text}")
-                        if attempt < retries - 1:
-                            await asyncio.sleep(1)
-                            continue
-                        else:
-                            return None
-                        
             except httpx.TimeoutException:
                 if attempt < retries - 1:
                     logger.warning(f"Request timeout, retrying (attempt {attempt + 1}/{retries})")
@@ -254,6 +312,43 @@ class ElevenLabsVoiceService:
                     return None
         
         return None
+    
+    @instrumented("elevenlabs", "synthesize")
+    async def _synthesize(self, clean_text: str) -> bytes:
+        """
+        One ElevenLabs text-to-speech call (run by the scheduler)
+        
+        Raises:
+            TTSRateLimited: On HTTP 429
+            RuntimeError: On any other non-200 response
+        """
+        response = await self._get_http_client().post(
+            f"{self.base_url}/text-to-speech/{self.voice_id}",
+            headers={
+                "Accept": "audio/mpeg",
+                "Content-Type": "application/json",
+                "xi-api-key": self.api_key
+            },
+            json={
+                "text": clean_text,
+                "model_id": self.model_id,
+                "voice_settings": self.voice_settings
+            },
+            timeout=30.0
+        )
+        
+        if response.status_code == 200:
+            return response.content
+        
+        if response.status_code == 429:
+            try:
+                retry_after = float(response.headers.get("retry-after", ""))
+            except ValueError:
+                retry_after = None
+            raise TTSRateLimited(retry_after)
+        
+        logger.error(f"ElevenLabs API error: {response.status_code} - {response.text}")
+        raise RuntimeError(f"ElevenLabs API error: {response.status_code}")
 
 # Global service instance
 voice_service = ElevenLabsVoiceService()
\ No newline at end of file
@@ -3,9 +3,11 @@ OpenAI integration for intelligent QSR assistant responses
 """
 
 import os
+import asyncio
 import logging
 from typing import List, Dict, Optional
-from openai import OpenAI
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+import httpx
 from dotenv import load_dotenv
 
 # Import keyring optionally (for local development)
@@ -15,6 +17,11 @@ try:
 except ImportError:
     KEYRING_AVAILABLE = False
 
+try:
+    from metrics_registry import instrumented
+except ImportError:
+    from backend.metrics_registry import instrumented
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -30,6 +37,10 @@ class QSRAssistant:
         self.temperature = 0.2  # Lower temperature for more consistent instruction following
         self.demo_mode = False
         
+        # Bound concurrent completions so a burst of chats can't exhaust the pool or rate limit
+        self.max_concurrent_requests = int(os.getenv("OPENAI_MAX_CONCURRENT_REQUESTS", "16"))
+        self._request_semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+        
         self._initialize_openai()
     
     def _initialize_openai(self):
@@ -49,8 +60,19 @@ class QSRAssistant:
                     self.api_key = api_key
                     logger.info("OpenAI demo mode enabled - simulating AI responses")
                 else:
-                    # Real API key
-                    self.client = OpenAI(api_key=api_key)
+                    # Real API key - async client over a shared keep-alive pool
+                    self.client = AsyncOpenAI(
+                        api_key=api_key,
+                        max_retries=2,
+                        http_client=DefaultAsyncHttpxClient(
+                            limits=httpx.Limits(
+                                max_connections=self.max_concurrent_requests * 2,
+                                max_keepalive_connections=self.max_concurrent_requests,
+                                keepalive_expiry=60.0
+                            ),
+                            timeout=httpx.Timeout(60.0, connect=5.0)
+                        )
+                    )
                     self.api_key = api_key
                     logger.info("OpenAI client initialized successfully")
             else:
@@ -63,6 +85,30 @@ class QSRAssistant:
         """Check if OpenAI integration is available"""
         return self.client is not None or self.demo_mode
     
+    @instrumented("openai", "chat_completion")
+    async def create_chat_completion(self, **kwargs):
+        """Non-blocking chat completion, bounded by the concurrency limit"""
+        async with self._request_semaphore:
+            return await self.client.chat.completions.create(**kwargs)
+    
+    @instrumented("openai", "chat_completion_stream")
+    async def stream_chat_completion(self, **kwargs):
+        """
+        Stream a chat completion, yielding text deltas as they arrive
+        
+        The concurrency slot is held until the stream is exhausted or closed.
+        """
+        async with self._request_semaphore:
+            stream = await self.client.chat.completions.create(stream=True, **kwargs)
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content is not None:
+                    yield chunk.choices[0].delta.content
+    
+    async def close(self):
+        """Close the pooled HTTP client"""
+        if self.client is not None:
+            await self.client.close()
+    
     def create_qsr_employee_system_prompt(self, simplified_context: str = "") -> str:
         """Generate system prompt optimized for QSR floor employees based on world-class expertise"""
         
@@ -190,7 +236,7 @@ Remember: People can't remember long spoken instructions. Keep it short and clea
             print(f"DEBUG: Voice system prompt first 200 chars: {self.create_voice_system_prompt(context)[:200]}")
             
             # Call OpenAI API with voice-optimized settings
-            response = self.client.chat.completions.create(
+            response = await self.create_chat_completion(
                 model=self.model,
                 messages=messages,
                 max_tokens=120,  # Shorter for voice
@@ -326,7 +372,7 @@ Remember: People can't remember long spoken instructions. Keep it short and clea
             # Call OpenAI API with strengthened parameters
             print(f"DEBUG: Using model: {self.model}, temp: {self.temperature}")
             print(f"DEBUG: System prompt first 100 chars: {self.create_system_prompt()[:100]}")
-            response = self.client.chat.completions.create(
+            response = await self.create_chat_completion(
                 model=self.model,
                 messages=messages,
                 max_tokens=self.max_tokens,
@@ -399,19 +445,13 @@ Remember: People can't remember long spoken instructions. Keep it short and clea
             ]
             
             # Call OpenAI API with streaming and strengthened parameters
-            stream = self.client.chat.completions.create(
+            async for content in self.stream_chat_completion(
                 model=self.model,
                 messages=messages,
                 max_tokens=self.max_tokens,
-                temperature=self.temperature,
-                stream=True
-            )
-            
-            # Stream response chunks
-            for chunk in stream:
-                if chunk.choices[0].delta.content is not None:
-                    content = chunk.choices[0].delta.content
-                    yield {"chunk": content, "done": False}
+                temperature=self.temperature
+            ):
+                yield {"chunk": content, "done": False}
             
             # Send completion signal with metadata
             sources = []